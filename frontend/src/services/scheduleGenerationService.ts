@@ -15,7 +15,7 @@ export interface GenerateScheduleResponse {
 
 export interface GenerationStatus {
   job_id: string
-  status: 'pending' | 'running' | 'completed' | 'failed'
+  status: 'pending' | 'queued' | 'running' | 'completed' | 'failed' | 'stopped'
   stage?: string
   current_iteration?: number
   max_iterations?: number
@@ -25,6 +25,25 @@ export interface GenerationStatus {
   last_reasoning?: string
 }
 
+export interface GenerationProgress {
+  job_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'stopped' | 'error'
+  stage?: string
+  iteration?: number
+  max_iterations?: number
+  current_score?: number
+  best_score?: number
+  hard_violations?: number
+  phase?: string
+  phase_timings?: Record<string, number>
+  last_reasoning?: string
+  error_message?: string
+  timestamp?: number
+}
+
+// Статусы, после которых в поток больше ничего не придёт
+const FINAL_STATUSES: ReadonlyArray<GenerationProgress['status']> = ['completed', 'failed', 'stopped', 'error']
+
 export class ScheduleGenerationService {
   constructor(private api: AxiosInstance) {}
 
@@ -39,5 +58,33 @@ export class ScheduleGenerationService {
     )
     return response.data
   }
+
+  /**
+   * Подписка на прогресс генерации (Server-Sent Events) вместо опроса статуса.
+   * Задача в очереди присылает статус 'queued', поток остаётся открытым до
+   * завершения генерации. Возвращает функцию отписки.
+   */
+  watchGeneration(
+    jobId: string,
+    onProgress: (progress: GenerationProgress) => void,
+    onError?: (event: Event) => void
+  ): () => void {
+    const source = new EventSource(`${this.api.defaults.baseURL}/api/agent/status/${jobId}/stream`)
+
+    source.addEventListener('progress', (event) => {
+      const progress: GenerationProgress = JSON.parse((event as MessageEvent).data)
+      onProgress(progress)
+      if (FINAL_STATUSES.includes(progress.status)) {
+        source.close()
+      }
+    })
+
+    source.onerror = (event) => {
+      source.close()
+      onError?.(event)
+    }
+
+    return () => source.close()
+  }
 }
 
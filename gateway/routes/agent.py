@@ -4,9 +4,12 @@ HTTP REST API endpoints для агента генерации расписан
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Literal, Iterator, Dict, Any, List
 import logging
+import json
 import grpc
 
 from rpc_clients.agent_client import agent_client
@@ -25,6 +28,14 @@ class GenerateScheduleRequest(BaseModel):
     max_iterations: Optional[int] = Field(100, ge=1, le=500, description="Максимум итераций")
     skip_stage1: bool = Field(False, description="Пропустить Stage 1 (использовать существующее)")
     skip_stage2: bool = Field(False, description="Пропустить Stage 2 (без аудиторий)")
+    ga_islands: int = Field(0, ge=0, le=64, description="Островная модель ГА: число островов (0 = одна популяция)")
+    migration_interval: int = Field(0, ge=0, le=500, description="Поколений между миграциями (0 = по умолчанию)")
+    migrants_count: int = Field(0, ge=0, le=50, description="Лучших хромосом на миграцию (0 = по умолчанию)")
+    migration_topology: Literal['', 'ring', 'random'] = Field('', description="Топология миграции: ring или random")
+    stage1_engine: Literal['', 'demo', 'llm', 'annealing', 'tabu'] = Field('', description="Движок Stage 1: demo, llm (GigaChat) или локальный поиск annealing / tabu (пусто = по умолчанию)")
+    stage1_time_budget: float = Field(0, ge=0, le=3600, description="Бюджет локального поиска Stage 1, сек (0 = по умолчанию)")
+    profile: bool = Field(False, description="Сохранить cProfile генерации в generation_history.metrics")
+    priority: int = Field(0, ge=-10, le=10, description="Приоритет в очереди генераций (выше - раньше)")
     
     class Config:
         json_schema_extra = {
@@ -46,11 +57,45 @@ class GenerateScheduleRequest(BaseModel):
                     "max_iterations": 50,
                     "skip_stage1": True,
                     "skip_stage2": False
+                },
+                {
+                    "semester": 3,
+                    "max_iterations": 200,
+                    "skip_stage1": False,
+                    "skip_stage2": False,
+                    "ga_islands": 4,
+                    "migration_interval": 10,
+                    "migrants_count": 2,
+                    "migration_topology": "ring"
+                },
+                {
+                    "semester": 3,
+                    "max_iterations": 100,
+                    "skip_stage1": False,
+                    "skip_stage2": False,
+                    "stage1_engine": "annealing",
+                    "stage1_time_budget": 30
                 }
             ]
         }
 
 
+class RepairScheduleRequest(BaseModel):
+    """Запрос на ремонт активного расписания"""
+    semester: int = Field(..., ge=1, le=12, description="Номер семестра обучения (1-12)")
+    teacher_ids: List[int] = Field(default_factory=list, description="Преподаватели с изменёнными предпочтениями")
+    course_load_ids: List[int] = Field(default_factory=list, description="Нагрузки для переоптимизации (добавленные / удалённые / изменённые находятся автоматически)")
+    time_budget: float = Field(0, ge=0, le=600, description="Бюджет локального поиска, сек (0 = по умолчанию)")
+    
+    class Config:
+        json_schema_extra = {
+            "examples": [
+                {"semester": 3, "teacher_ids": [42]},
+                {"semester": 3, "course_load_ids": [1501], "time_budget": 10}
+            ]
+        }
+
+
 # ============ ENDPOINTS ============
 
 @router.post("/generate", dependencies=[Depends(require_staff)])
@@ -82,6 +127,8 @@ async def generate_schedule(
         
     except grpc.RpcError as e:
         error_detail = e.details() if hasattr(e, 'details') else str(e)
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=429, detail=error_detail)
         logger.error(f"RPC error in generate_schedule: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Agent service error: {error_detail}")
     except HTTPException:
@@ -91,6 +138,35 @@ async def generate_schedule(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/repair", dependencies=[Depends(require_staff)])
+async def repair_schedule(
+    data: RepairScheduleRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Отремонтировать активное расписание после небольших изменений
+    (нагрузки, предпочтения преподавателей) без полной генерации
+    
+    Требуется роль: staff или admin
+    """
+    try:
+        request_data = data.dict()
+        request_data['created_by'] = current_user['user_id']
+        
+        result = agent_client.repair_schedule(request_data)
+        return result
+        
+    except grpc.RpcError as e:
+        error_detail = e.details() if hasattr(e, 'details') else str(e)
+        if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+            raise HTTPException(status_code=409, detail=error_detail)
+        logger.error(f"RPC error in repair_schedule: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Agent service error: {error_detail}")
+    except Exception as e:
+        logger.error(f"Error in repair_schedule: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/status/{job_id}")
 async def get_generation_status(job_id: str):
     """
@@ -126,6 +202,56 @@ async def get_generation_status(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/status/{job_id}/stream")
+async def stream_generation_status(job_id: str):
+    """
+    Прогресс генерации в реальном времени (Server-Sent Events)
+    
+    Каждое событие - итерация ГА / Stage 1: iteration, best_score,
+    hard_violations, phase_timings. Поток закрывается после статуса
+    completed / failed / stopped. Вместо опроса /status/{job_id}.
+    Генерация другого экземпляра ms-agent: снимок статуса и конец потока;
+    потоков больше лимита ms-agent - 429.
+    """
+    events = agent_client.watch_generation(job_id)
+    
+    try:
+        # Первое событие - сразу: 404 до начала потока (чтение gRPC блокирующее - в пуле потоков)
+        first = await run_in_threadpool(next, events, None)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Generation not found")
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=429, detail=e.details())
+        logger.error(f"RPC error in stream_generation_status: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Agent service error: {e.details()}")
+    if first is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+    
+    def sse(event: Dict[str, Any]) -> str:
+        return f"event: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    def stream() -> Iterator[str]:
+        yield sse(first)
+        try:
+            for event in events:
+                yield sse(event)
+        except grpc.RpcError as e:
+            logger.error(f"RPC error in generation stream {job_id}: {e}")
+            yield sse({'job_id': job_id, 'status': 'error', 'error_message': str(e.details())})
+        finally:
+            events.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/schedule")
 async def get_schedule(
     generation_id: Optional[int] = None,
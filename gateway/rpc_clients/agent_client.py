@@ -5,7 +5,7 @@ gRPC клиент для взаимодействия с ms-agent
 
 import grpc
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 # Import generated protobuf files from local directory
 try:
@@ -60,7 +60,15 @@ class AgentClient:
                 max_iterations=data.get('max_iterations', 100),
                 skip_stage1=data.get('skip_stage1', False),
                 skip_stage2=data.get('skip_stage2', False),
-                created_by=data.get('created_by', 0)
+                created_by=data.get('created_by', 0),
+                ga_islands=data.get('ga_islands', 0),
+                migration_interval=data.get('migration_interval', 0),
+                migrants_count=data.get('migrants_count', 0),
+                migration_topology=data.get('migration_topology', ''),
+                stage1_engine=data.get('stage1_engine', ''),
+                stage1_time_budget=data.get('stage1_time_budget', 0.0),
+                profile=data.get('profile', False),
+                priority=data.get('priority', 0)
             )
             response = self.stub.GenerateSchedule(request, timeout=30)
             
@@ -107,6 +115,64 @@ class AgentClient:
             logger.error(f"RPC error getting status: {e}")
             raise
     
+    def repair_schedule(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Repair active schedule (synchronous, seconds)"""
+        try:
+            time_budget = data.get('time_budget', 0.0)
+            request = agent_pb2.RepairRequest(
+                semester=data['semester'],
+                teacher_ids=data.get('teacher_ids', []),
+                course_load_ids=data.get('course_load_ids', []),
+                time_budget=time_budget,
+                created_by=data.get('created_by', 0)
+            )
+            response = self.stub.RepairSchedule(request, timeout=(time_budget or 30) + 60)
+            
+            return {
+                'success': response.success,
+                'job_id': response.job_id,
+                'message': response.message,
+                'affected': response.affected,
+                'movable': response.movable,
+                'deleted': response.deleted,
+                'inserted': response.inserted,
+                'updated': response.updated,
+                'moved': response.moved,
+                'initial_score': response.initial_score,
+                'final_score': response.final_score,
+                'conflicts': response.conflicts,
+                'seconds': response.seconds
+            }
+            
+        except grpc.RpcError as e:
+            logger.error(f"RPC error repairing schedule: {e}")
+            raise
+    
+    def watch_generation(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Stream generation progress (server-streaming WatchGeneration)"""
+        request = agent_pb2.StatusRequest(job_id=job_id)
+        call = self.stub.WatchGeneration(request)
+        try:
+            for event in call:
+                yield {
+                    'job_id': event.job_id,
+                    'status': event.status,
+                    'stage': event.stage,
+                    'iteration': event.iteration,
+                    'max_iterations': event.max_iterations,
+                    'current_score': event.current_score,
+                    'best_score': event.best_score,
+                    'hard_violations': event.hard_violations,
+                    'phase': event.phase,
+                    'phase_timings': dict(event.phase_timings),
+                    'last_reasoning': event.last_reasoning,
+                    'error_message': event.error_message,
+                    'timestamp': event.timestamp
+                }
+        finally:
+            # Клиент SSE отключился - закрыть поток на стороне ms-agent
+            call.cancel()
+    
     def get_schedule(self, generation_id: Optional[int] = None, only_active: bool = False) -> list:
         """Get schedule"""
         try:
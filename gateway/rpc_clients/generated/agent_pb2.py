@@ -14,13 +14,15 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61gent.proto\x12\x05\x61gent\"\xbc\x02\n\nCourseLoad\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x17\n\x0f\x64iscipline_name\x18\x02 \x01(\t\x12\x17\n\x0f\x64iscipline_code\x18\x03 \x01(\t\x12\x12\n\nteacher_id\x18\x04 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x05 \x01(\t\x12\x18\n\x10teacher_priority\x18\x06 \x01(\x05\x12\x10\n\x08group_id\x18\x07 \x01(\x05\x12\x12\n\ngroup_name\x18\x08 \x01(\t\x12\x12\n\ngroup_size\x18\t \x01(\x05\x12\x13\n\x0blesson_type\x18\n \x01(\t\x12\x1a\n\x12hours_per_semester\x18\x0b \x01(\x05\x12\x18\n\x10lessons_per_week\x18\x0c \x01(\x05\x12\x10\n\x08semester\x18\r \x01(\x05\x12\x15\n\racademic_year\x18\x0e \x01(\t\"\xe8\x02\n\x08Schedule\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x16\n\x0e\x63ourse_load_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x03 \x01(\x05\x12\x11\n\ttime_slot\x18\x04 \x01(\x05\x12\x14\n\x0c\x63lassroom_id\x18\x05 \x01(\x05\x12\x16\n\x0e\x63lassroom_name\x18\x06 \x01(\t\x12\x12\n\nteacher_id\x18\x07 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x08 \x01(\t\x12\x10\n\x08group_id\x18\t \x01(\x05\x12\x12\n\ngroup_name\x18\n \x01(\t\x12\x17\n\x0f\x64iscipline_name\x18\x0b \x01(\t\x12\x13\n\x0blesson_type\x18\x0c \x01(\t\x12\x15\n\rgeneration_id\x18\r \x01(\x05\x12\x11\n\tis_active\x18\x0e \x01(\x08\x12\x10\n\x08semester\x18\x0f \x01(\x05\x12\x15\n\racademic_year\x18\x10 \x01(\t\x12\x11\n\tweek_type\x18\x11 \x01(\t\"d\n\x08\x43onflict\x12\x15\n\rschedule_id_1\x18\x01 \x01(\x05\x12\x15\n\rschedule_id_2\x18\x02 \x01(\x05\x12\x15\n\rconflict_type\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x04 \x01(\t\"y\n\x0fGenerateRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x02 \x01(\x05\x12\x13\n\x0bskip_stage1\x18\x03 \x01(\x08\x12\x13\n\x0bskip_stage2\x18\x04 \x01(\x08\x12\x12\n\ncreated_by\x18\x05 \x01(\x05\"S\n\x10GenerateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"\x1f\n\rStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xe1\x01\n\x0eStatusResponse\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\r\n\x05stage\x18\x04 \x01(\t\x12\x19\n\x11\x63urrent_iteration\x18\x05 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x06 \x01(\x05\x12\x15\n\rcurrent_score\x18\x07 \x01(\x02\x12\x12\n\nbest_score\x18\x08 \x01(\x02\x12\x1b\n\x13progress_percentage\x18\t \x01(\x02\x12\x16\n\x0elast_reasoning\x18\n \x01(\t\"/\n\x0eHistoryRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\x0e\n\x06offset\x18\x02 \x01(\x05\"S\n\x0fHistoryResponse\x12+\n\x05items\x18\x01 \x03(\x0b\x32\x1c.agent.GenerationHistoryItem\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"\xa0\x01\n\x15GenerationHistoryItem\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x10\n\x08semester\x18\x02 \x01(\x05\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x13\n\x0b\x66inal_score\x18\x04 \x01(\x02\x12\x18\n\x10total_iterations\x18\x05 \x01(\x05\x12\x12\n\ncreated_at\x18\x06 \x01(\t\x12\x12\n\ncreated_by\x18\x07 \x01(\x05\"\x1d\n\x0bStopRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"0\n\x0cStopResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"Q\n\x15GetCourseLoadsRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x11\n\tgroup_ids\x18\x03 \x03(\x05\"S\n\x13\x43ourseLoadsResponse\x12\'\n\x0c\x63ourse_loads\x18\x01 \x03(\x0b\x32\x11.agent.CourseLoad\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"@\n\x12GetScheduleRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\x12\x13\n\x0bonly_active\x18\x02 \x01(\x08\"=\n\x14GroupScheduleRequest\x12\x10\n\x08group_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"A\n\x16TeacherScheduleRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"K\n\x10ScheduleResponse\x12\"\n\tschedules\x18\x01 \x03(\x0b\x32\x0f.agent.Schedule\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"M\n\x0e\x41nalyzeRequest\x12\x17\n\rgeneration_id\x18\x01 \x01(\x05H\x00\x12\x18\n\x0e\x63urrent_active\x18\x02 \x01(\x08H\x00\x42\x08\n\x06target\"\x8d\x03\n\x10\x41nalysisResponse\x12\"\n\tconflicts\x18\x01 \x03(\x0b\x32\x0f.agent.Conflict\x12\x15\n\rtotal_lessons\x18\x02 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x03 \x01(\x05\x12\x18\n\x10isolated_lessons\x18\x04 \x01(\x05\x12\x12\n\ngaps_count\x18\x05 \x01(\x05\x12\x41\n\x0elessons_by_day\x18\x06 \x03(\x0b\x32).agent.AnalysisResponse.LessonsByDayEntry\x12\x43\n\x0flessons_by_type\x18\x07 \x03(\x0b\x32*.agent.AnalysisResponse.LessonsByTypeEntry\x1a\x33\n\x11LessonsByDayEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\x1a\x34\n\x12LessonsByTypeEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\'\n\x0eMetricsRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\"\xad\x02\n\x0fMetricsResponse\x12\x15\n\rfitness_score\x18\x01 \x01(\x02\x12\x18\n\x10preference_score\x18\x02 \x01(\x02\x12\x1a\n\x12\x64istribution_score\x18\x03 \x01(\x02\x12\x16\n\x0e\x63onflict_score\x18\x04 \x01(\x02\x12\x17\n\x0ftotal_conflicts\x18\x05 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x06 \x01(\x05\x12\x45\n\x10\x64\x65tailed_metrics\x18\x07 \x03(\x0b\x32+.agent.MetricsResponse.DetailedMetricsEntry\x1a\x36\n\x14\x44\x65tailedMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x14\n\x12HealthCheckRequest\"I\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t2\x8c\x06\n\x0c\x41gentService\x12\x43\n\x10GenerateSchedule\x12\x16.agent.GenerateRequest\x1a\x17.agent.GenerateResponse\x12\x42\n\x13GetGenerationStatus\x12\x14.agent.StatusRequest\x1a\x15.agent.StatusResponse\x12\x45\n\x14GetGenerationHistory\x12\x15.agent.HistoryRequest\x1a\x16.agent.HistoryResponse\x12\x39\n\x0eStopGeneration\x12\x12.agent.StopRequest\x1a\x13.agent.StopResponse\x12J\n\x0eGetCourseLoads\x12\x1c.agent.GetCourseLoadsRequest\x1a\x1a.agent.CourseLoadsResponse\x12\x41\n\x0bGetSchedule\x12\x19.agent.GetScheduleRequest\x1a\x17.agent.ScheduleResponse\x12K\n\x13GetScheduleForGroup\x12\x1b.agent.GroupScheduleRequest\x1a\x17.agent.ScheduleResponse\x12O\n\x15GetScheduleForTeacher\x12\x1d.agent.TeacherScheduleRequest\x1a\x17.agent.ScheduleResponse\x12\x41\n\x0f\x41nalyzeSchedule\x12\x15.agent.AnalyzeRequest\x1a\x17.agent.AnalysisResponse\x12;\n\nGetMetrics\x12\x15.agent.MetricsRequest\x1a\x16.agent.MetricsResponse\x12\x44\n\x0bHealthCheck\x12\x19.agent.HealthCheckRequest\x1a\x1a.agent.HealthCheckResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61gent.proto\x12\x05\x61gent\"\xbc\x02\n\nCourseLoad\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x17\n\x0f\x64iscipline_name\x18\x02 \x01(\t\x12\x17\n\x0f\x64iscipline_code\x18\x03 \x01(\t\x12\x12\n\nteacher_id\x18\x04 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x05 \x01(\t\x12\x18\n\x10teacher_priority\x18\x06 \x01(\x05\x12\x10\n\x08group_id\x18\x07 \x01(\x05\x12\x12\n\ngroup_name\x18\x08 \x01(\t\x12\x12\n\ngroup_size\x18\t \x01(\x05\x12\x13\n\x0blesson_type\x18\n \x01(\t\x12\x1a\n\x12hours_per_semester\x18\x0b \x01(\x05\x12\x18\n\x10lessons_per_week\x18\x0c \x01(\x05\x12\x10\n\x08semester\x18\r \x01(\x05\x12\x15\n\racademic_year\x18\x0e \x01(\t\"\xe8\x02\n\x08Schedule\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x16\n\x0e\x63ourse_load_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x03 \x01(\x05\x12\x11\n\ttime_slot\x18\x04 \x01(\x05\x12\x14\n\x0c\x63lassroom_id\x18\x05 \x01(\x05\x12\x16\n\x0e\x63lassroom_name\x18\x06 \x01(\t\x12\x12\n\nteacher_id\x18\x07 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x08 \x01(\t\x12\x10\n\x08group_id\x18\t \x01(\x05\x12\x12\n\ngroup_name\x18\n \x01(\t\x12\x17\n\x0f\x64iscipline_name\x18\x0b \x01(\t\x12\x13\n\x0blesson_type\x18\x0c \x01(\t\x12\x15\n\rgeneration_id\x18\r \x01(\x05\x12\x11\n\tis_active\x18\x0e \x01(\x08\x12\x10\n\x08semester\x18\x0f \x01(\x05\x12\x15\n\racademic_year\x18\x10 \x01(\t\x12\x11\n\tweek_type\x18\x11 \x01(\t\"d\n\x08\x43onflict\x12\x15\n\rschedule_id_1\x18\x01 \x01(\x05\x12\x15\n\rschedule_id_2\x18\x02 \x01(\x05\x12\x15\n\rconflict_type\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x04 \x01(\t\"\xb3\x02\n\x0fGenerateRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x02 \x01(\x05\x12\x13\n\x0bskip_stage1\x18\x03 \x01(\x08\x12\x13\n\x0bskip_stage2\x18\x04 \x01(\x08\x12\x12\n\ncreated_by\x18\x05 \x01(\x05\x12\x12\n\nga_islands\x18\x07 \x01(\x05\x12\x1a\n\x12migration_interval\x18\x08 \x01(\x05\x12\x16\n\x0emigrants_count\x18\t \x01(\x05\x12\x1a\n\x12migration_topology\x18\n \x01(\t\x12\x15\n\rstage1_engine\x18\x0b \x01(\t\x12\x1a\n\x12stage1_time_budget\x18\x0c \x01(\x01\x12\x0f\n\x07profile\x18\r \x01(\x08\x12\x10\n\x08priority\x18\x0e \x01(\x05\"S\n\x10GenerateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"x\n\rRepairRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x17\n\x0f\x63ourse_load_ids\x18\x03 \x03(\x05\x12\x13\n\x0btime_budget\x18\x04 \x01(\x01\x12\x12\n\ncreated_by\x18\x05 \x01(\x05\"\xf8\x01\n\x0eRepairResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x10\n\x08\x61\x66\x66\x65\x63ted\x18\x04 \x01(\x05\x12\x0f\n\x07movable\x18\x05 \x01(\x05\x12\x0f\n\x07\x64\x65leted\x18\x06 \x01(\x05\x12\x10\n\x08inserted\x18\x07 \x01(\x05\x12\x0f\n\x07updated\x18\x08 \x01(\x05\x12\r\n\x05moved\x18\t \x01(\x05\x12\x15\n\rinitial_score\x18\n \x01(\x05\x12\x13\n\x0b\x66inal_score\x18\x0b \x01(\x05\x12\x11\n\tconflicts\x18\x0c \x01(\x05\x12\x0f\n\x07seconds\x18\r \x01(\x01\"\x1f\n\rStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xe1\x01\n\x0eStatusResponse\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\r\n\x05stage\x18\x04 \x01(\t\x12\x19\n\x11\x63urrent_iteration\x18\x05 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x06 \x01(\x05\x12\x15\n\rcurrent_score\x18\x07 \x01(\x02\x12\x12\n\nbest_score\x18\x08 \x01(\x02\x12\x1b\n\x13progress_percentage\x18\t \x01(\x02\x12\x16\n\x0elast_reasoning\x18\n \x01(\t\"\xfc\x02\n\x12GenerationProgress\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\t\x12\x11\n\titeration\x18\x04 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x05 \x01(\x05\x12\x15\n\rcurrent_score\x18\x06 \x01(\x01\x12\x12\n\nbest_score\x18\x07 \x01(\x01\x12\x17\n\x0fhard_violations\x18\x08 \x01(\x05\x12\r\n\x05phase\x18\t \x01(\t\x12\x42\n\rphase_timings\x18\n \x03(\x0b\x32+.agent.GenerationProgress.PhaseTimingsEntry\x12\x16\n\x0elast_reasoning\x18\x0b \x01(\t\x12\x15\n\rerror_message\x18\x0c \x01(\t\x12\x11\n\ttimestamp\x18\r \x01(\x01\x1a\x33\n\x11PhaseTimingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"/\n\x0eHistoryRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\x0e\n\x06offset\x18\x02 \x01(\x05\"S\n\x0fHistoryResponse\x12+\n\x05items\x18\x01 \x03(\x0b\x32\x1c.agent.GenerationHistoryItem\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"\xa0\x01\n\x15GenerationHistoryItem\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x10\n\x08semester\x18\x02 \x01(\x05\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x13\n\x0b\x66inal_score\x18\x04 \x01(\x02\x12\x18\n\x10total_iterations\x18\x05 \x01(\x05\x12\x12\n\ncreated_at\x18\x06 \x01(\t\x12\x12\n\ncreated_by\x18\x07 \x01(\x05\"\x1d\n\x0bStopRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"0\n\x0cStopResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"Q\n\x15GetCourseLoadsRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x11\n\tgroup_ids\x18\x03 \x03(\x05\"S\n\x13\x43ourseLoadsResponse\x12\'\n\x0c\x63ourse_loads\x18\x01 \x03(\x0b\x32\x11.agent.CourseLoad\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"@\n\x12GetScheduleRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\x12\x13\n\x0bonly_active\x18\x02 \x01(\x08\"=\n\x14GroupScheduleRequest\x12\x10\n\x08group_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"A\n\x16TeacherScheduleRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"K\n\x10ScheduleResponse\x12\"\n\tschedules\x18\x01 \x03(\x0b\x32\x0f.agent.Schedule\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"M\n\x0e\x41nalyzeRequest\x12\x17\n\rgeneration_id\x18\x01 \x01(\x05H\x00\x12\x18\n\x0e\x63urrent_active\x18\x02 \x01(\x08H\x00\x42\x08\n\x06target\"\x8d\x03\n\x10\x41nalysisResponse\x12\"\n\tconflicts\x18\x01 \x03(\x0b\x32\x0f.agent.Conflict\x12\x15\n\rtotal_lessons\x18\x02 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x03 \x01(\x05\x12\x18\n\x10isolated_lessons\x18\x04 \x01(\x05\x12\x12\n\ngaps_count\x18\x05 \x01(\x05\x12\x41\n\x0elessons_by_day\x18\x06 \x03(\x0b\x32).agent.AnalysisResponse.LessonsByDayEntry\x12\x43\n\x0flessons_by_type\x18\x07 \x03(\x0b\x32*.agent.AnalysisResponse.LessonsByTypeEntry\x1a\x33\n\x11LessonsByDayEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\x1a\x34\n\x12LessonsByTypeEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\'\n\x0eMetricsRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\"\xad\x02\n\x0fMetricsResponse\x12\x15\n\rfitness_score\x18\x01 \x01(\x02\x12\x18\n\x10preference_score\x18\x02 \x01(\x02\x12\x1a\n\x12\x64istribution_score\x18\x03 \x01(\x02\x12\x16\n\x0e\x63onflict_score\x18\x04 \x01(\x02\x12\x17\n\x0ftotal_conflicts\x18\x05 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x06 \x01(\x05\x12\x45\n\x10\x64\x65tailed_metrics\x18\x07 \x03(\x0b\x32+.agent.MetricsResponse.DetailedMetricsEntry\x1a\x36\n\x14\x44\x65tailedMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x14\n\x12HealthCheckRequest\"I\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t2\x91\x07\n\x0c\x41gentService\x12\x43\n\x10GenerateSchedule\x12\x16.agent.GenerateRequest\x1a\x17.agent.GenerateResponse\x12\x42\n\x13GetGenerationStatus\x12\x14.agent.StatusRequest\x1a\x15.agent.StatusResponse\x12\x45\n\x14GetGenerationHistory\x12\x15.agent.HistoryRequest\x1a\x16.agent.HistoryResponse\x12\x39\n\x0eStopGeneration\x12\x12.agent.StopRequest\x1a\x13.agent.StopResponse\x12\x44\n\x0fWatchGeneration\x12\x14.agent.StatusRequest\x1a\x19.agent.GenerationProgress0\x01\x12=\n\x0eRepairSchedule\x12\x14.agent.RepairRequest\x1a\x15.agent.RepairResponse\x12J\n\x0eGetCourseLoads\x12\x1c.agent.GetCourseLoadsRequest\x1a\x1a.agent.CourseLoadsResponse\x12\x41\n\x0bGetSchedule\x12\x19.agent.GetScheduleRequest\x1a\x17.agent.ScheduleResponse\x12K\n\x13GetScheduleForGroup\x12\x1b.agent.GroupScheduleRequest\x1a\x17.agent.ScheduleResponse\x12O\n\x15GetScheduleForTeacher\x12\x1d.agent.TeacherScheduleRequest\x1a\x17.agent.ScheduleResponse\x12\x41\n\x0f\x41nalyzeSchedule\x12\x15.agent.AnalyzeRequest\x1a\x17.agent.AnalysisResponse\x12;\n\nGetMetrics\x12\x15.agent.MetricsRequest\x1a\x16.agent.MetricsResponse\x12\x44\n\x0bHealthCheck\x12\x19.agent.HealthCheckRequest\x1a\x1a.agent.HealthCheckResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'agent_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._options = None
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_options = b'8\001'
   _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._options = None
   _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._serialized_options = b'8\001'
   _globals['_ANALYSISRESPONSE_LESSONSBYTYPEENTRY']._options = None
@@ -33,54 +35,62 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_SCHEDULE']._serialized_end=702
   _globals['_CONFLICT']._serialized_start=704
   _globals['_CONFLICT']._serialized_end=804
-  _globals['_GENERATEREQUEST']._serialized_start=806
-  _globals['_GENERATEREQUEST']._serialized_end=927
-  _globals['_GENERATERESPONSE']._serialized_start=929
-  _globals['_GENERATERESPONSE']._serialized_end=1012
-  _globals['_STATUSREQUEST']._serialized_start=1014
-  _globals['_STATUSREQUEST']._serialized_end=1045
-  _globals['_STATUSRESPONSE']._serialized_start=1048
-  _globals['_STATUSRESPONSE']._serialized_end=1273
-  _globals['_HISTORYREQUEST']._serialized_start=1275
-  _globals['_HISTORYREQUEST']._serialized_end=1322
-  _globals['_HISTORYRESPONSE']._serialized_start=1324
-  _globals['_HISTORYRESPONSE']._serialized_end=1407
-  _globals['_GENERATIONHISTORYITEM']._serialized_start=1410
-  _globals['_GENERATIONHISTORYITEM']._serialized_end=1570
-  _globals['_STOPREQUEST']._serialized_start=1572
-  _globals['_STOPREQUEST']._serialized_end=1601
-  _globals['_STOPRESPONSE']._serialized_start=1603
-  _globals['_STOPRESPONSE']._serialized_end=1651
-  _globals['_GETCOURSELOADSREQUEST']._serialized_start=1653
-  _globals['_GETCOURSELOADSREQUEST']._serialized_end=1734
-  _globals['_COURSELOADSRESPONSE']._serialized_start=1736
-  _globals['_COURSELOADSRESPONSE']._serialized_end=1819
-  _globals['_GETSCHEDULEREQUEST']._serialized_start=1821
-  _globals['_GETSCHEDULEREQUEST']._serialized_end=1885
-  _globals['_GROUPSCHEDULEREQUEST']._serialized_start=1887
-  _globals['_GROUPSCHEDULEREQUEST']._serialized_end=1948
-  _globals['_TEACHERSCHEDULEREQUEST']._serialized_start=1950
-  _globals['_TEACHERSCHEDULEREQUEST']._serialized_end=2015
-  _globals['_SCHEDULERESPONSE']._serialized_start=2017
-  _globals['_SCHEDULERESPONSE']._serialized_end=2092
-  _globals['_ANALYZEREQUEST']._serialized_start=2094
-  _globals['_ANALYZEREQUEST']._serialized_end=2171
-  _globals['_ANALYSISRESPONSE']._serialized_start=2174
-  _globals['_ANALYSISRESPONSE']._serialized_end=2571
-  _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._serialized_start=2466
-  _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._serialized_end=2517
-  _globals['_ANALYSISRESPONSE_LESSONSBYTYPEENTRY']._serialized_start=2519
-  _globals['_ANALYSISRESPONSE_LESSONSBYTYPEENTRY']._serialized_end=2571
-  _globals['_METRICSREQUEST']._serialized_start=2573
-  _globals['_METRICSREQUEST']._serialized_end=2612
-  _globals['_METRICSRESPONSE']._serialized_start=2615
-  _globals['_METRICSRESPONSE']._serialized_end=2916
-  _globals['_METRICSRESPONSE_DETAILEDMETRICSENTRY']._serialized_start=2862
-  _globals['_METRICSRESPONSE_DETAILEDMETRICSENTRY']._serialized_end=2916
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=2918
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=2938
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=2940
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=3013
-  _globals['_AGENTSERVICE']._serialized_start=3016
-  _globals['_AGENTSERVICE']._serialized_end=3796
+  _globals['_GENERATEREQUEST']._serialized_start=807
+  _globals['_GENERATEREQUEST']._serialized_end=1114
+  _globals['_GENERATERESPONSE']._serialized_start=1116
+  _globals['_GENERATERESPONSE']._serialized_end=1199
+  _globals['_REPAIRREQUEST']._serialized_start=1201
+  _globals['_REPAIRREQUEST']._serialized_end=1321
+  _globals['_REPAIRRESPONSE']._serialized_start=1324
+  _globals['_REPAIRRESPONSE']._serialized_end=1572
+  _globals['_STATUSREQUEST']._serialized_start=1574
+  _globals['_STATUSREQUEST']._serialized_end=1605
+  _globals['_STATUSRESPONSE']._serialized_start=1608
+  _globals['_STATUSRESPONSE']._serialized_end=1833
+  _globals['_GENERATIONPROGRESS']._serialized_start=1836
+  _globals['_GENERATIONPROGRESS']._serialized_end=2216
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_start=2165
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_end=2216
+  _globals['_HISTORYREQUEST']._serialized_start=2218
+  _globals['_HISTORYREQUEST']._serialized_end=2265
+  _globals['_HISTORYRESPONSE']._serialized_start=2267
+  _globals['_HISTORYRESPONSE']._serialized_end=2350
+  _globals['_GENERATIONHISTORYITEM']._serialized_start=2353
+  _globals['_GENERATIONHISTORYITEM']._serialized_end=2513
+  _globals['_STOPREQUEST']._serialized_start=2515
+  _globals['_STOPREQUEST']._serialized_end=2544
+  _globals['_STOPRESPONSE']._serialized_start=2546
+  _globals['_STOPRESPONSE']._serialized_end=2594
+  _globals['_GETCOURSELOADSREQUEST']._serialized_start=2596
+  _globals['_GETCOURSELOADSREQUEST']._serialized_end=2677
+  _globals['_COURSELOADSRESPONSE']._serialized_start=2679
+  _globals['_COURSELOADSRESPONSE']._serialized_end=2762
+  _globals['_GETSCHEDULEREQUEST']._serialized_start=2764
+  _globals['_GETSCHEDULEREQUEST']._serialized_end=2828
+  _globals['_GROUPSCHEDULEREQUEST']._serialized_start=2830
+  _globals['_GROUPSCHEDULEREQUEST']._serialized_end=2891
+  _globals['_TEACHERSCHEDULEREQUEST']._serialized_start=2893
+  _globals['_TEACHERSCHEDULEREQUEST']._serialized_end=2958
+  _globals['_SCHEDULERESPONSE']._serialized_start=2960
+  _globals['_SCHEDULERESPONSE']._serialized_end=3035
+  _globals['_ANALYZEREQUEST']._serialized_start=3037
+  _globals['_ANALYZEREQUEST']._serialized_end=3114
+  _globals['_ANALYSISRESPONSE']._serialized_start=3117
+  _globals['_ANALYSISRESPONSE']._serialized_end=3514
+  _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._serialized_start=3409
+  _globals['_ANALYSISRESPONSE_LESSONSBYDAYENTRY']._serialized_end=3460
+  _globals['_ANALYSISRESPONSE_LESSONSBYTYPEENTRY']._serialized_start=3462
+  _globals['_ANALYSISRESPONSE_LESSONSBYTYPEENTRY']._serialized_end=3514
+  _globals['_METRICSREQUEST']._serialized_start=3516
+  _globals['_METRICSREQUEST']._serialized_end=3555
+  _globals['_METRICSRESPONSE']._serialized_start=3558
+  _globals['_METRICSRESPONSE']._serialized_end=3859
+  _globals['_METRICSRESPONSE_DETAILEDMETRICSENTRY']._serialized_start=3805
+  _globals['_METRICSRESPONSE_DETAILEDMETRICSENTRY']._serialized_end=3859
+  _globals['_HEALTHCHECKREQUEST']._serialized_start=3861
+  _globals['_HEALTHCHECKREQUEST']._serialized_end=3881
+  _globals['_HEALTHCHECKRESPONSE']._serialized_start=3883
+  _globals['_HEALTHCHECKRESPONSE']._serialized_end=3956
+  _globals['_AGENTSERVICE']._serialized_start=3959
+  _globals['_AGENTSERVICE']._serialized_end=4872
 # @@protoc_insertion_point(module_scope)
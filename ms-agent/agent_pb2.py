@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61gent.proto\x12\x05\x61gent\"\xbc\x02\n\nCourseLoad\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x17\n\x0f\x64iscipline_name\x18\x02 \x01(\t\x12\x17\n\x0f\x64iscipline_code\x18\x03 \x01(\t\x12\x12\n\nteacher_id\x18\x04 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x05 \x01(\t\x12\x18\n\x10teacher_priority\x18\x06 \x01(\x05\x12\x10\n\x08group_id\x18\x07 \x01(\x05\x12\x12\n\ngroup_name\x18\x08 \x01(\t\x12\x12\n\ngroup_size\x18\t \x01(\x05\x12\x13\n\x0blesson_type\x18\n \x01(\t\x12\x1a\n\x12hours_per_semester\x18\x0b \x01(\x05\x12\x18\n\x10lessons_per_week\x18\x0c \x01(\x05\x12\x10\n\x08semester\x18\r \x01(\x05\x12\x15\n\racademic_year\x18\x0e \x01(\t\"\xe8\x02\n\x08Schedule\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x16\n\x0e\x63ourse_load_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x03 \x01(\x05\x12\x11\n\ttime_slot\x18\x04 \x01(\x05\x12\x14\n\x0c\x63lassroom_id\x18\x05 \x01(\x05\x12\x16\n\x0e\x63lassroom_name\x18\x06 \x01(\t\x12\x12\n\nteacher_id\x18\x07 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x08 \x01(\t\x12\x10\n\x08group_id\x18\t \x01(\x05\x12\x12\n\ngroup_name\x18\n \x01(\t\x12\x17\n\x0f\x64iscipline_name\x18\x0b \x01(\t\x12\x13\n\x0blesson_type\x18\x0c \x01(\t\x12\x15\n\rgeneration_id\x18\r \x01(\x05\x12\x11\n\tis_active\x18\x0e \x01(\x08\x12\x10\n\x08semester\x18\x0f \x01(\x05\x12\x15\n\racademic_year\x18\x10 \x01(\t\x12\x11\n\tweek_type\x18\x11 \x01(\t\"\xc9\x03\n\x11GenerationHistory\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\x05\x12\x12\n\nstage_name\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x19\n\x11\x63urrent_iteration\x18\x06 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x07 \x01(\x05\x12\x15\n\rinitial_score\x18\x08 \x01(\x05\x12\x15\n\rcurrent_score\x18\t \x01(\x05\x12\x12\n\nbest_score\x18\n \x01(\x05\x12\x36\n\x07metrics\x18\x0b \x03(\x0b\x32%.agent.GenerationHistory.MetricsEntry\x12\x16\n\x0elast_reasoning\x18\x0c \x01(\t\x12\x15\n\rtotal_actions\x18\r \x01(\x05\x12\x12\n\nstarted_at\x18\x0e \x01(\t\x12\x14\n\x0c\x63ompleted_at\x18\x0f \x01(\t\x12\x18\n\x10\x64uration_seconds\x18\x10 \x01(\x05\x12\x15\n\rerror_message\x18\x11 \x01(\t\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x82\x02\n\x0b\x41gentAction\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x15\n\rgeneration_id\x18\x02 \x01(\x05\x12\x11\n\titeration\x18\x03 \x01(\x05\x12\x13\n\x0b\x61\x63tion_type\x18\x04 \x01(\t\x12\x15\n\raction_params\x18\x05 \x01(\t\x12\x0f\n\x07success\x18\x06 \x01(\x08\x12\x14\n\x0cscore_before\x18\x07 \x01(\x05\x12\x13\n\x0bscore_after\x18\x08 \x01(\x05\x12\x13\n\x0bscore_delta\x18\t \x01(\x05\x12\x11\n\treasoning\x18\n \x01(\t\x12\x12\n\ncreated_at\x18\x0b \x01(\t\x12\x19\n\x11\x65xecution_time_ms\x18\x0c \x01(\x05\"\x8f\x01\n\x0fGenerateRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x02 \x01(\x05\x12\x13\n\x0bskip_stage1\x18\x03 \x01(\x08\x12\x13\n\x0bskip_stage2\x18\x04 \x01(\x08\x12\x14\n\x0c\x62uilding_ids\x18\x05 \x03(\x05\x12\x12\n\ncreated_by\x18\x06 \x01(\x05\"D\n\x10GenerateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"\x1f\n\rStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xac\x01\n\x0eStatusResponse\x12,\n\ngeneration\x18\x01 \x01(\x0b\x32\x18.agent.GenerationHistory\x12\x1b\n\x13progress_percentage\x18\x02 \x01(\x02\x12#\n\x1b\x65stimated_seconds_remaining\x18\x03 \x01(\x05\x12*\n\x0erecent_actions\x18\x04 \x03(\x0b\x32\x12.agent.AgentAction\"/\n\x0eHistoryRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"d\n\x0fHistoryResponse\x12,\n\ngeneration\x18\x01 \x01(\x0b\x32\x18.agent.GenerationHistory\x12#\n\x07\x61\x63tions\x18\x02 \x03(\x0b\x32\x12.agent.AgentAction\"\x1d\n\x0bStopRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"0\n\x0cStopResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"Q\n\x15GetCourseLoadsRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x11\n\tgroup_ids\x18\x03 \x03(\x05\"S\n\x13\x43ourseLoadsResponse\x12\'\n\x0c\x63ourse_loads\x18\x01 \x03(\x0b\x32\x11.agent.CourseLoad\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"@\n\x12GetScheduleRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\x12\x13\n\x0bonly_active\x18\x02 \x01(\x08\"=\n\x14GroupScheduleRequest\x12\x10\n\x08group_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"A\n\x16TeacherScheduleRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"K\n\x10ScheduleResponse\x12\"\n\tschedules\x18\x01 \x03(\x0b\x32\x0f.agent.Schedule\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"M\n\x0e\x41nalyzeRequest\x12\x17\n\rgeneration_id\x18\x01 \x01(\x05H\x00\x12\x18\n\x0e\x63urrent_active\x18\x02 \x01(\x08H\x00\x42\x08\n\x06target\"\xb9\x02\n\x10\x41nalysisResponse\x12\"\n\tconflicts\x18\x01 \x03(\x0b\x32\x0f.agent.Conflict\x12\x15\n\rtotal_lessons\x18\x02 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x03 \x01(\x05\x12\x18\n\x10isolated_lessons\x18\x04 \x01(\x05\x12\x12\n\ngaps_count\x18\x05 \x01(\x05\x12\x13\n\x0btotal_score\x18\x06 \x01(\x05\x12M\n\x14teacher_metrics_json\x18\x07 \x03(\x0b\x32/.agent.AnalysisResponse.TeacherMetricsJsonEntry\x1a\x39\n\x17TeacherMetricsJsonEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"t\n\x08\x43onflict\x12\x15\n\rconflict_type\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\x12\x11\n\ttime_slot\x18\x03 \x01(\x05\x12\x14\n\x0cschedule_ids\x18\x04 \x03(\x05\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\" \n\x0eMetricsRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"f\n\x0fMetricsResponse\x12(\n\rscore_history\x18\x01 \x03(\x0b\x32\x11.agent.ScorePoint\x12)\n\x0btop_actions\x18\x02 \x03(\x0b\x32\x14.agent.ActionSummary\".\n\nScorePoint\x12\x11\n\titeration\x18\x01 \x01(\x05\x12\r\n\x05score\x18\x02 \x01(\x05\"L\n\rActionSummary\x12\x13\n\x0b\x61\x63tion_type\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x17\n\x0f\x61vg_score_delta\x18\x03 \x01(\x05\"\x14\n\x12HealthCheckRequest\"6\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t2\x8c\x06\n\x0c\x41gentService\x12\x43\n\x10GenerateSchedule\x12\x16.agent.GenerateRequest\x1a\x17.agent.GenerateResponse\x12\x42\n\x13GetGenerationStatus\x12\x14.agent.StatusRequest\x1a\x15.agent.StatusResponse\x12\x45\n\x14GetGenerationHistory\x12\x15.agent.HistoryRequest\x1a\x16.agent.HistoryResponse\x12\x39\n\x0eStopGeneration\x12\x12.agent.StopRequest\x1a\x13.agent.StopResponse\x12J\n\x0eGetCourseLoads\x12\x1c.agent.GetCourseLoadsRequest\x1a\x1a.agent.CourseLoadsResponse\x12\x41\n\x0bGetSchedule\x12\x19.agent.GetScheduleRequest\x1a\x17.agent.ScheduleResponse\x12K\n\x13GetScheduleForGroup\x12\x1b.agent.GroupScheduleRequest\x1a\x17.agent.ScheduleResponse\x12O\n\x15GetScheduleForTeacher\x12\x1d.agent.TeacherScheduleRequest\x1a\x17.agent.ScheduleResponse\x12\x41\n\x0f\x41nalyzeSchedule\x12\x15.agent.AnalyzeRequest\x1a\x17.agent.AnalysisResponse\x12;\n\nGetMetrics\x12\x15.agent.MetricsRequest\x1a\x16.agent.MetricsResponse\x12\x44\n\x0bHealthCheck\x12\x19.agent.HealthCheckRequest\x1a\x1a.agent.HealthCheckResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61gent.proto\x12\x05\x61gent\"\xbc\x02\n\nCourseLoad\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x17\n\x0f\x64iscipline_name\x18\x02 \x01(\t\x12\x17\n\x0f\x64iscipline_code\x18\x03 \x01(\t\x12\x12\n\nteacher_id\x18\x04 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x05 \x01(\t\x12\x18\n\x10teacher_priority\x18\x06 \x01(\x05\x12\x10\n\x08group_id\x18\x07 \x01(\x05\x12\x12\n\ngroup_name\x18\x08 \x01(\t\x12\x12\n\ngroup_size\x18\t \x01(\x05\x12\x13\n\x0blesson_type\x18\n \x01(\t\x12\x1a\n\x12hours_per_semester\x18\x0b \x01(\x05\x12\x18\n\x10lessons_per_week\x18\x0c \x01(\x05\x12\x10\n\x08semester\x18\r \x01(\x05\x12\x15\n\racademic_year\x18\x0e \x01(\t\"\xe8\x02\n\x08Schedule\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x16\n\x0e\x63ourse_load_id\x18\x02 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x03 \x01(\x05\x12\x11\n\ttime_slot\x18\x04 \x01(\x05\x12\x14\n\x0c\x63lassroom_id\x18\x05 \x01(\x05\x12\x16\n\x0e\x63lassroom_name\x18\x06 \x01(\t\x12\x12\n\nteacher_id\x18\x07 \x01(\x05\x12\x14\n\x0cteacher_name\x18\x08 \x01(\t\x12\x10\n\x08group_id\x18\t \x01(\x05\x12\x12\n\ngroup_name\x18\n \x01(\t\x12\x17\n\x0f\x64iscipline_name\x18\x0b \x01(\t\x12\x13\n\x0blesson_type\x18\x0c \x01(\t\x12\x15\n\rgeneration_id\x18\r \x01(\x05\x12\x11\n\tis_active\x18\x0e \x01(\x08\x12\x10\n\x08semester\x18\x0f \x01(\x05\x12\x15\n\racademic_year\x18\x10 \x01(\t\x12\x11\n\tweek_type\x18\x11 \x01(\t\"\xc9\x03\n\x11GenerationHistory\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\x05\x12\x12\n\nstage_name\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x19\n\x11\x63urrent_iteration\x18\x06 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x07 \x01(\x05\x12\x15\n\rinitial_score\x18\x08 \x01(\x05\x12\x15\n\rcurrent_score\x18\t \x01(\x05\x12\x12\n\nbest_score\x18\n \x01(\x05\x12\x36\n\x07metrics\x18\x0b \x03(\x0b\x32%.agent.GenerationHistory.MetricsEntry\x12\x16\n\x0elast_reasoning\x18\x0c \x01(\t\x12\x15\n\rtotal_actions\x18\r \x01(\x05\x12\x12\n\nstarted_at\x18\x0e \x01(\t\x12\x14\n\x0c\x63ompleted_at\x18\x0f \x01(\t\x12\x18\n\x10\x64uration_seconds\x18\x10 \x01(\x05\x12\x15\n\rerror_message\x18\x11 \x01(\t\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x82\x02\n\x0b\x41gentAction\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x15\n\rgeneration_id\x18\x02 \x01(\x05\x12\x11\n\titeration\x18\x03 \x01(\x05\x12\x13\n\x0b\x61\x63tion_type\x18\x04 \x01(\t\x12\x15\n\raction_params\x18\x05 \x01(\t\x12\x0f\n\x07success\x18\x06 \x01(\x08\x12\x14\n\x0cscore_before\x18\x07 \x01(\x05\x12\x13\n\x0bscore_after\x18\x08 \x01(\x05\x12\x13\n\x0bscore_delta\x18\t \x01(\x05\x12\x11\n\treasoning\x18\n \x01(\t\x12\x12\n\ncreated_at\x18\x0b \x01(\t\x12\x19\n\x11\x65xecution_time_ms\x18\x0c \x01(\x05\"\xc9\x02\n\x0fGenerateRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x02 \x01(\x05\x12\x13\n\x0bskip_stage1\x18\x03 \x01(\x08\x12\x13\n\x0bskip_stage2\x18\x04 \x01(\x08\x12\x14\n\x0c\x62uilding_ids\x18\x05 \x03(\x05\x12\x12\n\ncreated_by\x18\x06 \x01(\x05\x12\x12\n\nga_islands\x18\x07 \x01(\x05\x12\x1a\n\x12migration_interval\x18\x08 \x01(\x05\x12\x16\n\x0emigrants_count\x18\t \x01(\x05\x12\x1a\n\x12migration_topology\x18\n \x01(\t\x12\x15\n\rstage1_engine\x18\x0b \x01(\t\x12\x1a\n\x12stage1_time_budget\x18\x0c \x01(\x01\x12\x0f\n\x07profile\x18\r \x01(\x08\x12\x10\n\x08priority\x18\x0e \x01(\x05\"D\n\x10GenerateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"x\n\rRepairRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x17\n\x0f\x63ourse_load_ids\x18\x03 \x03(\x05\x12\x13\n\x0btime_budget\x18\x04 \x01(\x01\x12\x12\n\ncreated_by\x18\x05 \x01(\x05\"\xf8\x01\n\x0eRepairResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x10\n\x08\x61\x66\x66\x65\x63ted\x18\x04 \x01(\x05\x12\x0f\n\x07movable\x18\x05 \x01(\x05\x12\x0f\n\x07\x64\x65leted\x18\x06 \x01(\x05\x12\x10\n\x08inserted\x18\x07 \x01(\x05\x12\x0f\n\x07updated\x18\x08 \x01(\x05\x12\r\n\x05moved\x18\t \x01(\x05\x12\x15\n\rinitial_score\x18\n \x01(\x05\x12\x13\n\x0b\x66inal_score\x18\x0b \x01(\x05\x12\x11\n\tconflicts\x18\x0c \x01(\x05\x12\x0f\n\x07seconds\x18\r \x01(\x01\"\x1f\n\rStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xac\x01\n\x0eStatusResponse\x12,\n\ngeneration\x18\x01 \x01(\x0b\x32\x18.agent.GenerationHistory\x12\x1b\n\x13progress_percentage\x18\x02 \x01(\x02\x12#\n\x1b\x65stimated_seconds_remaining\x18\x03 \x01(\x05\x12*\n\x0erecent_actions\x18\x04 \x03(\x0b\x32\x12.agent.AgentAction\"\xfc\x02\n\x12GenerationProgress\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\t\x12\x11\n\titeration\x18\x04 \x01(\x05\x12\x16\n\x0emax_iterations\x18\x05 \x01(\x05\x12\x15\n\rcurrent_score\x18\x06 \x01(\x01\x12\x12\n\nbest_score\x18\x07 \x01(\x01\x12\x17\n\x0fhard_violations\x18\x08 \x01(\x05\x12\r\n\x05phase\x18\t \x01(\t\x12\x42\n\rphase_timings\x18\n \x03(\x0b\x32+.agent.GenerationProgress.PhaseTimingsEntry\x12\x16\n\x0elast_reasoning\x18\x0b \x01(\t\x12\x15\n\rerror_message\x18\x0c \x01(\t\x12\x11\n\ttimestamp\x18\r \x01(\x01\x1a\x33\n\x11PhaseTimingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"/\n\x0eHistoryRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"d\n\x0fHistoryResponse\x12,\n\ngeneration\x18\x01 \x01(\x0b\x32\x18.agent.GenerationHistory\x12#\n\x07\x61\x63tions\x18\x02 \x03(\x0b\x32\x12.agent.AgentAction\"\x1d\n\x0bStopRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"0\n\x0cStopResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"Q\n\x15GetCourseLoadsRequest\x12\x10\n\x08semester\x18\x01 \x01(\x05\x12\x13\n\x0bteacher_ids\x18\x02 \x03(\x05\x12\x11\n\tgroup_ids\x18\x03 \x03(\x05\"S\n\x13\x43ourseLoadsResponse\x12\'\n\x0c\x63ourse_loads\x18\x01 \x03(\x0b\x32\x11.agent.CourseLoad\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"@\n\x12GetScheduleRequest\x12\x15\n\rgeneration_id\x18\x01 \x01(\x05\x12\x13\n\x0bonly_active\x18\x02 \x01(\x08\"=\n\x14GroupScheduleRequest\x12\x10\n\x08group_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"A\n\x16TeacherScheduleRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\"K\n\x10ScheduleResponse\x12\"\n\tschedules\x18\x01 \x03(\x0b\x32\x0f.agent.Schedule\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"M\n\x0e\x41nalyzeRequest\x12\x17\n\rgeneration_id\x18\x01 \x01(\x05H\x00\x12\x18\n\x0e\x63urrent_active\x18\x02 \x01(\x08H\x00\x42\x08\n\x06target\"\xb9\x02\n\x10\x41nalysisResponse\x12\"\n\tconflicts\x18\x01 \x03(\x0b\x32\x0f.agent.Conflict\x12\x15\n\rtotal_lessons\x18\x02 \x01(\x05\x12\x1d\n\x15preference_violations\x18\x03 \x01(\x05\x12\x18\n\x10isolated_lessons\x18\x04 \x01(\x05\x12\x12\n\ngaps_count\x18\x05 \x01(\x05\x12\x13\n\x0btotal_score\x18\x06 \x01(\x05\x12M\n\x14teacher_metrics_json\x18\x07 \x03(\x0b\x32/.agent.AnalysisResponse.TeacherMetricsJsonEntry\x1a\x39\n\x17TeacherMetricsJsonEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"t\n\x08\x43onflict\x12\x15\n\rconflict_type\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x61y_of_week\x18\x02 \x01(\x05\x12\x11\n\ttime_slot\x18\x03 \x01(\x05\x12\x14\n\x0cschedule_ids\x18\x04 \x03(\x05\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\" \n\x0eMetricsRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"f\n\x0fMetricsResponse\x12(\n\rscore_history\x18\x01 \x03(\x0b\x32\x11.agent.ScorePoint\x12)\n\x0btop_actions\x18\x02 \x03(\x0b\x32\x14.agent.ActionSummary\".\n\nScorePoint\x12\x11\n\titeration\x18\x01 \x01(\x05\x12\r\n\x05score\x18\x02 \x01(\x05\"L\n\rActionSummary\x12\x13\n\x0b\x61\x63tion_type\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x17\n\x0f\x61vg_score_delta\x18\x03 \x01(\x05\"\x14\n\x12HealthCheckRequest\"6\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t2\x91\x07\n\x0c\x41gentService\x12\x43\n\x10GenerateSchedule\x12\x16.agent.GenerateRequest\x1a\x17.agent.GenerateResponse\x12\x42\n\x13GetGenerationStatus\x12\x14.agent.StatusRequest\x1a\x15.agent.StatusResponse\x12\x45\n\x14GetGenerationHistory\x12\x15.agent.HistoryRequest\x1a\x16.agent.HistoryResponse\x12\x39\n\x0eStopGeneration\x12\x12.agent.StopRequest\x1a\x13.agent.StopResponse\x12\x44\n\x0fWatchGeneration\x12\x14.agent.StatusRequest\x1a\x19.agent.GenerationProgress0\x01\x12=\n\x0eRepairSchedule\x12\x14.agent.RepairRequest\x1a\x15.agent.RepairResponse\x12J\n\x0eGetCourseLoads\x12\x1c.agent.GetCourseLoadsRequest\x1a\x1a.agent.CourseLoadsResponse\x12\x41\n\x0bGetSchedule\x12\x19.agent.GetScheduleRequest\x1a\x17.agent.ScheduleResponse\x12K\n\x13GetScheduleForGroup\x12\x1b.agent.GroupScheduleRequest\x1a\x17.agent.ScheduleResponse\x12O\n\x15GetScheduleForTeacher\x12\x1d.agent.TeacherScheduleRequest\x1a\x17.agent.ScheduleResponse\x12\x41\n\x0f\x41nalyzeSchedule\x12\x15.agent.AnalyzeRequest\x1a\x17.agent.AnalysisResponse\x12;\n\nGetMetrics\x12\x15.agent.MetricsRequest\x1a\x16.agent.MetricsResponse\x12\x44\n\x0bHealthCheck\x12\x19.agent.HealthCheckRequest\x1a\x1a.agent.HealthCheckResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -23,6 +23,8 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
   _globals['_GENERATIONHISTORY_METRICSENTRY']._options = None
   _globals['_GENERATIONHISTORY_METRICSENTRY']._serialized_options = b'8\001'
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._options = None
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_options = b'8\001'
   _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._options = None
   _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._serialized_options = b'8\001'
   _globals['_COURSELOAD']._serialized_start=23
@@ -36,53 +38,61 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_AGENTACTION']._serialized_start=1165
   _globals['_AGENTACTION']._serialized_end=1423
   _globals['_GENERATEREQUEST']._serialized_start=1426
-  _globals['_GENERATEREQUEST']._serialized_end=1569
-  _globals['_GENERATERESPONSE']._serialized_start=1571
-  _globals['_GENERATERESPONSE']._serialized_end=1639
-  _globals['_STATUSREQUEST']._serialized_start=1641
-  _globals['_STATUSREQUEST']._serialized_end=1672
-  _globals['_STATUSRESPONSE']._serialized_start=1675
-  _globals['_STATUSRESPONSE']._serialized_end=1847
-  _globals['_HISTORYREQUEST']._serialized_start=1849
-  _globals['_HISTORYREQUEST']._serialized_end=1896
-  _globals['_HISTORYRESPONSE']._serialized_start=1898
-  _globals['_HISTORYRESPONSE']._serialized_end=1998
-  _globals['_STOPREQUEST']._serialized_start=2000
-  _globals['_STOPREQUEST']._serialized_end=2029
-  _globals['_STOPRESPONSE']._serialized_start=2031
-  _globals['_STOPRESPONSE']._serialized_end=2079
-  _globals['_GETCOURSELOADSREQUEST']._serialized_start=2081
-  _globals['_GETCOURSELOADSREQUEST']._serialized_end=2162
-  _globals['_COURSELOADSRESPONSE']._serialized_start=2164
-  _globals['_COURSELOADSRESPONSE']._serialized_end=2247
-  _globals['_GETSCHEDULEREQUEST']._serialized_start=2249
-  _globals['_GETSCHEDULEREQUEST']._serialized_end=2313
-  _globals['_GROUPSCHEDULEREQUEST']._serialized_start=2315
-  _globals['_GROUPSCHEDULEREQUEST']._serialized_end=2376
-  _globals['_TEACHERSCHEDULEREQUEST']._serialized_start=2378
-  _globals['_TEACHERSCHEDULEREQUEST']._serialized_end=2443
-  _globals['_SCHEDULERESPONSE']._serialized_start=2445
-  _globals['_SCHEDULERESPONSE']._serialized_end=2520
-  _globals['_ANALYZEREQUEST']._serialized_start=2522
-  _globals['_ANALYZEREQUEST']._serialized_end=2599
-  _globals['_ANALYSISRESPONSE']._serialized_start=2602
-  _globals['_ANALYSISRESPONSE']._serialized_end=2915
-  _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._serialized_start=2858
-  _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._serialized_end=2915
-  _globals['_CONFLICT']._serialized_start=2917
-  _globals['_CONFLICT']._serialized_end=3033
-  _globals['_METRICSREQUEST']._serialized_start=3035
-  _globals['_METRICSREQUEST']._serialized_end=3067
-  _globals['_METRICSRESPONSE']._serialized_start=3069
-  _globals['_METRICSRESPONSE']._serialized_end=3171
-  _globals['_SCOREPOINT']._serialized_start=3173
-  _globals['_SCOREPOINT']._serialized_end=3219
-  _globals['_ACTIONSUMMARY']._serialized_start=3221
-  _globals['_ACTIONSUMMARY']._serialized_end=3297
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=3299
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=3319
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=3321
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=3375
-  _globals['_AGENTSERVICE']._serialized_start=3378
-  _globals['_AGENTSERVICE']._serialized_end=4158
+  _globals['_GENERATEREQUEST']._serialized_end=1755
+  _globals['_GENERATERESPONSE']._serialized_start=1757
+  _globals['_GENERATERESPONSE']._serialized_end=1825
+  _globals['_REPAIRREQUEST']._serialized_start=1827
+  _globals['_REPAIRREQUEST']._serialized_end=1947
+  _globals['_REPAIRRESPONSE']._serialized_start=1950
+  _globals['_REPAIRRESPONSE']._serialized_end=2198
+  _globals['_STATUSREQUEST']._serialized_start=2200
+  _globals['_STATUSREQUEST']._serialized_end=2231
+  _globals['_STATUSRESPONSE']._serialized_start=2234
+  _globals['_STATUSRESPONSE']._serialized_end=2406
+  _globals['_GENERATIONPROGRESS']._serialized_start=2409
+  _globals['_GENERATIONPROGRESS']._serialized_end=2789
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_start=2738
+  _globals['_GENERATIONPROGRESS_PHASETIMINGSENTRY']._serialized_end=2789
+  _globals['_HISTORYREQUEST']._serialized_start=2791
+  _globals['_HISTORYREQUEST']._serialized_end=2838
+  _globals['_HISTORYRESPONSE']._serialized_start=2840
+  _globals['_HISTORYRESPONSE']._serialized_end=2940
+  _globals['_STOPREQUEST']._serialized_start=2942
+  _globals['_STOPREQUEST']._serialized_end=2971
+  _globals['_STOPRESPONSE']._serialized_start=2973
+  _globals['_STOPRESPONSE']._serialized_end=3021
+  _globals['_GETCOURSELOADSREQUEST']._serialized_start=3023
+  _globals['_GETCOURSELOADSREQUEST']._serialized_end=3104
+  _globals['_COURSELOADSRESPONSE']._serialized_start=3106
+  _globals['_COURSELOADSRESPONSE']._serialized_end=3189
+  _globals['_GETSCHEDULEREQUEST']._serialized_start=3191
+  _globals['_GETSCHEDULEREQUEST']._serialized_end=3255
+  _globals['_GROUPSCHEDULEREQUEST']._serialized_start=3257
+  _globals['_GROUPSCHEDULEREQUEST']._serialized_end=3318
+  _globals['_TEACHERSCHEDULEREQUEST']._serialized_start=3320
+  _globals['_TEACHERSCHEDULEREQUEST']._serialized_end=3385
+  _globals['_SCHEDULERESPONSE']._serialized_start=3387
+  _globals['_SCHEDULERESPONSE']._serialized_end=3462
+  _globals['_ANALYZEREQUEST']._serialized_start=3464
+  _globals['_ANALYZEREQUEST']._serialized_end=3541
+  _globals['_ANALYSISRESPONSE']._serialized_start=3544
+  _globals['_ANALYSISRESPONSE']._serialized_end=3857
+  _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._serialized_start=3800
+  _globals['_ANALYSISRESPONSE_TEACHERMETRICSJSONENTRY']._serialized_end=3857
+  _globals['_CONFLICT']._serialized_start=3859
+  _globals['_CONFLICT']._serialized_end=3975
+  _globals['_METRICSREQUEST']._serialized_start=3977
+  _globals['_METRICSREQUEST']._serialized_end=4009
+  _globals['_METRICSRESPONSE']._serialized_start=4011
+  _globals['_METRICSRESPONSE']._serialized_end=4113
+  _globals['_SCOREPOINT']._serialized_start=4115
+  _globals['_SCOREPOINT']._serialized_end=4161
+  _globals['_ACTIONSUMMARY']._serialized_start=4163
+  _globals['_ACTIONSUMMARY']._serialized_end=4239
+  _globals['_HEALTHCHECKREQUEST']._serialized_start=4241
+  _globals['_HEALTHCHECKREQUEST']._serialized_end=4261
+  _globals['_HEALTHCHECKRESPONSE']._serialized_start=4263
+  _globals['_HEALTHCHECKRESPONSE']._serialized_end=4317
+  _globals['_AGENTSERVICE']._serialized_start=4320
+  _globals['_AGENTSERVICE']._serialized_end=5233
 # @@protoc_insertion_point(module_scope)
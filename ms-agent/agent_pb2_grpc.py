@@ -36,6 +36,16 @@ class AgentServiceStub(object):
                 request_serializer=agent__pb2.StopRequest.SerializeToString,
                 response_deserializer=agent__pb2.StopResponse.FromString,
                 )
+        self.WatchGeneration = channel.unary_stream(
+                '/agent.AgentService/WatchGeneration',
+                request_serializer=agent__pb2.StatusRequest.SerializeToString,
+                response_deserializer=agent__pb2.GenerationProgress.FromString,
+                )
+        self.RepairSchedule = channel.unary_unary(
+                '/agent.AgentService/RepairSchedule',
+                request_serializer=agent__pb2.RepairRequest.SerializeToString,
+                response_deserializer=agent__pb2.RepairResponse.FromString,
+                )
         self.GetCourseLoads = channel.unary_unary(
                 '/agent.AgentService/GetCourseLoads',
                 request_serializer=agent__pb2.GetCourseLoadsRequest.SerializeToString,
@@ -103,6 +113,18 @@ class AgentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchGeneration(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RepairSchedule(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetCourseLoads(self, request, context):
         """Управление нагрузкой
         """
@@ -172,6 +194,16 @@ def add_AgentServiceServicer_to_server(servicer, server):
                     request_deserializer=agent__pb2.StopRequest.FromString,
                     response_serializer=agent__pb2.StopResponse.SerializeToString,
             ),
+            'WatchGeneration': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchGeneration,
+                    request_deserializer=agent__pb2.StatusRequest.FromString,
+                    response_serializer=agent__pb2.GenerationProgress.SerializeToString,
+            ),
+            'RepairSchedule': grpc.unary_unary_rpc_method_handler(
+                    servicer.RepairSchedule,
+                    request_deserializer=agent__pb2.RepairRequest.FromString,
+                    response_serializer=agent__pb2.RepairResponse.SerializeToString,
+            ),
             'GetCourseLoads': grpc.unary_unary_rpc_method_handler(
                     servicer.GetCourseLoads,
                     request_deserializer=agent__pb2.GetCourseLoadsRequest.FromString,
@@ -287,6 +319,40 @@ class AgentService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchGeneration(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/agent.AgentService/WatchGeneration',
+            agent__pb2.StatusRequest.SerializeToString,
+            agent__pb2.GenerationProgress.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RepairSchedule(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/agent.AgentService/RepairSchedule',
+            agent__pb2.RepairRequest.SerializeToString,
+            agent__pb2.RepairResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetCourseLoads(request,
             target,
@@ -0,0 +1,21 @@
+"""
+Бенчмарки генетического алгоритма на синтетическом университете
+
+Работают офлайн (без Postgres, Redis и GigaChat): python -m benchmarks
+Нагрузка на GigaChatClient через локальный stub: python -m benchmarks.llm_load
+"""
+from benchmarks.synthetic import SIZES, generate_context, describe
+from benchmarks.suite import BenchmarkSuite, BENCHMARKS
+from benchmarks.report import build_report, save_report, load_report, compare_reports
+
+__all__ = [
+    'SIZES',
+    'generate_context',
+    'describe',
+    'BenchmarkSuite',
+    'BENCHMARKS',
+    'build_report',
+    'save_report',
+    'load_report',
+    'compare_reports'
+]
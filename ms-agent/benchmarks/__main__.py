@@ -0,0 +1,114 @@
+"""
+Запуск бенчмарков (из каталога ms-agent, без Postgres / Redis / GigaChat):
+
+    python -m benchmarks --size medium --output report.json
+    python -m benchmarks --size medium --baseline report.json --threshold 0.2
+
+С --baseline код выхода 1, если есть регрессии.
+"""
+import sys
+import argparse
+import logging
+
+from benchmarks.synthetic import SIZES, generate_context, describe
+from benchmarks.suite import BenchmarkSuite, BENCHMARKS
+from benchmarks.report import (
+    STATUS_REGRESSION, build_report, save_report, load_report,
+    compare_reports, dataset_mismatch, format_comparison
+)
+
+logger = logging.getLogger('benchmarks')
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='GA scheduler benchmarks on a synthetic university'
+    )
+    parser.add_argument('--size', choices=list(SIZES), default='medium',
+                        help='dataset preset (default: medium)')
+    parser.add_argument('--groups', type=int, help='override preset: groups')
+    parser.add_argument('--teachers', type=int, help='override preset: teachers')
+    parser.add_argument('--classrooms', type=int, help='override preset: classrooms')
+    parser.add_argument('--loads-per-group', type=int, help='override preset: course loads per group')
+    parser.add_argument('--alternating-share', type=float, default=0.0,
+                        help='share of odd/even-week course loads (default: 0)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--population', type=int, default=20, help='population size')
+    parser.add_argument('--generations', type=int, default=5, help='generations of the short GA run')
+    parser.add_argument('--encoding', choices=['weekly', 'template'], help='gene encoding (default: config)')
+    parser.add_argument('--engine', choices=['vectorized', 'reference'], help='fitness engine (default: config)')
+    parser.add_argument('--workers', type=int, default=1, help='evaluation processes for the GA run')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per benchmark (default: 7)')
+    parser.add_argument('--warmup', type=int, default=1, help='warmup runs, at least 1 (default: 1)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per sample, fast benchmarks loop (default: 0.2)')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--output', help='write JSON report to this path')
+    parser.add_argument('--baseline', help='compare with this JSON report')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='median slowdown per op treated as regression when sample '
+                             'interquartile ranges do not overlap (default: 0.2 = +20%%)')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Без -v предупреждения генераторов (неразмещённые занятия и т.п.) скрыты
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    dataset = dict(SIZES[args.size])
+    for key in ('groups', 'teachers', 'classrooms', 'loads_per_group'):
+        if getattr(args, key) is not None:
+            dataset[key] = getattr(args, key)
+    dataset['alternating_share'] = args.alternating_share
+    dataset['seed'] = args.seed
+
+    context = generate_context(**dataset)
+    logger.info(f"🏫 Synthetic university: {describe(context)}")
+
+    suite = BenchmarkSuite(
+        context,
+        population_size=args.population,
+        generations=args.generations,
+        encoding=args.encoding,
+        engine=args.engine,
+        workers=args.workers,
+        seed=args.seed
+    )
+    results = suite.run(args.only, repeat=args.repeat, warmup=args.warmup, min_time=args.min_time)
+    report = build_report(dict(dataset, **describe(context)), suite.settings(), results)
+
+    for name, result in results.items():
+        print(f"{name:<24} {result['median'] * 1000:10.2f} ms  "
+              f"{result['per_op'] * 1000:10.3f} ms/op  ({result['ops']} ops)")
+
+    if args.output:
+        save_report(report, args.output)
+        logger.info(f"💾 Report saved: {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    baseline = load_report(args.baseline)
+    for diff in dataset_mismatch(report, baseline):
+        logger.warning(f"⚠️ Baseline differs: {diff}")
+
+    rows = compare_reports(report, baseline, args.threshold)
+    print()
+    print(format_comparison(rows))
+
+    regressions = [row['name'] for row in rows if row['status'] == STATUS_REGRESSION]
+    if regressions:
+        logger.error(f"❌ Regressions (> +{args.threshold:.0%} per op): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Локальный stub GigaChat API для нагрузочных прогонов без сети
+
+OAuth (/api/v2/oauth), /api/v1/chat/completions и /api/v1/models с
+настраиваемой задержкой ответа и долей ошибок 429 / 503. На запросы с
+functions отвечает вызовом функции без обязательных аргументов
+(analyze_schedule и т.п.), на промпт GigaChatImprover - JSON с suggestions.
+
+    with GigaChatStubServer(latency=0.05, error_rate=0.1) as stub:
+        os.environ['GIGACHAT_BASE_URL'] = stub.base_url
+        os.environ['GIGACHAT_TOKEN_URL'] = stub.token_url
+
+Отдельный процесс (ms-agent с GIGACHAT_BASE_URL / GIGACHAT_TOKEN_URL на stub):
+
+    python -m benchmarks.gigachat_stub --port 8765 --latency 0.2
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+
+
+class GigaChatStubServer:
+    """HTTP-сервер в фоновом потоке; port=0 - свободный порт"""
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.05,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 token_ttl: float = 1800.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._active = 0
+        self.stats = {
+            'tokens_issued': 0,
+            'requests': 0,
+            'errors_injected': 0,
+            'unauthorized': 0,
+            'max_concurrent': 0
+        }
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def base_url(self) -> str:
+        return f'{self.url}/api/v1'
+
+    @property
+    def token_url(self) -> str:
+        return f'{self.url}/api/v2/oauth'
+
+    def start(self) -> 'GigaChatStubServer':
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='gigachat-stub', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'GigaChatStubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ============ Ответы ============
+
+    def _issue_token(self) -> Dict[str, Any]:
+        token = uuid.uuid4().hex
+        expires_at = time.time() + self.token_ttl
+        with self._lock:
+            self._tokens[token] = expires_at
+            self.stats['tokens_issued'] += 1
+        # Как GigaChat: expires_at в миллисекундах
+        return {'access_token': token, 'expires_at': int(expires_at * 1000)}
+
+    def _authorized(self, header: str) -> bool:
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else ''
+        with self._lock:
+            return self._tokens.get(token, 0) > time.time()
+
+    def _completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        functions = payload.get('functions') or []
+        free = [
+            f['name'] for f in functions
+            if not (f.get('parameters') or {}).get('required')
+        ]
+        if free:
+            name = self.random.choice(free)
+            message = {
+                'role': 'assistant',
+                'content': f'Stub: calling {name}',
+                'function_call': {'name': name, 'arguments': {}}
+            }
+        else:
+            # Промпт GigaChatImprover: "<N> нарушений предпочтений ..."
+            prompt = ' '.join(m.get('content', '') for m in payload.get('messages', []))
+            match = re.search(r'(\d+) нарушений', prompt)
+            count = int(match.group(1)) if match else 0
+            suggestions = [
+                {
+                    'lesson_id': self.random.randrange(count),
+                    'new_day': self.random.randint(1, 6),
+                    'new_slot': self.random.randint(1, 6)
+                }
+                for _ in range(min(count, 3))
+            ]
+            message = {
+                'role': 'assistant',
+                'content': json.dumps({'suggestions': suggestions})
+            }
+        return {
+            'choices': [{'index': 0, 'message': message, 'finish_reason': 'stop'}],
+            'model': payload.get('model', 'GigaChat'),
+            'object': 'chat.completion',
+            'created': int(time.time())
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict] = None):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Dict[str, Any]:
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    return json.loads(raw) if raw else {}
+                except ValueError:
+                    return {}
+
+            def _api(self, handle):
+                """Общая часть API: авторизация, задержка, инъекция ошибок"""
+                with stub._lock:
+                    stub.stats['requests'] += 1
+                    stub._active += 1
+                    stub.stats['max_concurrent'] = max(stub.stats['max_concurrent'], stub._active)
+                try:
+                    if not stub._authorized(self.headers.get('Authorization', '')):
+                        with stub._lock:
+                            stub.stats['unauthorized'] += 1
+                        self._send(401, {'status': 401, 'message': 'Unauthorized'})
+                        return
+
+                    delay = stub.latency + stub.random.uniform(-stub.jitter, stub.jitter)
+                    time.sleep(max(0.0, delay))
+
+                    if stub.error_rate and stub.random.random() < stub.error_rate:
+                        with stub._lock:
+                            stub.stats['errors_injected'] += 1
+                        if stub.random.random() < 0.5:
+                            self._send(429, {'status': 429, 'message': 'Too Many Requests'},
+                                       {'Retry-After': '0'})
+                        else:
+                            self._send(503, {'status': 503, 'message': 'Service Unavailable'})
+                        return
+
+                    self._send(200, handle())
+                finally:
+                    with stub._lock:
+                        stub._active -= 1
+
+            def do_POST(self):
+                body = self._body()
+                if self.path.endswith('/oauth'):
+                    self._send(200, stub._issue_token())
+                elif self.path.endswith('/chat/completions'):
+                    self._api(lambda: stub._completion(body))
+                else:
+                    self._send(404, {'status': 404, 'message': 'Not Found'})
+
+            def do_GET(self):
+                if self.path.endswith('/models'):
+                    self._api(lambda: {
+                        'object': 'list',
+                        'data': [{'id': 'GigaChat', 'object': 'model', 'owned_by': 'stub'}]
+                    })
+                else:
+                    self._send(404, {'status': 404, 'message': 'Not Found'})
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.gigachat_stub',
+                                     description='Local GigaChat API stub')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help='response delay, s')
+    parser.add_argument('--jitter', type=float, default=0.0, help='± random delay, s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 429/503 responses')
+    parser.add_argument('--token-ttl', type=float, default=1800.0, help='token lifetime, s')
+    args = parser.parse_args(argv)
+
+    stub = GigaChatStubServer(args.host, args.port, args.latency, args.jitter,
+                              args.error_rate, args.token_ttl)
+    stub.start()
+    print(f"GIGACHAT_BASE_URL={stub.base_url}")
+    print(f"GIGACHAT_TOKEN_URL={stub.token_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        print(json.dumps(stub.stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Нагрузочный прогон GigaChatClient на локальном stub (без сети и Postgres)
+
+    python -m benchmarks.llm_load --path chat --requests 200 --threads 16
+    python -m benchmarks.llm_load --path agent --latency 0.2 --error-rate 0.1
+    python -m benchmarks.llm_load --path improver --size small
+
+chat     - chat_completion с промптом
+agent    - шаг Stage1Agent: call_with_tools с инструментами Stage 1
+           и выполнение выбранного инструмента на синтетическом расписании
+improver - GigaChatImprover.improve_top_chromosomes на синтетической популяции
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable
+
+from benchmarks.gigachat_stub import GigaChatStubServer
+from config import config
+
+logger = logging.getLogger('benchmarks')
+
+PATHS = ('chat', 'agent', 'improver')
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.llm_load',
+        description='GigaChatClient load test against a local stub server'
+    )
+    parser.add_argument('--path', choices=PATHS, default='chat')
+    parser.add_argument('--requests', type=int, default=100, help='operations in total')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent callers')
+    parser.add_argument('--concurrency', type=int, default=4, help='GIGACHAT_MAX_CONCURRENCY')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub response delay, s')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of stub 429/503 responses')
+    parser.add_argument('--retries', type=int, default=3, help='GIGACHAT_MAX_RETRIES')
+    parser.add_argument('--size', default='small', help='synthetic dataset preset (agent / improver)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+    stub = GigaChatStubServer(latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, seed=args.seed)
+    with stub:
+        # До импорта gigachat_client: адреса и семафор берутся из config при импорте
+        config.GIGACHAT_BASE_URL = stub.base_url
+        config.GIGACHAT_TOKEN_URL = stub.token_url
+        config.GIGACHAT_CLIENT_ID = config.GIGACHAT_CLIENT_ID or 'stub'
+        config.GIGACHAT_CLIENT_SECRET = config.GIGACHAT_CLIENT_SECRET or 'stub'
+        config.GIGACHAT_MAX_CONCURRENCY = args.concurrency
+        config.GIGACHAT_MAX_RETRIES = args.retries
+        config.GIGACHAT_BACKOFF_BASE = 0.05
+        operation = _operation(args)
+
+        latencies: List[float] = []
+        failures = 0
+
+        def timed(_):
+            start = time.perf_counter()
+            operation()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(timed, i) for i in range(args.requests)]
+            for future in futures:
+                try:
+                    latencies.append(future.result())
+                except Exception as e:
+                    failures += 1
+                    logger.info(f"❌ Operation failed: {e}")
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"path            {args.path}")
+    print(f"operations      {args.requests} ({failures} failed)")
+    print(f"elapsed         {elapsed:.2f} s")
+    print(f"throughput      {args.requests / elapsed:.1f} ops/s")
+    if latencies:
+        print(f"latency p50     {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"latency p95     {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms")
+        print(f"latency max     {latencies[-1] * 1000:.1f} ms")
+    print(f"stub            {stub.stats}")
+    return 1 if failures else 0
+
+
+def _operation(args: argparse.Namespace) -> Callable[[], Any]:
+    """Операция выбранного пути (импорты - после настройки окружения)"""
+    from services.gigachat_client import GigaChatClient
+
+    client = GigaChatClient()
+
+    if args.path == 'chat':
+        messages = [
+            {'role': 'system', 'content': 'Эксперт по расписаниям.'},
+            {'role': 'user', 'content': 'Предложи улучшение расписания.'}
+        ]
+        return lambda: client.chat_completion(messages=messages)
+
+    from benchmarks.synthetic import SIZES, generate_context
+    context = generate_context(**SIZES[args.size], seed=args.seed)
+
+    if args.path == 'agent':
+        from prompts.stage1_prompt import STAGE1_SYSTEM_PROMPT
+        from tools.temporal_tools import ScheduleState, get_temporal_tools
+
+        schedule = _schedule(context, args.seed)
+        preferences = context['teacher_preferences']
+
+        def agent_step():
+            # Своё состояние на вызов: инструменты меняют расписание
+            state = ScheduleState([dict(lesson) for lesson in schedule])
+            tools = {tool.name: tool for tool in get_temporal_tools(state, preferences)}
+            response = client.call_with_tools(
+                system_prompt=STAGE1_SYSTEM_PROMPT,
+                user_message='Проанализируй расписание и выбери действие.',
+                tools=[tool.get_definition() for tool in tools.values()]
+            )
+            if response['type'] == 'function_call':
+                tools[response['function_name']].execute(**response['arguments'])
+            return response
+
+        return agent_step
+
+    from services.gigachat_improver import GigaChatImprover
+    from services.population_initializer import PopulationInitializer
+
+    improver = GigaChatImprover()
+    improver.client = client
+    population = PopulationInitializer(context).create_population(3)
+
+    def improve():
+        return asyncio.run(improver.improve_top_chromosomes(
+            chromosomes=[c.copy() for c in population],
+            teacher_preferences=context['teacher_preferences'],
+            top_n=3
+        ))
+
+    return improve
+
+
+def _schedule(context: Dict[str, Any], seed: int) -> List[Dict]:
+    """Расписание Stage 1 из синтетических нагрузок (случайные слоты)"""
+    rnd = random.Random(seed)
+    schedule = []
+    for load in context['course_loads']:
+        for _ in range(load['lessons_per_week']):
+            schedule.append({
+                'id': len(schedule) + 1,
+                'course_load_id': load['id'],
+                'discipline_name': load['discipline_name'],
+                'lesson_type': load['lesson_type'],
+                'teacher_id': load['teacher_id'],
+                'teacher_name': load['teacher_name'],
+                'teacher_priority': load['teacher_priority'],
+                'group_id': load['group_id'],
+                'group_name': load['group_name'],
+                'day_of_week': rnd.randint(1, 6),
+                'time_slot': rnd.randint(1, 6),
+                'classroom_id': None
+            })
+    return schedule
+
+
+if __name__ == '__main__':
+    sys.exit(main())
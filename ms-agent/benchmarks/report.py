@@ -0,0 +1,140 @@
+"""
+JSON-отчёт бенчмарков и сравнение с базовым
+
+Сравнивается медианное по замерам время на операцию (per_op): отчёт
+с другим размером популяции остаётся сопоставимым. Регрессия - замедление
+медианы больше threshold (доля, 0.2 = +20%), подтверждённое разбросом:
+межквартильные интервалы замеров (q1_per_op..q3_per_op) базового и текущего
+отчёта не пересекаются. Иначе разница в пределах шума - 'ok' (или 'noisy',
+если медиана вышла за порог).
+"""
+import sys
+import json
+import platform
+from datetime import datetime, timezone
+from typing import Dict, List, Any
+
+import numpy as np
+
+REPORT_VERSION = 2
+
+COMPARED_METRIC = 'per_op'
+
+STATUS_REGRESSION = 'regression'
+STATUS_IMPROVEMENT = 'improvement'
+STATUS_OK = 'ok'
+STATUS_NOISY = 'noisy'
+STATUS_NEW = 'new'
+STATUS_MISSING = 'missing'
+
+
+def build_report(dataset: Dict[str, Any],
+                 settings: Dict[str, Any],
+                 results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'version': REPORT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine()
+        },
+        'dataset': dataset,
+        'settings': settings,
+        'benchmarks': results
+    }
+
+
+def save_report(report: Dict[str, Any], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(
+            f"Unsupported benchmark report version {report.get('version')} in {path}"
+        )
+    return report
+
+
+def compare_reports(current: Dict[str, Any],
+                    baseline: Dict[str, Any],
+                    threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Сравнить отчёт с базовым
+
+    Returns:
+        [{'name', 'baseline', 'current', 'ratio', 'noise', 'status'}] по
+        бенчмаркам обоих отчётов; ratio = current / baseline по per_op,
+        noise - наибольший относительный межквартильный размах
+    """
+    current_results = current.get('benchmarks', {})
+    baseline_results = baseline.get('benchmarks', {})
+
+    rows = []
+    for name in list(current_results) + [n for n in baseline_results if n not in current_results]:
+        now = current_results.get(name)
+        base = baseline_results.get(name)
+        row = {
+            'name': name,
+            'baseline': base[COMPARED_METRIC] if base else None,
+            'current': now[COMPARED_METRIC] if now else None,
+            'ratio': None,
+            'noise': None
+        }
+
+        if base is None:
+            row['status'] = STATUS_NEW
+        elif now is None:
+            row['status'] = STATUS_MISSING
+        else:
+            row['ratio'] = row['current'] / row['baseline'] if row['baseline'] else float('inf')
+            row['noise'] = max(_spread(base), _spread(now))
+            if row['ratio'] > 1 + threshold:
+                row['status'] = STATUS_REGRESSION if now['q1_per_op'] > base['q3_per_op'] else STATUS_NOISY
+            elif row['ratio'] < 1 / (1 + threshold):
+                row['status'] = STATUS_IMPROVEMENT if now['q3_per_op'] < base['q1_per_op'] else STATUS_NOISY
+            else:
+                row['status'] = STATUS_OK
+        rows.append(row)
+
+    return rows
+
+
+def _spread(result: Dict[str, Any]) -> float:
+    """Межквартильный размах замеров относительно медианы"""
+    median = result[COMPARED_METRIC]
+    return (result['q3_per_op'] - result['q1_per_op']) / median if median else 0.0
+
+
+def dataset_mismatch(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Отличия параметров датасета/настроек (сравнение может быть некорректным)"""
+    diffs = []
+    for section in ('dataset', 'settings'):
+        now = current.get(section, {})
+        base = baseline.get(section, {})
+        for key in sorted(set(now) | set(base)):
+            if now.get(key) != base.get(key):
+                diffs.append(f"{section}.{key}: {base.get(key)} -> {now.get(key)}")
+    return diffs
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Таблица сравнения для консоли"""
+    def ms(value):
+        return f"{value * 1000:10.3f}" if value is not None else f"{'-':>10}"
+
+    def share(value, fmt):
+        return format(value, fmt) if value is not None else f"{'-':>7}"
+
+    lines = [f"{'benchmark':<24} {'base ms/op':>10} {'now ms/op':>10} {'ratio':>7} {'noise':>7}  status"]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<24} {ms(row['baseline'])} {ms(row['current'])} "
+            f"{share(row['ratio'], '7.2f')} {share(row['noise'], '7.1%')}  {row['status']}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,304 @@
+"""
+Набор бенчмарков генетического алгоритма
+
+Каждый бенчмарк - функция (suite) -> (ops, extra): выполняет замеряемую
+работу и возвращает число операций и метрики качества. Перед каждым
+повтором ГСЧ (random и numpy) переинициализируется seed + номер повтора,
+поэтому повторы и запуски на одном контексте воспроизводимы.
+
+Повтор (замер) длится не меньше min_time: быстрые бенчмарки (доли
+миллисекунды на операцию) выполняются в замере несколько раз подряд,
+иначе таймер и фоновая нагрузка дают разброс в десятки процентов.
+
+Фитнес без кэша (cache_size=0): замеряется сам расчёт.
+Короткий прогон ГА - как GenerationOrchestrator._evolve_population
+без LLM-улучшений и без БД.
+"""
+import math
+import time
+import random
+import tracemalloc
+import logging
+import statistics
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Callable, Optional, Any
+
+import numpy as np
+
+from config import config
+from utils.chromosome import Chromosome
+from utils.preference_matrix import PreferenceMatrix
+from services.population_initializer import PopulationInitializer
+from services.fitness_calculator import FitnessCalculator
+from services.parallel_evaluator import ParallelEvaluator
+from services.genetic_operators import (
+    SelectionOperator, CrossoverOperator, MutationOperator, evolve_generation
+)
+from services.simple_schedule_generator import SimpleScheduleGenerator
+
+logger = logging.getLogger(__name__)
+
+BenchmarkFunc = Callable[['BenchmarkSuite'], Tuple[int, Dict[str, Any]]]
+
+# Предел вызовов бенчмарка в одном замере
+MAX_LOOPS = 1000
+
+
+class BenchmarkSuite:
+    """
+    Бенчмарки на одном контексте
+
+    population_size, generations - размер популяции и число поколений
+    короткого прогона ГА; encoding / engine - None = из config.
+    """
+
+    def __init__(self,
+                 context: Dict[str, Any],
+                 population_size: int = 20,
+                 generations: int = 5,
+                 encoding: Optional[str] = None,
+                 engine: Optional[str] = None,
+                 workers: int = 1,
+                 seed: int = 42):
+        self.context = context
+        self.population_size = population_size
+        self.generations = generations
+        self.encoding = encoding or config.GA_GENE_ENCODING
+        self.engine = engine or config.FITNESS_ENGINE
+        self.workers = workers
+        self.seed = seed
+
+        self.preferences = PreferenceMatrix.from_context(context)
+        self.initializer = PopulationInitializer(context, self.encoding)
+        self.fitness_calculator = self._fitness_calculator(cache_size=0)
+        self.mutation = MutationOperator(context['classrooms'], self.preferences)
+
+        # Популяция для бенчмарков операторов
+        self._reseed(0)
+        self.population = self.initializer.create_population(population_size)
+        for chromosome in self.population:
+            self.fitness_calculator.calculate(chromosome)
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            'population_size': self.population_size,
+            'generations': self.generations,
+            'encoding': self.encoding,
+            'engine': self.engine,
+            'workers': self.workers,
+            'seed': self.seed
+        }
+
+    def run(self,
+            names: Optional[List[str]] = None,
+            repeat: int = 7,
+            warmup: int = 1,
+            min_time: float = 0.2) -> Dict[str, Dict[str, Any]]:
+        """
+        Запустить бенчмарки (names=None - все), вернуть результаты по имени
+
+        repeat - замеров, min_time - минимальная длительность замера, сек.
+        """
+        names = names or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise ValueError(f"Unknown benchmarks: {unknown}, expected {list(BENCHMARKS)}")
+
+        results = OrderedDict()
+        for name in names:
+            func, description = BENCHMARKS[name]
+            results[name] = self._measure(func, description, repeat, warmup, min_time)
+            logger.info(
+                f"⏱️ {name}: median {results[name]['median'] * 1000:.1f} ms "
+                f"({results[name]['ops']} ops, {results[name]['loops']} loops per sample)"
+            )
+        return results
+
+    def _measure(self,
+                 func: BenchmarkFunc,
+                 description: str,
+                 repeat: int,
+                 warmup: int,
+                 min_time: float = 0.0) -> Dict[str, Any]:
+        elapsed = 0.0
+        for run in range(max(1, warmup)):
+            self._reseed(run)
+            start = time.perf_counter()
+            func(self)
+            elapsed = time.perf_counter() - start
+
+        # Вызовов в замере: по последнему прогреву, чтобы замер длился min_time
+        loops = max(1, min(MAX_LOOPS, math.ceil(min_time / elapsed))) if elapsed > 0 else 1
+
+        timings = []
+        ops, extra = 0, {}
+        for run in range(max(1, repeat)):
+            self._reseed(run)
+            start = time.perf_counter()
+            for _ in range(loops):
+                ops, extra = func(self)
+            timings.append((time.perf_counter() - start) / loops)
+
+        per_op = [timing / ops if ops else timing for timing in timings]
+        q1, _, q3 = statistics.quantiles(per_op, n=4) if len(per_op) > 1 else (per_op[0],) * 3
+        median = statistics.median(timings)
+        return {
+            'description': description,
+            'runs': len(timings),
+            'loops': loops,
+            'ops': ops,
+            'min': min(timings),
+            'median': median,
+            'mean': statistics.fmean(timings),
+            'max': max(timings),
+            'per_op': statistics.median(per_op),
+            'min_per_op': min(per_op),
+            'q1_per_op': q1,
+            'q3_per_op': q3,
+            'extra': extra
+        }
+
+    def _reseed(self, run: int):
+        random.seed(self.seed + run)
+        np.random.seed((self.seed + run) % (2 ** 32))
+
+    def _fitness_calculator(self, cache_size: Optional[int] = None) -> FitnessCalculator:
+        return FitnessCalculator(
+            teacher_preferences=self.context['teacher_preferences'],
+            classrooms=self.context['classrooms'],
+            groups=self.context['groups'],
+            engine=self.engine,
+            preference_matrix=self.preferences,
+            cache_size=cache_size
+        )
+
+    def _pairs(self) -> List[Tuple[Chromosome, Chromosome]]:
+        population = self.population
+        return [
+            (population[i], population[(i + 1) % len(population)])
+            for i in range(len(population))
+        ]
+
+
+# ============ Бенчмарки ============
+
+def bench_population_init(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    population = suite.initializer.create_population(suite.population_size)
+    return len(population), {
+        'chromosomes': len(population),
+        'genes': len(population[0]) if population else 0
+    }
+
+
+def bench_fitness_calculate(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    for chromosome in suite.population:
+        suite.fitness_calculator.calculate(chromosome)
+    return len(suite.population), {
+        'best_fitness': max(c.fitness for c in suite.population),
+        'valid': sum(1 for c in suite.population if c.is_valid())
+    }
+
+
+def bench_crossover_single_point(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    pairs = suite._pairs()
+    for parent1, parent2 in pairs:
+        CrossoverOperator.single_point_crossover(parent1, parent2)
+    return len(pairs), {}
+
+
+def bench_crossover_uniform(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    pairs = suite._pairs()
+    for parent1, parent2 in pairs:
+        CrossoverOperator.uniform_crossover(parent1, parent2)
+    return len(pairs), {}
+
+
+def bench_mutation(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    for chromosome in suite.population:
+        suite.mutation.mutate(chromosome, mutation_rate=0.1)
+    return len(suite.population), {}
+
+
+def bench_smart_mutation(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    for chromosome in suite.population:
+        suite.mutation.smart_mutate(chromosome, mutation_rate=0.1)
+    return len(suite.population), {}
+
+
+def bench_local_search(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    best = max(suite.population, key=lambda c: c.fitness)
+    improved = suite.mutation.local_search(best, suite.fitness_calculator, moves=200)
+    return 200, {'fitness_before': best.fitness, 'fitness_after': improved.fitness}
+
+
+def bench_simple_generator(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    generator = SimpleScheduleGenerator(suite.context['course_loads'], suite.context['classrooms'])
+    schedule = generator.generate()
+    return len(schedule), {'lessons': len(schedule)}
+
+
+def bench_materialize(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    best = max(suite.population, key=lambda c: c.fitness)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    lessons = best.lessons
+    schedule = best.to_schedule_dict()
+    _, peak = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+    return len(schedule), {
+        'lessons': len(lessons),
+        'rows': len(schedule),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def bench_ga_short_run(suite: BenchmarkSuite) -> Tuple[int, Dict[str, Any]]:
+    fitness_calculator = suite._fitness_calculator()
+    selection = SelectionOperator()
+    crossover = CrossoverOperator()
+
+    with ParallelEvaluator(suite.context, fitness_calculator, workers=suite.workers) as evaluator:
+        population = suite.initializer.create_population(suite.population_size)
+        evaluator.evaluate(population)
+        best = max(population, key=lambda c: c.fitness) if population else None
+
+        for _ in range(suite.generations):
+            population = evolve_generation(
+                population=population,
+                population_size=suite.population_size,
+                selection=selection,
+                crossover=crossover,
+                mutation=suite.mutation,
+                fitness_calculator=fitness_calculator,
+                evaluate=evaluator.evaluate,
+                reinitialize=suite.initializer.create_population
+            )
+            if population:
+                current = max(population, key=lambda c: c.fitness)
+                if best is None or current.fitness > best.fitness:
+                    best = current
+
+    return suite.generations, {
+        'best_fitness': best.fitness if best is not None else None,
+        'best_hard_violations': best.hard_violations if best is not None else None,
+        'valid': sum(1 for c in population if c.is_valid()),
+        'fitness_cache_hit_rate': fitness_calculator.cache.hit_rate
+    }
+
+
+# Имя -> (функция, описание); порядок - порядок запуска
+BENCHMARKS: Dict[str, Tuple[BenchmarkFunc, str]] = OrderedDict([
+    ('population_init', (bench_population_init, 'PopulationInitializer.create_population')),
+    ('fitness_calculate', (bench_fitness_calculate, 'FitnessCalculator.calculate (без кэша), на хромосому')),
+    ('crossover_single_point', (bench_crossover_single_point, 'CrossoverOperator.single_point_crossover, на пару')),
+    ('crossover_uniform', (bench_crossover_uniform, 'CrossoverOperator.uniform_crossover, на пару')),
+    ('mutation', (bench_mutation, 'MutationOperator.mutate, на хромосому')),
+    ('smart_mutation', (bench_smart_mutation, 'MutationOperator.smart_mutate, на хромосому')),
+    ('local_search', (bench_local_search, 'MutationOperator.local_search, 200 ходов')),
+    ('simple_generator', (bench_simple_generator, 'SimpleScheduleGenerator.generate')),
+    ('materialize', (bench_materialize, 'Chromosome.lessons + to_schedule_dict (peak_kb - tracemalloc), на занятие')),
+    ('ga_short_run', (bench_ga_short_run, 'Короткий прогон ГА (evolve_generation), на поколение'))
+])
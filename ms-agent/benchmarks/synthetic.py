@@ -0,0 +1,211 @@
+"""
+Синтетический университет для бенчмарков
+
+Воспроизводимый (seed) набор групп, преподавателей с приоритетами 1-4
+и сетками предпочтений, аудиторий с типами и вместимостью и нагрузок.
+Контекст - в том же формате, что возвращает
+ScheduleContextBuilder.build_context, без Postgres и ms-core.
+"""
+import random
+from typing import Dict, List, Any
+
+from utils.preference_matrix import PreferenceMatrix
+
+DAYS = range(1, 7)
+SLOTS = range(1, 7)
+
+# Пресеты размера: группы, преподаватели, аудитории, нагрузок на группу
+SIZES: Dict[str, Dict[str, int]] = {
+    'small': {'groups': 10, 'teachers': 15, 'classrooms': 12, 'loads_per_group': 6},
+    'medium': {'groups': 60, 'teachers': 80, 'classrooms': 50, 'loads_per_group': 8},
+    'large': {'groups': 250, 'teachers': 400, 'classrooms': 200, 'loads_per_group': 8}
+}
+
+# Тип занятия -> доля нагрузок
+LESSON_TYPES = {
+    'Лекция': 0.3,
+    'Практика': 0.4,
+    'Лабораторная': 0.2,
+    'Семинар': 0.1
+}
+
+# Размер группы
+GROUP_SIZE = (12, 30)
+
+# Тип аудитории -> (доля аудиторий, диапазон вместимости);
+# любая аудитория вмещает группу - датасет разрешим без нарушений вместимости
+CLASSROOM_TYPES = {
+    'LECTURE': (0.2, (60, 150)),
+    'PRACTICE': (0.35, (30, 45)),
+    'LAB': (0.25, (30, 40)),
+    'SEMINAR': (0.2, (30, 40))
+}
+
+# Приоритет преподавателя -> доля (1 - внешний совместитель, 4 - штатный)
+TEACHER_PRIORITIES = {1: 0.1, 2: 0.1, 3: 0.2, 4: 0.6}
+
+# Максимум пар в неделю на преподавателя при распределении нагрузок
+TEACHER_WEEKLY_LIMIT = 24
+
+
+def generate_context(groups: int = 60,
+                     teachers: int = 80,
+                     classrooms: int = 50,
+                     loads_per_group: int = 8,
+                     preference_density: float = 0.25,
+                     alternating_share: float = 0.0,
+                     semester: int = 1,
+                     academic_year: str = '2025/2026',
+                     seed: int = 42) -> Dict[str, Any]:
+    """
+    Сгенерировать контекст генерации
+
+    Args:
+        groups, teachers, classrooms: размеры
+        loads_per_group: дисциплин (нагрузок) на группу, 1-2 пары в неделю каждая
+        preference_density: доля слотов сетки 6×6 с предпочтением у преподавателя
+        alternating_share: доля нагрузок по числителю/знаменателю (week_type
+            odd/even; 0 - ключ week_type не добавляется, как в build_context)
+        seed: одинаковый seed - одинаковый контекст
+
+    Returns:
+        {'course_loads', 'teacher_preferences', 'classrooms', 'teachers',
+         'groups', 'preference_matrix'}
+    """
+    rnd = random.Random(seed)
+
+    classroom_list = _generate_classrooms(rnd, classrooms)
+    teacher_preferences = _generate_teachers(rnd, teachers, preference_density)
+    group_map = {
+        group_id: {
+            'id': group_id,
+            'name': f'ГР-{group_id:03d}',
+            'size': rnd.randint(*GROUP_SIZE)
+        }
+        for group_id in range(1, groups + 1)
+    }
+    course_loads = _generate_loads(
+        rnd, group_map, teacher_preferences, loads_per_group,
+        alternating_share, semester, academic_year
+    )
+
+    teacher_ids = {load['teacher_id'] for load in course_loads}
+    return {
+        'course_loads': course_loads,
+        'teacher_preferences': teacher_preferences,
+        'classrooms': classroom_list,
+        'teachers': {
+            teacher_id: teacher_preferences[teacher_id] for teacher_id in sorted(teacher_ids)
+        },
+        'groups': group_map,
+        'preference_matrix': PreferenceMatrix(teacher_preferences)
+    }
+
+
+def describe(context: Dict[str, Any]) -> Dict[str, int]:
+    """Размеры контекста (для отчёта)"""
+    return {
+        'course_loads': len(context['course_loads']),
+        'weekly_lessons': sum(load['lessons_per_week'] for load in context['course_loads']),
+        'teachers': len(context['teachers']),
+        'groups': len(context['groups']),
+        'classrooms': len(context['classrooms'])
+    }
+
+
+def _weighted_choice(rnd: random.Random, weights: Dict[Any, float]) -> Any:
+    return rnd.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _generate_classrooms(rnd: random.Random, count: int) -> List[Dict]:
+    # По одной аудитории каждого типа, остальные - по долям
+    types = list(CLASSROOM_TYPES)[:count]
+    types += [
+        _weighted_choice(rnd, {t: share for t, (share, _) in CLASSROOM_TYPES.items()})
+        for _ in range(count - len(types))
+    ]
+
+    result = []
+    for classroom_id, classroom_type in enumerate(types, start=1):
+        low, high = CLASSROOM_TYPES[classroom_type][1]
+        result.append({
+            'id': classroom_id,
+            'name': f'{classroom_id // 100 + 1}-{classroom_id:03d}',
+            'capacity': rnd.randint(low, high),
+            'classroom_type': classroom_type
+        })
+    return result
+
+
+def _generate_teachers(rnd: random.Random,
+                       count: int,
+                       preference_density: float) -> Dict[int, Dict]:
+    grid = [(day, slot) for day in DAYS for slot in SLOTS]
+    per_teacher = round(len(grid) * max(0.0, min(1.0, preference_density)))
+
+    teachers = {}
+    for teacher_id in range(1, count + 1):
+        preferences = [
+            {
+                'day_of_week': day,
+                'time_slot': slot,
+                'is_preferred': rnd.random() < 0.6
+            }
+            for day, slot in sorted(rnd.sample(grid, per_teacher))
+        ]
+        teachers[teacher_id] = {
+            'priority': _weighted_choice(rnd, TEACHER_PRIORITIES),
+            'name': f'Преподаватель {teacher_id}',
+            'preferences': preferences
+        }
+    return teachers
+
+
+def _generate_loads(rnd: random.Random,
+                    groups: Dict[int, Dict],
+                    teachers: Dict[int, Dict],
+                    loads_per_group: int,
+                    alternating_share: float,
+                    semester: int,
+                    academic_year: str) -> List[Dict]:
+    teacher_load = {teacher_id: 0 for teacher_id in teachers}
+
+    loads = []
+    for group_id, group in groups.items():
+        for number in range(1, loads_per_group + 1):
+            lesson_type = _weighted_choice(rnd, LESSON_TYPES)
+            lessons_per_week = rnd.choice((1, 1, 2))
+
+            # Свободный преподаватель; если все заняты - наименее загруженный
+            available = [
+                teacher_id for teacher_id, load in teacher_load.items()
+                if load + lessons_per_week <= TEACHER_WEEKLY_LIMIT
+            ]
+            if available:
+                teacher_id = rnd.choice(available)
+            else:
+                teacher_id = min(teacher_load, key=teacher_load.get)
+            teacher_load[teacher_id] += lessons_per_week
+
+            load = {
+                'id': len(loads) + 1,
+                'discipline_name': f'Дисциплина {number} ({group["name"]})',
+                'discipline_code': f'D{group_id:03d}{number:02d}',
+                'teacher_id': teacher_id,
+                'teacher_name': teachers[teacher_id]['name'],
+                'teacher_priority': teachers[teacher_id]['priority'],
+                'group_id': group_id,
+                'group_name': group['name'],
+                'group_size': group['size'],
+                'lesson_type': lesson_type,
+                'hours_per_semester': lessons_per_week * 32,
+                'lessons_per_week': lessons_per_week,
+                'semester': semester,
+                'academic_year': academic_year
+            }
+            if alternating_share > 0:
+                load['week_type'] = (
+                    rnd.choice(('odd', 'even')) if rnd.random() < alternating_share else 'both'
+                )
+            loads.append(load)
+    return loads
@@ -33,6 +33,22 @@ class Config:
     GIGACHAT_MODEL: str = os.getenv('GIGACHAT_MODEL', 'GigaChat')
     GIGACHAT_TEMPERATURE: float = float(os.getenv('GIGACHAT_TEMPERATURE', 0.7))
     GIGACHAT_MAX_TOKENS: int = int(os.getenv('GIGACHAT_MAX_TOKENS', 2000))
+    # Адреса API (для локального stub-сервера: python -m benchmarks.gigachat_stub)
+    GIGACHAT_BASE_URL: str = os.getenv('GIGACHAT_BASE_URL', 'https://gigachat.devices.sberbank.ru/api/v1')
+    GIGACHAT_TOKEN_URL: str = os.getenv('GIGACHAT_TOKEN_URL', 'https://ngw.devices.sberbank.ru:9443/api/v2/oauth')
+    # Одновременных запросов (и соединений в пуле) на процесс
+    GIGACHAT_MAX_CONCURRENCY: int = int(os.getenv('GIGACHAT_MAX_CONCURRENCY', 4))
+    # Таймауты (сек): соединение и ответ
+    GIGACHAT_CONNECT_TIMEOUT: float = float(os.getenv('GIGACHAT_CONNECT_TIMEOUT', 5.0))
+    GIGACHAT_TIMEOUT: float = float(os.getenv('GIGACHAT_TIMEOUT', 60.0))
+    # Повторы при 429 / 5xx / сетевых ошибках: задержка до min(MAX, BASE * 2^попытка) с jitter
+    GIGACHAT_MAX_RETRIES: int = int(os.getenv('GIGACHAT_MAX_RETRIES', 3))
+    GIGACHAT_BACKOFF_BASE: float = float(os.getenv('GIGACHAT_BACKOFF_BASE', 0.5))
+    GIGACHAT_BACKOFF_MAX: float = float(os.getenv('GIGACHAT_BACKOFF_MAX', 8.0))
+    # Токен обновляется за N секунд до истечения
+    GIGACHAT_TOKEN_REFRESH_MARGIN: int = int(os.getenv('GIGACHAT_TOKEN_REFRESH_MARGIN', 300))
+    # Кэш ответов GigaChatImprover по набору нарушений (0 = выключен)
+    LLM_RESPONSE_CACHE_SIZE: int = int(os.getenv('LLM_RESPONSE_CACHE_SIZE', 256))
     
     # ============ RPC CLIENTS ============
     MS_AUDIT_HOST: str = os.getenv('MS_AUDIT_HOST', 'localhost')
@@ -50,18 +66,101 @@ class Config:
     GRPC_PORT: int = int(os.getenv('GRPC_PORT', 50053))
     GRPC_MAX_WORKERS: int = int(os.getenv('GRPC_MAX_WORKERS', 10))
     GRPC_MAX_MESSAGE_LENGTH: int = 100 * 1024 * 1024  # 100MB
+    # WatchGeneration: одновременных потоков (не больше GRPC_MAX_WORKERS - 2);
+    # без событий N секунд статус перечитывается из БД (генерация не в этом процессе - поток закрывается)
+    WATCH_MAX_STREAMS: int = int(os.getenv('WATCH_MAX_STREAMS', 4))
+    WATCH_IDLE_TIMEOUT: float = float(os.getenv('WATCH_IDLE_TIMEOUT', 15.0))
+    # Ответов AnalyzeSchedule в кэше (генераций; 0 = без кэша)
+    ANALYSIS_CACHE_SIZE: int = int(os.getenv('ANALYSIS_CACHE_SIZE', 64))
     
     # ============ AGENT SETTINGS ============
     MAX_ITERATIONS: int = int(os.getenv('MAX_ITERATIONS', 100))
     STAGE1_MAX_ITERATIONS: int = int(os.getenv('STAGE1_MAX_ITERATIONS', 80))
     STAGE2_MAX_ITERATIONS: int = int(os.getenv('STAGE2_MAX_ITERATIONS', 50))
     
+    # Stage 2 (аудитории): процессов (0 = min(4, ядер), 1 = без пула процессов; см. utils.process_pool),
+    # стоимость пустого места и смены аудитории группой между парами дня
+    STAGE2_WORKERS: int = int(os.getenv('STAGE2_WORKERS', 0))
+    STAGE2_WASTED_SEAT_COST: float = float(os.getenv('STAGE2_WASTED_SEAT_COST', 1.0))
+    STAGE2_ROOM_CHANGE_COST: float = float(os.getenv('STAGE2_ROOM_CHANGE_COST', 20.0))
+    
     # Критерий остановки (если скор не улучшился за N итераций)
     EARLY_STOPPING_PATIENCE: int = int(os.getenv('EARLY_STOPPING_PATIENCE', 15))
     
     # Критерий успеха (процент улучшения)
     MIN_IMPROVEMENT_THRESHOLD: float = float(os.getenv('MIN_IMPROVEMENT_THRESHOLD', 0.01))  # 1%
     
+    # Прогресс генерации: подписчики WatchGeneration получают каждую итерацию,
+    # generation_history в БД обновляется не чаще раза в N секунд
+    PROGRESS_DB_INTERVAL: float = float(os.getenv('PROGRESS_DB_INTERVAL', 5.0))
+    
+    # Движок Stage 1: demo | llm (GigaChat, ход на итерацию) | annealing | tabu (локальный поиск без LLM)
+    STAGE1_ENGINE: str = os.getenv('STAGE1_ENGINE', 'demo')
+    # Локальный поиск: бюджет времени (сек), остановка без улучшения за N кандидатов, интервал прогресса (сек)
+    STAGE1_TIME_BUDGET: float = float(os.getenv('STAGE1_TIME_BUDGET', 30.0))
+    STAGE1_PATIENCE: int = int(os.getenv('STAGE1_PATIENCE', 200000))
+    STAGE1_PROGRESS_INTERVAL: float = float(os.getenv('STAGE1_PROGRESS_INTERVAL', 1.0))
+    # Итераций LLM-агента после локального поиска (0 = без финальной полировки)
+    STAGE1_LLM_POLISH_ITERATIONS: int = int(os.getenv('STAGE1_LLM_POLISH_ITERATIONS', 0))
+    
+    # Ремонт активного расписания (RepairSchedule): локальный поиск только по
+    # окрестности изменённых нагрузок / предпочтений - метод и бюджет (сек)
+    REPAIR_METHOD: str = os.getenv('REPAIR_METHOD', 'annealing')
+    REPAIR_TIME_BUDGET: float = float(os.getenv('REPAIR_TIME_BUDGET', 5.0))
+    
+    # ============ GENETIC ALGORITHM ============
+    # Движок fitness: vectorized (NumPy) или reference (построчный Python)
+    FITNESS_ENGINE: str = os.getenv('FITNESS_ENGINE', 'vectorized')
+    
+    # Параллельная оценка популяции (0 = min(4, ядер), 1 = без пула процессов;
+    # пул - fork из многопоточного сервера, см. utils.process_pool)
+    GA_EVAL_WORKERS: int = int(os.getenv('GA_EVAL_WORKERS', 0))
+    GA_EVAL_CHUNK_SIZE: int = int(os.getenv('GA_EVAL_CHUNK_SIZE', 4))
+    
+    # Островная модель (0/1 = одна популяция)
+    GA_ISLANDS: int = int(os.getenv('GA_ISLANDS', 0))
+    GA_MIGRATION_INTERVAL: int = int(os.getenv('GA_MIGRATION_INTERVAL', 10))
+    GA_MIGRANTS: int = int(os.getenv('GA_MIGRANTS', 2))
+    GA_MIGRATION_TOPOLOGY: str = os.getenv('GA_MIGRATION_TOPOLOGY', 'ring')  # ring или random
+    
+    # Кэш fitness: LRU по хэшу генома (0 = выключен)
+    GA_FITNESS_CACHE_SIZE: int = int(os.getenv('GA_FITNESS_CACHE_SIZE', 2048))
+    
+    # Кодировка генов: weekly (ген = занятие недели) или template (недельный шаблон с маской недель)
+    GA_GENE_ENCODING: str = os.getenv('GA_GENE_ENCODING', 'weekly')
+    
+    # LLM-улучшения топа популяции (GigaChat + Stage1Agent) в фоне: раз в N поколений (0 = выключены)
+    GA_LLM_INTERVAL: int = int(os.getenv('GA_LLM_INTERVAL', 10))
+    
+    # Декомпозиция: независимые кластеры нагрузок (без общих преподавателей и групп)
+    # составляются параллельно, затем ремонт аудиторий; процессов 0 = min(4, ядер), см. utils.process_pool.
+    # Включает ГА для генераций без островов (ga_islands <= 1) вместо простого генератора
+    GA_DECOMPOSE: bool = os.getenv('GA_DECOMPOSE', 'false').lower() == 'true'
+    GA_CLUSTER_WORKERS: int = int(os.getenv('GA_CLUSTER_WORKERS', 0))
+    
+    # ============ JOB QUEUE ============
+    # Генерации выполняются по очереди (generation_history, status = 'queued'):
+    # одновременно не больше GENERATION_WORKERS, в очереди не больше GENERATION_QUEUE_SIZE
+    GENERATION_WORKERS: int = int(os.getenv('GENERATION_WORKERS', 1))
+    # Стабильный ID экземпляра ms-agent (не имя хоста - ID контейнера меняется при пересоздании):
+    # его генерации в статусе 'running' при запуске помечаются 'failed'. У каждого экземпляра - свой
+    GENERATION_WORKER_ID: str = os.getenv('GENERATION_WORKER_ID', 'ms-agent')
+    GENERATION_QUEUE_SIZE: int = int(os.getenv('GENERATION_QUEUE_SIZE', 20))
+    # Опрос очереди воркером без уведомлений (сек) и статуса 'stopped' генерации (сек)
+    GENERATION_QUEUE_POLL_INTERVAL: float = float(os.getenv('GENERATION_QUEUE_POLL_INTERVAL', 5.0))
+    GENERATION_CANCEL_POLL_INTERVAL: float = float(os.getenv('GENERATION_CANCEL_POLL_INTERVAL', 5.0))
+    
+    # ============ EXCEL IMPORT ============
+    # Разбор файлов нагрузки кафедр (ExcelParser.parse_multiple_files):
+    # процессов (0 = min(4, ядер), 1 = без пула процессов; см. utils.process_pool)
+    EXCEL_PARSE_WORKERS: int = int(os.getenv('EXCEL_PARSE_WORKERS', 0))
+    
+    # ============ PROFILING ============
+    # cProfile каждой генерации (иначе - только по GenerateRequest.profile),
+    # функций в generation_history.metrics['profile']
+    GENERATION_PROFILE: bool = os.getenv('GENERATION_PROFILE', 'false').lower() == 'true'
+    GENERATION_PROFILE_TOP: int = int(os.getenv('GENERATION_PROFILE_TOP', 40))
+    
     # ============ LOGGING ============
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     
@@ -0,0 +1,21 @@
+-- Миграция: очередь генераций (services.job_queue)
+-- Генерации ставятся в очередь со статусом 'queued' и берутся воркерами
+-- по приоритету; параметры запуска хранятся в params
+
+ALTER TABLE generation_history DROP CONSTRAINT IF EXISTS generation_history_status_check;
+ALTER TABLE generation_history ADD CONSTRAINT generation_history_status_check
+    CHECK (status IN ('queued', 'running', 'completed', 'failed', 'stopped'));
+
+ALTER TABLE generation_history ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE generation_history ADD COLUMN IF NOT EXISTS params JSONB;
+ALTER TABLE generation_history ADD COLUMN IF NOT EXISTS queued_at TIMESTAMP DEFAULT NOW();
+ALTER TABLE generation_history ADD COLUMN IF NOT EXISTS worker VARCHAR(255);
+
+-- Выборка следующей генерации из очереди
+CREATE INDEX IF NOT EXISTS idx_generation_history_queue
+ON generation_history(priority DESC, queued_at, id) WHERE status = 'queued';
+
+COMMENT ON COLUMN generation_history.priority IS 'Приоритет в очереди (больше - раньше)';
+COMMENT ON COLUMN generation_history.params IS 'Параметры запуска генерации (JSON)';
+COMMENT ON COLUMN generation_history.queued_at IS 'Время постановки в очередь';
+COMMENT ON COLUMN generation_history.worker IS 'Экземпляр ms-agent (GENERATION_WORKER_ID), выполняющий генерацию';
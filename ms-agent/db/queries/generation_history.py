@@ -14,7 +14,74 @@ INSERT_GENERATION = """
     RETURNING id
 """
 
+# Поставить генерацию в очередь (services.job_queue)
+ENQUEUE_GENERATION = """
+    INSERT INTO generation_history (
+        job_id, stage, stage_name, status,
+        max_iterations, initial_score, created_by,
+        priority, params, queued_at
+    ) VALUES (
+        %(job_id)s, %(stage)s, %(stage_name)s, 'queued',
+        %(max_iterations)s, NULL, %(created_by)s,
+        %(priority)s, %(params)s, NOW()
+    )
+    RETURNING id
+"""
+
+# Взять следующую генерацию из очереди (приоритет, затем порядок постановки;
+# SKIP LOCKED - несколько воркеров / экземпляров не возьмут одну генерацию)
+CLAIM_NEXT_GENERATION = """
+    UPDATE generation_history
+    SET status = 'running',
+        started_at = NOW(),
+        worker = %(worker)s
+    WHERE id = (
+        SELECT id
+        FROM generation_history
+        WHERE status = 'queued'
+        ORDER BY priority DESC, queued_at, id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *, EXTRACT(EPOCH FROM (NOW() - queued_at)) AS wait_seconds
+"""
+
+# Длина очереди
+COUNT_QUEUED_GENERATIONS = """
+    SELECT COUNT(*) AS queued
+    FROM generation_history
+    WHERE status = 'queued'
+"""
+
+# Позиция генерации в очереди (1 = следующая)
+SELECT_QUEUE_POSITION = """
+    SELECT COUNT(*) AS position
+    FROM generation_history q, generation_history g
+    WHERE g.job_id = %(job_id)s
+        AND q.status = 'queued'
+        AND (q.priority > g.priority
+             OR (q.priority = g.priority AND (q.queued_at, q.id) <= (g.queued_at, g.id)))
+"""
+
+# Генерации, прерванные перезапуском экземпляра ms-agent (worker - GENERATION_WORKER_ID)
+FAIL_INTERRUPTED_GENERATIONS = """
+    UPDATE generation_history
+    SET status = 'failed',
+        completed_at = NOW(),
+        error_message = 'Interrupted by ms-agent restart'
+    WHERE status = 'running' AND worker = %(worker)s
+    RETURNING job_id
+"""
+
+# Статус генерации (опрос отмены - utils.cancellation)
+SELECT_GENERATION_STATUS = """
+    SELECT status
+    FROM generation_history
+    WHERE job_id = %(job_id)s
+"""
+
 # Обновить статус генерации
+# (остановленная пользователем генерация остаётся 'stopped')
 UPDATE_GENERATION_STATUS = """
     UPDATE generation_history
     SET status = %(status)s,
@@ -24,21 +91,23 @@ UPDATE_GENERATION_STATUS = """
                                 THEN EXTRACT(EPOCH FROM (NOW() - started_at))::int 
                                 ELSE duration_seconds END,
         error_message = %(error_message)s
-    WHERE job_id = %(job_id)s
+    WHERE job_id = %(job_id)s AND status <> 'stopped'
 """
 
 # Обновить итерацию и скор
+# (пишется с прореживанием: best_score - лучший скор с прошлой записи,
+# actions - сколько итераций прошло с прошлой записи)
 UPDATE_GENERATION_ITERATION = """
     UPDATE generation_history
     SET current_iteration = %(current_iteration)s,
         current_score = %(current_score)s,
         best_score = CASE 
-            WHEN %(current_score)s > COALESCE(best_score, -999999) 
-            THEN %(current_score)s 
+            WHEN %(best_score)s > COALESCE(best_score, -999999) 
+            THEN %(best_score)s 
             ELSE best_score 
         END,
         last_reasoning = %(last_reasoning)s,
-        total_actions = total_actions + 1
+        total_actions = total_actions + %(actions)s
     WHERE job_id = %(job_id)s
 """
 
@@ -49,6 +118,13 @@ UPDATE_GENERATION_METRICS = """
     WHERE job_id = %(job_id)s
 """
 
+# Дописать метрики (JSON объединяется с уже сохранёнными)
+MERGE_GENERATION_METRICS = """
+    UPDATE generation_history
+    SET metrics = COALESCE(metrics, '{}'::jsonb) || %(metrics)s::jsonb
+    WHERE id = %(id)s
+"""
+
 # Получить генерацию по job_id
 SELECT_GENERATION_BY_JOB_ID = """
     SELECT *
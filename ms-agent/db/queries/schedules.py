@@ -20,6 +20,21 @@ INSERT_SCHEDULE = """
     RETURNING id
 """
 
+# Колонки для массовой записи (порядок COPY_SCHEDULES)
+SCHEDULE_COLUMNS = (
+    'course_load_id', 'day_of_week', 'time_slot',
+    'classroom_id', 'classroom_name',
+    'teacher_id', 'teacher_name', 'group_id', 'group_name',
+    'discipline_name', 'lesson_type', 'generation_id', 'is_active',
+    'semester', 'academic_year'
+)
+
+# Массовая вставка через COPY (строки - db.schedule_writer)
+COPY_SCHEDULES = f"""
+    COPY schedules ({', '.join(SCHEDULE_COLUMNS)})
+    FROM STDIN
+"""
+
 # Обновить временной слот
 UPDATE_SCHEDULE_TIME = """
     UPDATE schedules
@@ -36,6 +51,28 @@ UPDATE_SCHEDULE_CLASSROOM = """
     WHERE id = %(id)s
 """
 
+# Обновить занятие целиком (ремонт расписания - services.schedule_repair)
+UPDATE_SCHEDULE_LESSON = """
+    UPDATE schedules
+    SET day_of_week = %(day_of_week)s,
+        time_slot = %(time_slot)s,
+        classroom_id = %(classroom_id)s,
+        classroom_name = %(classroom_name)s,
+        teacher_id = %(teacher_id)s,
+        teacher_name = %(teacher_name)s,
+        group_id = %(group_id)s,
+        group_name = %(group_name)s,
+        discipline_name = %(discipline_name)s,
+        lesson_type = %(lesson_type)s
+    WHERE id = %(id)s
+"""
+
+# Удалить занятия по id
+DELETE_SCHEDULES_BY_IDS = """
+    DELETE FROM schedules
+    WHERE id = ANY(%(ids)s)
+"""
+
 # Получить активное расписание (только последнее сгенерированное)
 SELECT_ACTIVE_SCHEDULES = """
     SELECT s.*
@@ -57,6 +94,13 @@ SELECT_SCHEDULES_BY_GENERATION = """
     ORDER BY day_of_week, time_slot, teacher_name
 """
 
+# Версия строк генерации (меняется при любом insert / update / delete)
+SELECT_GENERATION_VERSION = """
+    SELECT COUNT(*) as lessons, MAX(id) as max_id, MAX(updated_at) as updated_at
+    FROM schedules
+    WHERE generation_id = %(generation_id)s
+"""
+
 # Получить расписание преподавателя
 SELECT_TEACHER_SCHEDULE = """
     SELECT *
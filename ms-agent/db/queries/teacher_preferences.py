@@ -24,6 +24,14 @@ SELECT_TEACHER_PREFERENCES = """
     ORDER BY day_of_week, time_slot
 """
 
+# Получить предпочтения нескольких преподавателей одним запросом
+SELECT_PREFERENCES_BY_TEACHERS = """
+    SELECT *
+    FROM teacher_preferences
+    WHERE teacher_id = ANY(%(teacher_ids)s)
+    ORDER BY teacher_id, day_of_week, time_slot
+"""
+
 # Получить предпочтительные слоты
 SELECT_PREFERRED_SLOTS = """
     SELECT day_of_week, time_slot, preference_strength
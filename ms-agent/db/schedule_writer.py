@@ -0,0 +1,191 @@
+"""
+Schedule Writer
+Массовое сохранение расписания через COPY в одной транзакции
+
+Раньше каждое занятие - отдельный INSERT_SCHEDULE со своим соединением из
+пула и autocommit: 30k занятий сохранялись минутами, а падение посередине
+оставляло наполовину записанное активное расписание. Теперь строки
+потоково передаются в COPY ... FROM STDIN, а деактивация старого
+расписания, вставка нового и запись скорости в generation_history.metrics
+коммитятся вместе.
+
+apply_diff - то же для ремонта расписания (services.schedule_repair):
+удаление, обновление и вставка только изменённых занятий одной транзакцией.
+"""
+
+import json
+import time
+import logging
+from typing import Iterable, Dict, Any, Optional, List
+
+from db.connection import db
+from db.queries import schedules as schedule_queries
+from db.queries import generation_history as gen_queries
+from utils import profiling
+
+logger = logging.getLogger(__name__)
+
+# Строк на один read() из COPY-потока
+COPY_CHUNK_ROWS = 1000
+
+
+class _CopyStream:
+    """Файлоподобный поток COPY text format из итератора строк (без буфера на всё расписание)"""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _next_chunk(self) -> str:
+        lines = []
+        for row in self._rows:
+            lines.append('\t'.join(
+                _copy_value(row.get(column)) for column in schedule_queries.SCHEDULE_COLUMNS
+            ))
+            if len(lines) >= COPY_CHUNK_ROWS:
+                break
+        self.count += len(lines)
+        return ''.join(line + '\n' for line in lines)
+
+
+def _copy_value(value: Any) -> str:
+    """Значение в COPY text format: NULL = \\N, экранирование спецсимволов"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def save_schedule(rows: Iterable[Dict[str, Any]],
+                  generation_id: Optional[int] = None,
+                  deactivate_old: bool = True,
+                  replace_generation: bool = False) -> Dict[str, Any]:
+    """
+    Сохранить расписание одной транзакцией
+
+    Args:
+        rows: Строки schedules (ключи - SCHEDULE_COLUMNS, как у INSERT_SCHEDULE)
+        generation_id: ID генерации - скорость записи попадает в её metrics
+        deactivate_old: Деактивировать текущее активное расписание
+        replace_generation: Сначала удалить уже сохранённые строки generation_id
+
+    Returns:
+        {'rows', 'seconds', 'rows_per_second'}
+
+    При ошибке транзакция откатывается: старое расписание остаётся активным.
+    """
+    stream = _CopyStream(rows)
+    start = time.monotonic()
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            if replace_generation and generation_id is not None:
+                cur.execute(
+                    schedule_queries.DELETE_SCHEDULES_BY_GENERATION,
+                    {'generation_id': generation_id}
+                )
+            if deactivate_old:
+                cur.execute(schedule_queries.DEACTIVATE_OLD_SCHEDULES)
+
+            cur.copy_expert(schedule_queries.COPY_SCHEDULES, stream)
+
+            seconds = time.monotonic() - start
+            stats = {
+                'rows': stream.count,
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(stream.count / seconds, 1) if seconds > 0 else 0.0
+            }
+
+            if generation_id is not None:
+                cur.execute(
+                    gen_queries.MERGE_GENERATION_METRICS,
+                    {'id': generation_id, 'metrics': json.dumps({'schedule_save': stats})}
+                )
+
+        conn.commit()
+
+    profiling.record('save', stats['seconds'])
+    logger.info(
+        f"💾 Saved {stats['rows']} lessons in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:.0f} rows/s)"
+    )
+    return stats
+
+
+def apply_diff(deleted_ids: List[int],
+               updated: List[Dict[str, Any]],
+               inserted: List[Dict[str, Any]],
+               generation_id: Optional[int] = None,
+               metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Применить изменения к сохранённому расписанию одной транзакцией
+
+    Args:
+        deleted_ids: id удаляемых строк schedules
+        updated: Строки с id (ключи - UPDATE_SCHEDULE_LESSON)
+        inserted: Новые строки (ключи - SCHEDULE_COLUMNS)
+        generation_id: ID генерации - metrics попадают в её generation_history.metrics
+        metrics: Дополнительные metrics (например, {'repair': {...}})
+
+    Returns:
+        {'deleted', 'updated', 'inserted', 'seconds'}
+
+    При ошибке транзакция откатывается: расписание не меняется.
+    """
+    start = time.monotonic()
+    stream = _CopyStream(inserted)
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            if deleted_ids:
+                cur.execute(schedule_queries.DELETE_SCHEDULES_BY_IDS, {'ids': list(deleted_ids)})
+            if updated:
+                cur.executemany(schedule_queries.UPDATE_SCHEDULE_LESSON, updated)
+            if inserted:
+                cur.copy_expert(schedule_queries.COPY_SCHEDULES, stream)
+
+            stats = {
+                'deleted': len(deleted_ids),
+                'updated': len(updated),
+                'inserted': stream.count,
+                'seconds': round(time.monotonic() - start, 3)
+            }
+
+            if generation_id is not None:
+                cur.execute(
+                    gen_queries.MERGE_GENERATION_METRICS,
+                    {
+                        'id': generation_id,
+                        'metrics': json.dumps({**(metrics or {}), 'schedule_diff': stats})
+                    }
+                )
+
+        conn.commit()
+
+    profiling.record('save', stats['seconds'])
+    logger.info(
+        f"💾 Applied schedule diff in {stats['seconds']:.2f}s: -{stats['deleted']} "
+        f"~{stats['updated']} +{stats['inserted']} lessons"
+    )
+    return stats
@@ -149,20 +149,36 @@ class AgentAction(_message.Message):
     def __init__(self, id: _Optional[int] = ..., generation_id: _Optional[int] = ..., iteration: _Optional[int] = ..., action_type: _Optional[str] = ..., action_params: _Optional[str] = ..., success: bool = ..., score_before: _Optional[int] = ..., score_after: _Optional[int] = ..., score_delta: _Optional[int] = ..., reasoning: _Optional[str] = ..., created_at: _Optional[str] = ..., execution_time_ms: _Optional[int] = ...) -> None: ...
 
 class GenerateRequest(_message.Message):
-    __slots__ = ("semester", "max_iterations", "skip_stage1", "skip_stage2", "building_ids", "created_by")
+    __slots__ = ("semester", "max_iterations", "skip_stage1", "skip_stage2", "building_ids", "created_by", "ga_islands", "migration_interval", "migrants_count", "migration_topology", "stage1_engine", "stage1_time_budget", "profile", "priority")
     SEMESTER_FIELD_NUMBER: _ClassVar[int]
     MAX_ITERATIONS_FIELD_NUMBER: _ClassVar[int]
     SKIP_STAGE1_FIELD_NUMBER: _ClassVar[int]
     SKIP_STAGE2_FIELD_NUMBER: _ClassVar[int]
     BUILDING_IDS_FIELD_NUMBER: _ClassVar[int]
     CREATED_BY_FIELD_NUMBER: _ClassVar[int]
+    GA_ISLANDS_FIELD_NUMBER: _ClassVar[int]
+    MIGRATION_INTERVAL_FIELD_NUMBER: _ClassVar[int]
+    MIGRANTS_COUNT_FIELD_NUMBER: _ClassVar[int]
+    MIGRATION_TOPOLOGY_FIELD_NUMBER: _ClassVar[int]
+    STAGE1_ENGINE_FIELD_NUMBER: _ClassVar[int]
+    STAGE1_TIME_BUDGET_FIELD_NUMBER: _ClassVar[int]
+    PROFILE_FIELD_NUMBER: _ClassVar[int]
+    PRIORITY_FIELD_NUMBER: _ClassVar[int]
     semester: int
     max_iterations: int
     skip_stage1: bool
     skip_stage2: bool
     building_ids: _containers.RepeatedScalarFieldContainer[int]
     created_by: int
-    def __init__(self, semester: _Optional[int] = ..., max_iterations: _Optional[int] = ..., skip_stage1: bool = ..., skip_stage2: bool = ..., building_ids: _Optional[_Iterable[int]] = ..., created_by: _Optional[int] = ...) -> None: ...
+    ga_islands: int
+    migration_interval: int
+    migrants_count: int
+    migration_topology: str
+    stage1_engine: str
+    stage1_time_budget: float
+    profile: bool
+    priority: int
+    def __init__(self, semester: _Optional[int] = ..., max_iterations: _Optional[int] = ..., skip_stage1: bool = ..., skip_stage2: bool = ..., building_ids: _Optional[_Iterable[int]] = ..., created_by: _Optional[int] = ..., ga_islands: _Optional[int] = ..., migration_interval: _Optional[int] = ..., migrants_count: _Optional[int] = ..., migration_topology: _Optional[str] = ..., stage1_engine: _Optional[str] = ..., stage1_time_budget: _Optional[float] = ..., profile: bool = ..., priority: _Optional[int] = ...) -> None: ...
 
 class GenerateResponse(_message.Message):
     __slots__ = ("success", "job_id", "message")
@@ -174,6 +190,50 @@ class GenerateResponse(_message.Message):
     message: str
     def __init__(self, success: bool = ..., job_id: _Optional[str] = ..., message: _Optional[str] = ...) -> None: ...
 
+class RepairRequest(_message.Message):
+    __slots__ = ("semester", "teacher_ids", "course_load_ids", "time_budget", "created_by")
+    SEMESTER_FIELD_NUMBER: _ClassVar[int]
+    TEACHER_IDS_FIELD_NUMBER: _ClassVar[int]
+    COURSE_LOAD_IDS_FIELD_NUMBER: _ClassVar[int]
+    TIME_BUDGET_FIELD_NUMBER: _ClassVar[int]
+    CREATED_BY_FIELD_NUMBER: _ClassVar[int]
+    semester: int
+    teacher_ids: _containers.RepeatedScalarFieldContainer[int]
+    course_load_ids: _containers.RepeatedScalarFieldContainer[int]
+    time_budget: float
+    created_by: int
+    def __init__(self, semester: _Optional[int] = ..., teacher_ids: _Optional[_Iterable[int]] = ..., course_load_ids: _Optional[_Iterable[int]] = ..., time_budget: _Optional[float] = ..., created_by: _Optional[int] = ...) -> None: ...
+
+class RepairResponse(_message.Message):
+    __slots__ = ("success", "job_id", "message", "affected", "movable", "deleted", "inserted", "updated", "moved", "initial_score", "final_score", "conflicts", "seconds")
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    JOB_ID_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    AFFECTED_FIELD_NUMBER: _ClassVar[int]
+    MOVABLE_FIELD_NUMBER: _ClassVar[int]
+    DELETED_FIELD_NUMBER: _ClassVar[int]
+    INSERTED_FIELD_NUMBER: _ClassVar[int]
+    UPDATED_FIELD_NUMBER: _ClassVar[int]
+    MOVED_FIELD_NUMBER: _ClassVar[int]
+    INITIAL_SCORE_FIELD_NUMBER: _ClassVar[int]
+    FINAL_SCORE_FIELD_NUMBER: _ClassVar[int]
+    CONFLICTS_FIELD_NUMBER: _ClassVar[int]
+    SECONDS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    job_id: str
+    message: str
+    affected: int
+    movable: int
+    deleted: int
+    inserted: int
+    updated: int
+    moved: int
+    initial_score: int
+    final_score: int
+    conflicts: int
+    seconds: float
+    def __init__(self, success: bool = ..., job_id: _Optional[str] = ..., message: _Optional[str] = ..., affected: _Optional[int] = ..., movable: _Optional[int] = ..., deleted: _Optional[int] = ..., inserted: _Optional[int] = ..., updated: _Optional[int] = ..., moved: _Optional[int] = ..., initial_score: _Optional[int] = ..., final_score: _Optional[int] = ..., conflicts: _Optional[int] = ..., seconds: _Optional[float] = ...) -> None: ...
+
 class StatusRequest(_message.Message):
     __slots__ = ("job_id",)
     JOB_ID_FIELD_NUMBER: _ClassVar[int]
@@ -192,6 +252,43 @@ class StatusResponse(_message.Message):
     recent_actions: _containers.RepeatedCompositeFieldContainer[AgentAction]
     def __init__(self, generation: _Optional[_Union[GenerationHistory, _Mapping]] = ..., progress_percentage: _Optional[float] = ..., estimated_seconds_remaining: _Optional[int] = ..., recent_actions: _Optional[_Iterable[_Union[AgentAction, _Mapping]]] = ...) -> None: ...
 
+class GenerationProgress(_message.Message):
+    __slots__ = ("job_id", "status", "stage", "iteration", "max_iterations", "current_score", "best_score", "hard_violations", "phase", "phase_timings", "last_reasoning", "error_message", "timestamp")
+    class PhaseTimingsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: float
+        def __init__(self, key: _Optional[str] = ..., value: _Optional[float] = ...) -> None: ...
+    JOB_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    STAGE_FIELD_NUMBER: _ClassVar[int]
+    ITERATION_FIELD_NUMBER: _ClassVar[int]
+    MAX_ITERATIONS_FIELD_NUMBER: _ClassVar[int]
+    CURRENT_SCORE_FIELD_NUMBER: _ClassVar[int]
+    BEST_SCORE_FIELD_NUMBER: _ClassVar[int]
+    HARD_VIOLATIONS_FIELD_NUMBER: _ClassVar[int]
+    PHASE_FIELD_NUMBER: _ClassVar[int]
+    PHASE_TIMINGS_FIELD_NUMBER: _ClassVar[int]
+    LAST_REASONING_FIELD_NUMBER: _ClassVar[int]
+    ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    TIMESTAMP_FIELD_NUMBER: _ClassVar[int]
+    job_id: str
+    status: str
+    stage: str
+    iteration: int
+    max_iterations: int
+    current_score: float
+    best_score: float
+    hard_violations: int
+    phase: str
+    phase_timings: _containers.ScalarMap[str, float]
+    last_reasoning: str
+    error_message: str
+    timestamp: float
+    def __init__(self, job_id: _Optional[str] = ..., status: _Optional[str] = ..., stage: _Optional[str] = ..., iteration: _Optional[int] = ..., max_iterations: _Optional[int] = ..., current_score: _Optional[float] = ..., best_score: _Optional[float] = ..., hard_violations: _Optional[int] = ..., phase: _Optional[str] = ..., phase_timings: _Optional[_Mapping[str, float]] = ..., last_reasoning: _Optional[str] = ..., error_message: _Optional[str] = ..., timestamp: _Optional[float] = ...) -> None: ...
+
 class HistoryRequest(_message.Message):
     __slots__ = ("job_id", "limit")
     JOB_ID_FIELD_NUMBER: _ClassVar[int]
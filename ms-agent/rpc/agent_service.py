@@ -4,6 +4,7 @@ gRPC Agent Service Implementation
 
 import grpc
 import logging
+import threading
 
 try:
     from proto.generated import agent_pb2, agent_pb2_grpc
@@ -12,6 +13,9 @@ except ImportError:
     agent_pb2_grpc = None
 
 from services.agent_orchestrator import agent_orchestrator
+from services.progress_bus import progress_bus, TERMINAL_STATUSES
+from services.job_queue import generation_queue
+from services.analysis_cache import analysis_cache
 from db.connection import db
 from db.queries import (
     course_loads as load_queries,
@@ -26,6 +30,12 @@ logger = logging.getLogger(__name__)
 class AgentServicer:
     """gRPC Agent Service Implementation"""
     
+    def __init__(self):
+        # WatchGeneration держит поток сервера всю генерацию: остальным RPC
+        # всегда остаётся не меньше двух потоков GRPC_MAX_WORKERS
+        self.watch_limit = max(1, min(config.WATCH_MAX_STREAMS, config.GRPC_MAX_WORKERS - 2))
+        self._watch_slots = threading.BoundedSemaphore(self.watch_limit)
+    
     def GenerateSchedule(self, request, context):
         """Запустить генерацию расписания"""
         try:
@@ -37,7 +47,15 @@ class AgentServicer:
                 skip_stage1=request.skip_stage1,
                 skip_stage2=request.skip_stage2,
                 created_by=request.created_by if request.created_by else None,
-                demo_mode=demo_mode
+                demo_mode=demo_mode,
+                ga_islands=request.ga_islands,
+                migration_interval=request.migration_interval or None,
+                migrants_count=request.migrants_count or None,
+                migration_topology=request.migration_topology or None,
+                stage1_engine=request.stage1_engine or None,
+                stage1_time_budget=request.stage1_time_budget or None,
+                profile=request.profile or None,
+                priority=request.priority
             )
             
             if result['success']:
@@ -47,7 +65,10 @@ class AgentServicer:
                     message=result['message']
                 )
             else:
-                context.set_code(grpc.StatusCode.INTERNAL)
+                context.set_code(
+                    grpc.StatusCode.RESOURCE_EXHAUSTED if result.get('queue_full')
+                    else grpc.StatusCode.INTERNAL
+                )
                 context.set_details(result.get('error', 'Unknown error'))
                 return agent_pb2.GenerateResponse(
                     success=False,
@@ -224,7 +245,7 @@ class AgentServicer:
             
             gen = generation[0]
             
-            if gen['status'] != 'running':
+            if gen['status'] not in ('queued', 'running'):
                 return agent_pb2.StopResponse(
                     success=False,
                     message=f"Generation is not running (status: {gen['status']})"
@@ -241,6 +262,11 @@ class AgentServicer:
                 fetch=False
             )
             
+            # Выполняемая генерация прервётся на ближайшей проверке отмены,
+            # генерацию из очереди воркер уже не возьмёт
+            generation_queue.cancel(request.job_id)
+            progress_bus.close(request.job_id, 'stopped', 'Stopped by user')
+            
             logger.info(f"✅ Generation stopped: {request.job_id}")
             
             return agent_pb2.StopResponse(
@@ -256,6 +282,135 @@ class AgentServicer:
                 message="Internal error"
             )
     
+    def RepairSchedule(self, request, context):
+        """Отремонтировать активное расписание (синхронно)"""
+        try:
+            result = agent_orchestrator.repair_schedule(
+                semester=request.semester,
+                teacher_ids=list(request.teacher_ids),
+                course_load_ids=list(request.course_load_ids),
+                time_budget=request.time_budget or None,
+                created_by=request.created_by or None
+            )
+            
+            if not result['success']:
+                context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+                context.set_details(result.get('error', 'Unknown error'))
+                return agent_pb2.RepairResponse(
+                    success=False,
+                    job_id=result.get('job_id', ''),
+                    message=result.get('error', 'Unknown error')
+                )
+            
+            stats = result['stats']
+            return agent_pb2.RepairResponse(
+                success=True,
+                job_id=result['job_id'],
+                message=result['message'],
+                affected=stats['affected'],
+                movable=stats['movable'],
+                deleted=stats['deleted'],
+                inserted=stats['inserted'],
+                updated=stats['updated'],
+                moved=stats['moved'],
+                initial_score=int(stats['initial_score']),
+                final_score=int(stats['final_score']),
+                conflicts=stats['conflicts'],
+                seconds=stats['seconds']
+            )
+            
+        except Exception as e:
+            logger.error(f"RepairSchedule error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return agent_pb2.RepairResponse(success=False, message=str(e))
+    
+    def WatchGeneration(self, request, context):
+        """
+        Поток прогресса генерации (server-streaming)
+        
+        Итерации приходят из шины прогресса по мере выполнения,
+        поток закрывается после completed / failed / stopped.
+        Если генерация не в этом процессе (завершена давно или после
+        перезапуска) - событие из generation_history.
+        
+        Одновременных потоков не больше watch_limit (сверх - RESOURCE_EXHAUSTED).
+        Нет событий WATCH_IDLE_TIMEOUT секунд - статус перечитывается из
+        generation_history: генерация завершена или выполняется другим
+        экземпляром ms-agent - последнее событие, поток закрывается.
+        """
+        if not self._watch_slots.acquire(blocking=False):
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(
+                f"Too many progress streams ({self.watch_limit}), poll GetGenerationStatus instead"
+            )
+            return
+        
+        try:
+            if progress_bus.last(request.job_id) is None:
+                gen = self._history_progress(request.job_id)
+                if gen is None:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details("Generation not found")
+                    return
+                
+                yield self._build_progress_message(gen)
+                if gen['status'] in TERMINAL_STATUSES:
+                    return
+            
+            for event in progress_bus.watch(
+                request.job_id, context.is_active, idle_timeout=config.WATCH_IDLE_TIMEOUT
+            ):
+                if event is not None:
+                    yield self._build_progress_message(event)
+                    continue
+                
+                # Тишина: публикует ли кто-то прогресс в этом процессе
+                if generation_queue.is_running(request.job_id):
+                    continue
+                gen = self._history_progress(request.job_id)
+                if gen is None:
+                    return
+                if gen['status'] == 'queued' or (
+                    gen['status'] == 'running' and gen.get('worker') == generation_queue.worker_name
+                ):
+                    # В очереди (может взять и этот экземпляр) или только что взята здесь
+                    continue
+                yield self._build_progress_message(gen)
+                return
+            
+        except Exception as e:
+            logger.error(f"WatchGeneration error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+        finally:
+            self._watch_slots.release()
+    
+    @staticmethod
+    def _history_progress(job_id: str):
+        """Событие прогресса из generation_history (None - генерации нет)"""
+        generation = db.execute_query(
+            gen_queries.SELECT_GENERATION_BY_JOB_ID,
+            {'job_id': job_id},
+            fetch=True
+        )
+        if not generation:
+            return None
+        
+        gen = generation[0]
+        return {
+            'job_id': gen['job_id'],
+            'status': gen['status'],
+            'stage': gen.get('stage_name', ''),
+            'iteration': gen.get('current_iteration', 0),
+            'max_iterations': gen.get('max_iterations', 0),
+            'current_score': gen.get('current_score', 0),
+            'best_score': gen.get('best_score', 0),
+            'last_reasoning': gen.get('last_reasoning', ''),
+            'error_message': gen.get('error_message', ''),
+            'worker': gen.get('worker')
+        }
+    
     # ============================================================
     # COURSE LOADS
     # ============================================================
@@ -410,6 +565,17 @@ class AgentServicer:
                 context.set_details("No target specified")
                 return agent_pb2.AnalysisResponse()
             
+            # Cached response is valid while the generation's rows are unchanged
+            version_row = db.execute_query(
+                schedule_queries.SELECT_GENERATION_VERSION,
+                {'generation_id': generation_id},
+                fetch=True
+            )[0]
+            version = (version_row['lessons'], version_row['max_id'], version_row['updated_at'])
+            cached = analysis_cache.get(generation_id, version)
+            if cached is not None:
+                return cached
+            
             # Get schedules
             schedules = db.execute_query(
                 schedule_queries.SELECT_SCHEDULES_BY_GENERATION,
@@ -429,18 +595,15 @@ class AgentServicer:
             # Get unique teacher IDs from schedules
             teacher_ids = list(set(s['teacher_id'] for s in schedules_list))
             
-            # Load teacher preferences
-            teacher_preferences = {}
-            for teacher_id in teacher_ids:
-                prefs = db.execute_query(
-                    pref_queries.SELECT_TEACHER_PREFERENCES,
-                    {'teacher_id': teacher_id},
-                    fetch=True
-                )
-                if prefs:
-                    teacher_preferences[teacher_id] = [dict(p) for p in prefs]
-                else:
-                    teacher_preferences[teacher_id] = []
+            # Load teacher preferences (one query for all teachers)
+            teacher_preferences = {teacher_id: [] for teacher_id in teacher_ids}
+            prefs = db.execute_query(
+                pref_queries.SELECT_PREFERENCES_BY_TEACHERS,
+                {'teacher_ids': teacher_ids},
+                fetch=True
+            )
+            for pref in prefs or []:
+                teacher_preferences[pref['teacher_id']].append(dict(pref))
             
             # Calculate fitness using full fitness function
             fitness_calc = FitnessCalculator()
@@ -477,7 +640,7 @@ class AgentServicer:
                        f"Isolated={len(isolated_lessons)}, "
                        f"Gaps={total_gaps}")
             
-            return agent_pb2.AnalysisResponse(
+            response = agent_pb2.AnalysisResponse(
                 conflicts=conflict_messages,
                 total_lessons=len(schedules_list),
                 preference_violations=preference_violations_count,
@@ -485,6 +648,8 @@ class AgentServicer:
                 gaps_count=total_gaps,
                 total_score=total_score
             )
+            analysis_cache.put(generation_id, version, response)
+            return response
             
         except Exception as e:
             logger.error(f"AnalyzeSchedule error: {e}", exc_info=True)
@@ -574,6 +739,24 @@ class AgentServicer:
             error_message=gen.get('error_message', '') or ''
         )
     
+    def _build_progress_message(self, event: dict):
+        """Build protobuf GenerationProgress message"""
+        return agent_pb2.GenerationProgress(
+            job_id=event.get('job_id', ''),
+            status=event.get('status', ''),
+            stage=event.get('stage', '') or '',
+            iteration=event.get('iteration', 0) or 0,
+            max_iterations=event.get('max_iterations', 0) or 0,
+            current_score=event.get('current_score', 0) or 0,
+            best_score=event.get('best_score', 0) or 0,
+            hard_violations=event.get('hard_violations', 0) or 0,
+            phase=event.get('phase', ''),
+            phase_timings=event.get('phase_timings', {}),
+            last_reasoning=event.get('last_reasoning', '') or '',
+            error_message=event.get('error_message', '') or '',
+            timestamp=event.get('timestamp', 0)
+        )
+    
     def _build_schedule_message(self, s: dict):
         """Build protobuf Schedule message"""
         if agent_pb2 is None:
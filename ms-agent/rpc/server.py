@@ -7,6 +7,8 @@ from concurrent import futures
 import logging
 
 from rpc.agent_service import AgentServicer
+from services.agent_orchestrator import agent_orchestrator
+from services.job_queue import generation_queue
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -44,6 +46,8 @@ def serve():
     
     server.add_insecure_port(f'[::]:{config.GRPC_PORT}')
     
+    generation_queue.start(agent_orchestrator.run_job)
+    
     logger.info(f"Starting gRPC server on port {config.GRPC_PORT}")
     server.start()
     logger.info("gRPC server started successfully")
@@ -3,16 +3,26 @@ Agent Orchestrator
 Оркестратор двухэтапной генерации расписания
 """
 
+import json
 import logging
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from services.stage1_agent import Stage1Agent
+from services.stage1_optimizer import Stage1Optimizer, METHODS as STAGE1_METHODS
 from services.initial_schedule import InitialScheduleGenerator
 from services.fitness import fitness_calculator
 from services.generation_orchestrator import GenerationOrchestrator
+from services.progress_bus import ProgressReporter
+from services.classroom_assigner import ClassroomAssigner
+from services.schedule_repair import ScheduleRepairer, ShapeError, PER_WEEK_STAGES, check_weekly_shape
+from services.job_queue import generation_queue, QueueFull
+from utils.cancellation import GenerationCancelled
+from utils import profiling
+from utils.profiling import GenerationProfiler
 from db.connection import db
+from db import schedule_writer
 from db.queries import (
     course_loads as load_queries,
     generation_history as gen_queries,
@@ -23,13 +33,23 @@ from config import config
 
 logger = logging.getLogger(__name__)
 
+# Движки Stage 1: demo / llm - Stage1Agent, annealing / tabu - Stage1Optimizer
+STAGE1_ENGINES = ('demo', 'llm') + STAGE1_METHODS
+
+
+def uses_genetic(ga_islands: int) -> bool:
+    """Генерация через ГА: острова (ga_islands > 1) или кластеры при GA_DECOMPOSE"""
+    return bool(ga_islands and ga_islands > 1) or config.GA_DECOMPOSE
+
+
+def ga_mode(ga_islands: int) -> str:
+    """Режим ГА для логов и сообщений"""
+    return f"{ga_islands} islands" if ga_islands and ga_islands > 1 else "decomposed clusters"
+
 
 class AgentOrchestrator:
     """Orchestrator для управления процессом генерации"""
     
-    def __init__(self):
-        self.running_jobs = {}  # {job_id: orchestrator_instance}
-    
     def start_generation(
         self,
         semester: int,
@@ -38,10 +58,18 @@ class AgentOrchestrator:
         skip_stage2: bool = False,
         created_by: Optional[int] = None,
         academic_year: Optional[str] = None,
-        demo_mode: bool = False
+        demo_mode: bool = False,
+        ga_islands: int = 0,
+        migration_interval: Optional[int] = None,
+        migrants_count: Optional[int] = None,
+        migration_topology: Optional[str] = None,
+        stage1_engine: Optional[str] = None,
+        stage1_time_budget: Optional[float] = None,
+        profile: Optional[bool] = None,
+        priority: int = 0
     ) -> Dict[str, Any]:
         """
-        Запустить генерацию расписания
+        Поставить генерацию расписания в очередь
         
         Args:
             semester: Номер семестра (1 или 2)
@@ -49,17 +77,32 @@ class AgentOrchestrator:
             skip_stage1: Пропустить Stage 1 (использовать существующее расписание)
             skip_stage2: Пропустить Stage 2 (не назначать аудитории)
             created_by: ID пользователя
+            ga_islands: > 1 - генетический алгоритм в островном режиме;
+                <= 1 при GA_DECOMPOSE - ГА по независимым кластерам нагрузок
+            migration_interval: Поколений между миграциями (default: config.GA_MIGRATION_INTERVAL)
+            migrants_count: Мигрантов с острова (default: config.GA_MIGRANTS)
+            migration_topology: ring | random (default: config.GA_MIGRATION_TOPOLOGY)
+            stage1_engine: demo | llm | annealing | tabu (default: config.STAGE1_ENGINE)
+            stage1_time_budget: Бюджет локального поиска, сек (default: config.STAGE1_TIME_BUDGET)
+            profile: cProfile генерации в generation_history.metrics (default: config.GENERATION_PROFILE)
+            priority: Приоритет в очереди (больше - раньше)
         
         Returns:
             {'success': bool, 'job_id': str, 'message': str}
         """
         try:
+            stage1_engine = stage1_engine or config.STAGE1_ENGINE
+            if stage1_engine not in STAGE1_ENGINES:
+                return {
+                    'success': False,
+                    'error': f"Unknown stage1_engine '{stage1_engine}', expected one of {STAGE1_ENGINES}"
+                }
+            
             # Сгенерировать job_id
             job_id = str(uuid.uuid4())
             
             # Вычислить academic_year если не передан
             if not academic_year:
-                from datetime import datetime
                 current_year = datetime.now().year
                 # Учебный год: если сентябрь-декабрь, то текущий/следующий, иначе предыдущий/текущий
                 current_month = datetime.now().month
@@ -68,10 +111,7 @@ class AgentOrchestrator:
                 else:  # Январь-август
                     academic_year = f"{current_year - 1}/{current_year}"
             
-            logger.info(f"🚀 Starting schedule generation for semester {semester}, academic year {academic_year}")
-            logger.info(f"Job ID: {job_id}")
-            
-            # Загрузить нагрузки
+            # Нагрузки должны быть до постановки в очередь (сами загружаются воркером)
             course_loads = db.execute_query(
                 load_queries.SELECT_COURSE_LOADS_BY_SEMESTER,
                 {'semester': semester},
@@ -86,271 +126,469 @@ class AgentOrchestrator:
                     'error': error_msg
                 }
             
-            logger.info(f"📚 Loaded {len(course_loads)} course loads")
+            generation_queue.ensure_capacity()
             
-            # Загрузить предпочтения преподавателей
-            teacher_prefs_raw = db.execute_query(
-                pref_queries.SELECT_ALL_PREFERENCES,
-                {},
+            params = {
+                'semester': semester,
+                'academic_year': academic_year,
+                'max_iterations': max_iterations,
+                'skip_stage2': skip_stage2,
+                'ga_islands': ga_islands,
+                'migration_interval': migration_interval,
+                'migrants_count': migrants_count,
+                'migration_topology': migration_topology,
+                'stage1_engine': stage1_engine,
+                'stage1_time_budget': stage1_time_budget,
+                'profile': profile
+            }
+            is_ga = uses_genetic(ga_islands)
+            # Режим фиксируется при постановке: смена GA_DECOMPOSE не меняет уже поставленные задачи
+            params['genetic'] = is_ga
+            db.execute_query(
+                gen_queries.ENQUEUE_GENERATION,
+                {
+                    'job_id': job_id,
+                    'stage': 1,
+                    'stage_name': 'genetic' if is_ga else 'temporal',
+                    'max_iterations': max_iterations or config.MAX_ITERATIONS,
+                    'created_by': created_by,
+                    'priority': priority,
+                    'params': json.dumps(params)
+                },
                 fetch=True
             )
+            generation_queue.notify()
+            position = generation_queue.position(job_id)
+            
+            logger.info(
+                f"📥 Queued generation {job_id} for semester {semester}, academic year {academic_year} "
+                f"({len(course_loads)} course loads, priority {priority}, position {position})"
+            )
+            
+            return {
+                'success': True,
+                'job_id': job_id,
+                'message': (
+                    f"GA generation queued ({ga_mode(ga_islands)}), position {position}" if is_ga
+                    else f"Generation queued, position {position}"
+                )
+            }
+            
+        except QueueFull as e:
+            logger.warning(f"⚠️ {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'queue_full': True
+            }
+        except Exception as e:
+            logger.error(f"Failed to start generation: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def run_job(self, job: Dict[str, Any]):
+        """
+        Выполнить генерацию из очереди (воркер services.job_queue)
+        
+        Args:
+            job: Строка generation_history с params из start_generation
+        """
+        params = job.get('params') or {}
+        if isinstance(params, str):
+            params = json.loads(params)
+        
+        kwargs = {
+            'job_id': job['job_id'],
+            'generation_id': job['id'],
+            'semester': params['semester'],
+            'academic_year': params['academic_year'],
+            'max_iterations': params.get('max_iterations')
+        }
+        ga_islands = params.get('ga_islands') or 0
+        if params.get('genetic', uses_genetic(ga_islands)):
+            # Генетический алгоритм: островная модель или независимые кластеры (GA_DECOMPOSE)
+            logger.info(f"🏝️ Using GA ({ga_mode(ga_islands)})")
+            kwargs['max_iterations'] = kwargs['max_iterations'] or config.MAX_ITERATIONS
+            self._profiled(
+                job['id'], params.get('profile'), self._run_ga_generation,
+                islands=ga_islands,
+                migration_interval=params.get('migration_interval'),
+                migrants_count=params.get('migrants_count'),
+                migration_topology=params.get('migration_topology'),
+                **kwargs
+            )
+            return
+        
+        # Используем простой генератор + Stage 1 (без ГА)
+        logger.info(f"🤖 Using Simple Generator + Stage 1 engine '{params.get('stage1_engine')}'")
+        self._profiled(
+            job['id'], params.get('profile'), self._run_simple_generation,
+            skip_stage2=params.get('skip_stage2', False),
+            stage1_engine=params.get('stage1_engine') or config.STAGE1_ENGINE,
+            stage1_time_budget=params.get('stage1_time_budget'),
+            **kwargs
+        )
+
+    def _run_simple_generation(
+        self,
+        job_id: str,
+        generation_id: int,
+        semester: int,
+        academic_year: str,
+        max_iterations: Optional[int],
+        skip_stage2: bool,
+        stage1_engine: str,
+        stage1_time_budget: Optional[float]
+    ):
+        """Простой генератор + Stage 1 + Stage 2 (в потоке воркера очереди)"""
+        logger.info(f"🚀 Starting schedule generation for semester {semester}, academic year {academic_year}")
+        logger.info(f"Job ID: {job_id}")
+        
+        progress = ProgressReporter(
+            job_id, max_iterations or config.MAX_ITERATIONS, stage='temporal'
+        )
+        try:
+            from services.simple_schedule_generator import SimpleScheduleGenerator
             
-            teacher_preferences = {}
-            for row in teacher_prefs_raw:
-                teacher_preferences[row['teacher_id']] = row['preferences']
+            # Нагрузки и предпочтения - на момент запуска, а не постановки в очередь
+            course_loads = db.execute_query(
+                load_queries.SELECT_COURSE_LOADS_BY_SEMESTER,
+                {'semester': semester},
+                fetch=True
+            )
+            logger.info(f"📚 Loaded {len(course_loads)} course loads")
             
+            teacher_preferences = {
+                row['teacher_id']: row['preferences']
+                for row in db.execute_query(pref_queries.SELECT_ALL_PREFERENCES, {}, fetch=True)
+            }
             logger.info(f"👥 Loaded preferences for {len(teacher_preferences)} teachers")
             
-            # Создать запись о генерации
-            generation_result = db.execute_query(
-                gen_queries.INSERT_GENERATION,
-                {
-                    'job_id': job_id,
-                    'stage': 1,
-                    'stage_name': 'temporal',
-                    'status': 'running',
-                    'max_iterations': max_iterations or config.MAX_ITERATIONS,
-                    'initial_score': None,
-                    'created_by': created_by
-                },
+            # Загрузить аудитории
+            classrooms = db.execute_query(
+                "SELECT id, name, capacity, classroom_type FROM classrooms WHERE is_active = true",
+                {},
                 fetch=True
             )
             
-            generation_id = generation_result[0]['id']
+            logger.info(f"📚 Loaded {len(classrooms)} classrooms")
             
-            # Используем простой генератор + агент (без ГА)
-            logger.info("🤖 Using Simple Generator + LLM Agent")
+            # Создать простой генератор
+            generator = SimpleScheduleGenerator(course_loads, classrooms)
+            
+            # Сгенерировать начальное расписание
+            logger.info("🎲 Generating initial schedule...")
+            with profiling.phase('initial_schedule'):
+                initial_schedule = generator.generate()
             
-            # Запустить генерацию в фоне
-            import threading
+            logger.info(f"✅ Generated {len(initial_schedule)} lessons")
             
-            def run_generation():
-                """Запустить генерацию в фоновом потоке"""
+            # Получить актуальные имена преподавателей из БД напрямую
+            teacher_names_cache = {}
+            teacher_ids = set(lesson.get('teacher_id', 0) for lesson in initial_schedule if lesson.get('teacher_id', 0) > 0)
+            if teacher_ids:
+                logger.info(f"📋 Fetching actual teacher names for {len(teacher_ids)} teachers from database (initial schedule)")
                 try:
-                    from services.simple_schedule_generator import SimpleScheduleGenerator
-                    
-                    # Загрузить аудитории
-                    classrooms = db.execute_query(
-                        "SELECT id, name, capacity, classroom_type FROM classrooms WHERE is_active = true",
-                        {},
+                    # Получить актуальные имена преподавателей из таблицы teachers
+                    teachers_data = db.execute_query(
+                        "SELECT id, full_name FROM teachers WHERE id = ANY(%(teacher_ids)s)",
+                        {'teacher_ids': list(teacher_ids)},
                         fetch=True
                     )
-                    
-                    logger.info(f"📚 Loaded {len(classrooms)} classrooms")
-                    
-                    # Создать простой генератор
-                    generator = SimpleScheduleGenerator(course_loads, classrooms)
-                    
-                    # Сгенерировать начальное расписание
-                    logger.info("🎲 Generating initial schedule...")
-                    initial_schedule = generator.generate()
-                    
-                    logger.info(f"✅ Generated {len(initial_schedule)} lessons")
-                    
-                    # Получить актуальные имена преподавателей из БД напрямую
-                    teacher_names_cache = {}
-                    teacher_ids = set(lesson.get('teacher_id', 0) for lesson in initial_schedule if lesson.get('teacher_id', 0) > 0)
-                    if teacher_ids:
-                        logger.info(f"📋 Fetching actual teacher names for {len(teacher_ids)} teachers from database (initial schedule)")
-                        try:
-                            # Получить актуальные имена преподавателей из таблицы teachers
-                            teachers_data = db.execute_query(
-                                "SELECT id, full_name FROM teachers WHERE id = ANY(%(teacher_ids)s)",
-                                {'teacher_ids': list(teacher_ids)},
-                                fetch=True
-                            )
-                            for teacher_row in teachers_data:
-                                teacher_names_cache[teacher_row['id']] = teacher_row.get('full_name', '')
-                                logger.info(f"  ✅ Teacher {teacher_row['id']}: {teacher_names_cache[teacher_row['id']]}")
-                        except Exception as e:
-                            logger.error(f"  ❌ Failed to fetch teacher names from database: {e}")
-                    
-                    # Обновить teacher_name в расписании актуальными данными
-                    updated_count = 0
-                    for lesson in initial_schedule:
-                        teacher_id = lesson.get('teacher_id', 0)
-                        if teacher_id > 0 and teacher_id in teacher_names_cache:
-                            old_name = lesson.get('teacher_name', '')
-                            lesson['teacher_name'] = teacher_names_cache[teacher_id]
-                            if old_name != teacher_names_cache[teacher_id]:
-                                updated_count += 1
-                                logger.info(f"  🔄 Updated lesson teacher_name: teacher_id={teacher_id}, old='{old_name}', new='{teacher_names_cache[teacher_id]}'")
-                    if updated_count > 0:
-                        logger.info(f"✅ Updated {updated_count} lessons with actual teacher names")
-                    
-                    # Оценить начальное расписание
-                    initial_result = fitness_calculator.calculate(initial_schedule, teacher_preferences)
-                    initial_score = initial_result['total_score']
-                    
-                    logger.info(f"📊 Initial score: {initial_score}")
-                    
-                    # Обновить БД
-                    db.execute_query(
-                        gen_queries.UPDATE_GENERATION_ITERATION,
-                        {
-                            'job_id': job_id,
-                            'current_iteration': 0,
-                            'current_score': initial_score,
-                            'last_reasoning': 'Initial schedule generated'
-                        },
-                        fetch=False
-                    )
-                    
-                    # Деактивировать старые расписания перед сохранением нового
-                    db.execute_query(
-                        schedule_queries.DEACTIVATE_OLD_SCHEDULES,
-                        {},
-                        fetch=False
+                    for teacher_row in teachers_data:
+                        teacher_names_cache[teacher_row['id']] = teacher_row.get('full_name', '')
+                        logger.info(f"  ✅ Teacher {teacher_row['id']}: {teacher_names_cache[teacher_row['id']]}")
+                except Exception as e:
+                    logger.error(f"  ❌ Failed to fetch teacher names from database: {e}")
+            
+            # Обновить teacher_name в расписании актуальными данными
+            updated_count = 0
+            for lesson in initial_schedule:
+                teacher_id = lesson.get('teacher_id', 0)
+                if teacher_id > 0 and teacher_id in teacher_names_cache:
+                    old_name = lesson.get('teacher_name', '')
+                    lesson['teacher_name'] = teacher_names_cache[teacher_id]
+                    if old_name != teacher_names_cache[teacher_id]:
+                        updated_count += 1
+                        logger.info(f"  🔄 Updated lesson teacher_name: teacher_id={teacher_id}, old='{old_name}', new='{teacher_names_cache[teacher_id]}'")
+            if updated_count > 0:
+                logger.info(f"✅ Updated {updated_count} lessons with actual teacher names")
+            
+            # Оценить начальное расписание
+            initial_result = fitness_calculator.calculate(initial_schedule, teacher_preferences)
+            initial_score = initial_result['total_score']
+            
+            logger.info(f"📊 Initial score: {initial_score}")
+            
+            # Прогресс: начальное расписание (в БД - сразу)
+            progress.report(
+                iteration=0,
+                current_score=initial_score,
+                hard_violations=len(initial_result['details']['conflicts']),
+                phase='initial',
+                reasoning='Initial schedule generated',
+                flush=True
+            )
+            
+            # КРИТИЧЕСКАЯ ПРОВЕРКА: Проверить дубликаты в начальном расписании перед сохранением
+            seen_slots = {}  # {(day, time_slot, teacher_id, group_id): lesson}
+            duplicates = []
+            for lesson in initial_schedule:
+                day = lesson.get('day_of_week')
+                slot = lesson.get('time_slot')
+                teacher_id = lesson.get('teacher_id')
+                group_id = lesson.get('group_id')
+                slot_key = (day, slot, teacher_id, group_id)
+                
+                if slot_key in seen_slots:
+                    duplicates.append({
+                        'existing': seen_slots[slot_key],
+                        'duplicate': lesson
+                    })
+                    logger.error(
+                        f"❌ DUPLICATE DETECTED in initial_schedule! "
+                        f"Slot (day={day}, slot={slot}, teacher={teacher_id}, group={group_id}) "
+                        f"Existing: {seen_slots[slot_key].get('discipline_name')}, "
+                        f"Duplicate: {lesson.get('discipline_name')}"
                     )
-                    logger.info("🔄 Deactivated old schedules")
-                    
-                    # КРИТИЧЕСКАЯ ОЧИСТКА: Удалить все неактивные расписания старше текущей генерации
-                    # чтобы избежать путаницы и дубликатов
-                    db.execute_query(
-                        """
-                        DELETE FROM schedules
-                        WHERE is_active = false
-                        AND (generation_id IS NULL OR generation_id < %(generation_id)s)
-                        """,
-                        {'generation_id': generation_id},
-                        fetch=False
+                else:
+                    seen_slots[slot_key] = lesson
+            
+            if duplicates:
+                logger.error(
+                    f"❌ CRITICAL: Found {len(duplicates)} duplicate lessons in initial_schedule! "
+                    f"Removing duplicates before saving."
+                )
+                # Удалить дубликаты из initial_schedule
+                initial_schedule = list(seen_slots.values())
+                logger.info(f"✅ After removing duplicates: {len(initial_schedule)} unique lessons")
+            
+            # Без Stage 1 время занятий окончательное - сразу Stage 2
+            if not skip_stage2 and not (max_iterations and max_iterations > 0):
+                self._run_stage2(generation_id, initial_schedule, course_loads, classrooms)
+            
+            # Сохранить начальное расписание в БД (старое деактивируется в той же транзакции)
+            saved = schedule_writer.save_schedule(
+                self._schedule_rows(initial_schedule, generation_id, semester, academic_year),
+                generation_id=generation_id
+            )
+            logger.info(
+                f"💾 Saved initial schedule: {saved['rows']} lessons. "
+                f"Using semester={semester}, academic_year={academic_year}"
+            )
+            
+            # КРИТИЧЕСКАЯ ОЧИСТКА: Удалить все неактивные расписания старше текущей генерации
+            # чтобы избежать путаницы и дубликатов
+            db.execute_query(
+                """
+                DELETE FROM schedules
+                WHERE is_active = false
+                AND (generation_id IS NULL OR generation_id < %(generation_id)s)
+                """,
+                {'generation_id': generation_id},
+                fetch=False
+            )
+            logger.info(f"🧹 Cleaned up old inactive schedules")
+            
+            # КРИТИЧЕСКАЯ ПРОВЕРКА: Удалить дубликаты из БД после сохранения
+            # Дубликаты - это записи с одинаковым (day_of_week, time_slot, teacher_id, group_id)
+            # оставляем только самую новую запись (с максимальным id)
+            cleanup_result = db.execute_query(
+                """
+                DELETE FROM schedules
+                WHERE id IN (
+                    SELECT id
+                    FROM (
+                        SELECT id,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY day_of_week, time_slot, teacher_id, group_id, generation_id
+                                ORDER BY id DESC
+                            ) as rn
+                        FROM schedules
+                        WHERE is_active = true AND generation_id = %(generation_id)s
+                    ) ranked
+                    WHERE rn > 1
+                )
+                RETURNING id
+                """,
+                {'generation_id': generation_id},
+                fetch=True
+            )
+            if cleanup_result:
+                logger.warning(
+                    f"⚠️ Removed {len(cleanup_result)} duplicate schedules from database for generation_id={generation_id}"
+                )
+            
+            # Проверить дубликаты по group_id и day_of_week, time_slot
+            # В один слот может быть только одна пара для группы!
+            group_duplicates = db.execute_query(
+                """
+                SELECT day_of_week, time_slot, group_id, COUNT(*) as count
+                FROM schedules
+                WHERE is_active = true AND generation_id = %(generation_id)s
+                GROUP BY day_of_week, time_slot, group_id
+                HAVING COUNT(*) > 1
+                """,
+                {'generation_id': generation_id},
+                fetch=True
+            )
+            if group_duplicates:
+                logger.error(
+                    f"❌ CRITICAL: Found {len(group_duplicates)} duplicate slots in database! "
+                    f"One group has multiple lessons in the same slot: {group_duplicates}"
+                )
+                # Удалить дубликаты, оставив только одну запись (с минимальным id)
+                removed_count = db.execute_query(
+                    """
+                    DELETE FROM schedules
+                    WHERE id IN (
+                        SELECT id
+                        FROM (
+                            SELECT id,
+                                ROW_NUMBER() OVER (
+                                    PARTITION BY day_of_week, time_slot, group_id
+                                    ORDER BY id ASC
+                                ) as rn
+                            FROM schedules
+                            WHERE is_active = true AND generation_id = %(generation_id)s
+                        ) ranked
+                        WHERE rn > 1
                     )
-                    logger.info(f"🧹 Cleaned up old inactive schedules")
+                    RETURNING id
+                    """,
+                    {'generation_id': generation_id},
+                    fetch=True
+                )
+                if removed_count:
+                    logger.info(f"🧹 Removed {len(removed_count)} duplicate slots from database")
+            
+            # Проверить, что начальное расписание сохранено и активно
+            if initial_schedule:
+                logger.info(f"✅ Initial schedule with generation_id={generation_id} is ACTIVE")
+            
+            # Запустить оптимизацию Stage 1 (опционально)
+            if max_iterations and max_iterations > 0:
+                
+                result, agent = self._run_stage1(
+                    generation_id, initial_schedule, teacher_preferences, progress,
+                    max_iterations=max_iterations,
+                    engine=stage1_engine,
+                    time_budget=stage1_time_budget
+                )
+                
+                if result.get('success'):
+                    final_score = result.get('best_score', initial_score)
+                    logger.info(f"✅ Optimization completed. Final score: {final_score}")
                     
-                    # КРИТИЧЕСКАЯ ПРОВЕРКА: Проверить дубликаты в начальном расписании перед сохранением
-                    seen_slots = {}  # {(day, time_slot, teacher_id, group_id): lesson}
-                    duplicates = []
-                    for lesson in initial_schedule:
-                        day = lesson.get('day_of_week')
-                        slot = lesson.get('time_slot')
-                        teacher_id = lesson.get('teacher_id')
-                        group_id = lesson.get('group_id')
-                        slot_key = (day, slot, teacher_id, group_id)
+                    # Сохранить оптимизированное расписание
+                    optimized_schedule = agent.schedule_state.current_schedule
+                    if optimized_schedule:
+                        logger.info(f"💾 Saving optimized schedule ({len(optimized_schedule)} lessons)...")
+                        logger.info(f"   Semester: {semester}, Academic Year: {academic_year}")
+                        
+                        # Получить актуальные имена преподавателей из БД напрямую для оптимизированного расписания
+                        teacher_names_cache = {}
+                        teacher_ids = set(lesson.get('teacher_id', 0) for lesson in optimized_schedule if lesson.get('teacher_id', 0) > 0)
+                        if teacher_ids:
+                            logger.info(f"📋 Fetching actual teacher names for {len(teacher_ids)} teachers from database (optimized schedule)")
+                            try:
+                                # Получить актуальные имена преподавателей из таблицы teachers
+                                teachers_data = db.execute_query(
+                                    "SELECT id, full_name FROM teachers WHERE id = ANY(%(teacher_ids)s)",
+                                    {'teacher_ids': list(teacher_ids)},
+                                    fetch=True
+                                )
+                                for teacher_row in teachers_data:
+                                    teacher_names_cache[teacher_row['id']] = teacher_row.get('full_name', '')
+                                    logger.info(f"  ✅ Teacher {teacher_row['id']}: {teacher_names_cache[teacher_row['id']]}")
+                            except Exception as e:
+                                logger.error(f"  ❌ Failed to fetch teacher names from database: {e}")
+                        
+                        # Обновить teacher_name в оптимизированном расписании актуальными данными
+                        updated_count = 0
+                        for lesson in optimized_schedule:
+                            teacher_id = lesson.get('teacher_id', 0)
+                            if teacher_id > 0 and teacher_id in teacher_names_cache:
+                                old_name = lesson.get('teacher_name', '')
+                                lesson['teacher_name'] = teacher_names_cache[teacher_id]
+                                if old_name != teacher_names_cache[teacher_id]:
+                                    updated_count += 1
+                                    logger.info(f"  🔄 Updated optimized lesson teacher_name: teacher_id={teacher_id}, old='{old_name}', new='{teacher_names_cache[teacher_id]}'")
+                        if updated_count > 0:
+                            logger.info(f"✅ Updated {updated_count} optimized lessons with actual teacher names")
                         
-                        if slot_key in seen_slots:
-                            duplicates.append({
-                                'existing': seen_slots[slot_key],
-                                'duplicate': lesson
-                            })
+                        # КРИТИЧЕСКАЯ ПРОВЕРКА 1: Удалить занятия на воскресенье (day 0 или 7)
+                        sunday_lessons = [l for l in optimized_schedule if l.get('day_of_week') == 0 or l.get('day_of_week') == 7]
+                        if sunday_lessons:
                             logger.error(
-                                f"❌ DUPLICATE DETECTED in initial_schedule! "
-                                f"Slot (day={day}, slot={slot}, teacher={teacher_id}, group={group_id}) "
-                                f"Existing: {seen_slots[slot_key].get('discipline_name')}, "
-                                f"Duplicate: {lesson.get('discipline_name')}"
+                                f"❌ CRITICAL: Found {len(sunday_lessons)} lessons with Sunday (day 0 or 7) in optimized_schedule! "
+                                f"Removing them before saving."
                             )
-                        else:
-                            seen_slots[slot_key] = lesson
-                    
-                    if duplicates:
-                        logger.error(
-                            f"❌ CRITICAL: Found {len(duplicates)} duplicate lessons in initial_schedule! "
-                            f"Removing duplicates before saving."
-                        )
-                        # Удалить дубликаты из initial_schedule
-                        initial_schedule = list(seen_slots.values())
-                        logger.info(f"✅ After removing duplicates: {len(initial_schedule)} unique lessons")
-                    
-                    # Сохранить начальное расписание в БД
-                    saved_count = 0
-                    skipped_count = 0
-                    for lesson in initial_schedule:
-                        # КРИТИЧЕСКАЯ ФИНАЛЬНАЯ ПРОВЕРКА: Воскресенье (0 или 7) ЗАПРЕЩЕНО!
-                        day_of_week = lesson.get('day_of_week')
-                        if day_of_week == 0 or day_of_week == 7 or day_of_week < 1 or day_of_week > 6:
+                            optimized_schedule = [l for l in optimized_schedule if l.get('day_of_week') not in [0, 7]]
+                        
+                        # КРИТИЧЕСКАЯ ПРОВЕРКА 2: Удалить занятия с невалидным day_of_week (< 1 or > 6)
+                        invalid_lessons = [l for l in optimized_schedule if l.get('day_of_week', 0) < 1 or l.get('day_of_week', 0) > 6]
+                        if invalid_lessons:
                             logger.error(
-                                f"CRITICAL ERROR: Attempting to save lesson with invalid day_of_week={day_of_week}! "
-                                f"Only days 1-6 (Monday-Saturday) are allowed. Sunday (0 or 7) is FORBIDDEN! "
-                                f"Lesson: discipline={lesson.get('discipline_name')}, "
-                                f"teacher={lesson.get('teacher_id')}, group={lesson.get('group_id')}. "
-                                f"SKIPPING SAVE!"
+                                f"❌ CRITICAL: Found {len(invalid_lessons)} lessons with invalid day_of_week in optimized_schedule! "
+                                f"Removing them before saving."
                             )
-                            continue  # НЕ сохраняем занятие с воскресеньем!
+                            optimized_schedule = [l for l in optimized_schedule if 1 <= l.get('day_of_week', 0) <= 6]
                         
-                        try:
-                            db.execute_query(
-                                schedule_queries.INSERT_SCHEDULE,
-                                {
-                                    'generation_id': generation_id,
-                                    'course_load_id': lesson['course_load_id'],
-                                    'day_of_week': day_of_week,  # Используем проверенное значение
-                                    'time_slot': lesson['time_slot'],
-                                    'classroom_id': lesson.get('classroom_id') or None,
-                                    'classroom_name': lesson.get('classroom_name') or None,
-                                    'teacher_id': lesson['teacher_id'],
-                                    'teacher_name': lesson.get('teacher_name', ''),
-                                    'group_id': lesson['group_id'],
-                                    'group_name': lesson.get('group_name', ''),
-                                    'discipline_name': lesson['discipline_name'],
-                                    'lesson_type': lesson['lesson_type'],
-                                    'is_active': True,
-                                    'semester': semester,
-                                    'academic_year': academic_year
-                                },
-                                fetch=False
-                            )
-                            saved_count += 1
-                        except Exception as e:
+                        # КРИТИЧЕСКАЯ ПРОВЕРКА 3: Проверить дубликаты в оптимизированном расписании перед сохранением
+                        # Дубликаты - это занятия с одинаковым (day, time_slot, group_id)
+                        seen_slots = {}  # {(day, time_slot, group_id): lesson}
+                        duplicates = []
+                        for lesson in optimized_schedule:
+                            day = lesson.get('day_of_week')
+                            slot = lesson.get('time_slot')
+                            group_id = lesson.get('group_id')
+                            # КРИТИЧНО: В один слот может быть ТОЛЬКО ОДНА ПАРА для группы!
+                            slot_key = (day, slot, group_id)
+                            
+                            if slot_key in seen_slots:
+                                duplicates.append({
+                                    'existing': seen_slots[slot_key],
+                                    'duplicate': lesson
+                                })
+                                logger.error(
+                                    f"❌ DUPLICATE DETECTED in optimized_schedule! "
+                                    f"Slot (day={day}, slot={slot}, group={group_id}) "
+                                    f"Existing: {seen_slots[slot_key].get('discipline_name')}, teacher={seen_slots[slot_key].get('teacher_id')}, "
+                                    f"Duplicate: {lesson.get('discipline_name')}, teacher={lesson.get('teacher_id')}"
+                                )
+                            else:
+                                seen_slots[slot_key] = lesson
+                        
+                        if duplicates:
                             logger.error(
-                                f"❌ Failed to save lesson {lesson.get('id')} "
-                                f"(day={day_of_week}, slot={lesson.get('time_slot')}, "
-                                f"teacher={lesson.get('teacher_id')}, group={lesson.get('group_id')}): {e}"
+                                f"❌ CRITICAL: Found {len(duplicates)} duplicate lessons in optimized_schedule! "
+                                f"Removing duplicates before saving."
                             )
-                            skipped_count += 1
-                    
-                    logger.info(
-                        f"💾 Saved initial schedule: {saved_count} lessons saved, {skipped_count} skipped. "
-                        f"Using semester={semester}, academic_year={academic_year}"
-                    )
-                    
-                    # КРИТИЧЕСКАЯ ПРОВЕРКА: Удалить дубликаты из БД после сохранения
-                    # Дубликаты - это записи с одинаковым (day_of_week, time_slot, teacher_id, group_id)
-                    # оставляем только самую новую запись (с максимальным id)
-                    cleanup_result = db.execute_query(
-                        """
-                        DELETE FROM schedules
-                        WHERE id IN (
-                            SELECT id
-                            FROM (
-                                SELECT id,
-                                    ROW_NUMBER() OVER (
-                                        PARTITION BY day_of_week, time_slot, teacher_id, group_id, generation_id
-                                        ORDER BY id DESC
-                                    ) as rn
-                                FROM schedules
-                                WHERE is_active = true AND generation_id = %(generation_id)s
-                            ) ranked
-                            WHERE rn > 1
+                            # Удалить дубликаты из optimized_schedule (оставляем только первое вхождение)
+                            optimized_schedule = list(seen_slots.values())
+                            logger.info(f"✅ After removing duplicates: {len(optimized_schedule)} unique lessons")
+                        
+                        # Stage 2: аудитории под окончательное время занятий
+                        if not skip_stage2:
+                            self._run_stage2(generation_id, optimized_schedule, course_loads, classrooms)
+                        
+                        # Заменить начальное расписание этой генерации оптимизированным
+                        # (удаление, деактивация остальных и вставка - одна транзакция)
+                        saved = schedule_writer.save_schedule(
+                            self._schedule_rows(optimized_schedule, generation_id, semester, academic_year),
+                            generation_id=generation_id,
+                            replace_generation=True
                         )
-                        RETURNING id
-                        """,
-                        {'generation_id': generation_id},
-                        fetch=True
-                    )
-                    if cleanup_result:
-                        logger.warning(
-                            f"⚠️ Removed {len(cleanup_result)} duplicate schedules from database for generation_id={generation_id}"
+                        logger.info(
+                            f"✅ Optimized schedule saved successfully: {saved['rows']}/{len(optimized_schedule)} lessons saved. "
+                            f"Using semester={semester}, academic_year={academic_year}"
                         )
-                    
-                    # Проверить дубликаты по group_id и day_of_week, time_slot
-                    # В один слот может быть только одна пара для группы!
-                    group_duplicates = db.execute_query(
-                        """
-                        SELECT day_of_week, time_slot, group_id, COUNT(*) as count
-                        FROM schedules
-                        WHERE is_active = true AND generation_id = %(generation_id)s
-                        GROUP BY day_of_week, time_slot, group_id
-                        HAVING COUNT(*) > 1
-                        """,
-                        {'generation_id': generation_id},
-                        fetch=True
-                    )
-                    if group_duplicates:
-                        logger.error(
-                            f"❌ CRITICAL: Found {len(group_duplicates)} duplicate slots in database! "
-                            f"One group has multiple lessons in the same slot: {group_duplicates}"
-                        )
-                        # Удалить дубликаты, оставив только одну запись (с минимальным id)
-                        removed_count = db.execute_query(
+                        
+                        # КРИТИЧЕСКАЯ ПРОВЕРКА: Удалить дубликаты из БД после сохранения оптимизированного расписания
+                        cleanup_result = db.execute_query(
                             """
                             DELETE FROM schedules
                             WHERE id IN (
@@ -358,8 +596,8 @@ class AgentOrchestrator:
                                 FROM (
                                     SELECT id,
                                         ROW_NUMBER() OVER (
-                                            PARTITION BY day_of_week, time_slot, group_id
-                                            ORDER BY id ASC
+                                            PARTITION BY day_of_week, time_slot, teacher_id, group_id, generation_id
+                                            ORDER BY id DESC
                                         ) as rn
                                     FROM schedules
                                     WHERE is_active = true AND generation_id = %(generation_id)s
@@ -371,304 +609,296 @@ class AgentOrchestrator:
                             {'generation_id': generation_id},
                             fetch=True
                         )
-                        if removed_count:
-                            logger.info(f"🧹 Removed {len(removed_count)} duplicate slots from database")
-                    
-                    # Проверить, что начальное расписание сохранено и активно
-                    if initial_schedule:
-                        logger.info(f"✅ Initial schedule with generation_id={generation_id} is ACTIVE")
-                    
-                    # Запустить агента для оптимизации (опционально)
-                    if max_iterations and max_iterations > 0:
-                        
-                        import os
-                        use_demo = True  
-                        
-                        if use_demo:
-                            
-                            logger.info(f"🤖 Starting agent optimization ({max_iterations} iterations)...")
-                            agent = Stage1Agent(generation_id, initial_schedule, teacher_preferences)
-                            result = agent.run_demo(max_iterations or 5)
-                        else:
-                            logger.info(f"🤖 Starting agent optimization ({max_iterations} iterations)...")
-                            agent = Stage1Agent(generation_id, initial_schedule, teacher_preferences)
-                            result = agent.run(max_iterations or 5)
+                        if cleanup_result:
+                            logger.warning(
+                                f"⚠️ Removed {len(cleanup_result)} duplicate schedules from database after optimization for generation_id={generation_id}"
+                            )
                         
-                        if result.get('success'):
-                            final_score = result.get('best_score', initial_score)
-                            logger.info(f"✅ Optimization completed. Final score: {final_score}")
-                            
-                            # Сохранить оптимизированное расписание
-                            optimized_schedule = agent.schedule_state.current_schedule
-                            if optimized_schedule:
-                                logger.info(f"💾 Saving optimized schedule ({len(optimized_schedule)} lessons)...")
-                                logger.info(f"   Semester: {semester}, Academic Year: {academic_year}")
-                                
-                                # Получить актуальные имена преподавателей из БД напрямую для оптимизированного расписания
-                                teacher_names_cache = {}
-                                teacher_ids = set(lesson.get('teacher_id', 0) for lesson in optimized_schedule if lesson.get('teacher_id', 0) > 0)
-                                if teacher_ids:
-                                    logger.info(f"📋 Fetching actual teacher names for {len(teacher_ids)} teachers from database (optimized schedule)")
-                                    try:
-                                        # Получить актуальные имена преподавателей из таблицы teachers
-                                        teachers_data = db.execute_query(
-                                            "SELECT id, full_name FROM teachers WHERE id = ANY(%(teacher_ids)s)",
-                                            {'teacher_ids': list(teacher_ids)},
-                                            fetch=True
-                                        )
-                                        for teacher_row in teachers_data:
-                                            teacher_names_cache[teacher_row['id']] = teacher_row.get('full_name', '')
-                                            logger.info(f"  ✅ Teacher {teacher_row['id']}: {teacher_names_cache[teacher_row['id']]}")
-                                    except Exception as e:
-                                        logger.error(f"  ❌ Failed to fetch teacher names from database: {e}")
-                                
-                                # Обновить teacher_name в оптимизированном расписании актуальными данными
-                                updated_count = 0
-                                for lesson in optimized_schedule:
-                                    teacher_id = lesson.get('teacher_id', 0)
-                                    if teacher_id > 0 and teacher_id in teacher_names_cache:
-                                        old_name = lesson.get('teacher_name', '')
-                                        lesson['teacher_name'] = teacher_names_cache[teacher_id]
-                                        if old_name != teacher_names_cache[teacher_id]:
-                                            updated_count += 1
-                                            logger.info(f"  🔄 Updated optimized lesson teacher_name: teacher_id={teacher_id}, old='{old_name}', new='{teacher_names_cache[teacher_id]}'")
-                                if updated_count > 0:
-                                    logger.info(f"✅ Updated {updated_count} optimized lessons with actual teacher names")
-                                
-                                # КРИТИЧЕСКАЯ ПРОВЕРКА 1: Удалить занятия на воскресенье (day 0 или 7)
-                                sunday_lessons = [l for l in optimized_schedule if l.get('day_of_week') == 0 or l.get('day_of_week') == 7]
-                                if sunday_lessons:
-                                    logger.error(
-                                        f"❌ CRITICAL: Found {len(sunday_lessons)} lessons with Sunday (day 0 or 7) in optimized_schedule! "
-                                        f"Removing them before saving."
-                                    )
-                                    optimized_schedule = [l for l in optimized_schedule if l.get('day_of_week') not in [0, 7]]
-                                
-                                # КРИТИЧЕСКАЯ ПРОВЕРКА 2: Удалить занятия с невалидным day_of_week (< 1 or > 6)
-                                invalid_lessons = [l for l in optimized_schedule if l.get('day_of_week', 0) < 1 or l.get('day_of_week', 0) > 6]
-                                if invalid_lessons:
-                                    logger.error(
-                                        f"❌ CRITICAL: Found {len(invalid_lessons)} lessons with invalid day_of_week in optimized_schedule! "
-                                        f"Removing them before saving."
-                                    )
-                                    optimized_schedule = [l for l in optimized_schedule if 1 <= l.get('day_of_week', 0) <= 6]
-                                
-                                # КРИТИЧЕСКАЯ ПРОВЕРКА 3: Проверить дубликаты в оптимизированном расписании перед сохранением
-                                # Дубликаты - это занятия с одинаковым (day, time_slot, group_id)
-                                seen_slots = {}  # {(day, time_slot, group_id): lesson}
-                                duplicates = []
-                                for lesson in optimized_schedule:
-                                    day = lesson.get('day_of_week')
-                                    slot = lesson.get('time_slot')
-                                    group_id = lesson.get('group_id')
-                                    # КРИТИЧНО: В один слот может быть ТОЛЬКО ОДНА ПАРА для группы!
-                                    slot_key = (day, slot, group_id)
-                                    
-                                    if slot_key in seen_slots:
-                                        duplicates.append({
-                                            'existing': seen_slots[slot_key],
-                                            'duplicate': lesson
-                                        })
-                                        logger.error(
-                                            f"❌ DUPLICATE DETECTED in optimized_schedule! "
-                                            f"Slot (day={day}, slot={slot}, group={group_id}) "
-                                            f"Existing: {seen_slots[slot_key].get('discipline_name')}, teacher={seen_slots[slot_key].get('teacher_id')}, "
-                                            f"Duplicate: {lesson.get('discipline_name')}, teacher={lesson.get('teacher_id')}"
-                                        )
-                                    else:
-                                        seen_slots[slot_key] = lesson
-                                
-                                if duplicates:
-                                    logger.error(
-                                        f"❌ CRITICAL: Found {len(duplicates)} duplicate lessons in optimized_schedule! "
-                                        f"Removing duplicates before saving."
-                                    )
-                                    # Удалить дубликаты из optimized_schedule (оставляем только первое вхождение)
-                                    optimized_schedule = list(seen_slots.values())
-                                    logger.info(f"✅ After removing duplicates: {len(optimized_schedule)} unique lessons")
-                                
-                                # Удалить старое расписание с этим generation_id (начальное)
-                                db.execute_query(
-                                    schedule_queries.DELETE_SCHEDULES_BY_GENERATION,
-                                    {'generation_id': generation_id},
-                                    fetch=False
-                                )
-                                logger.info(f"🗑️ Deleted old schedule for generation_id={generation_id}")
-                                
-                                # Деактивировать все остальные активные расписания
-                                db.execute_query(
-                                    schedule_queries.DEACTIVATE_OLD_SCHEDULES,
-                                    {},
-                                    fetch=False
-                                )
-                                logger.info("🔄 Deactivated all old active schedules")
-                                
-                                # Сохранить оптимизированное расписание
-                                saved_count = 0
-                                skipped_count = 0
-                                for lesson in optimized_schedule:
-                                    # КРИТИЧЕСКАЯ ФИНАЛЬНАЯ ПРОВЕРКА: Воскресенье (0 или 7) ЗАПРЕЩЕНО!
-                                    day_of_week = lesson.get('day_of_week', 1)
-                                    if day_of_week == 0 or day_of_week == 7 or day_of_week < 1 or day_of_week > 6:
-                                        logger.error(
-                                            f"CRITICAL ERROR: Attempting to save optimized lesson with invalid day_of_week={day_of_week}! "
-                                            f"Only days 1-6 (Monday-Saturday) are allowed. Sunday (0 or 7) is FORBIDDEN! "
-                                            f"Lesson: discipline={lesson.get('discipline_name')}, "
-                                            f"teacher={lesson.get('teacher_id')}, group={lesson.get('group_id')}. "
-                                            f"SKIPPING SAVE!"
-                                        )
-                                        continue  # НЕ сохраняем занятие с воскресеньем!
-                                    
-                                    try:
-                                        db.execute_query(
-                                            schedule_queries.INSERT_SCHEDULE,
-                                            {
-                                                'generation_id': generation_id,
-                                                'course_load_id': lesson.get('course_load_id', 0),
-                                                'day_of_week': day_of_week,  # Используем проверенное значение
-                                                'time_slot': lesson.get('time_slot', 1),
-                                                'classroom_id': lesson.get('classroom_id') or None,
-                                                'classroom_name': lesson.get('classroom_name') or None,
-                                                'teacher_id': lesson.get('teacher_id', 0),
-                                                'teacher_name': lesson.get('teacher_name', ''),
-                                                'group_id': lesson.get('group_id', 0),
-                                                'group_name': lesson.get('group_name', ''),
-                                                'discipline_name': lesson.get('discipline_name', ''),
-                                                'lesson_type': lesson.get('lesson_type', 'Практика'),
-                                                'is_active': True,
-                                                'semester': semester,
-                                                'academic_year': academic_year
-                                            },
-                                            fetch=False
-                                        )
-                                        saved_count += 1
-                                    except Exception as e:
-                                        logger.error(
-                                            f"❌ Failed to save optimized lesson {lesson.get('id')} "
-                                            f"(day={day_of_week}, slot={lesson.get('time_slot')}, "
-                                            f"teacher={lesson.get('teacher_id')}, group={lesson.get('group_id')}): {e}"
-                                        )
-                                        skipped_count += 1
-                                logger.info(
-                                    f"✅ Optimized schedule saved successfully: {saved_count}/{len(optimized_schedule)} lessons saved, {skipped_count} skipped. "
-                                    f"Using semester={semester}, academic_year={academic_year}"
-                                )
-                                
-                                # КРИТИЧЕСКАЯ ПРОВЕРКА: Удалить дубликаты из БД после сохранения оптимизированного расписания
-                                cleanup_result = db.execute_query(
-                                    """
-                                    DELETE FROM schedules
-                                    WHERE id IN (
-                                        SELECT id
-                                        FROM (
-                                            SELECT id,
-                                                ROW_NUMBER() OVER (
-                                                    PARTITION BY day_of_week, time_slot, teacher_id, group_id, generation_id
-                                                    ORDER BY id DESC
-                                                ) as rn
-                                            FROM schedules
-                                            WHERE is_active = true AND generation_id = %(generation_id)s
-                                        ) ranked
-                                        WHERE rn > 1
-                                    )
-                                    RETURNING id
-                                    """,
-                                    {'generation_id': generation_id},
-                                    fetch=True
-                                )
-                                if cleanup_result:
-                                    logger.warning(
-                                        f"⚠️ Removed {len(cleanup_result)} duplicate schedules from database after optimization for generation_id={generation_id}"
-                                    )
-                                
-                                # Проверить дубликаты по group_id и day_of_week, time_slot
-                                group_duplicates = db.execute_query(
-                                    """
-                                    SELECT day_of_week, time_slot, group_id, COUNT(*) as count
-                                    FROM schedules
-                                    WHERE is_active = true AND generation_id = %(generation_id)s
-                                    GROUP BY day_of_week, time_slot, group_id
-                                    HAVING COUNT(*) > 1
-                                    """,
-                                    {'generation_id': generation_id},
-                                    fetch=True
+                        # Проверить дубликаты по group_id и day_of_week, time_slot
+                        group_duplicates = db.execute_query(
+                            """
+                            SELECT day_of_week, time_slot, group_id, COUNT(*) as count
+                            FROM schedules
+                            WHERE is_active = true AND generation_id = %(generation_id)s
+                            GROUP BY day_of_week, time_slot, group_id
+                            HAVING COUNT(*) > 1
+                            """,
+                            {'generation_id': generation_id},
+                            fetch=True
+                        )
+                        if group_duplicates:
+                            logger.error(
+                                f"❌ CRITICAL: Found {len(group_duplicates)} duplicate slots in database after optimization! "
+                                f"One group has multiple lessons in the same slot: {group_duplicates}"
+                            )
+                            # Удалить дубликаты, оставив только одну запись (с минимальным id)
+                            removed_count = db.execute_query(
+                                """
+                                DELETE FROM schedules
+                                WHERE id IN (
+                                    SELECT id
+                                    FROM (
+                                        SELECT id,
+                                            ROW_NUMBER() OVER (
+                                                PARTITION BY day_of_week, time_slot, group_id
+                                                ORDER BY id ASC
+                                            ) as rn
+                                        FROM schedules
+                                        WHERE is_active = true AND generation_id = %(generation_id)s
+                                    ) ranked
+                                    WHERE rn > 1
                                 )
-                                if group_duplicates:
-                                    logger.error(
-                                        f"❌ CRITICAL: Found {len(group_duplicates)} duplicate slots in database after optimization! "
-                                        f"One group has multiple lessons in the same slot: {group_duplicates}"
-                                    )
-                                    # Удалить дубликаты, оставив только одну запись (с минимальным id)
-                                    removed_count = db.execute_query(
-                                        """
-                                        DELETE FROM schedules
-                                        WHERE id IN (
-                                            SELECT id
-                                            FROM (
-                                                SELECT id,
-                                                    ROW_NUMBER() OVER (
-                                                        PARTITION BY day_of_week, time_slot, group_id
-                                                        ORDER BY id ASC
-                                                    ) as rn
-                                                FROM schedules
-                                                WHERE is_active = true AND generation_id = %(generation_id)s
-                                            ) ranked
-                                            WHERE rn > 1
-                                        )
-                                        RETURNING id
-                                        """,
-                                        {'generation_id': generation_id},
-                                        fetch=True
-                                    )
-                                    if removed_count:
-                                        logger.info(f"🧹 Removed {len(removed_count)} duplicate slots from database after optimization")
-                                
-                                logger.info(f"✅ Schedule with generation_id={generation_id} is now ACTIVE")
-                        else:
-                            logger.warning(f"⚠️ Optimization failed: {result.get('error')}")
-                    
-                    # Обновить статус на завершено
-                    db.execute_query(
-                        gen_queries.UPDATE_GENERATION_STATUS,
-                        {
-                            'job_id': job_id,
-                            'status': 'completed',
-                            'error_message': None
-                        },
-                        fetch=False
-                    )
-                    
-                    logger.info(f"✅ Generation completed successfully: {job_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error in background generation: {e}", exc_info=True)
-                    db.execute_query(
-                        gen_queries.UPDATE_GENERATION_STATUS,
-                        {
-                            'job_id': job_id,
-                            'status': 'failed',
-                            'error_message': str(e)
-                        },
-                        fetch=False
+                                RETURNING id
+                                """,
+                                {'generation_id': generation_id},
+                                fetch=True
+                            )
+                            if removed_count:
+                                logger.info(f"🧹 Removed {len(removed_count)} duplicate slots from database after optimization")
+                        
+                        logger.info(f"✅ Schedule with generation_id={generation_id} is now ACTIVE")
+                else:
+                    logger.warning(f"⚠️ Optimization failed: {result.get('error')}")
+            
+            # Обновить статус на завершено
+            progress.finish('completed')
+            
+            logger.info(f"✅ Generation completed successfully: {job_id}")
+            
+        except GenerationCancelled:
+            logger.info(f"⏹️ Generation stopped by user: {job_id}")
+            progress.finish('stopped', 'Stopped by user')
+        except Exception as e:
+            logger.error(f"Error in background generation: {e}", exc_info=True)
+            progress.finish('failed', str(e))
+    
+    def repair_schedule(
+        self,
+        semester: int,
+        teacher_ids: Optional[List[int]] = None,
+        course_load_ids: Optional[List[int]] = None,
+        time_budget: Optional[float] = None,
+        created_by: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Отремонтировать активное расписание под изменения нагрузок / предпочтений
+        (синхронно, секунды вместо полной генерации)
+        
+        Args:
+            semester: Номер семестра
+            teacher_ids: Преподаватели с изменёнными предпочтениями
+            course_load_ids: Нагрузки, занятия которых нужно переоптимизировать
+            time_budget: Бюджет локального поиска, сек (default: config.REPAIR_TIME_BUDGET)
+            created_by: ID пользователя
+        
+        Returns:
+            {'success', 'job_id', 'message', 'stats'} или {'success': False, 'error'}
+        """
+        job_id = str(uuid.uuid4())
+        generation_id = None
+        progress = None
+        try:
+            lessons = db.execute_query(schedule_queries.SELECT_ACTIVE_SCHEDULES, {}, fetch=True)
+            lessons = [
+                lesson for lesson in lessons
+                if lesson.get('semester') in (None, semester)
+            ]
+            if not lessons:
+                return {
+                    'success': False,
+                    'error': f"No active schedule for semester {semester}. Run a full generation first."
+                }
+            
+            course_loads = db.execute_query(
+                load_queries.SELECT_COURSE_LOADS_BY_SEMESTER,
+                {'semester': semester},
+                fetch=True
+            )
+            
+            # Расписание ГА хранится по неделям семестра - ремонт удалил бы "лишние" недели
+            source = db.execute_query(
+                gen_queries.SELECT_GENERATION_BY_ID,
+                {'id': lessons[0].get('generation_id')},
+                fetch=True
+            )
+            if source and source[0].get('stage_name') in PER_WEEK_STAGES:
+                return {
+                    'success': False,
+                    'error': (
+                        f"Active schedule (generation {lessons[0].get('generation_id')}) was produced by "
+                        f"the genetic algorithm and is stored per semester week; repair supports weekly "
+                        f"schedules only. Run a full generation instead."
                     )
+                }
+            try:
+                check_weekly_shape(lessons, course_loads)
+            except ShapeError as e:
+                return {'success': False, 'error': str(e)}
             
-            # Запустить в отдельном потоке
-            thread = threading.Thread(target=run_generation, daemon=True)
-            thread.start()
+            teacher_preferences = {
+                row['teacher_id']: row['preferences']
+                for row in db.execute_query(pref_queries.SELECT_ALL_PREFERENCES, {}, fetch=True)
+            }
+            classrooms = db.execute_query(
+                "SELECT id, name, capacity, classroom_type FROM classrooms WHERE is_active = true",
+                {},
+                fetch=True
+            )
             
-            # Сразу вернуть job_id
+            generation_id = db.execute_query(
+                gen_queries.INSERT_GENERATION,
+                {
+                    'job_id': job_id,
+                    'stage': 1,
+                    'stage_name': 'repair',
+                    'status': 'running',
+                    'max_iterations': 0,
+                    'initial_score': None,
+                    'created_by': created_by
+                },
+                fetch=True
+            )[0]['id']
+            progress = ProgressReporter(job_id, stage='repair')
+            
+            logger.info(
+                f"🩹 Repairing active schedule (generation {lessons[0].get('generation_id')}, "
+                f"{len(lessons)} lessons) for semester {semester}: "
+                f"teachers={teacher_ids or []}, course_loads={course_load_ids or []}"
+            )
+            
+            with GenerationProfiler(generation_id):
+                repairer = ScheduleRepairer(
+                    lessons, course_loads, teacher_preferences, classrooms,
+                    teacher_ids=teacher_ids or (),
+                    course_load_ids=course_load_ids or (),
+                    time_budget=time_budget
+                )
+                result = repairer.repair(generation_id, progress)
+                stats = result['stats']
+                
+                # Новые занятия - строки активной генерации (она остаётся активным расписанием)
+                schedule_writer.apply_diff(
+                    result['deleted_ids'],
+                    result['updated'],
+                    result['inserted'],
+                    generation_id=generation_id,
+                    metrics={'repair': stats}
+                )
+            
+            progress.finish('completed')
             return {
                 'success': True,
                 'job_id': job_id,
-                'message': 'Generation started successfully'
+                'message': (
+                    f"Repaired {stats['affected']} affected lessons: "
+                    f"-{stats['deleted']} +{stats['inserted']} ~{stats['updated']}"
+                ),
+                'stats': stats
             }
             
         except Exception as e:
-            logger.error(f"Failed to start generation: {e}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            logger.error(f"Schedule repair failed: {e}", exc_info=True)
+            if progress is not None:
+                progress.finish('failed', str(e))
+            return {'success': False, 'job_id': job_id if generation_id else '', 'error': str(e)}
+    
+    @staticmethod
+    def _profiled(generation_id: int, profile: Optional[bool], target, /, *args, **kwargs):
+        """
+        Выполнить генерацию под GenerationProfiler (фазы и cProfile - в generation_history.metrics)
+        
+        Параметры до / - только позиционные: generation_id самой генерации идёт в kwargs.
+        """
+        with GenerationProfiler(generation_id, profile):
+            return target(*args, **kwargs)
+    
+    def _run_stage1(
+        self,
+        generation_id: int,
+        initial_schedule: list,
+        teacher_preferences: dict,
+        progress: ProgressReporter,
+        max_iterations: int,
+        engine: str,
+        time_budget: Optional[float] = None
+    ):
+        """
+        Stage 1 выбранным движком
+        
+        annealing / tabu - локальный поиск без LLM, затем (если
+        STAGE1_LLM_POLISH_ITERATIONS > 0) финальная полировка LLM-агентом.
+        
+        Returns:
+            (результат, объект с schedule_state - Stage1Agent или Stage1Optimizer)
+        """
+        if engine in STAGE1_METHODS:
+            optimizer = Stage1Optimizer(
+                generation_id, initial_schedule, teacher_preferences, progress,
+                method=engine,
+                time_budget=time_budget
+            )
+            result = optimizer.run()
+            
+            polish_iterations = config.STAGE1_LLM_POLISH_ITERATIONS
+            if not result.get('success') or polish_iterations <= 0:
+                return result, optimizer
+            
+            logger.info(f"🤖 LLM polish after {engine} ({polish_iterations} iterations)...")
+            agent = Stage1Agent(
+                generation_id, optimizer.schedule_state.current_schedule, teacher_preferences, progress
+            )
+            polish_result = agent.run(polish_iterations)
+            polish_result['initial_score'] = result['initial_score']
+            polish_result['method'] = f"{engine}+llm"
+            return polish_result, agent
+        
+        logger.info(f"🤖 Starting agent optimization ({max_iterations} iterations)...")
+        agent = Stage1Agent(generation_id, initial_schedule, teacher_preferences, progress)
+        if engine == 'demo':
+            return agent.run_demo(max_iterations or 5), agent
+        return agent.run(max_iterations or 5), agent
+    
+    def _run_ga_generation(
+        self,
+        job_id: str,
+        generation_id: int,
+        semester: int,
+        academic_year: str,
+        max_iterations: int,
+        islands: int,
+        migration_interval: Optional[int],
+        migrants_count: Optional[int],
+        migration_topology: Optional[str]
+    ):
+        """Запустить ГА: острова при islands > 1, иначе кластеры GA_DECOMPOSE"""
+        import asyncio
+        
+        progress = ProgressReporter(job_id, max_iterations, stage='genetic')
+        try:
+            result = asyncio.run(GenerationOrchestrator().generate_schedule(
+                generation_id=generation_id,
+                progress=progress,
+                semester=semester,
+                academic_year=academic_year,
+                max_iterations=max_iterations,
+                islands=islands,
+                migration_interval=migration_interval,
+                migrants_count=migrants_count,
+                migration_topology=migration_topology
+            ))
+            
+            if not result.get('success'):
+                raise Exception(result.get('message', 'GA generation failed'))
+            
+            progress.finish('completed')
+            logger.info(f"✅ GA generation completed successfully: {job_id}")
+            
+        except GenerationCancelled:
+            logger.info(f"⏹️ GA generation stopped by user: {job_id}")
+            progress.finish('stopped', 'Stopped by user')
+        except Exception as e:
+            logger.error(f"Error in GA generation: {e}", exc_info=True)
+            progress.finish('failed', str(e))
     
     def _run_generation_sync(
         self,
@@ -678,9 +908,12 @@ class AgentOrchestrator:
         teacher_preferences: dict,
         max_iterations: int,
         skip_stage1: bool,
-        skip_stage2: bool
+        skip_stage2: bool,
+        stage1_engine: str = 'llm',
+        stage1_time_budget: Optional[float] = None
     ) -> Dict[str, Any]:
         """Запустить генерацию синхронно"""
+        progress = ProgressReporter(job_id, max_iterations, stage='temporal')
         try:
             # Stage 1: Temporal Optimization
             if not skip_stage1:
@@ -697,21 +930,23 @@ class AgentOrchestrator:
                 initial_result = fitness_calculator.calculate(initial_schedule, teacher_preferences)
                 initial_score = initial_result['total_score']
                 
-                # Обновить БД
-                db.execute_query(
-                    gen_queries.UPDATE_GENERATION_ITERATION,
-                    {
-                        'job_id': job_id,
-                        'current_iteration': 0,
-                        'current_score': initial_score,
-                        'last_reasoning': 'Initial schedule generated'
-                    },
-                    fetch=False
+                # Прогресс: начальное расписание (в БД - сразу)
+                progress.report(
+                    iteration=0,
+                    current_score=initial_score,
+                    hard_violations=len(initial_result['details']['conflicts']),
+                    phase='initial',
+                    reasoning='Initial schedule generated',
+                    flush=True
                 )
                 
                 # Запустить оптимизацию
-                agent = Stage1Agent(generation_id, initial_schedule, teacher_preferences)
-                stage1_result = agent.run(max_iterations)
+                stage1_result, _ = self._run_stage1(
+                    generation_id, initial_schedule, teacher_preferences, progress,
+                    max_iterations=max_iterations,
+                    engine=stage1_engine,
+                    time_budget=stage1_time_budget
+                )
                 
                 if not stage1_result['success']:
                     raise Exception("Stage 1 failed")
@@ -727,24 +962,16 @@ class AgentOrchestrator:
                     fetch=True
                 )
             
+            # Stage 2: Classroom Assignment
+            if not skip_stage2:
+                self._run_stage2(generation_id, optimized_schedule, course_loads)
+            
             # Сохранить расписание в БД
             logger.info("💾 Saving schedule to database...")
             self._save_schedule(optimized_schedule, generation_id, semester=None, academic_year=None)
             
-            # Stage 2: Classroom Assignment (TODO: implement)
-            if not skip_stage2:
-                logger.info("⏭️ Stage 2 not yet implemented")
-            
             # Завершить
-            db.execute_query(
-                gen_queries.UPDATE_GENERATION_STATUS,
-                {
-                    'job_id': job_id,
-                    'status': 'completed',
-                    'error_message': None
-                },
-                fetch=False
-            )
+            progress.finish('completed')
             
             logger.info(f"✅ Generation {job_id} completed successfully!")
             
@@ -754,51 +981,83 @@ class AgentOrchestrator:
             logger.error(f"Generation failed: {e}", exc_info=True)
             
             # Обновить статус
-            db.execute_query(
-                gen_queries.UPDATE_GENERATION_STATUS,
-                {
-                    'job_id': job_id,
-                    'status': 'failed',
-                    'error_message': str(e)
-                },
-                fetch=False
-            )
+            progress.finish('failed', str(e))
             
             return {'success': False, 'error': str(e)}
     
-    def _save_schedule(self, schedule: list, generation_id: int, semester: Optional[int] = None, academic_year: Optional[str] = None):
-        """Сохранить расписание в БД"""
-        # Деактивировать старые
+    def _run_stage2(
+        self,
+        generation_id: int,
+        schedule: list,
+        course_loads: list,
+        classrooms: Optional[list] = None
+    ) -> Dict[str, Any]:
+        """
+        Stage 2: назначить аудитории (min-cost паросочетание по слотам, на месте)
+        
+        Итог назначения пишется в generation_history.metrics['classroom_assignment'].
+        """
+        logger.info("=" * 60)
+        logger.info("STAGE 2: CLASSROOM ASSIGNMENT")
+        logger.info("=" * 60)
+        
+        if classrooms is None:
+            classrooms = db.execute_query(
+                "SELECT id, name, capacity, classroom_type FROM classrooms WHERE is_active = true",
+                {},
+                fetch=True
+            )
+        
+        with profiling.phase('classroom_assignment'):
+            stats = ClassroomAssigner(classrooms, course_loads).assign(schedule)
         db.execute_query(
-            schedule_queries.DEACTIVATE_OLD_SCHEDULES,
-            {},
+            gen_queries.MERGE_GENERATION_METRICS,
+            {'id': generation_id, 'metrics': json.dumps({'classroom_assignment': stats})},
             fetch=False
         )
-        
-        # Вставить новое
+        return stats
+    
+    def _save_schedule(self, schedule: list, generation_id: int, semester: Optional[int] = None, academic_year: Optional[str] = None):
+        """Сохранить расписание в БД (одной транзакцией, старое деактивируется)"""
+        schedule_writer.save_schedule(
+            self._schedule_rows(schedule, generation_id, semester, academic_year),
+            generation_id=generation_id
+        )
+    
+    @staticmethod
+    def _schedule_rows(schedule: list, generation_id: int,
+                       semester: Optional[int], academic_year: Optional[str]):
+        """Строки schedules для schedule_writer (занятия с недопустимым днём пропускаются)"""
         for lesson in schedule:
-            db.execute_query(
-                schedule_queries.INSERT_SCHEDULE,
-                {
-                    'course_load_id': lesson['course_load_id'],
-                    'day_of_week': lesson['day_of_week'],
-                    'time_slot': lesson['time_slot'],
-                    'classroom_id': lesson.get('classroom_id'),
-                    'classroom_name': lesson.get('classroom_name'),
-                    'teacher_id': lesson['teacher_id'],
-                    'teacher_name': lesson['teacher_name'],
-                    'group_id': lesson['group_id'],
-                    'group_name': lesson['group_name'],
-                    'discipline_name': lesson['discipline_name'],
-                    'lesson_type': lesson['lesson_type'],
-                    'generation_id': generation_id,
-                    'is_active': True,
-                    'semester': semester,
-                    'academic_year': academic_year
-                },
-                fetch=False
-            )
-
+            # КРИТИЧЕСКАЯ ФИНАЛЬНАЯ ПРОВЕРКА: Воскресенье (0 или 7) ЗАПРЕЩЕНО!
+            day_of_week = lesson.get('day_of_week', 1)
+            if day_of_week is None or day_of_week < 1 or day_of_week > 6:
+                logger.error(
+                    f"CRITICAL ERROR: Attempting to save lesson with invalid day_of_week={day_of_week}! "
+                    f"Only days 1-6 (Monday-Saturday) are allowed. Sunday (0 or 7) is FORBIDDEN! "
+                    f"Lesson: discipline={lesson.get('discipline_name')}, "
+                    f"teacher={lesson.get('teacher_id')}, group={lesson.get('group_id')}. "
+                    f"SKIPPING SAVE!"
+                )
+                continue  # НЕ сохраняем занятие с воскресеньем!
+            
+            yield {
+                'generation_id': generation_id,
+                'course_load_id': lesson.get('course_load_id', 0),
+                'day_of_week': day_of_week,
+                'time_slot': lesson.get('time_slot', 1),
+                'classroom_id': lesson.get('classroom_id') or None,
+                'classroom_name': lesson.get('classroom_name') or None,
+                'teacher_id': lesson.get('teacher_id', 0),
+                'teacher_name': lesson.get('teacher_name', ''),
+                'group_id': lesson.get('group_id', 0),
+                'group_name': lesson.get('group_name', ''),
+                'discipline_name': lesson.get('discipline_name', ''),
+                'lesson_type': lesson.get('lesson_type', 'Практика'),
+                'is_active': True,
+                'semester': semester,
+                'academic_year': academic_year
+            }
 
 # Singleton instance
 agent_orchestrator = AgentOrchestrator()
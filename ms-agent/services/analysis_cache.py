@@ -0,0 +1,66 @@
+"""
+Analysis Cache - готовые ответы AnalyzeSchedule по generation_id
+
+Завершённая генерация не меняется, а дашборд запрашивает анализ при
+каждом обновлении. Ответ хранится вместе с версией строк генерации
+(число строк, MAX(id), MAX(updated_at) - SELECT_GENERATION_VERSION):
+любое изменение расписания генерации (в том числе из ms-schedule)
+меняет версию, и ответ пересчитывается.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from utils.metrics import analysis_cache_lookups_total
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    LRU: generation_id -> (версия строк, AnalysisResponse)
+
+    Потокобезопасен (gRPC обрабатывает запросы в пуле потоков).
+    max_size <= 0 - кэш выключен.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[Tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation_id: int, version: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(generation_id) if self.max_size > 0 else None
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(generation_id)
+                self.hits += 1
+                response = entry[1]
+            else:
+                if entry is not None:
+                    # Расписание генерации изменилось
+                    del self._entries[generation_id]
+                self.misses += 1
+                response = None
+        analysis_cache_lookups_total.labels(result='miss' if response is None else 'hit').inc()
+        return response
+
+    def put(self, generation_id: int, version: Tuple, response: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[generation_id] = (version, response)
+            self._entries.move_to_end(generation_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance
+analysis_cache = AnalysisCache(config.ANALYSIS_CACHE_SIZE)
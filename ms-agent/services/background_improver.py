@@ -0,0 +1,155 @@
+"""
+Background LLM Improver
+LLM-улучшения топа популяции ГА в фоновом потоке
+
+Раньше эволюция ждала GigaChatImprover и LLMAgentImprover (HTTP к GigaChat)
+каждые 10 поколений. Теперь в фон уходит снимок (копии) лучших хромосом,
+ГА продолжает эволюцию, а готовые улучшения вливаются в одно из следующих
+поколений. Одновременно выполняется не больше одного улучшения.
+
+Фоновый поток работает под дочерним CancelToken генерации: close() или
+остановка генерации прерывают улучшение на ближайшей cancellation.check()
+(перед каждым запросом к GigaChat и итерацией Stage1Agent).
+"""
+import asyncio
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Optional
+
+from utils.chromosome import Chromosome
+from services.fitness_calculator import FitnessCalculator
+from services.gigachat_improver import GigaChatImprover
+from services.llm_agent_improver import LLMAgentImprover
+from utils import profiling, cancellation
+from utils.cancellation import CancelToken, GenerationCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLLMImprover:
+    """
+    GigaChat + Stage1Agent над снимком топа популяции в отдельном потоке
+
+    submit() - отправить снимок (если предыдущее улучшение завершено),
+    collect() - забрать готовые улучшения (None - ещё выполняется / не было).
+    """
+
+    def __init__(self,
+                 gigachat_improver: GigaChatImprover,
+                 agent_improver: LLMAgentImprover,
+                 fitness_calculator: FitnessCalculator,
+                 teacher_preferences: Dict,
+                 top_n: int = 3,
+                 agent_top_n: int = 2,
+                 agent_iterations: int = 5):
+        self.gigachat_improver = gigachat_improver
+        self.agent_improver = agent_improver
+        self.teacher_preferences = teacher_preferences
+        self.top_n = top_n
+        self.agent_top_n = agent_top_n
+        self.agent_iterations = agent_iterations
+
+        # Свой калькулятор без кэша: кэш основного не потокобезопасен
+        self.fitness_calculator = FitnessCalculator(
+            teacher_preferences=fitness_calculator.teacher_preferences,
+            classrooms=list(fitness_calculator.classrooms.values()),
+            groups=fitness_calculator.groups,
+            engine=fitness_calculator.engine,
+            preference_matrix=fitness_calculator.preferences,
+            cache_size=0
+        )
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm-improver')
+        # Фазы фонового потока - в профилировщик генерации, создавшей улучшатель
+        self._profiler = profiling.current()
+        # Отмена фонового потока: close() или остановка генерации (токен её потока)
+        parent = cancellation.current()
+        self._cancel = CancelToken(
+            parent.job_id if parent is not None else 'llm-improver', poll_interval=0, parent=parent
+        )
+        self._future: Optional[Future] = None
+        self._submitted_at = 0
+        self.submitted = 0
+        self.merged = 0
+        self.skipped = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def submit(self, population: List[Chromosome], iteration: int) -> bool:
+        """Отправить снимок топа популяции; False - предыдущее улучшение ещё выполняется"""
+        if self.busy:
+            self.skipped += 1
+            logger.info(
+                f"⏳ LLM improvement from iteration {self._submitted_at} still running, skipping"
+            )
+            return False
+
+        top = sorted(population, key=lambda c: c.fitness, reverse=True)[:self.top_n]
+        snapshot = [chromosome.copy() for chromosome in top]
+        self._future = self._executor.submit(self._improve, snapshot)
+        self._submitted_at = iteration
+        self.submitted += 1
+        logger.info(f"🤖 LLM improvement of top-{len(snapshot)} submitted (iteration {iteration})")
+        return True
+
+    def collect(self) -> Optional[List[Chromosome]]:
+        """Готовые улучшения (хромосомы требуют оценки) или None"""
+        if self._future is None or not self._future.done():
+            return None
+
+        future, self._future = self._future, None
+        try:
+            improved = future.result()
+        except Exception as e:
+            logger.error(f"❌ Background LLM improvement failed: {e}", exc_info=True)
+            return []
+
+        self.merged += 1
+        logger.info(
+            f"📥 LLM improvements from iteration {self._submitted_at} ready: "
+            f"{len(improved)} chromosomes"
+        )
+        return improved
+
+    def close(self):
+        """Прервать и не ждать незавершённое улучшение: его результат уже не нужен"""
+        if self.busy:
+            logger.info("⏹️ Cancelling unfinished LLM improvement")
+        self._cancel.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._future = None
+
+    def _improve(self, snapshot: List[Chromosome]) -> List[Chromosome]:
+        """Выполняется в фоновом потоке"""
+        profiler = self._profiler.bind() if self._profiler is not None else nullcontext()
+        with self._cancel.bind(), profiler:
+            try:
+                return self._improve_top(snapshot)
+            except GenerationCancelled:
+                logger.info("⏹️ LLM improvement cancelled")
+                return []
+
+    def _improve_top(self, snapshot: List[Chromosome]) -> List[Chromosome]:
+        """GigaChat, затем Stage1Agent над лучшими"""
+        # Шаг 1: GigaChat улучшение (быстрое, через промпты)
+        improved_gigachat = asyncio.run(self.gigachat_improver.improve_top_chromosomes(
+            chromosomes=snapshot,
+            teacher_preferences=self.teacher_preferences,
+            top_n=self.top_n
+        ))
+
+        # Пересчитать fitness для выбора лучших перед Stage1Agent
+        for chromosome in improved_gigachat:
+            self.fitness_calculator.calculate(chromosome)
+
+        # Шаг 2: Stage1Agent улучшение (глубокое, с инструментами)
+        improved_agent = self.agent_improver.improve_top_chromosomes(
+            chromosomes=improved_gigachat,
+            max_iterations=self.agent_iterations,
+            top_n=self.agent_top_n
+        )
+
+        return improved_gigachat + improved_agent
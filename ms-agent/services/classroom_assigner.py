@@ -0,0 +1,312 @@
+"""
+Classroom Assigner - Stage 2: назначение аудиторий
+
+Время занятий (день, пара, неделя) уже зафиксировано Stage 1, поэтому для
+каждого слота (неделя, день, пара) аудитории назначаются независимо:
+двудольное паросочетание занятие -> аудитория минимальной стоимости
+(венгерский алгоритм, O(n^2 * m) с векторизованным по аудиториям шагом).
+
+Стоимость пары (занятие, аудитория):
+- недопустимо (вместимость < размера группы или лабораторная не в
+  лаборатории) - INFEASIBLE_COST: берётся, только если допустимых не хватает;
+- пустые места: (вместимость - размер группы) * STAGE2_WASTED_SEAT_COST;
+- смена аудитории: STAGE2_ROOM_CHANGE_COST, если группа на предыдущей паре
+  этого дня сидела в другой аудитории.
+
+Из-за стоимости смены аудитории пары одного дня решаются по порядку,
+а дни (и недели) - параллельно в пуле процессов. Занятий в слоте больше,
+чем аудиторий - лишние остаются без аудитории (classroom_id = None).
+"""
+import time
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+
+from config import config
+from utils.classroom_types import is_lab_classroom, is_lab_lesson
+from utils.process_pool import pool_workers
+
+logger = logging.getLogger(__name__)
+
+# Стоимость недопустимой аудитории и занятия без аудитории
+INFEASIBLE_COST = 1e6
+UNASSIGNED_COST = 1e7
+
+
+# ============ Паросочетание минимальной стоимости ============
+
+def min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Венгерский алгоритм для прямоугольной матрицы n x m (n <= m)
+
+    Returns:
+        Массив длины n: номер столбца, назначенного строке
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # столбец -> строка (1-based, 0 = свободен)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    # Тёплый старт: u = минимум строки, жадно занять свободные столбцы с нулевой
+    # приведённой стоимостью - кратчайшие пути ищутся только для оставшихся строк
+    u[1:] = cost.min(axis=1)
+    pending = []
+    for row in range(1, n + 1):
+        tight = np.flatnonzero((cost[row - 1] == u[row]) & (match[1:] == 0))
+        if len(tight):
+            match[tight[0] + 1] = row
+        else:
+            pending.append(row)
+
+    # Столбец 0 - фиктивный корень пути (как в match / way)
+    padded = np.empty((n, m + 1))
+    padded[:, 0] = np.inf
+    padded[:, 1:] = cost
+
+    for row in pending:
+        match[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        free = np.ones(m + 1, dtype=bool)
+
+        # Кратчайший увеличивающий путь от строки row (Дейкстра по приведённым стоимостям)
+        while True:
+            used[col] = True
+            free[col] = False
+            current_row = match[col]
+
+            reduced = padded[current_row - 1] - u[current_row] - v
+            better = free & (reduced < min_reduced)
+            np.copyto(min_reduced, reduced, where=better)
+            way[better] = col
+
+            candidates = np.where(free, min_reduced, np.inf)
+            next_col = int(np.argmin(candidates))
+            delta = candidates[next_col]
+            if match[next_col]:
+                # Равноценные аудитории: свободный столбец сразу завершает путь
+                unmatched = (candidates == delta) & (match == 0)
+                if unmatched.any():
+                    next_col = int(np.argmax(unmatched))
+
+            u[match[used]] += delta
+            v[used] -= delta
+            min_reduced[free] -= delta
+
+            col = next_col
+            if match[col] == 0:
+                break
+
+        # Развернуть путь
+        while col:
+            prev = way[col]
+            match[col] = match[prev]
+            col = prev
+
+    assignment = np.full(n, -1, dtype=np.int64)
+    assigned = np.nonzero(match[1:])[0]
+    assignment[match[1:][assigned] - 1] = assigned
+    return assignment
+
+
+def _week(lesson: Dict) -> Any:
+    """Неделя занятия (week_number - расписание ГА, без недели - одна неделя)"""
+    return lesson.get('week_number', lesson.get('week'))
+
+
+# ============ Состояние процесса-воркера ============
+
+_worker_rooms: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(capacities: np.ndarray, labs: np.ndarray):
+    """Инициализация воркера: аудитории передаются один раз на процесс"""
+    global _worker_rooms
+    _worker_rooms = (capacities, labs)
+
+
+def _assign_day_task(lessons: List[Tuple]) -> List[Tuple[int, int]]:
+    """Задача воркера: все пары одного дня"""
+    capacities, labs = _worker_rooms
+    return _assign_day(lessons, capacities, labs)
+
+
+def _assign_day(lessons: List[Tuple],
+                capacities: np.ndarray,
+                labs: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Назначить аудитории занятиям одного дня, пара за парой
+
+    Args:
+        lessons: (индекс в расписании, пара, размер группы, лабораторная, группа, текущая аудитория)
+        capacities: Вместимости аудиторий
+        labs: Признак лаборатории
+
+    Returns:
+        [(индекс в расписании, номер аудитории или -1)]
+    """
+    room_count = len(capacities)
+    by_slot: Dict[int, List[Tuple]] = defaultdict(list)
+    for lesson in lessons:
+        by_slot[lesson[1]].append(lesson)
+
+    waste_weight = config.STAGE2_WASTED_SEAT_COST
+    change_cost = config.STAGE2_ROOM_CHANGE_COST
+
+    result = []
+    group_rooms: Dict[Any, int] = {}  # группа -> аудитория на предыдущей паре дня
+    for slot in sorted(by_slot):
+        slot_lessons = by_slot[slot]
+        n = len(slot_lessons)
+        sizes = np.array([lesson[2] for lesson in slot_lessons], dtype=np.float64)
+        needs_lab = np.array([lesson[3] for lesson in slot_lessons], dtype=bool)
+
+        cost = np.empty((n, max(room_count, n)))
+        real = cost[:, :room_count]
+        real[:] = (capacities[None, :] - sizes[:, None]) * waste_weight
+        infeasible = (capacities[None, :] < sizes[:, None]) | (needs_lab[:, None] & ~labs[None, :])
+        real[infeasible] = INFEASIBLE_COST
+        # Фиктивные аудитории, если занятий больше, чем аудиторий
+        cost[:, room_count:] = UNASSIGNED_COST
+
+        if change_cost:
+            for row, lesson in enumerate(slot_lessons):
+                previous = group_rooms.get(lesson[4], lesson[5])
+                if previous is not None and previous >= 0:
+                    real[row] += change_cost
+                    real[row, previous] -= change_cost
+
+        assignment = min_cost_assignment(cost)
+        for lesson, room in zip(slot_lessons, assignment):
+            room = int(room) if room < room_count else -1
+            result.append((lesson[0], room))
+            if room >= 0:
+                group_rooms[lesson[4]] = room
+
+    return result
+
+
+class ClassroomAssigner:
+    """
+    Stage 2: оптимальное назначение аудиторий уже размещённым по времени занятиям
+
+    workers <= 1 - все дни в текущем процессе.
+    """
+
+    def __init__(self,
+                 classrooms: List[Dict],
+                 course_loads: Optional[List[Dict]] = None,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            classrooms: Аудитории (id, name, capacity, classroom_type)
+            course_loads: Нагрузки - размер группы, если его нет в занятии
+            workers: Процессов (default: config.STAGE2_WORKERS, 0 = min(4, ядер))
+        """
+        self.classrooms = list(classrooms)
+        self._room_index = {c.get('id'): i for i, c in enumerate(self.classrooms)}
+        self._capacities = np.array(
+            [c.get('capacity') or 0 for c in self.classrooms], dtype=np.float64
+        )
+        self._labs = np.array([is_lab_classroom(c) for c in self.classrooms], dtype=bool)
+        self._group_sizes = {
+            load.get('id'): load.get('group_size') or load.get('students_count') or 0
+            for load in course_loads or []
+        }
+
+        self.workers = pool_workers(config.STAGE2_WORKERS if workers is None else workers)
+
+    def assign(self, schedule: List[Dict]) -> Dict[str, Any]:
+        """
+        Назначить аудитории (classroom_id / classroom_name меняются на месте)
+
+        Returns:
+            {'lessons', 'assigned', 'unassigned', 'infeasible', 'room_changes', 'wasted_seats', 'seconds'}
+        """
+        start = time.monotonic()
+        if not self.classrooms:
+            logger.warning("⚠️ Stage 2: no classrooms, skipping assignment")
+            return {'lessons': len(schedule), 'assigned': 0, 'unassigned': len(schedule)}
+
+        days: Dict[Tuple, List[Tuple]] = defaultdict(list)
+        for index, lesson in enumerate(schedule):
+            days[(_week(lesson), lesson.get('day_of_week'))].append((
+                index,
+                lesson.get('time_slot'),
+                self._group_size(lesson),
+                is_lab_lesson(lesson.get('lesson_type')),
+                lesson.get('group_id'),
+                self._room_index.get(lesson.get('classroom_id'), -1)
+            ))
+        tasks = list(days.values())
+
+        workers = min(self.workers, len(tasks))
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self._capacities, self._labs)
+            ) as pool:
+                results = list(pool.map(_assign_day_task, tasks))
+        else:
+            results = [_assign_day(task, self._capacities, self._labs) for task in tasks]
+
+        for day_result in results:
+            for index, room in day_result:
+                classroom = self.classrooms[room] if room >= 0 else None
+                schedule[index]['classroom_id'] = classroom.get('id') if classroom else None
+                schedule[index]['classroom_name'] = classroom.get('name') if classroom else None
+
+        stats = self._stats(schedule)
+        stats['seconds'] = round(time.monotonic() - start, 3)
+        logger.info(
+            f"🏫 Stage 2: {stats['assigned']}/{stats['lessons']} lessons assigned "
+            f"in {stats['seconds']:.2f}s ({len(tasks)} days, {workers} workers); "
+            f"infeasible={stats['infeasible']}, room changes={stats['room_changes']}, "
+            f"wasted seats={stats['wasted_seats']}"
+        )
+        return stats
+
+    def _group_size(self, lesson: Dict) -> int:
+        return (
+            lesson.get('group_size')
+            or lesson.get('students_count')
+            or self._group_sizes.get(lesson.get('course_load_id'), 0)
+        )
+
+    def _stats(self, schedule: List[Dict]) -> Dict[str, Any]:
+        """Итог назначения: нарушения вместимости / типа, смены аудиторий, пустые места"""
+        assigned = infeasible = wasted = changes = 0
+        group_days: Dict[Tuple, List[Tuple]] = defaultdict(list)
+        for lesson in schedule:
+            room = self._room_index.get(lesson.get('classroom_id'))
+            if room is None:
+                continue
+            assigned += 1
+            size = self._group_size(lesson)
+            capacity = self._capacities[room]
+            if capacity < size or (is_lab_lesson(lesson.get('lesson_type')) and not self._labs[room]):
+                infeasible += 1
+            else:
+                wasted += int(capacity - size)
+            group_days[(_week(lesson), lesson.get('day_of_week'), lesson.get('group_id'))].append(
+                (lesson.get('time_slot'), room)
+            )
+
+        for lessons in group_days.values():
+            lessons.sort()
+            changes += sum(1 for a, b in zip(lessons, lessons[1:]) if a[1] != b[1])
+
+        return {
+            'lessons': len(schedule),
+            'assigned': assigned,
+            'unassigned': len(schedule) - assigned,
+            'infeasible': infeasible,
+            'room_changes': changes,
+            'wasted_seats': wasted
+        }
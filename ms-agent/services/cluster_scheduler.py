@@ -0,0 +1,224 @@
+"""
+Cluster Scheduler - ГА по независимым кластерам нагрузок
+
+ScheduleContextBuilder.decompose делит нагрузки на кластеры без общих
+преподавателей и групп. Каждый кластер - отдельная задача пула процессов
+со своей популяцией (как остров, но без миграций: кластеры не пересекаются
+по генам). Время работы растёт с размером крупнейшего кластера, а не со
+всей задачей.
+
+Единственный общий ресурс кластеров - аудитории. После слияния лучших
+расписаний кластеров конфликты аудиторий устраняются назначением Stage 2
+(ClassroomAssigner) по слитому расписанию: аудитории, не создающие
+конфликтов, сохраняются за счёт стоимости смены аудитории.
+"""
+import time
+import random
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+
+from config import config
+from utils.chromosome import Chromosome, LoadTable, GENE_LOAD, GENE_CLASSROOM
+from utils.preference_matrix import PreferenceMatrix
+from utils import profiling, cancellation
+from utils.process_pool import pool_workers
+from services.population_initializer import PopulationInitializer
+from services.fitness_calculator import FitnessCalculator
+from services.classroom_assigner import ClassroomAssigner
+from services.progress_bus import ProgressReporter
+from services.genetic_operators import (
+    SelectionOperator, CrossoverOperator, MutationOperator, evolve_generation
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ============ Процесс-кластер ============
+
+def _evolve_cluster(cluster_id: int,
+                    context: Dict[str, Any],
+                    population_size: int,
+                    generations: int,
+                    seed: int,
+                    engine: str,
+                    encoding: str) -> Tuple[int, Optional[np.ndarray], float, float]:
+    """
+    ГА одного кластера в процессе пула
+
+    Returns:
+        (cluster_id, гены лучшей хромосомы или None, её fitness, секунды)
+    """
+    start = time.monotonic()
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+
+    fitness_calculator = FitnessCalculator(
+        teacher_preferences=context['teacher_preferences'],
+        classrooms=context['classrooms'],
+        groups=context['groups'],
+        engine=engine,
+        preference_matrix=PreferenceMatrix.from_context(context)
+    )
+    selection = SelectionOperator()
+    crossover = CrossoverOperator()
+    mutation = MutationOperator(context['classrooms'], fitness_calculator.preferences)
+    initializer = PopulationInitializer(context, encoding)
+
+    def evaluate(chromosomes: List[Chromosome]):
+        for chromosome in chromosomes:
+            fitness_calculator.calculate(chromosome)
+
+    population = initializer.create_population(population_size)
+    evaluate(population)
+    best: Optional[Chromosome] = None
+
+    for _ in range(generations):
+        if not population:
+            population = initializer.create_population(population_size)
+            evaluate(population)
+
+        current_best = max(population, key=lambda c: c.fitness)
+        if best is None or current_best.fitness > best.fitness:
+            best = current_best.copy()
+
+        population = evolve_generation(
+            population=population,
+            population_size=population_size,
+            selection=selection,
+            crossover=crossover,
+            mutation=mutation,
+            fitness_calculator=fitness_calculator,
+            evaluate=evaluate,
+            reinitialize=initializer.create_population
+        )
+
+    if population:
+        current_best = max(population, key=lambda c: c.fitness)
+        if best is None or current_best.fitness > best.fitness:
+            best = current_best.copy()
+
+    return (
+        cluster_id,
+        best.genes if best is not None else None,
+        best.fitness if best is not None else float('-inf'),
+        time.monotonic() - start
+    )
+
+
+# ============ Координатор ============
+
+class ClusterScheduler:
+    """
+    Параллельный ГА по кластерам + слияние с ремонтом аудиторий
+
+    workers - процессов (default: config.GA_CLUSTER_WORKERS, 0 = min(4, ядер))
+    """
+
+    def __init__(self,
+                 context: Dict[str, Any],
+                 clusters: List[Dict[str, Any]],
+                 fitness_calculator: FitnessCalculator,
+                 population_size: int = 50,
+                 encoding: Optional[str] = None,
+                 workers: Optional[int] = None):
+        self.context = context
+        self.clusters = clusters
+        self.fitness_calculator = fitness_calculator
+        self.population_size = population_size
+        self.encoding = encoding or config.GA_GENE_ENCODING
+        self.loads = LoadTable(context['course_loads'], self.encoding)
+
+        workers = pool_workers(config.GA_CLUSTER_WORKERS if workers is None else workers)
+        self.workers = min(workers, len(clusters))
+
+    def run(self,
+            max_iterations: int,
+            progress: Optional[ProgressReporter] = None) -> Optional[Chromosome]:
+        """Составить кластеры параллельно, слить и отремонтировать аудитории"""
+        logger.info(
+            f"🧩 Cluster GA: {len(self.clusters)} clusters × {self.population_size}, "
+            f"{max_iterations} generations, {self.workers} workers"
+        )
+        if progress is not None:
+            progress.max_iterations = len(self.clusters)
+
+        results: Dict[int, Tuple[np.ndarray, float]] = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(
+                    _evolve_cluster,
+                    cluster_id,
+                    cluster,
+                    self.population_size,
+                    max_iterations,
+                    random.randrange(2 ** 63),
+                    self.fitness_calculator.engine,
+                    self.encoding
+                )
+                for cluster_id, cluster in enumerate(self.clusters)
+            ]
+            for future in as_completed(futures):
+                if cancellation.current() is not None and cancellation.current().cancelled:
+                    # Ещё не начатые кластеры не запускать
+                    for pending in futures:
+                        pending.cancel()
+                    cancellation.check()
+                cluster_id, genes, fitness, seconds = future.result()
+                if genes is None:
+                    raise RuntimeError(f"Cluster {cluster_id} produced no population")
+                results[cluster_id] = (genes, fitness)
+                profiling.record('cluster_ga', seconds)
+                logger.info(
+                    f"✅ Cluster {cluster_id}: fitness {fitness:.0f}, "
+                    f"{len(self.clusters[cluster_id]['course_loads'])} loads, {seconds:.1f}s "
+                    f"({len(results)}/{len(self.clusters)})"
+                )
+                if progress is not None:
+                    progress.report(
+                        iteration=len(results),
+                        current_score=sum(f for _, f in results.values()),
+                        phase='cluster',
+                        phase_timings={'cluster': seconds},
+                        reasoning=f"Cluster {cluster_id} done"
+                    )
+
+        with profiling.phase('cluster_merge'):
+            merged = self._merge(results)
+            self._repair_classrooms(merged)
+
+        if progress is not None:
+            progress.flush()
+        return merged
+
+    def _merge(self, results: Dict[int, Tuple[np.ndarray, float]]) -> Chromosome:
+        """Гены кластеров -> одна хромосома над общей LoadTable (индексы нагрузок пересчитываются)"""
+        parts = []
+        for cluster_id, cluster in enumerate(self.clusters):
+            genes = results[cluster_id][0].copy()
+            positions = np.asarray(cluster['load_positions'], dtype=genes.dtype)
+            genes[GENE_LOAD] = positions[genes[GENE_LOAD]]
+            parts.append(genes)
+        return Chromosome(self.loads, np.concatenate(parts, axis=1))
+
+    def _repair_classrooms(self, chromosome: Chromosome):
+        """Конфликты общих аудиторий: Stage 2 по слитому расписанию (на месте)"""
+        self.fitness_calculator.calculate(chromosome)
+        before = chromosome.hard_violations
+
+        # Аудитории назначаются по неделям: шаблон разворачивается
+        expanded = chromosome.expand()
+        schedule = expanded.to_schedule_dict()
+        ClassroomAssigner(self.context['classrooms'], self.context['course_loads']).assign(schedule)
+        expanded.genes[GENE_CLASSROOM] = [lesson['classroom_id'] or 0 for lesson in schedule]
+
+        if expanded is not chromosome:
+            chromosome.loads, chromosome.genes = expanded.loads, expanded.genes
+        self.fitness_calculator.calculate(chromosome)
+        logger.info(
+            f"🔧 Merged {len(self.clusters)} clusters: hard violations "
+            f"{before} -> {chromosome.hard_violations} after classroom repair, "
+            f"fitness {chromosome.fitness:.0f}"
+        )
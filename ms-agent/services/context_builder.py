@@ -7,6 +7,8 @@ from typing import Dict, List, Any, Optional
 from rpc_clients.core_client import get_core_client
 from db.connection import db
 from db.queries import course_loads as load_queries
+from utils.preference_matrix import PreferenceMatrix
+from utils.chromosome import week_mask
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +32,8 @@ class ScheduleContextBuilder:
                 'teacher_preferences': Dict,  # из ms-core
                 'classrooms': List[Dict],     # из ms-audit
                 'teachers': Dict,             # из ms-core
-                'groups': Dict                # из ms-core
+                'groups': Dict,               # из ms-core
+                'preference_matrix': PreferenceMatrix  # скомпилированные предпочтения
             }
         """
         logger.info(f"Building context for semester {semester}, year {academic_year}")
@@ -87,6 +90,9 @@ class ScheduleContextBuilder:
                 'preferences': pref_set.get('preferences', [])
             }
         
+        # Скомпилировать предпочтения один раз: преподаватели × дни × пары
+        context['preference_matrix'] = PreferenceMatrix(context['teacher_preferences'])
+        
         # 3. Получить аудитории (пока из БД, потом можно через ms-audit)
         # TODO: получить через ms-audit gRPC
         classrooms = db.execute_query(
@@ -136,4 +142,95 @@ class ScheduleContextBuilder:
         )
         
         return context
+    
+    @staticmethod
+    def decompose(context: Dict[str, Any], max_clusters: int) -> List[Dict[str, Any]]:
+        """
+        Разбить контекст на независимые кластеры нагрузок
+        
+        Нагрузки связаны только общими преподавателями и группами (и общим
+        фондом аудиторий): компоненты связности графа преподаватель-группа
+        можно составлять параллельно, конфликты преподавателей и групп между
+        кластерами невозможны. Компоненты раскладываются не более чем в
+        max_clusters кластеров, сбалансированных по числу занятий
+        (крупные - первыми, в наименее загруженный кластер).
+        
+        Returns:
+            Контексты кластеров (аудитории общие, 'load_positions' - индексы
+            нагрузок кластера в context['course_loads']). Одна компонента
+            или max_clusters <= 1 - [context].
+        """
+        course_loads = context['course_loads']
+        if max_clusters <= 1 or len(course_loads) < 2:
+            return [context]
+        
+        # Union-find по вершинам ('t', teacher_id) / ('g', group_id)
+        parent: Dict[Any, Any] = {}
+        
+        def find(node):
+            root = node
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while node != root:
+                parent[node], node = root, parent[node]
+            return root
+        
+        for load in course_loads:
+            teacher, group = find(('t', load.get('teacher_id'))), find(('g', load.get('group_id')))
+            if teacher != group:
+                parent[teacher] = group
+        
+        components: Dict[Any, List[int]] = {}
+        for position, load in enumerate(course_loads):
+            components.setdefault(find(('g', load.get('group_id'))), []).append(position)
+        
+        if len(components) <= 1:
+            return [context]
+        
+        def lessons(positions: List[int]) -> int:
+            return sum(
+                (course_loads[p].get('lessons_per_week') or 1)
+                * week_mask(course_loads[p].get('week_type')).bit_count()
+                for p in positions
+            )
+        
+        # Жадная балансировка: компонента -> наименее загруженный кластер
+        bins: List[List[int]] = [[] for _ in range(min(max_clusters, len(components)))]
+        sizes = [0] * len(bins)
+        for positions in sorted(components.values(), key=lessons, reverse=True):
+            target = sizes.index(min(sizes))
+            bins[target].extend(positions)
+            sizes[target] += lessons(positions)
+        
+        clusters = []
+        for positions in bins:
+            positions.sort()
+            loads = [course_loads[p] for p in positions]
+            teacher_ids = {load.get('teacher_id') for load in loads}
+            group_ids = {load.get('group_id') for load in loads}
+            teacher_preferences = {
+                teacher_id: prefs for teacher_id, prefs in context['teacher_preferences'].items()
+                if teacher_id in teacher_ids
+            }
+            clusters.append({
+                'course_loads': loads,
+                'teacher_preferences': teacher_preferences,
+                'classrooms': context['classrooms'],
+                'teachers': {
+                    teacher_id: info for teacher_id, info in context.get('teachers', {}).items()
+                    if teacher_id in teacher_ids
+                },
+                'groups': {
+                    group_id: info for group_id, info in context.get('groups', {}).items()
+                    if group_id in group_ids
+                },
+                'preference_matrix': PreferenceMatrix(teacher_preferences),
+                'load_positions': positions
+            })
+        
+        logger.info(
+            f"🧩 Decomposed {len(course_loads)} loads: {len(components)} independent components "
+            f"-> {len(clusters)} clusters (lessons per cluster: {sorted(sizes, reverse=True)})"
+        )
+        return clusters
 
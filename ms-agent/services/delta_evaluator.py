@@ -0,0 +1,602 @@
+"""
+Delta Evaluator
+Инкрементальная (дельта) оценка расписания для мутаций, swap и move
+
+Держит счётчики занятости по преподавателям, группам и аудиториям
+и списки слотов по дням. Перемещение k занятий пересчитывает только
+затронутые корзины (bucket) - O(k) вместо полного пересчёта.
+
+- ChromosomeDeltaEvaluator - правила FitnessCalculator (генетический алгоритм)
+- ScheduleDeltaEvaluator - правила services.fitness (инструменты Stage 1)
+"""
+import logging
+from typing import Dict, List, Optional, Tuple, Iterable, Any
+
+from utils.chromosome import Chromosome, GENE_DAY, GENE_SLOT, GENE_CLASSROOM
+from utils.classroom_types import is_lab_lesson
+from services.fitness_calculator import FitnessCalculator
+from services.fitness import TEACHER_PRIORITIES, GAP_PENALTIES, fitness_calculator
+
+logger = logging.getLogger(__name__)
+
+
+def _inc(counter: Dict, key, delta: int):
+    """Изменить счётчик, удаляя нулевые значения"""
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class ChromosomeDeltaEvaluator:
+    """
+    Инкрементальный fitness для Chromosome (правила FitnessCalculator)
+
+    Результат совпадает с FitnessCalculator.calculate для того же расписания.
+    """
+
+    # Индексы вектора статистики
+    T_CONFLICT, G_CONFLICT, R_CONFLICT = 0, 1, 2
+    CAPACITY, TYPE, AVAILABILITY = 3, 4, 5
+    MAX_STUDENT, MAX_TEACHER = 6, 7
+    PREF = 8                      # 8..11 - приоритеты 1..4
+    GAP_COUNT, COMPACT = 12, 13
+    UNEVEN, ROOM_CHANGE = 14, 15
+    EARLY, LATE, LOW_UTILIZATION = 16, 17, 18
+    STATS_SIZE = 19
+
+    def __init__(self, calculator: FitnessCalculator, chromosome: Chromosome):
+        self.calculator = calculator
+        self.chromosome = chromosome
+
+        loads = chromosome.loads
+        self._teacher = loads.teacher_ids
+        self._group = loads.group_ids
+        preferences = calculator.preferences
+        self._teacher_row = preferences.rows_for(loads.teacher_id_array).tolist()
+        self._group_size = [
+            (calculator.groups.get(g) or {}).get('size') or 0 for g in loads.group_ids
+        ]
+        self._is_lab = [is_lab_lesson(lesson_type) for lesson_type in loads.lesson_types]
+
+        self._rooms = {
+            int(room_id): (int(capacity), bool(not_lab))
+            for room_id, capacity, not_lab in zip(
+                calculator._room_ids, calculator._room_capacity, calculator._room_not_lab
+            )
+        }
+        self._pref_priority = preferences.priority.tolist()
+        self._unavailable = preferences.unavailable.tolist()
+        self._grid = preferences.GRID_SIZE
+
+        # Гены как списки Python (быстрый скалярный доступ)
+        self._load, self._day, self._slot, self._week, self._room = (
+            row.tolist() for row in chromosome.genes
+        )
+
+        # Счётчики занятости
+        self._teacher_slots: Dict[Tuple, int] = {}   # (t, d, s, w) -> count
+        self._group_slots: Dict[Tuple, int] = {}     # (g, d, s, w) -> count
+        self._room_slots: Dict[Tuple, int] = {}      # (r, d, s, w) -> count
+        self._group_days: Dict[Tuple, Dict] = {}     # (g, d, w) -> {slot: count}
+        self._teacher_days: Dict[Tuple, Dict] = {}   # (t, d, w) -> {slot: count}
+        self._teacher_day_rooms: Dict[Tuple, Dict] = {}  # (t, d, w) -> {room: count}
+        self._teacher_weeks: Dict[Tuple, Dict] = {}  # (t, w) -> {day: count}
+        self._room_usage: Dict[int, int] = {}        # room -> count
+
+        for i in range(len(self._load)):
+            self._place(i, +1)
+
+        self.stats = self._contribution(self._all_buckets(), range(len(self._load)))
+
+    # ============ Публичный API ============
+
+    @property
+    def fitness(self) -> float:
+        return self._fitness(self.stats)
+
+    @property
+    def hard_violations(self) -> int:
+        return sum(self.stats[:self.PREF])
+
+    def score_move(self, index: int, day: int, slot: int,
+                   classroom: Optional[int] = None) -> float:
+        """Дельта fitness при перемещении занятия (без применения)"""
+        return self._preview([(index, day, slot, classroom)])
+
+    def apply_move(self, index: int, day: int, slot: int,
+                   classroom: Optional[int] = None) -> float:
+        """Переместить занятие и обновить fitness за O(1)"""
+        return self._commit([(index, day, slot, classroom)])
+
+    def score_swap(self, index1: int, index2: int) -> float:
+        """Дельта fitness при обмене временных слотов двух занятий"""
+        return self._preview(self._swap_changes(index1, index2))
+
+    def apply_swap(self, index1: int, index2: int) -> float:
+        """Обменять временные слоты двух занятий"""
+        return self._commit(self._swap_changes(index1, index2))
+
+    def sync(self) -> Chromosome:
+        """Записать fitness и счётчики в хромосому (как FitnessCalculator)"""
+        chromosome = self.chromosome
+        stats = self.stats
+        chromosome.fitness = self.fitness
+        chromosome.conflicts_count = stats[self.T_CONFLICT] + stats[self.G_CONFLICT] + stats[self.R_CONFLICT]
+
+        hard_violations = self.hard_violations
+        chromosome.hard_violations = hard_violations
+        if hard_violations > 0:
+            return chromosome
+
+        chromosome.hard_violations = 0
+        chromosome.preference_violations = {p: stats[self.PREF + p - 1] for p in (1, 2, 3, 4)}
+        chromosome.gaps_count = stats[self.GAP_COUNT]
+        chromosome.early_lessons = stats[self.EARLY]
+        chromosome.late_lessons = stats[self.LATE]
+        return chromosome
+
+    # ============ Внутреннее ============
+
+    def _swap_changes(self, index1: int, index2: int) -> List[Tuple]:
+        return [
+            (index1, self._day[index2], self._slot[index2], None),
+            (index2, self._day[index1], self._slot[index1], None)
+        ]
+
+    def _fitness(self, stats: List[int]) -> float:
+        calc = self.calculator
+        hard_penalty = (
+            stats[self.T_CONFLICT] * calc.PENALTY_TEACHER_CONFLICT +
+            stats[self.G_CONFLICT] * calc.PENALTY_GROUP_CONFLICT +
+            stats[self.R_CONFLICT] * calc.PENALTY_CLASSROOM_CONFLICT +
+            stats[self.CAPACITY] * calc.PENALTY_CAPACITY_MISMATCH +
+            stats[self.TYPE] * calc.PENALTY_TYPE_MISMATCH +
+            stats[self.AVAILABILITY] * calc.PENALTY_TEACHER_UNAVAILABLE +
+            stats[self.MAX_STUDENT] * calc.PENALTY_MAX_LESSONS_STUDENT +
+            stats[self.MAX_TEACHER] * calc.PENALTY_MAX_LESSONS_TEACHER
+        )
+        if sum(stats[:self.PREF]) > 0:
+            return calc.BASE_FITNESS + hard_penalty
+
+        soft_penalty = sum(
+            stats[self.PREF + p - 1] * calc.PENALTY_PREFERENCE[p] for p in (1, 2, 3, 4)
+        )
+        soft_penalty += (
+            stats[self.GAP_COUNT] * calc.PENALTY_GAP +
+            stats[self.COMPACT] * calc.PENALTY_NON_COMPACT +
+            stats[self.UNEVEN] * calc.PENALTY_UNEVEN_LOAD +
+            stats[self.ROOM_CHANGE] * calc.PENALTY_CLASSROOM_CHANGE +
+            stats[self.EARLY] * calc.PENALTY_EARLY +
+            stats[self.LATE] * calc.PENALTY_LATE +
+            stats[self.LOW_UTILIZATION] * calc.PENALTY_LOW_UTILIZATION
+        )
+        return calc.BASE_FITNESS + hard_penalty + soft_penalty
+
+    def _place(self, i: int, sign: int):
+        """Добавить (+1) или убрать (-1) занятие из счётчиков"""
+        load = self._load[i]
+        t, g = self._teacher[load], self._group[load]
+        d, s, w, r = self._day[i], self._slot[i], self._week[i], self._room[i]
+
+        _inc(self._teacher_slots, (t, d, s, w), sign)
+        _inc(self._group_slots, (g, d, s, w), sign)
+        _inc(self._room_slots, (r, d, s, w), sign)
+        _inc(self._group_days.setdefault((g, d, w), {}), s, sign)
+        _inc(self._teacher_days.setdefault((t, d, w), {}), s, sign)
+        _inc(self._teacher_day_rooms.setdefault((t, d, w), {}), r, sign)
+        _inc(self._teacher_weeks.setdefault((t, w), {}), d, sign)
+        if r != 0:
+            _inc(self._room_usage, r, sign)
+
+    def _buckets(self, i: int, day: int, slot: int, room: int) -> List[Tuple]:
+        """Корзины занятия i при положении (day, slot, room)"""
+        load = self._load[i]
+        t, g, w = self._teacher[load], self._group[load], self._week[i]
+        return [
+            ('T', (t, day, slot, w)), ('G', (g, day, slot, w)), ('R', (room, day, slot, w)),
+            ('GD', (g, day, w)), ('TD', (t, day, w)), ('TW', (t, w)), ('U', room)
+        ]
+
+    def _all_buckets(self) -> Iterable[Tuple]:
+        for kind, storage in (
+            ('T', self._teacher_slots), ('G', self._group_slots), ('R', self._room_slots),
+            ('GD', self._group_days), ('TD', self._teacher_days),
+            ('TW', self._teacher_weeks), ('U', self._room_usage)
+        ):
+            for key in list(storage.keys()):
+                yield kind, key
+
+    def _contribution(self, buckets: Iterable[Tuple], lessons: Iterable[int]) -> List[int]:
+        """Вклад корзин и занятий в вектор статистики"""
+        stats = [0] * self.STATS_SIZE
+        calc = self.calculator
+
+        for kind, key in buckets:
+            if kind == 'T':
+                stats[self.T_CONFLICT] += max(self._teacher_slots.get(key, 0) - 1, 0)
+            elif kind == 'G':
+                stats[self.G_CONFLICT] += max(self._group_slots.get(key, 0) - 1, 0)
+            elif kind == 'R':
+                stats[self.R_CONFLICT] += max(self._room_slots.get(key, 0) - 1, 0)
+            elif kind == 'GD':
+                slots = sorted(self._group_days.get(key) or ())
+                if len(slots) > calc.MAX_LESSONS_PER_DAY:
+                    stats[self.MAX_STUDENT] += 1
+                for a, b in zip(slots, slots[1:]):
+                    gap = b - a - 1
+                    if gap > 0:
+                        stats[self.GAP_COUNT] += gap
+                        if gap > 1:
+                            stats[self.COMPACT] += gap
+            elif kind == 'TD':
+                if len(self._teacher_days.get(key) or ()) > calc.MAX_LESSONS_PER_DAY:
+                    stats[self.MAX_TEACHER] += 1
+                rooms = len(self._teacher_day_rooms.get(key) or ())
+                if rooms > 1:
+                    stats[self.ROOM_CHANGE] += rooms - 1
+            elif kind == 'TW':
+                days_load = self._teacher_weeks.get(key) or {}
+                if len(days_load) >= 2:
+                    spread = max(days_load.values()) - min(days_load.values())
+                    if spread > 2:
+                        stats[self.UNEVEN] += spread - 2
+            elif kind == 'U':
+                usage = self._room_usage.get(key, 0)
+                if usage and key in self._rooms and usage / calc.TOTAL_SLOTS < 0.1:
+                    stats[self.LOW_UTILIZATION] += 1
+
+        grid = self._grid
+        for i in lessons:
+            load = self._load[i]
+            d, s, r = self._day[i], self._slot[i], self._room[i]
+
+            room = self._rooms.get(r) if r != 0 else None
+            if room is not None:
+                capacity, not_lab = room
+                group_size = self._group_size[load]
+                if group_size and capacity < group_size:
+                    stats[self.CAPACITY] += 1
+                if not_lab and self._is_lab[load]:
+                    stats[self.TYPE] += 1
+
+            if 0 <= d < grid and 0 <= s < grid:
+                row = self._teacher_row[load]
+                if self._unavailable[row][d][s]:
+                    stats[self.AVAILABILITY] += 1
+                priority = self._pref_priority[row][d][s]
+                if priority:
+                    stats[self.PREF + priority - 1] += 1
+
+            if s == 1:
+                stats[self.EARLY] += 1
+            elif s == 6:
+                stats[self.LATE] += 1
+
+        return stats
+
+    def _set(self, changes: List[Tuple]) -> List[Tuple]:
+        """Применить изменения к счётчикам, вернуть обратные изменения"""
+        undo = []
+        for i, _, _, _ in changes:
+            undo.append((i, self._day[i], self._slot[i], self._room[i]))
+            self._place(i, -1)
+        for i, day, slot, classroom in changes:
+            self._day[i] = day
+            self._slot[i] = slot
+            if classroom is not None:
+                self._room[i] = classroom
+        for i, _, _, _ in changes:
+            self._place(i, +1)
+        return undo
+
+    def _delta_stats(self, changes: List[Tuple]) -> Tuple[List[int], List[Tuple]]:
+        """Новый вектор статистики: пересчёт только затронутых корзин"""
+        lessons = [i for i, _, _, _ in changes]
+        buckets = set()
+        for i, day, slot, classroom in changes:
+            room = self._room[i] if classroom is None else classroom
+            buckets.update(self._buckets(i, self._day[i], self._slot[i], self._room[i]))
+            buckets.update(self._buckets(i, day, slot, room))
+
+        before = self._contribution(buckets, lessons)
+        undo = self._set(changes)
+        after = self._contribution(buckets, lessons)
+        return [x + a - b for x, a, b in zip(self.stats, after, before)], undo
+
+    def _preview(self, changes: List[Tuple]) -> float:
+        new_stats, undo = self._delta_stats(changes)
+        self._set(undo)
+        return self._fitness(new_stats) - self._fitness(self.stats)
+
+    def _commit(self, changes: List[Tuple]) -> float:
+        old_fitness = self.fitness
+        self.stats, _ = self._delta_stats(changes)
+
+        genes = self.chromosome.genes
+        for i, _, _, _ in changes:
+            genes[GENE_DAY, i] = self._day[i]
+            genes[GENE_SLOT, i] = self._slot[i]
+            genes[GENE_CLASSROOM, i] = self._room[i]
+
+        return self.fitness - old_fitness
+
+
+class ScheduleDeltaEvaluator:
+    """
+    Инкрементальный скор для расписания-списка словарей (правила services.fitness)
+
+    Используется инструментами Stage 1 (swap / move) вместо полного пересчёта.
+    """
+
+    # Индексы вектора статистики
+    CONFLICTS, MAX_LESSONS, PREFERENCES, ISOLATED, GAPS, DISTRIBUTION = range(6)
+    STATS_SIZE = 6
+
+    MAX_LESSONS_PER_DAY = 4
+
+    def __init__(self, schedule: List[Dict], teacher_preferences: Dict):
+        self.schedule = schedule
+        self._index = {lesson.get('id'): i for i, lesson in enumerate(schedule)}
+
+        # Скомпилированные предпочтения (общие с services.fitness)
+        self._preferences = fitness_calculator.preference_matrix(teacher_preferences)
+
+        self._teacher_slots: Dict[Tuple, int] = {}   # (t, d, s) -> count
+        self._group_slots: Dict[Tuple, int] = {}     # (g, d, s) -> count
+        self._room_slots: Dict[Tuple, int] = {}      # (r, d, s) -> count
+        self._teacher_days: Dict[Tuple, Dict] = {}   # (t, d) -> {slot: count}
+        self._group_days: Dict[Tuple, Dict] = {}     # (g, d) -> {slot: count}
+        self._teacher_week: Dict[Any, Dict] = {}     # t -> {day: count}
+        self._group_week: Dict[Any, Dict] = {}       # g -> {day: count}
+
+        for i in range(len(schedule)):
+            self._place(i, +1)
+
+        all_buckets = [
+            (kind, key)
+            for kind, storage in (
+                ('T', self._teacher_slots), ('G', self._group_slots), ('R', self._room_slots),
+                ('TD', self._teacher_days), ('GD', self._group_days),
+                ('TW', self._teacher_week), ('GW', self._group_week)
+            )
+            for key in storage
+        ]
+        self.stats = self._contribution(all_buckets, range(len(schedule)))
+
+    # ============ Публичный API ============
+
+    @property
+    def score(self) -> int:
+        return self._score(self.stats)
+
+    @property
+    def conflicts(self) -> int:
+        return self.stats[self.CONFLICTS]
+
+    def index_of(self, lesson_id) -> Optional[int]:
+        """Позиция занятия по id (O(1) вместо линейного поиска)"""
+        return self._index.get(lesson_id)
+
+    def preview_move(self, index: int, day: int, slot: int) -> Dict[str, int]:
+        """Предпросмотр перемещения: дельта скора и конфликты после"""
+        return self._preview([(index, day, slot)])
+
+    def preview_swap(self, index1: int, index2: int) -> Dict[str, int]:
+        """Предпросмотр обмена временных слотов"""
+        return self._preview(self._swap_changes(index1, index2))
+
+    def is_free(self, index: int, day: int, slot: int, ignore: Optional[int] = None) -> bool:
+        """
+        Свободен ли слот для занятия index: преподаватель, группа и аудитория
+        не заняты (занятие ignore не учитывается - для swap)
+        """
+        lesson = self.schedule[index]
+        other = self.schedule[ignore] if ignore is not None else None
+        if other is not None and (other['day_of_week'], other['time_slot']) != (day, slot):
+            other = None
+
+        busy = self._teacher_slots.get((lesson['teacher_id'], day, slot), 0)
+        if other is not None and other['teacher_id'] == lesson['teacher_id']:
+            busy -= 1
+        if busy > 0:
+            return False
+
+        busy = self._group_slots.get((lesson['group_id'], day, slot), 0)
+        if other is not None and other['group_id'] == lesson['group_id']:
+            busy -= 1
+        if busy > 0:
+            return False
+
+        classroom_id = lesson.get('classroom_id')
+        if classroom_id:
+            busy = self._room_slots.get((classroom_id, day, slot), 0)
+            if other is not None and other.get('classroom_id') == classroom_id:
+                busy -= 1
+            if busy > 0:
+                return False
+        return True
+
+    def score_move(self, index: int, day: int, slot: int) -> int:
+        return self.preview_move(index, day, slot)['score_delta']
+
+    def score_swap(self, index1: int, index2: int) -> int:
+        return self.preview_swap(index1, index2)['score_delta']
+
+    def apply_move(self, index: int, day: int, slot: int) -> int:
+        old_score = self.score
+        self.stats = self._delta_stats([(index, day, slot)])
+        return self.score - old_score
+
+    def apply_swap(self, index1: int, index2: int) -> int:
+        old_score = self.score
+        self.stats = self._delta_stats(self._swap_changes(index1, index2))
+        return self.score - old_score
+
+    # ============ Внутреннее ============
+
+    @staticmethod
+    def _score(stats: List[int]) -> int:
+        return (
+            stats[0] * -10000 + stats[1] * -10000 + stats[2] +
+            stats[3] * -300 + stats[4] + stats[5]
+        )
+
+    def _swap_changes(self, index1: int, index2: int) -> List[Tuple]:
+        l1, l2 = self.schedule[index1], self.schedule[index2]
+        return [
+            (index1, l2['day_of_week'], l2['time_slot']),
+            (index2, l1['day_of_week'], l1['time_slot'])
+        ]
+
+    def _place(self, i: int, sign: int):
+        lesson = self.schedule[i]
+        t, g = lesson['teacher_id'], lesson['group_id']
+        d, s = lesson['day_of_week'], lesson['time_slot']
+
+        _inc(self._teacher_slots, (t, d, s), sign)
+        _inc(self._group_slots, (g, d, s), sign)
+        if lesson.get('classroom_id'):
+            _inc(self._room_slots, (lesson['classroom_id'], d, s), sign)
+        _inc(self._teacher_days.setdefault((t, d), {}), s, sign)
+        _inc(self._group_days.setdefault((g, d), {}), s, sign)
+        _inc(self._teacher_week.setdefault(t, {}), d, sign)
+        _inc(self._group_week.setdefault(g, {}), d, sign)
+
+    def _buckets(self, i: int) -> List[Tuple]:
+        lesson = self.schedule[i]
+        t, g = lesson['teacher_id'], lesson['group_id']
+        d, s = lesson['day_of_week'], lesson['time_slot']
+        buckets = [
+            ('T', (t, d, s)), ('G', (g, d, s)),
+            ('TD', (t, d)), ('GD', (g, d)), ('TW', t), ('GW', g)
+        ]
+        if lesson.get('classroom_id'):
+            buckets.append(('R', (lesson['classroom_id'], d, s)))
+        return buckets
+
+    @staticmethod
+    def _gaps_penalty(slots: Dict) -> int:
+        ordered = sorted(slots)
+        penalty = 0
+        for a, b in zip(ordered, ordered[1:]):
+            gap_size = b - a - 1
+            if gap_size > 0:
+                penalty += GAP_PENALTIES.get(min(gap_size, 3), GAP_PENALTIES[3])
+        return penalty
+
+    def _max_lessons(self, entity, day, slots: Dict) -> int:
+        if not entity or not day:
+            return 0
+        unique_slots = sum(1 for s in slots if s)
+        return 1 if unique_slots > self.MAX_LESSONS_PER_DAY else 0
+
+    @staticmethod
+    def _distribution_penalty(day_counts: Dict, single_day: int, strong: int, moderate: int) -> int:
+        """Штраф за неравномерность (как services.fitness)"""
+        total_lessons = sum(day_counts.values())
+        if total_lessons == 0:
+            return 0
+        ideal_per_day = total_lessons / 6.0
+        variance = 0
+        for day in range(1, 7):
+            variance += abs(day_counts.get(day, 0) - ideal_per_day)
+
+        max_day = max(day_counts.values())
+        min_day = min(day_counts.values())
+        if max_day > 0 and min_day == 0 and len(day_counts) == 1:
+            return single_day * total_lessons
+        if variance > ideal_per_day * 2:
+            return strong * int(variance)
+        if variance > ideal_per_day:
+            return moderate * int(variance)
+        return 0
+
+    def _contribution(self, buckets: Iterable[Tuple], lessons: Iterable[int]) -> List[int]:
+        stats = [0] * self.STATS_SIZE
+
+        for kind, key in buckets:
+            if kind == 'T':
+                stats[self.CONFLICTS] += max(self._teacher_slots.get(key, 0) - 1, 0)
+            elif kind == 'G':
+                stats[self.CONFLICTS] += max(self._group_slots.get(key, 0) - 1, 0)
+            elif kind == 'R':
+                stats[self.CONFLICTS] += max(self._room_slots.get(key, 0) - 1, 0)
+            elif kind in ('TD', 'GD'):
+                storage = self._teacher_days if kind == 'TD' else self._group_days
+                slots = storage.get(key) or {}
+                if not slots:
+                    continue
+                stats[self.MAX_LESSONS] += self._max_lessons(key[0], key[1], slots)
+                stats[self.GAPS] += self._gaps_penalty(slots)
+                if kind == 'TD' and sum(slots.values()) == 1:
+                    stats[self.ISOLATED] += 1
+            elif kind == 'TW':
+                stats[self.DISTRIBUTION] += self._distribution_penalty(
+                    self._teacher_week.get(key) or {}, -30, -15, -5
+                )
+            elif kind == 'GW':
+                stats[self.DISTRIBUTION] += self._distribution_penalty(
+                    self._group_week.get(key) or {}, -50, -20, -10
+                )
+
+        for i in lessons:
+            lesson = self.schedule[i]
+            if not self._preferences.is_preferred(
+                lesson['teacher_id'], lesson['day_of_week'], lesson['time_slot']
+            ):
+                priority = lesson.get('teacher_priority', 4)
+                stats[self.PREFERENCES] += TEACHER_PRIORITIES.get(priority, TEACHER_PRIORITIES[4])['penalty']
+
+        return stats
+
+    def _set(self, changes: List[Tuple]) -> List[Tuple]:
+        undo = []
+        for i, _, _ in changes:
+            lesson = self.schedule[i]
+            undo.append((i, lesson['day_of_week'], lesson['time_slot']))
+            self._place(i, -1)
+        for i, day, slot in changes:
+            self.schedule[i]['day_of_week'] = day
+            self.schedule[i]['time_slot'] = slot
+        for i, _, _ in changes:
+            self._place(i, +1)
+        return undo
+
+    def _delta_stats(self, changes: List[Tuple]) -> List[int]:
+        lessons = [i for i, _, _ in changes]
+        buckets = set()
+        for i in lessons:
+            buckets.update(self._buckets(i))
+        for i, day, slot in changes:
+            # Корзины нового положения
+            lesson = self.schedule[i]
+            t, g = lesson['teacher_id'], lesson['group_id']
+            buckets.update([
+                ('T', (t, day, slot)), ('G', (g, day, slot)),
+                ('TD', (t, day)), ('GD', (g, day))
+            ])
+            if lesson.get('classroom_id'):
+                buckets.add(('R', (lesson['classroom_id'], day, slot)))
+
+        # Дни не меняются - распределение по неделе (TW / GW) прежнее
+        if all(self.schedule[i]['day_of_week'] == day for i, day, _ in changes):
+            buckets = {bucket for bucket in buckets if bucket[0] not in ('TW', 'GW')}
+
+        before = self._contribution(buckets, lessons)
+        self._set(changes)
+        after = self._contribution(buckets, lessons)
+        return [s + a - b for s, a, b in zip(self.stats, after, before)]
+
+    def _preview(self, changes: List[Tuple]) -> Dict[str, int]:
+        old_score = self.score
+        lessons = [i for i, _, _ in changes]
+        undo = [(i, self.schedule[i]['day_of_week'], self.schedule[i]['time_slot']) for i in lessons]
+        new_stats = self._delta_stats(changes)
+        self._set(undo)
+        return {
+            'score_delta': self._score(new_stats) - old_score,
+            'score_after': self._score(new_stats),
+            'conflicts': new_stats[self.CONFLICTS]
+        }
@@ -3,9 +3,12 @@ Fitness Calculator
 Оценка качества расписания с учётом приоритетов преподавателей
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Union
 import logging
 
+from utils.preference_matrix import PreferenceMatrix
+from utils.load_catalog import lesson_names
+
 logger = logging.getLogger(__name__)
 
 # Приоритеты преподавателей (KEY FEATURE!)
@@ -28,7 +31,27 @@ class FitnessCalculator:
     """Вычисление fitness-функции расписания"""
     
     def __init__(self):
-        pass
+        # Последние скомпилированные предпочтения: (исходный словарь, матрица)
+        self._matrix_cache: Tuple[Any, PreferenceMatrix] = (None, None)
+    
+    def preference_matrix(
+        self,
+        teacher_preferences: Union[Dict, PreferenceMatrix]
+    ) -> PreferenceMatrix:
+        """
+        Скомпилировать предпочтения в PreferenceMatrix
+        
+        Кэшируется по идентичности словаря: Stage 1 передаёт один и тот же
+        словарь на всех итерациях, компиляция выполняется один раз.
+        """
+        if isinstance(teacher_preferences, PreferenceMatrix):
+            return teacher_preferences
+        
+        source, matrix = self._matrix_cache
+        if source is not teacher_preferences:
+            matrix = PreferenceMatrix(teacher_preferences)
+            self._matrix_cache = (teacher_preferences, matrix)
+        return matrix
     
     def calculate(
         self,
@@ -124,7 +147,7 @@ class FitnessCalculator:
                 conflicts.append({
                     'type': 'teacher',
                     'teacher_id': teacher_id,
-                    'teacher_name': lesson['teacher_name'],
+                    **lesson_names(lesson, ('teacher_name',)),
                     'day': lesson['day_of_week'],
                     'time': lesson['time_slot']
                 })
@@ -136,7 +159,7 @@ class FitnessCalculator:
                 conflicts.append({
                     'type': 'group',
                     'group_id': group_id,
-                    'group_name': lesson['group_name'],
+                    **lesson_names(lesson, ('group_name',)),
                     'day': lesson['day_of_week'],
                     'time': lesson['time_slot']
                 })
@@ -149,7 +172,7 @@ class FitnessCalculator:
                     conflicts.append({
                         'type': 'classroom',
                         'classroom_id': classroom_id,
-                        'classroom_name': lesson.get('classroom_name', ''),
+                        **({'classroom_name': lesson['classroom_name']} if lesson.get('classroom_name') else {}),
                         'day': lesson['day_of_week'],
                         'time': lesson['time_slot']
                     })
@@ -170,18 +193,14 @@ class FitnessCalculator:
         """
         violations = []
         total_penalty = 0
+        matrix = self.preference_matrix(preferences)
         
         for lesson in schedule:
             teacher_id = lesson['teacher_id']
-            teacher_prefs = preferences.get(teacher_id, [])
             
             # Проверить, есть ли предпочтение для этого слота
-            slot_key = (lesson['day_of_week'], lesson['time_slot'])
-            is_preferred = any(
-                p['day_of_week'] == slot_key[0] and 
-                p['time_slot'] == slot_key[1] and 
-                p['is_preferred']
-                for p in teacher_prefs
+            is_preferred = matrix.is_preferred(
+                teacher_id, lesson['day_of_week'], lesson['time_slot']
             )
             
             # Если НЕ предпочтительно, штраф по приоритету
@@ -192,7 +211,7 @@ class FitnessCalculator:
                 
                 violations.append({
                     'teacher_id': teacher_id,
-                    'teacher_name': lesson['teacher_name'],
+                    **lesson_names(lesson, ('teacher_name',)),
                     'priority': priority,
                     'priority_name': TEACHER_PRIORITIES[priority]['name'],
                     'day': lesson['day_of_week'],
@@ -224,12 +243,13 @@ class FitnessCalculator:
         # Найти дни с одной парой
         for (teacher_id, day), lessons in teacher_days.items():
             if len(lessons) == 1:
+                names = lesson_names(lessons[0], ('teacher_name', 'discipline_name'))
                 isolated.append({
                     'teacher_id': teacher_id,
-                    'teacher_name': lessons[0]['teacher_name'],
+                    **({'teacher_name': names['teacher_name']} if 'teacher_name' in names else {}),
                     'day': day,
                     'lesson_id': lessons[0].get('id'),
-                    'discipline': lessons[0]['discipline_name']
+                    **({'discipline': names['discipline_name']} if 'discipline_name' in names else {})
                 })
         
         return isolated
@@ -255,7 +275,7 @@ class FitnessCalculator:
                 if gap_size > 0:
                     gaps['teacher_gaps'].append({
                         'teacher_id': teacher_id,
-                        'teacher_name': lessons[0]['teacher_name'],
+                        **lesson_names(lessons[0], ('teacher_name',)),
                         'day': day,
                         'gap_size': gap_size,
                         'between': (time_slots[i], time_slots[i+1])
@@ -271,7 +291,7 @@ class FitnessCalculator:
                 if gap_size > 0:
                     gaps['group_gaps'].append({
                         'group_id': group_id,
-                        'group_name': lessons[0]['group_name'],
+                        **lesson_names(lessons[0], ('group_name',)),
                         'day': day,
                         'gap_size': gap_size,
                         'between': (time_slots[i], time_slots[i+1])
@@ -0,0 +1,126 @@
+"""
+Fitness Cache - мемоизация fitness для неизменённых хромосом
+
+Элита переносится в новое поколение без изменений и оценивается
+повторно (шаг 3.1, отбор валидных, после LLM-улучшений). Кэш хранит
+результат расчёта по хэшу генов (Chromosome.genome_hash) в LRU
+ограниченного размера, повторная оценка того же генома - запись полей.
+"""
+import logging
+from collections import OrderedDict
+from typing import Dict, Tuple, Any
+
+from utils.chromosome import Chromosome
+from utils.metrics import fitness_cache_lookups_total
+
+logger = logging.getLogger(__name__)
+
+
+def pack_result(chromosome: Chromosome) -> Tuple:
+    """Результат расчёта fitness хромосомы (для кэша и пула процессов)"""
+    return (
+        chromosome.fitness,
+        chromosome.conflicts_count,
+        chromosome.hard_violations,
+        chromosome.preference_violations,
+        chromosome.gaps_count,
+        chromosome.early_lessons,
+        chromosome.late_lessons
+    )
+
+
+def apply_result(chromosome: Chromosome, result: Tuple):
+    """Записать результат в хромосому (те же поля, что обновляет FitnessCalculator)"""
+    fitness, conflicts, hard, prefs, gaps, early, late = result
+    chromosome.fitness = fitness
+    chromosome.conflicts_count = conflicts
+    chromosome.hard_violations = hard
+    if hard > 0:
+        return
+    chromosome.preference_violations = dict(prefs)
+    chromosome.gaps_count = gaps
+    chromosome.early_lessons = early
+    chromosome.late_lessons = late
+
+
+class FitnessCache:
+    """
+    LRU: хэш генома -> результат расчёта fitness
+
+    max_size <= 0 - кэш выключен (lookup всегда промах, store ничего не хранит).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, chromosome: Chromosome) -> Tuple[Tuple, bool]:
+        """
+        Найти результат для генома хромосомы
+
+        Returns:
+            (key, hit): key - хэш генома для последующего store,
+            hit - результат уже записан в хромосому
+        """
+        key = chromosome.genome_hash()
+
+        # Хромосома уже оценена с этими генами (копия элиты и т.п.)
+        if chromosome.scored_hash == key:
+            self._count(hit=True)
+            return key, True
+
+        result = self._entries.get(key)
+        if result is None:
+            self._count(hit=False)
+            return key, False
+
+        self._entries.move_to_end(key)
+        apply_result(chromosome, result)
+        chromosome.scored_hash = key
+        self._count(hit=True)
+        return key, True
+
+    def store(self, key: Tuple, chromosome: Chromosome):
+        """Запомнить результат расчёта для генома key"""
+        chromosome.scored_hash = key
+        if not self.enabled:
+            return
+        self._entries[key] = pack_result(chromosome)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        fitness_cache_lookups_total.labels(result='hit' if hit else 'miss').inc()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
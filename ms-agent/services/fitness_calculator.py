@@ -6,7 +6,18 @@ Fitness Calculator для генетического алгоритма
 """
 import logging
 from typing import Dict, List, Optional
-from utils.chromosome import Chromosome, Lesson
+
+import numpy as np
+
+from config import config
+from utils.chromosome import (
+    Chromosome, Lesson, LoadTable,
+    GENE_LOAD, GENE_DAY, GENE_SLOT, GENE_WEEK, GENE_CLASSROOM,
+    WEEKS_IN_SEMESTER, ENCODING_WEEKLY
+)
+from utils.preference_matrix import PreferenceMatrix
+from utils.classroom_types import is_lab_classroom, is_lab_lesson
+from services.fitness_cache import FitnessCache
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +97,18 @@ class FitnessCalculator:
     
     MAX_LESSONS_PER_DAY = 4       # Максимум пар в день для студента и преподавателя
     
-    def __init__(self, teacher_preferences: Dict, classrooms: Optional[List[Dict]] = None, groups: Optional[Dict] = None):
+    TOTAL_SLOTS = 6 * 6 * 16      # 6 дней * 6 пар * 16 недель
+    
+    # Размер сетки (день, пара) в скомпилированных таблицах преподавателей
+    GRID_SIZE = PreferenceMatrix.GRID_SIZE
+    
+    ENGINE_VECTORIZED = 'vectorized'
+    ENGINE_REFERENCE = 'reference'
+    
+    def __init__(self, teacher_preferences: Dict, classrooms: Optional[List[Dict]] = None,
+                 groups: Optional[Dict] = None, engine: Optional[str] = None,
+                 preference_matrix: Optional[PreferenceMatrix] = None,
+                 cache_size: Optional[int] = None):
         """
         Args:
             teacher_preferences: {
@@ -115,19 +137,69 @@ class FitnessCalculator:
                     'building': Optional[str]
                 }
             }
+            engine: 'vectorized' (NumPy, по умолчанию) или 'reference'
+                (построчный Python). Оба движка дают одинаковый результат.
+            preference_matrix: скомпилированные предпочтения из build_context
+                (если не передана - компилируется из teacher_preferences)
+            cache_size: размер LRU кэша fitness по хэшу генома
+                (None - config.GA_FITNESS_CACHE_SIZE, 0 - без кэша)
         """
         self.teacher_preferences = teacher_preferences
         self.classrooms = {c['id']: c for c in (classrooms or [])}
         self.groups = groups or {}
+        self.engine = engine or config.FITNESS_ENGINE
+        
+        # Таблицы используются обоими движками и DeltaEvaluator
+        self.preferences = preference_matrix or PreferenceMatrix(
+            teacher_preferences, self.PENALTY_PREFERENCE
+        )
+        self._compile_classroom_tables()
+        
+        # Кэш массивов по нагрузкам (LoadTable общая для всей популяции)
+        self._load_arrays_owner: Optional[LoadTable] = None
+        self._load_arrays: Dict[str, np.ndarray] = {}
+        
+        self.cache = FitnessCache(
+            config.GA_FITNESS_CACHE_SIZE if cache_size is None else cache_size
+        )
     
     def calculate(self, chromosome: Chromosome) -> float:
+        """
+        Рассчитать fitness (неизменённый геном берётся из кэша)
+        
+        Хромосома, уже оценённая с теми же генами, и геном из LRU
+        не пересчитываются - в хромосому записывается сохранённый результат.
+        """
+        if not self.cache.enabled:
+            return self.evaluate(chromosome)
+        
+        key, hit = self.cache.lookup(chromosome)
+        if hit:
+            return chromosome.fitness
+        
+        fitness = self.evaluate(chromosome)
+        self.cache.store(key, chromosome)
+        return fitness
+    
+    def evaluate(self, chromosome: Chromosome) -> float:
+        """Рассчитать fitness выбранным движком (без кэша)"""
+        chromosome.hard_violations = 0
+        if chromosome.loads.is_template:
+            return self._calculate_template(chromosome)
+        if self.engine == self.ENGINE_VECTORIZED:
+            return self._calculate_vectorized(chromosome)
+        return self._calculate_reference(chromosome)
+    
+    def _calculate_reference(self, chromosome: Chromosome) -> float:
         """Рассчитать fitness согласно рекомендациям статьи"""
         
         fitness = self.BASE_FITNESS
+        # Занятия материализуются один раз на расчёт (не на каждую проверку)
+        lessons = chromosome.lessons
         
         # ========== 1. ЖЁСТКИЕ ОГРАНИЧЕНИЯ (HARD CONSTRAINTS) ==========
         # 1.1. Конфликты ресурсов во времени
-        conflicts = self._check_conflicts(chromosome.lessons)
+        conflicts = self._check_conflicts(lessons)
         chromosome.conflicts_count = conflicts['total']
         
         fitness += conflicts['teacher'] * self.PENALTY_TEACHER_CONFLICT
@@ -135,21 +207,21 @@ class FitnessCalculator:
         fitness += conflicts['classroom'] * self.PENALTY_CLASSROOM_CONFLICT
         
         # 1.2. Соответствие аудитории требованиям
-        capacity_violations = self._check_capacity_mismatch(chromosome.lessons)
+        capacity_violations = self._check_capacity_mismatch(lessons)
         fitness += capacity_violations * self.PENALTY_CAPACITY_MISMATCH
         
-        type_violations = self._check_classroom_type_mismatch(chromosome.lessons)
+        type_violations = self._check_classroom_type_mismatch(lessons)
         fitness += type_violations * self.PENALTY_TYPE_MISMATCH
         
         # 1.3. Доступность преподавателя
-        availability_violations = self._check_teacher_availability(chromosome.lessons)
+        availability_violations = self._check_teacher_availability(lessons)
         fitness += availability_violations * self.PENALTY_TEACHER_UNAVAILABLE
         
         # 1.4. Максимум 4 пары в день (ЗАКОН!)
-        max_lessons_student_violations = self._check_max_lessons_per_day_hard(chromosome.lessons, is_student=True)
+        max_lessons_student_violations = self._check_max_lessons_per_day_hard(lessons, is_student=True)
         fitness += max_lessons_student_violations * self.PENALTY_MAX_LESSONS_STUDENT
         
-        max_lessons_teacher_violations = self._check_max_lessons_per_day_hard(chromosome.lessons, is_student=False)
+        max_lessons_teacher_violations = self._check_max_lessons_per_day_hard(lessons, is_student=False)
         fitness += max_lessons_teacher_violations * self.PENALTY_MAX_LESSONS_TEACHER
         
         # Если есть жесткие нарушения - низкий fitness
@@ -165,34 +237,34 @@ class FitnessCalculator:
         
         # ========== 2. МЯГКИЕ ОГРАНИЧЕНИЯ (SOFT CONSTRAINTS) ==========
         # 2.1. НАРУШЕНИЯ ПРЕДПОЧТЕНИЙ ⭐ ГЛАВНАЯ ОПТИМИЗАЦИЯ
-        pref_violations = self._calculate_preference_violations(chromosome.lessons)
+        pref_violations = self._calculate_preference_violations(lessons)
         chromosome.preference_violations = pref_violations
         
         for priority, count in pref_violations.items():
             fitness += count * self.PENALTY_PREFERENCE[priority]
         
         # 2.2. ДЛЯ СТУДЕНТОВ
-        gaps_penalty = self._calculate_gaps_penalty(chromosome.lessons)
+        gaps_penalty = self._calculate_gaps_penalty(lessons)
         chromosome.gaps_count = gaps_penalty['count']
         fitness += gaps_penalty['penalty']
         
-        compactness_penalty = self._calculate_compactness_penalty(chromosome.lessons)
+        compactness_penalty = self._calculate_compactness_penalty(lessons)
         fitness += compactness_penalty
         
         # 2.3. ДЛЯ ПРЕПОДАВАТЕЛЕЙ
-        uneven_load_penalty = self._calculate_uneven_load_penalty(chromosome.lessons)
+        uneven_load_penalty = self._calculate_uneven_load_penalty(lessons)
         fitness += uneven_load_penalty
         
-        classroom_change_penalty = self._calculate_classroom_change_penalty(chromosome.lessons)
+        classroom_change_penalty = self._calculate_classroom_change_penalty(lessons)
         fitness += classroom_change_penalty
         
         # 2.4. ОБЩИЕ
-        time_penalty = self._calculate_time_penalty(chromosome.lessons)
+        time_penalty = self._calculate_time_penalty(lessons)
         chromosome.early_lessons = time_penalty['early']
         chromosome.late_lessons = time_penalty['late']
         fitness += time_penalty['penalty']
         
-        utilization_penalty = self._calculate_utilization_penalty(chromosome.lessons)
+        utilization_penalty = self._calculate_utilization_penalty(lessons)
         fitness += utilization_penalty
         
         chromosome.fitness = fitness
@@ -260,24 +332,11 @@ class FitnessCalculator:
         violations = {1: 0, 2: 0, 3: 0, 4: 0}
         
         for lesson in lessons:
-            teacher_id = lesson.teacher_id
-            
-            if teacher_id not in self.teacher_preferences:
-                continue
-            
-            teacher_info = self.teacher_preferences[teacher_id]
-            priority = teacher_info.get('priority', 4)
-            
-            # Проверить предпочтение для этого слота
-            preference = None
-            for pref in teacher_info.get('preferences', []):
-                if pref.get('day_of_week') == lesson.day and \
-                   pref.get('time_slot') == lesson.slot:
-                    preference = pref
-                    break
-            
-            # Если есть предпочтение и оно negative
-            if preference and not preference.get('is_preferred', True):
+            # Приоритет нарушенного (negative) предпочтения для слота
+            priority = self.preferences.violation_priority(
+                lesson.teacher_id, lesson.day, lesson.slot
+            )
+            if priority:
                 violations[priority] += 1
         
         return violations
@@ -365,14 +424,7 @@ class FitnessCalculator:
         """
         violations = 0
         
-        # Маппинг типов занятий на типы аудиторий
-        lesson_type_to_classroom_type = {
-            'Лабораторная': ['LAB', 'Лаборатория', 'LABORATORY'],
-            'Лекция': ['LECTURE', 'Лекционная', 'AUDITORIUM'],
-            'Практика': ['PRACTICE', 'Практическая', 'SEMINAR'],
-            'Семинар': ['SEMINAR', 'Семинарская', 'PRACTICE']
-        }
-        
+        # Строгое требование только у лабораторных (utils.classroom_types - общее со Stage 2)
         for lesson in lessons:
             if lesson.classroom_id == 0:
                 continue
@@ -381,19 +433,12 @@ class FitnessCalculator:
             if not classroom:
                 continue
             
-            lesson_type = lesson.lesson_type or ''
-            classroom_type = (classroom.get('classroom_type') or '').upper()
-            
-            # Проверить соответствие типа
-            required_types = lesson_type_to_classroom_type.get(lesson_type, [])
-            if required_types and not any(rt in classroom_type for rt in required_types):
-                # Для лабораторных - строгое требование
-                if lesson_type == 'Лабораторная':
-                    violations += 1
-                    logger.debug(
-                        f"Type mismatch: {lesson_type} requires LAB, "
-                        f"but got {classroom_type}"
-                    )
+            if is_lab_lesson(lesson.lesson_type) and not is_lab_classroom(classroom):
+                violations += 1
+                logger.debug(
+                    f"Type mismatch: {lesson.lesson_type} requires LAB, "
+                    f"but got {classroom.get('classroom_type')}"
+                )
         
         return violations
     
@@ -405,32 +450,14 @@ class FitnessCalculator:
         """
         violations = 0
         
+        # Календарь доступности {day: {slot: bool}} скомпилирован в PreferenceMatrix
         for lesson in lessons:
-            teacher_id = lesson.teacher_id
-            if teacher_id not in self.teacher_preferences:
-                continue
-            
-            teacher_info = self.teacher_preferences[teacher_id]
-            availability = teacher_info.get('availability')
-            
-            if not availability:
-                continue  # Нет данных о доступности - пропускаем
-            
-            # Проверить доступность для дня и времени
-            day = lesson.day
-            slot = lesson.slot
-            
-            # Формат availability: {day: {slot: bool}}
-            if isinstance(availability, dict):
-                day_availability = availability.get(day, {})
-                if isinstance(day_availability, dict):
-                    is_available = day_availability.get(slot, True)
-                    if not is_available:
-                        violations += 1
-                        logger.debug(
-                            f"Teacher {teacher_id} unavailable "
-                            f"on day {day}, slot {slot}"
-                        )
+            if self.preferences.is_unavailable(lesson.teacher_id, lesson.day, lesson.slot):
+                violations += 1
+                logger.debug(
+                    f"Teacher {lesson.teacher_id} unavailable "
+                    f"on day {lesson.day}, slot {lesson.slot}"
+                )
         
         return violations
     
@@ -587,7 +614,7 @@ class FitnessCalculator:
         
         # Подсчитать использование каждой аудитории
         classroom_usage = {}
-        total_slots = 6 * 6 * 16  # 6 дней * 6 пар * 16 недель
+        total_slots = self.TOTAL_SLOTS
         
         for lesson in lessons:
             if lesson.classroom_id == 0:
@@ -608,3 +635,341 @@ class FitnessCalculator:
         
         return penalty
 
+
+    # ============ ВЕКТОРНЫЙ ДВИЖОК (NumPy) ============
+    
+    def _compile_classroom_tables(self):
+        """Отсортированные id аудиторий + вместимость и признак 'не лаборатория'"""
+        room_ids = sorted(self.classrooms.keys())
+        self._room_ids = np.array(room_ids, dtype=np.int64)
+        self._room_capacity = np.array(
+            [self.classrooms[rid].get('capacity') or 0 for rid in room_ids],
+            dtype=np.int64
+        )
+        self._room_not_lab = np.array(
+            [not is_lab_classroom(self.classrooms[rid]) for rid in room_ids],
+            dtype=bool
+        )
+    
+    def _room_lookup(self, room_values: np.ndarray):
+        """(известна, вместимость, не лаборатория) для отсортированных id аудиторий"""
+        if len(self._room_ids) == 0:
+            return (
+                np.zeros(len(room_values), dtype=bool),
+                np.zeros(len(room_values), dtype=np.int64),
+                np.zeros(len(room_values), dtype=bool)
+            )
+        pos = np.minimum(np.searchsorted(self._room_ids, room_values), len(self._room_ids) - 1)
+        room_known = (self._room_ids[pos] == room_values) & (room_values != 0)
+        return room_known, self._room_capacity[pos], self._room_not_lab[pos]
+    
+    def _get_load_arrays(self, loads: LoadTable) -> Dict[str, np.ndarray]:
+        """Массивы по индексу нагрузки (кэшируются для LoadTable)"""
+        if self._load_arrays_owner is loads:
+            return self._load_arrays
+        
+        teacher_ids = loads.teacher_id_array
+        group_ids = loads.group_id_array
+        
+        self._load_arrays = {
+            # Плотные индексы для построения ключей
+            'teacher': np.unique(teacher_ids, return_inverse=True)[1].reshape(-1).astype(np.int64),
+            'group': np.unique(group_ids, return_inverse=True)[1].reshape(-1).astype(np.int64),
+            # Строка в таблицах предпочтений
+            'teacher_row': self.preferences.rows_for(teacher_ids),
+            'group_size': np.array(
+                [(self.groups.get(gid) or {}).get('size') or 0 for gid in loads.group_ids],
+                dtype=np.int64
+            ),
+            'is_lab': np.array(
+                [is_lab_lesson(lesson_type) for lesson_type in loads.lesson_types],
+                dtype=bool
+            )
+        }
+        self._load_arrays_owner = loads
+        return self._load_arrays
+    
+    @staticmethod
+    def _run_lengths(sorted_keys: np.ndarray) -> np.ndarray:
+        """Длины серий одинаковых значений в отсортированном массиве"""
+        if len(sorted_keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        return np.diff(np.concatenate((starts, [len(sorted_keys)])))
+    
+    @staticmethod
+    def _unique_keys(keys: np.ndarray) -> np.ndarray:
+        """
+        Отсортированные уникальные ключи
+        
+        Сортировка на месте + отбор первых в сериях: np.unique в NumPy 2
+        для массива без return_* идёт через хэш-таблицу, на десятках тысяч
+        int64-ключей это в несколько раз медленнее сортировки.
+        """
+        keys.sort()
+        if len(keys) == 0:
+            return keys
+        first = np.empty(len(keys), dtype=bool)
+        first[0] = True
+        np.not_equal(keys[1:], keys[:-1], out=first[1:])
+        return keys[first]
+    
+    def _calculate_vectorized(self, chromosome: Chromosome) -> float:
+        """
+        Векторный расчёт fitness
+        
+        Все проверки сводятся к сортировке/подсчёту ключей
+        (сущность, день, неделя, пара) в int64. Результат и счётчики
+        совпадают с _calculate_reference.
+        """
+        genes = chromosome.genes
+        if len(chromosome) == 0 or genes[GENE_DAY:GENE_WEEK + 1].min() < 0:
+            return self._calculate_reference(chromosome)
+        
+        arrays = self._get_load_arrays(chromosome.loads)
+        load_idx = genes[GENE_LOAD]
+        day = genes[GENE_DAY].astype(np.int64)
+        slot = genes[GENE_SLOT].astype(np.int64)
+        week = genes[GENE_WEEK].astype(np.int64)
+        room = genes[GENE_CLASSROOM].astype(np.int64)
+        
+        n_lessons = len(day)
+        n_days = int(day.max()) + 1
+        n_slots = int(slot.max()) + 1
+        n_weeks = int(week.max()) + 1
+        n_time = n_days * n_weeks * n_slots
+        
+        teacher = arrays['teacher'][load_idx]
+        group = arrays['group'][load_idx]
+        room_values, room_dense, room_counts = np.unique(
+            room, return_inverse=True, return_counts=True
+        )
+        room_dense = room_dense.reshape(-1)
+        
+        # Ключ времени: (день, неделя, пара), пара - младший разряд
+        time_key = (day * n_weeks + week) * n_slots + slot
+        teacher_slots = self._unique_keys(teacher * n_time + time_key)
+        group_slots = self._unique_keys(group * n_time + time_key)
+        room_slots = self._unique_keys(room_dense * n_time + time_key)
+        
+        fitness = self.BASE_FITNESS
+        
+        # ========== 1. ЖЁСТКИЕ ОГРАНИЧЕНИЯ ==========
+        # 1.1. Конфликты = повторные вхождения ключа
+        teacher_conflicts = n_lessons - len(teacher_slots)
+        group_conflicts = n_lessons - len(group_slots)
+        classroom_conflicts = n_lessons - len(room_slots)
+        conflicts_total = teacher_conflicts + group_conflicts + classroom_conflicts
+        chromosome.conflicts_count = conflicts_total
+        
+        fitness += teacher_conflicts * self.PENALTY_TEACHER_CONFLICT
+        fitness += group_conflicts * self.PENALTY_GROUP_CONFLICT
+        fitness += classroom_conflicts * self.PENALTY_CLASSROOM_CONFLICT
+        
+        # 1.2. Соответствие аудитории (по уникальным аудиториям)
+        room_known, room_capacity, room_not_lab = self._room_lookup(room_values)
+        
+        lesson_room_known = room_known[room_dense]
+        group_size = arrays['group_size'][load_idx]
+        capacity_violations = int(np.count_nonzero(
+            lesson_room_known & (group_size > 0) & (room_capacity[room_dense] < group_size)
+        ))
+        fitness += capacity_violations * self.PENALTY_CAPACITY_MISMATCH
+        
+        type_violations = int(np.count_nonzero(
+            lesson_room_known & arrays['is_lab'][load_idx] & room_not_lab[room_dense]
+        ))
+        fitness += type_violations * self.PENALTY_TYPE_MISMATCH
+        
+        # 1.3. Доступность преподавателя
+        grid = self.GRID_SIZE
+        in_grid = (day < grid) & (slot < grid)
+        teacher_row = arrays['teacher_row'][load_idx]
+        grid_day = np.where(in_grid, day, 0)
+        grid_slot = np.where(in_grid, slot, 0)
+        
+        availability_violations = int(np.count_nonzero(
+            self.preferences.unavailable[teacher_row, grid_day, grid_slot] & in_grid
+        ))
+        fitness += availability_violations * self.PENALTY_TEACHER_UNAVAILABLE
+        
+        # 1.4. Максимум 4 пары в день: серии (сущность, день, неделя) среди уникальных слотов
+        max_lessons_student_violations = int(np.count_nonzero(
+            self._run_lengths(group_slots // n_slots) > self.MAX_LESSONS_PER_DAY
+        ))
+        fitness += max_lessons_student_violations * self.PENALTY_MAX_LESSONS_STUDENT
+        
+        max_lessons_teacher_violations = int(np.count_nonzero(
+            self._run_lengths(teacher_slots // n_slots) > self.MAX_LESSONS_PER_DAY
+        ))
+        fitness += max_lessons_teacher_violations * self.PENALTY_MAX_LESSONS_TEACHER
+        
+        hard_violations = (
+            conflicts_total + capacity_violations +
+            type_violations + availability_violations +
+            max_lessons_student_violations + max_lessons_teacher_violations
+        )
+        if hard_violations > 0:
+            chromosome.fitness = fitness
+            chromosome.hard_violations = hard_violations
+            return fitness
+        
+        # ========== 2. МЯГКИЕ ОГРАНИЧЕНИЯ ==========
+        # 2.1. Предпочтения: один gather по скомпилированной таблице
+        priorities = self.preferences.priority[teacher_row, grid_day, grid_slot]
+        priority_counts = np.bincount(priorities[in_grid], minlength=5)
+        pref_violations = {p: int(priority_counts[p]) for p in (1, 2, 3, 4)}
+        chromosome.preference_violations = pref_violations
+        
+        for priority, count in pref_violations.items():
+            fitness += count * self.PENALTY_PREFERENCE[priority]
+        
+        # 2.2. Окна и компактность: разности соседних уникальных слотов группы за день
+        group_day = group_slots // n_slots
+        same_day = group_day[1:] == group_day[:-1]
+        gaps = (np.diff(group_slots % n_slots) - 1)[same_day]
+        gaps = gaps[gaps > 0]
+        
+        gaps_count = int(gaps.sum())
+        chromosome.gaps_count = gaps_count
+        fitness += gaps_count * self.PENALTY_GAP
+        
+        fitness += int(gaps[gaps > 1].sum()) * self.PENALTY_NON_COMPACT
+        
+        # 2.3. Неравномерная нагрузка: пары по (преподаватель, неделя, день)
+        teacher_week_day, day_loads = np.unique(
+            (teacher * n_weeks + week) * n_days + day, return_counts=True
+        )
+        teacher_week = teacher_week_day // n_days
+        starts = np.concatenate(([0], np.flatnonzero(teacher_week[1:] != teacher_week[:-1]) + 1))
+        days_in_week = np.diff(np.concatenate((starts, [len(teacher_week)])))
+        spread = np.maximum.reduceat(day_loads, starts) - np.minimum.reduceat(day_loads, starts)
+        uneven = spread[(days_in_week >= 2) & (spread > 2)] - 2
+        fitness += int(uneven.sum()) * self.PENALTY_UNEVEN_LOAD
+        
+        # Смена аудиторий: уникальные (преподаватель, день, неделя, аудитория)
+        teacher_day = teacher_slots // n_slots
+        teacher_day_all = (teacher * n_time + time_key) // n_slots
+        n_rooms = len(room_values)
+        teacher_day_rooms = len(self._unique_keys(teacher_day_all * n_rooms + room_dense))
+        teacher_days = len(self._run_lengths(teacher_day))  # teacher_slots отсортированы
+        fitness += (teacher_day_rooms - teacher_days) * self.PENALTY_CLASSROOM_CHANGE
+        
+        # 2.4. Время
+        early = int(np.count_nonzero(slot == 1))
+        late = int(np.count_nonzero(slot == 6))
+        chromosome.early_lessons = early
+        chromosome.late_lessons = late
+        fitness += early * self.PENALTY_EARLY + late * self.PENALTY_LATE
+        
+        # Утилизация: используемые аудитории из справочника с загрузкой < 10%
+        low_utilization = room_known & (room_counts / self.TOTAL_SLOTS < 0.1)
+        fitness += int(np.count_nonzero(low_utilization)) * self.PENALTY_LOW_UTILIZATION
+        
+        chromosome.fitness = fitness
+        return fitness
+    
+    # ============ НЕДЕЛЬНЫЙ ШАБЛОН (маски недель) ============
+    
+    def _calculate_template(self, chromosome: Chromosome) -> float:
+        """
+        Fitness недельного шаблона без разворачивания на 16 недель
+        
+        Недели с одинаковым набором активных генов образуют класс
+        (для масок "все недели" класс один, для числителя/знаменателя - два).
+        Все штрафы, кроме утилизации аудиторий, считаются внутри недели,
+        поэтому каждый класс оценивается как одна неделя и берётся с весом
+        = числу его недель. Утилизация пересчитывается по семестру.
+        Результат и счётчики совпадают с расчётом по expand().
+        """
+        if self.engine != self.ENGINE_VECTORIZED or len(chromosome) == 0:
+            expanded = chromosome.expand()
+            self._calculate_reference(expanded)
+            return self._apply_expanded_result(chromosome, expanded)
+        
+        genes = chromosome.genes
+        week_loads = chromosome.loads.with_encoding(ENCODING_WEEKLY)
+        
+        masks = genes[GENE_WEEK].astype(np.int64)
+        active = ((masks[:, None] >> np.arange(WEEKS_IN_SEMESTER)) & 1).astype(bool)
+        
+        # Классы недель: одинаковые столбцы active
+        _, class_weeks, class_sizes = np.unique(
+            np.packbits(active, axis=0).T, axis=0, return_index=True, return_counts=True
+        )
+        
+        room_values, room_dense = np.unique(genes[GENE_CLASSROOM], return_inverse=True)
+        room_dense = room_dense.reshape(-1)
+        room_known = self._room_lookup(room_values.astype(np.int64))[0]
+        room_usage = np.zeros(len(room_values), dtype=np.int64)
+        
+        hard_penalty = 0
+        soft_penalty = 0
+        conflicts_total = 0
+        hard_violations = 0
+        pref_violations = {1: 0, 2: 0, 3: 0, 4: 0}
+        gaps_count = early = late = 0
+        
+        for week_idx, weight in zip(class_weeks.tolist(), class_sizes.tolist()):
+            in_week = active[:, week_idx]
+            if not in_week.any():
+                continue
+            
+            week_genes = genes[:, in_week]
+            week_genes[GENE_WEEK] = 1
+            week = Chromosome(week_loads, week_genes)
+            penalty = self._calculate_vectorized(week) - self.BASE_FITNESS
+            
+            conflicts_total += weight * week.conflicts_count
+            if week.hard_violations > 0:
+                hard_violations += weight * week.hard_violations
+                hard_penalty += weight * penalty
+                continue
+            
+            # Утилизация внутри одной недели не имеет смысла - убрать, учесть ниже
+            usage = np.bincount(room_dense[in_week], minlength=len(room_values))
+            room_usage += weight * usage
+            low_in_week = room_known & (usage > 0) & (usage / self.TOTAL_SLOTS < 0.1)
+            penalty -= int(np.count_nonzero(low_in_week)) * self.PENALTY_LOW_UTILIZATION
+            
+            soft_penalty += weight * penalty
+            for priority, count in week.preference_violations.items():
+                pref_violations[priority] += weight * count
+            gaps_count += weight * week.gaps_count
+            early += weight * week.early_lessons
+            late += weight * week.late_lessons
+        
+        chromosome.conflicts_count = conflicts_total
+        
+        if hard_violations > 0:
+            fitness = self.BASE_FITNESS + hard_penalty
+            chromosome.fitness = fitness
+            chromosome.hard_violations = hard_violations
+            return fitness
+        
+        # Утилизация за семестр: используемые аудитории из справочника с загрузкой < 10%
+        low_utilization = room_known & (room_usage > 0) & (room_usage / self.TOTAL_SLOTS < 0.1)
+        soft_penalty += int(np.count_nonzero(low_utilization)) * self.PENALTY_LOW_UTILIZATION
+        
+        fitness = self.BASE_FITNESS + soft_penalty
+        chromosome.fitness = fitness
+        chromosome.preference_violations = pref_violations
+        chromosome.gaps_count = gaps_count
+        chromosome.early_lessons = early
+        chromosome.late_lessons = late
+        return fitness
+    
+    @staticmethod
+    def _apply_expanded_result(chromosome: Chromosome, expanded: Chromosome) -> float:
+        """Перенести результат развёрнутой хромосомы в шаблон"""
+        chromosome.fitness = expanded.fitness
+        chromosome.conflicts_count = expanded.conflicts_count
+        if expanded.hard_violations > 0:
+            chromosome.hard_violations = expanded.hard_violations
+            return chromosome.fitness
+        chromosome.preference_violations = expanded.preference_violations
+        chromosome.gaps_count = expanded.gaps_count
+        chromosome.early_lessons = expanded.early_lessons
+        chromosome.late_lessons = expanded.late_lessons
+        return chromosome.fitness
@@ -2,18 +2,31 @@
 Generation Orchestrator для генетического алгоритма
 Полный цикл генерации расписания через ГА
 """
+import time
 import logging
 from typing import List, Dict, Optional
+from config import config
+from utils.chromosome import Chromosome
+from utils.preference_matrix import PreferenceMatrix
 from services.context_builder import ScheduleContextBuilder
 from services.population_initializer import PopulationInitializer
 from services.fitness_calculator import FitnessCalculator
+from services.parallel_evaluator import ParallelEvaluator
 from services.genetic_operators import (
-    SelectionOperator, CrossoverOperator, MutationOperator
+    SelectionOperator, CrossoverOperator, MutationOperator, evolve_generation
 )
+from services.island_model import IslandModel
+from services.cluster_scheduler import ClusterScheduler
 from services.gigachat_improver import GigaChatImprover
 from services.llm_agent_improver import LLMAgentImprover
+from services.background_improver import BackgroundLLMImprover
+from services.progress_bus import ProgressReporter
 from db.connection import db
-from db.queries import schedules as schedule_queries
+from db import schedule_writer
+from utils.metrics import fitness_cache_hit_rate, ga_generations_per_second
+from utils import profiling, cancellation
+from utils.process_pool import pool_workers
+from utils.cancellation import GenerationCancelled
 
 logger = logging.getLogger(__name__)
 
@@ -42,19 +55,40 @@ class GenerationOrchestrator:
                                academic_year: str,
                                group_ids: Optional[List[int]] = None,
                                population_size: int = 50,
-                               max_iterations: int = 100) -> Dict:
-        """Запустить генетический алгоритм"""
+                               max_iterations: int = 100,
+                               islands: Optional[int] = None,
+                               migration_interval: Optional[int] = None,
+                               migrants_count: Optional[int] = None,
+                               migration_topology: Optional[str] = None,
+                               gene_encoding: Optional[str] = None,
+                               progress: Optional[ProgressReporter] = None) -> Dict:
+        """
+        Запустить генетический алгоритм
+        
+        islands > 1 - островная модель: islands популяций по population_size
+        в отдельных процессах, миграция migrants_count лучших каждые
+        migration_interval поколений (ring/random). None - из config.
+        gene_encoding - weekly (ген = занятие недели) или template
+        (недельный шаблон с масками недель). None - config.GA_GENE_ENCODING.
+        progress - прогресс поколений для WatchGeneration (итоговый
+        статус выставляет вызывающий код).
+        GA_DECOMPOSE (без островов) - независимые кластеры нагрузок
+        составляются параллельно (ClusterScheduler, без LLM-улучшений).
+        """
+        
+        evaluator = None
         
         try:
             logger.info(f"🧬 Starting GA for generation {generation_id}")
             
             # ШАГ 1: Получить данные из ms-core
             logger.info("📊 Building context from ms-core...")
-            context = await self.context_builder.build_context(
-                semester=semester,
-                academic_year=academic_year,
-                group_ids=group_ids
-            )
+            with profiling.phase('context_build'):
+                context = await self.context_builder.build_context(
+                    semester=semester,
+                    academic_year=academic_year,
+                    group_ids=group_ids
+                )
             
             logger.info(
                 f"Context: {len(context['course_loads'])} loads, "
@@ -68,181 +102,72 @@ class GenerationOrchestrator:
                     'message': 'No course loads found'
                 }
             
-            # ШАГ 2: Создать начальную популяцию
-            logger.info(f"🎲 Creating population of {population_size}...")
-            initializer = PopulationInitializer(context)
-            population = initializer.create_population(population_size)
-            
-            if len(population) == 0:
-                return {
-                    'success': False,
-                    'message': 'Failed to create initial population'
-                }
-            
-            logger.info(f"✅ Initial population: {len(population)} chromosomes")
-            
             # Инициализация операторов с учетом новых параметров
             fitness_calculator = FitnessCalculator(
                 teacher_preferences=context['teacher_preferences'],
                 classrooms=context['classrooms'],
-                groups=context['groups']
+                groups=context['groups'],
+                preference_matrix=PreferenceMatrix.from_context(context)
             )
-            mutation = MutationOperator(context['classrooms'])
             
-            # Инициализировать LLM Agent Improver с полным контекстом
-            self.llm_agent_improver = LLMAgentImprover(
-                generation_id=generation_id,
-                teacher_preferences=context['teacher_preferences'],
-                classrooms=context['classrooms'],
-                groups=context['groups']
-            )
+            islands = config.GA_ISLANDS if islands is None else islands
+            gene_encoding = gene_encoding or config.GA_GENE_ENCODING
+            logger.info(f"🧬 Gene encoding: {gene_encoding}")
             
-            # Оценить начальную популяцию
-            for chromosome in population:
-                fitness_calculator.calculate(chromosome)
-            
-            # ШАГ 3: Эволюция ~100 итераций
-            best_chromosome = None
-            best_fitness = float('-inf')
-            
-            for iteration in range(max_iterations):
-                logger.info(f"=== Iteration {iteration + 1}/{max_iterations} ===")
-                
-                # Проверка на пустую популяцию
-                if not population:
-                    logger.warning("⚠️ Population is empty! Reinitializing...")
-                    population = initializer.create_population(population_size)
-                    for chromosome in population:
-                        fitness_calculator.calculate(chromosome)
-                
-                # 3.1. Оценить fitness
-                for chromosome in population:
-                    fitness_calculator.calculate(chromosome)
-                
-                # 3.2. Найти лучшего
-                current_best = max(population, key=lambda c: c.fitness)
-                
-                if current_best.fitness > best_fitness:
-                    best_fitness = current_best.fitness
-                    best_chromosome = current_best.copy()
-                    
-                    logger.info(
-                        f"🏆 NEW BEST! Fitness: {best_fitness:.0f}, "
-                        f"Hard violations: {best_chromosome.hard_violations}, "
-                        f"Conflicts: {best_chromosome.conflicts_count}, "
-                        f"Pref violations: {best_chromosome.preference_violations}"
+            clusters = [context]
+            if config.GA_DECOMPOSE and islands <= 1:
+                with profiling.phase('decomposition'):
+                    clusters = self.context_builder.decompose(
+                        context, pool_workers(config.GA_CLUSTER_WORKERS)
                     )
-                
-                # 3.3. Элитизм
-                elite = self.selection.elitism_selection(
-                    population, elite_size=10
+            
+            if islands > 1:
+                # ШАГ 2-3: Островная модель (популяции в отдельных процессах)
+                island_model = IslandModel(
+                    context=context,
+                    fitness_calculator=fitness_calculator,
+                    islands=islands,
+                    migration_interval=migration_interval,
+                    migrants_count=migrants_count,
+                    topology=migration_topology,
+                    population_size=population_size,
+                    encoding=gene_encoding
+                )
+                best_chromosome = island_model.run(max_iterations, progress)
+            elif len(clusters) > 1:
+                # ШАГ 2-3: Независимые кластеры в отдельных процессах + ремонт аудиторий
+                best_chromosome = ClusterScheduler(
+                    context=context,
+                    clusters=clusters,
+                    fitness_calculator=fitness_calculator,
+                    population_size=population_size,
+                    encoding=gene_encoding
+                ).run(max_iterations, progress)
+            else:
+                # ШАГ 2-3: Одна популяция
+                evaluator = ParallelEvaluator(context, fitness_calculator)
+                best_chromosome = await self._evolve_population(
+                    context=context,
+                    generation_id=generation_id,
+                    fitness_calculator=fitness_calculator,
+                    evaluator=evaluator,
+                    population_size=population_size,
+                    max_iterations=max_iterations,
+                    gene_encoding=gene_encoding,
+                    progress=progress
                 )
-                
-                # 3.4. Создать новое поколение
-                new_population = elite.copy()
-                
-                while len(new_population) < population_size:
-                    # Селекция
-                    parent1 = self.selection.tournament_selection(population)
-                    parent2 = self.selection.tournament_selection(population)
-                    
-                    # Кроссовер
-                    child1, child2 = self.crossover.single_point_crossover(
-                        parent1, parent2
-                    )
-                    
-                    # Мутация
-                    child1 = mutation.mutate(child1, mutation_rate=0.1)
-                    child2 = mutation.mutate(child2, mutation_rate=0.1)
-                    
-                    new_population.extend([child1, child2])
-                
-                new_population = new_population[:population_size]
-                
-                # 3.5. Отфильтровать невалидных (с жесткими нарушениями)
-                valid_population = []
-                for c in new_population:
-                    fitness_calculator.calculate(c)
-                    if c.is_valid():  # Проверяет hard_violations == 0
-                        valid_population.append(c)
-                
-                if len(valid_population) < population_size // 2:
-                    # Добавить валидных из старой популяции
-                    valid_from_old = [
-                        c for c in population if c.is_valid()
-                    ]
-                    valid_population.extend(valid_from_old)
-                    valid_population = valid_population[:population_size]
-                
-                # Если все еще пусто, добавить лучших из старой популяции (даже невалидных)
-                if not valid_population:
-                    logger.warning("⚠️ No valid chromosomes! Using best from previous population...")
-                    sorted_old = sorted(population, key=lambda c: c.fitness, reverse=True)
-                    valid_population = sorted_old[:min(population_size, len(sorted_old))]
-                
-                # Если все еще пусто, пересоздать популяцию
-                if not valid_population:
-                    logger.warning("⚠️ Population completely lost! Reinitializing...")
-                    valid_population = initializer.create_population(population_size)
-                    for chromosome in valid_population:
-                        fitness_calculator.calculate(chromosome)
-                
-                population = valid_population
-                
-                logger.info(f"✅ Valid: {len(population)}/{population_size}")
-                
-                # 3.6. Каждые 10 итераций - LLM улучшения (GigaChat + Stage1Agent)
-                if (iteration + 1) % 10 == 0 and len(population) >= 3:
-                    logger.info("🤖 Applying LLM improvements (GigaChat + Stage1Agent)...")
-                    
-                    # Шаг 1: GigaChat улучшение (быстрое, через промпты)
-                    improved_gigachat = await self.gigachat_improver.improve_top_chromosomes(
-                        chromosomes=population,
-                        teacher_preferences=context['teacher_preferences'],
-                        top_n=3
-                    )
-                    
-                    # Пересчитать fitness для GigaChat улучшений
-                    for chromosome in improved_gigachat:
-                        fitness_calculator.calculate(chromosome)
-                    
-                    # Шаг 2: Stage1Agent улучшение (глубокое, с инструментами)
-                    # Применяем к лучшим из GigaChat улучшений
-                    improved_agent = self.llm_agent_improver.improve_top_chromosomes(
-                        chromosomes=improved_gigachat,
-                        max_iterations=5,  # Небольшое количество итераций
-                        top_n=2  # Только топ-2 для глубокой оптимизации
-                    )
-                    
-                    # Пересчитать fitness для Stage1Agent улучшений
-                    for chromosome in improved_agent:
-                        fitness_calculator.calculate(chromosome)
-                    
-                    # Добавить все улучшения в популяцию
-                    population.extend(improved_gigachat)
-                    population.extend(improved_agent)
-                    
-                    # Отфильтровать и взять лучших (только валидные)
-                    valid = [c for c in population if c.is_valid()]
-                    population = sorted(
-                        valid,
-                        key=lambda c: c.fitness,
-                        reverse=True
-                    )[:population_size]
-                    
-                    if population:
-                        logger.info(
-                            f"After LLM improvements: "
-                            f"best fitness = {population[0].fitness:.0f}"
-                        )
+            
+            best_fitness = best_chromosome.fitness if best_chromosome else float('-inf')
             
             # ШАГ 4: Сохранить лучшее (только если валидно)
             if best_chromosome and best_chromosome.is_valid():
                 logger.info("💾 Saving best schedule...")
                 
+                # Шаблон разворачивается по неделям только здесь
+                schedule = best_chromosome.to_schedule_dict()
                 await self._save_schedule(
                     generation_id=generation_id,
-                    schedule=best_chromosome.to_schedule_dict(),
+                    schedule=schedule,
                     semester=semester,
                     academic_year=academic_year
                 )
@@ -252,12 +177,13 @@ class GenerationOrchestrator:
                     'generation_id': generation_id,
                     'best_chromosome': best_chromosome,
                     'statistics': {
-                        'total_lessons': len(best_chromosome.lessons),
+                        'total_lessons': len(schedule),
                         'hard_violations': 0,  # ГАРАНТИРОВАНО!
                         'conflicts': 0,  # ГАРАНТИРОВАНО!
                         'fitness_score': best_chromosome.fitness,
                         'preference_violations': best_chromosome.preference_violations,
-                        'iterations': max_iterations
+                        'iterations': max_iterations,
+                        'fitness_cache': fitness_calculator.cache.get_statistics()
                     },
                     'message': f'Schedule generated! Fitness: {best_fitness:.0f}'
                 }
@@ -267,12 +193,232 @@ class GenerationOrchestrator:
                     'message': 'Failed to generate valid schedule'
                 }
             
+        except GenerationCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error in orchestrator: {e}", exc_info=True)
             return {
                 'success': False,
                 'message': f'Error: {str(e)}'
             }
+        finally:
+            if evaluator is not None:
+                evaluator.close()
+    
+    async def _evolve_population(self,
+                                 context: Dict,
+                                 generation_id: int,
+                                 fitness_calculator: FitnessCalculator,
+                                 evaluator: ParallelEvaluator,
+                                 population_size: int,
+                                 max_iterations: int,
+                                 gene_encoding: Optional[str] = None,
+                                 progress: Optional[ProgressReporter] = None) -> Optional[Chromosome]:
+        """Эволюция одной популяции, возвращает лучшую хромосому"""
+        
+        # ШАГ 2: Создать начальную популяцию
+        logger.info(f"🎲 Creating population of {population_size}...")
+        with profiling.phase('population_init'):
+            initializer = PopulationInitializer(context, gene_encoding)
+            population = initializer.create_population(population_size)
+        
+        if len(population) == 0:
+            logger.error("Failed to create initial population")
+            return None
+        
+        logger.info(f"✅ Initial population: {len(population)} chromosomes")
+        
+        mutation = MutationOperator(
+            context['classrooms'], fitness_calculator.preferences
+        )
+        
+        # Инициализировать LLM Agent Improver с полным контекстом
+        self.llm_agent_improver = LLMAgentImprover(
+            generation_id=generation_id,
+            teacher_preferences=context['teacher_preferences'],
+            classrooms=context['classrooms'],
+            groups=context['groups'],
+            preference_matrix=fitness_calculator.preferences
+        )
+        
+        # LLM-улучшения в фоне (эволюция не ждёт GigaChat)
+        llm_interval = config.GA_LLM_INTERVAL
+        llm_improver = None
+        if llm_interval > 0:
+            llm_improver = BackgroundLLMImprover(
+                gigachat_improver=self.gigachat_improver,
+                agent_improver=self.llm_agent_improver,
+                fitness_calculator=fitness_calculator,
+                teacher_preferences=context['teacher_preferences'],
+                top_n=3,
+                agent_top_n=2,  # Только топ-2 для глубокой оптимизации
+                agent_iterations=5  # Небольшое количество итераций
+            )
+        
+        # Оценить начальную популяцию
+        with profiling.phase('evaluation'):
+            evaluator.evaluate(population)
+        
+        # ШАГ 3: Эволюция ~100 итераций
+        evolution_start = time.time()
+        
+        try:
+            best_chromosome = self._evolution_loop(
+                population=population,
+                population_size=population_size,
+                max_iterations=max_iterations,
+                generation_id=generation_id,
+                initializer=initializer,
+                mutation=mutation,
+                fitness_calculator=fitness_calculator,
+                evaluator=evaluator,
+                llm_improver=llm_improver,
+                llm_interval=llm_interval,
+                progress=progress
+            )
+        finally:
+            if llm_improver is not None:
+                llm_improver.close()
+        
+        # Пропускная способность ГА (с фоновыми LLM-улучшениями и без)
+        elapsed = time.time() - evolution_start
+        throughput = max_iterations / elapsed if elapsed > 0 else 0.0
+        llm_stage = 'background' if llm_improver is not None else 'off'
+        ga_generations_per_second.labels(llm_stage=llm_stage).set(throughput)
+        logger.info(
+            f"⚡ GA throughput: {throughput:.2f} generations/s "
+            f"({max_iterations} in {elapsed:.1f}s, LLM stage: {llm_stage}"
+            + (
+                f", {llm_improver.submitted} submitted / {llm_improver.merged} merged / "
+                f"{llm_improver.skipped} skipped"
+                if llm_improver is not None else ''
+            )
+            + ")"
+        )
+        
+        if progress is not None:
+            progress.flush()
+        
+        return best_chromosome
+    
+    def _evolution_loop(self,
+                        population: List[Chromosome],
+                        population_size: int,
+                        max_iterations: int,
+                        generation_id: int,
+                        initializer: PopulationInitializer,
+                        mutation: MutationOperator,
+                        fitness_calculator: FitnessCalculator,
+                        evaluator: ParallelEvaluator,
+                        llm_improver: Optional[BackgroundLLMImprover],
+                        llm_interval: int,
+                        progress: Optional[ProgressReporter]) -> Optional[Chromosome]:
+        """Поколения эволюции, возвращает лучшую хромосому"""
+        best_chromosome = None
+        best_fitness = float('-inf')
+        
+        for iteration in range(max_iterations):
+            cancellation.check()
+            logger.info(f"=== Iteration {iteration + 1}/{max_iterations} ===")
+            
+            # Проверка на пустую популяцию
+            if not population:
+                logger.warning("⚠️ Population is empty! Reinitializing...")
+                population = initializer.create_population(population_size)
+                evaluator.evaluate(population)
+            
+            # 3.1. Оценить fitness
+            phase_start = time.time()
+            evaluator.evaluate(population)
+            phase_timings = {'evaluate': time.time() - phase_start}
+            profiling.record('evaluation', phase_timings['evaluate'])
+            
+            # 3.2. Найти лучшего
+            current_best = max(population, key=lambda c: c.fitness)
+            
+            if current_best.fitness > best_fitness:
+                best_fitness = current_best.fitness
+                best_chromosome = current_best.copy()
+                
+                logger.info(
+                    f"🏆 NEW BEST! Fitness: {best_fitness:.0f}, "
+                    f"Hard violations: {best_chromosome.hard_violations}, "
+                    f"Conflicts: {best_chromosome.conflicts_count}, "
+                    f"Pref violations: {best_chromosome.preference_violations}"
+                )
+            
+            # 3.3-3.5. Элитизм, новое поколение, отбор валидных
+            phase_start = time.time()
+            population = evolve_generation(
+                population=population,
+                population_size=population_size,
+                selection=self.selection,
+                crossover=self.crossover,
+                mutation=mutation,
+                fitness_calculator=fitness_calculator,
+                evaluate=evaluator.evaluate,
+                reinitialize=initializer.create_population
+            )
+            phase_timings['evolve'] = time.time() - phase_start
+            
+            logger.info(f"✅ Valid: {len(population)}/{population_size}")
+            
+            cache = fitness_calculator.cache
+            if cache.enabled:
+                fitness_cache_hit_rate.labels(generation_id=str(generation_id)).set(cache.hit_rate)
+                logger.info(
+                    f"💾 Fitness cache: hit rate {cache.hit_rate:.0%} "
+                    f"({cache.hits} hits / {cache.misses} misses, "
+                    f"{len(cache)}/{cache.max_size} genomes)"
+                )
+            
+            # 3.6. LLM улучшения (GigaChat + Stage1Agent) в фоне:
+            # готовые результаты вливаются в популяцию, каждые llm_interval
+            # поколений в фон уходит снимок топа
+            if llm_improver is not None:
+                phase_start = time.time()
+                improved = llm_improver.collect()
+                if improved:
+                    with profiling.phase('evaluation'):
+                        evaluator.evaluate(improved)
+                    
+                    # Добавить улучшения, отфильтровать и взять лучших (только валидные)
+                    population.extend(improved)
+                    valid = [c for c in population if c.is_valid()]
+                    population = sorted(
+                        valid,
+                        key=lambda c: c.fitness,
+                        reverse=True
+                    )[:population_size]
+                    
+                    if population:
+                        logger.info(
+                            f"After LLM improvements: "
+                            f"best fitness = {population[0].fitness:.0f}"
+                        )
+                        if population[0].fitness > best_fitness:
+                            best_fitness = population[0].fitness
+                            best_chromosome = population[0].copy()
+                
+                # Последнее поколение - результат уже не успеет влиться
+                if ((iteration + 1) % llm_interval == 0 and iteration + 1 < max_iterations
+                        and len(population) >= 3):
+                    llm_improver.submit(population, iteration + 1)
+                
+                if improved is not None:
+                    phase_timings['llm'] = time.time() - phase_start
+            
+            if progress is not None:
+                progress.report(
+                    iteration=iteration + 1,
+                    current_score=current_best.fitness,
+                    hard_violations=current_best.hard_violations,
+                    phase='llm' if 'llm' in phase_timings else 'evolve',
+                    phase_timings=phase_timings,
+                    reasoning=f"Valid: {len(population)}/{population_size}"
+                )
+        
+        return best_chromosome
     
     async def _save_schedule(self,
                            generation_id: int,
@@ -311,14 +457,18 @@ class GenerationOrchestrator:
         if updated_count > 0:
             logger.info(f"✅ Updated {updated_count} lessons with actual teacher names")
         
-        # Деактивировать старые
-        db.execute_query(
-            schedule_queries.DEACTIVATE_OLD_SCHEDULES,
-            {},
-            fetch=False
+        # Деактивировать старые и вставить новое - одной транзакцией
+        schedule_writer.save_schedule(
+            self._schedule_rows(schedule, generation_id, semester, academic_year),
+            generation_id=generation_id
         )
-        
-        # Вставить новое
+    
+    @staticmethod
+    def _schedule_rows(schedule: List[Dict],
+                       generation_id: int,
+                       semester: int,
+                       academic_year: str):
+        """Строки schedules для schedule_writer"""
         for lesson in schedule:
             # КРИТИЧЕСКАЯ ФИНАЛЬНАЯ ПРОВЕРКА: Воскресенье (0 или 7) ЗАПРЕЩЕНО!
             day_of_week = lesson.get('day_of_week', 1)
@@ -332,27 +482,21 @@ class GenerationOrchestrator:
                 )
                 continue  # НЕ сохраняем занятие с воскресеньем!
             
-            db.execute_query(
-                schedule_queries.INSERT_SCHEDULE,
-                {
-                    'course_load_id': lesson.get('course_load_id', 0),
-                    'day_of_week': day_of_week,  # Используем проверенное значение
-                    'time_slot': lesson.get('time_slot', 1),
-                    'classroom_id': lesson.get('classroom_id', 0),
-                    'classroom_name': lesson.get('classroom_name'),
-                    'teacher_id': lesson.get('teacher_id', 0),
-                    'teacher_name': lesson.get('teacher_name', ''),
-                    'group_id': lesson.get('group_id', 0),
-                    'group_name': lesson.get('group_name', ''),
-                    'discipline_name': lesson.get('discipline_name', ''),
-                    'lesson_type': lesson.get('lesson_type', 'Практика'),
-                    'generation_id': generation_id,
-                    'is_active': True,
-                    'semester': semester,
-                    'academic_year': academic_year
-                },
-                fetch=False
-            )
-        
-        logger.info(f"Saved {len(schedule)} lessons to database")
+            yield {
+                'course_load_id': lesson.get('course_load_id', 0),
+                'day_of_week': day_of_week,  # Используем проверенное значение
+                'time_slot': lesson.get('time_slot', 1),
+                'classroom_id': lesson.get('classroom_id', 0),
+                'classroom_name': lesson.get('classroom_name'),
+                'teacher_id': lesson.get('teacher_id', 0),
+                'teacher_name': lesson.get('teacher_name', ''),
+                'group_id': lesson.get('group_id', 0),
+                'group_name': lesson.get('group_name', ''),
+                'discipline_name': lesson.get('discipline_name', ''),
+                'lesson_type': lesson.get('lesson_type', 'Практика'),
+                'generation_id': generation_id,
+                'is_active': True,
+                'semester': semester,
+                'academic_year': academic_year
+            }
 
@@ -2,10 +2,18 @@
 Genetic Operators для генетического алгоритма
 Селекция, кроссовер, мутация
 """
+import time
 import random
 import logging
-from typing import List, Tuple, Dict
-from utils.chromosome import Chromosome, Lesson
+from typing import List, Tuple, Dict, Callable, Optional
+
+import numpy as np
+
+from utils.chromosome import Chromosome
+from services.fitness_calculator import FitnessCalculator
+from services.delta_evaluator import ChromosomeDeltaEvaluator
+from utils.preference_matrix import PreferenceMatrix
+from utils import profiling
 
 logger = logging.getLogger(__name__)
 
@@ -38,120 +46,285 @@ class CrossoverOperator:
     def single_point_crossover(parent1: Chromosome,
                               parent2: Chromosome) -> Tuple[Chromosome, Chromosome]:
         """Одноточечный кроссовер"""
-        if len(parent1.lessons) == 0 or len(parent2.lessons) == 0:
+        if len(parent1) == 0 or len(parent2) == 0:
             return parent1.copy(), parent2.copy()
         
-        point = random.randint(1, min(len(parent1.lessons), len(parent2.lessons)) - 1)
-        
-        child1_lessons = parent1.lessons[:point] + parent2.lessons[point:]
-        child2_lessons = parent2.lessons[:point] + parent1.lessons[point:]
+        point = random.randint(1, min(len(parent1), len(parent2)) - 1)
         
-        child1 = Chromosome([lesson.copy() for lesson in child1_lessons])
-        child2 = Chromosome([lesson.copy() for lesson in child2_lessons])
+        child1_genes = np.concatenate(
+            (parent1.genes[:, :point], parent2.genes[:, point:]), axis=1
+        )
+        child2_genes = np.concatenate(
+            (parent2.genes[:, :point], parent1.genes[:, point:]), axis=1
+        )
         
-        return child1, child2
+        return (
+            Chromosome(parent1.loads, child1_genes),
+            Chromosome(parent1.loads, child2_genes)
+        )
     
     @staticmethod
     def uniform_crossover(parent1: Chromosome,
                          parent2: Chromosome,
                          crossover_rate: float = 0.5) -> Tuple[Chromosome, Chromosome]:
-        """Однородный кроссовер"""
-        if len(parent1.lessons) == 0 or len(parent2.lessons) == 0:
+        """Однородный кроссовер (обмен блоками по (course_load, week))"""
+        if len(parent1) == 0 or len(parent2) == 0:
             return parent1.copy(), parent2.copy()
         
-        # Создать маппинг по course_load_id
-        p1_map = {}
-        p2_map = {}
-        
-        for lesson in parent1.lessons:
-            key = (lesson.course_load_id, lesson.week)
-            if key not in p1_map:
-                p1_map[key] = []
-            p1_map[key].append(lesson)
-        
-        for lesson in parent2.lessons:
-            key = (lesson.course_load_id, lesson.week)
-            if key not in p2_map:
-                p2_map[key] = []
-            p2_map[key].append(lesson)
-        
-        child1_lessons = []
-        child2_lessons = []
-        
-        all_keys = set(p1_map.keys()) | set(p2_map.keys())
-        
-        for key in all_keys:
-            if random.random() < crossover_rate:
-                # Взять от parent2 для child1, от parent1 для child2
-                if key in p2_map:
-                    child1_lessons.extend([l.copy() for l in p2_map[key]])
-                if key in p1_map:
-                    child2_lessons.extend([l.copy() for l in p1_map[key]])
-            else:
-                # Взять от parent1 для child1, от parent2 для child2
-                if key in p1_map:
-                    child1_lessons.extend([l.copy() for l in p1_map[key]])
-                if key in p2_map:
-                    child2_lessons.extend([l.copy() for l in p2_map[key]])
+        # Ключ блока = (load_idx, week); в шаблоне week - маска недель (< 2^16)
+        p1_keys = parent1.load_idx.astype(np.int64) * 65536 + parent1.week
+        p2_keys = parent2.load_idx.astype(np.int64) * 65536 + parent2.week
+        
+        all_keys = np.union1d(p1_keys, p2_keys)
+        swapped_keys = all_keys[np.random.random(len(all_keys)) < crossover_rate]
+        
+        p1_swapped = np.isin(p1_keys, swapped_keys)
+        p2_swapped = np.isin(p2_keys, swapped_keys)
         
-        return Chromosome(child1_lessons), Chromosome(child2_lessons)
+        # child1: свои блоки от parent1, обменянные - от parent2
+        child1_genes = np.concatenate(
+            (parent1.genes[:, ~p1_swapped], parent2.genes[:, p2_swapped]), axis=1
+        )
+        child2_genes = np.concatenate(
+            (parent2.genes[:, ~p2_swapped], parent1.genes[:, p1_swapped]), axis=1
+        )
+        
+        return (
+            Chromosome(parent1.loads, child1_genes),
+            Chromosome(parent1.loads, child2_genes)
+        )
 
 
 class MutationOperator:
     """Мутация"""
     
-    def __init__(self, classrooms: List[Dict]):
+    def __init__(self, classrooms: List[Dict],
+                 preference_matrix: Optional[PreferenceMatrix] = None):
         self.classrooms = classrooms
+        self.preferences = preference_matrix
+        self.classroom_ids = np.array(
+            [c.get('id', 0) for c in classrooms], dtype=np.int32
+        )
     
     def mutate(self, chromosome: Chromosome, 
               mutation_rate: float = 0.1) -> Chromosome:
         """Мутация - изменить день/слот случайных занятий"""
         mutated = chromosome.copy()
+        size = len(mutated)
+        
+        mask = np.random.random(size) < mutation_rate
+        count = int(mask.sum())
+        if count == 0:
+            return mutated
+        
+        # Изменить день/слот
+        mutated.day[mask] = np.random.randint(1, 7, size=count)
+        mutated.slot[mask] = np.random.randint(1, 7, size=count)
         
-        for lesson in mutated.lessons:
-            if random.random() < mutation_rate:
-                # Изменить день/слот
-                lesson.day = random.randint(1, 6)
-                lesson.slot = random.randint(1, 6)
-                
-                # Опционально: изменить аудиторию
-                if self.classrooms and random.random() < 0.3:
-                    classroom = random.choice(self.classrooms)
-                    lesson.classroom_id = classroom.get('id', 0)
+        # Опционально: изменить аудиторию
+        if len(self.classroom_ids) > 0:
+            room_mask = mask & (np.random.random(size) < 0.3)
+            room_count = int(room_mask.sum())
+            if room_count:
+                mutated.classroom[room_mask] = np.random.choice(
+                    self.classroom_ids, size=room_count
+                )
         
         return mutated
     
     def smart_mutate(self, chromosome: Chromosome,
-                    teacher_preferences: Dict,
+                    teacher_preferences: Optional[Dict] = None,
                     mutation_rate: float = 0.1) -> Chromosome:
-        """Умная мутация - переместить в предпочтительные слоты"""
+        """
+        Умная мутация - переместить в предпочтительные слоты
+        
+        Слоты берутся из PreferenceMatrix одним gather по строкам
+        преподавателей. teacher_preferences нужен, только если матрица
+        не передана в конструктор.
+        """
         mutated = chromosome.copy()
         
-        for lesson in mutated.lessons:
-            if random.random() < mutation_rate:
-                teacher_id = lesson.teacher_id
-                
-                if teacher_id in teacher_preferences:
-                    prefs = teacher_preferences[teacher_id].get('preferences', [])
-                    preferred_slots = [
-                        (p['day_of_week'], p['time_slot'])
-                        for p in prefs
-                        if p.get('is_preferred', False)
-                    ]
-                    
-                    if preferred_slots:
-                        # Переместить в предпочтительный слот
-                        new_day, new_slot = random.choice(preferred_slots)
-                        lesson.day = new_day
-                        lesson.slot = new_slot
-                    else:
-                        # Обычная мутация
-                        lesson.day = random.randint(1, 6)
-                        lesson.slot = random.randint(1, 6)
-                else:
-                    # Обычная мутация
-                    lesson.day = random.randint(1, 6)
-                    lesson.slot = random.randint(1, 6)
+        indices = np.flatnonzero(np.random.random(len(mutated)) < mutation_rate)
+        if len(indices) == 0:
+            return mutated
+        
+        preferences = self.preferences
+        if preferences is None:
+            preferences = self.preferences = PreferenceMatrix(teacher_preferences or {})
+        
+        rows = preferences.rows_for(mutated.teacher_ids[indices])
+        has_preferred, preferred_slots = preferences.random_preferred(rows)
+        
+        # Без предпочтений - обычная мутация
+        new_day = np.random.randint(1, 7, size=len(indices))
+        new_slot = np.random.randint(1, 7, size=len(indices))
+        new_day[has_preferred] = preferred_slots[has_preferred, 0]
+        new_slot[has_preferred] = preferred_slots[has_preferred, 1]
+        
+        mutated.day[indices] = new_day
+        mutated.slot[indices] = new_slot
         
         return mutated
+    
+    def local_search(self, chromosome: Chromosome,
+                    fitness_calculator: FitnessCalculator,
+                    moves: int = 200) -> Chromosome:
+        """
+        Мутация с дельта-оценкой
+        
+        Пробные перемещения оцениваются через score_move за O(1),
+        принимаются только неухудшающие. Fitness результата уже посчитан.
+        Недельный шаблон (маски недель) оценивается полным пересчётом.
+        """
+        improved = chromosome.copy()
+        size = len(improved)
+        if size == 0:
+            return improved
+        
+        if improved.loads.is_template:
+            return self._template_local_search(improved, fitness_calculator, moves)
+        
+        evaluator = ChromosomeDeltaEvaluator(fitness_calculator, improved)
+        accepted = 0
+        
+        for _ in range(moves):
+            index = random.randrange(size)
+            day = random.randint(1, 6)
+            slot = random.randint(1, 6)
+            classroom = None
+            if self.classrooms and random.random() < 0.3:
+                classroom = random.choice(self.classrooms).get('id', 0)
+            
+            if evaluator.score_move(index, day, slot, classroom) >= 0:
+                evaluator.apply_move(index, day, slot, classroom)
+                accepted += 1
+        
+        logger.debug(f"Local search: {accepted}/{moves} moves accepted")
+        
+        improved = evaluator.sync()
+        # Fitness уже точный - запомнить, чтобы evaluate не пересчитывал
+        if fitness_calculator.cache.enabled:
+            fitness_calculator.cache.store(improved.genome_hash(), improved)
+        return improved
+    
+    def _template_local_search(self, chromosome: Chromosome,
+                               fitness_calculator: FitnessCalculator,
+                               moves: int) -> Chromosome:
+        """
+        Локальный поиск по шаблону: полный пересчёт fitness на ход
+        
+        DeltaEvaluator ведёт счётчики по номерам недель, а шаблон
+        в 16 раз меньше развёрнутого расписания - полный расчёт дешёвый.
+        """
+        size = len(chromosome)
+        fitness = fitness_calculator.calculate(chromosome)
+        hard_violations = chromosome.hard_violations
+        accepted = 0
+        
+        for _ in range(moves):
+            index = random.randrange(size)
+            old = chromosome.genes[:, index].copy()
+            
+            chromosome.day[index] = random.randint(1, 6)
+            chromosome.slot[index] = random.randint(1, 6)
+            if self.classrooms and random.random() < 0.3:
+                chromosome.classroom[index] = random.choice(self.classrooms).get('id', 0)
+            
+            trial = chromosome.copy()
+            fitness_calculator.calculate(trial)
+            # Жёсткие нарушения обрывают подсчёт мягких - такой ход не принимать
+            if trial.hard_violations <= hard_violations and trial.fitness >= fitness:
+                fitness = trial.fitness
+                hard_violations = trial.hard_violations
+                accepted += 1
+            else:
+                chromosome.genes[:, index] = old
+        
+        fitness_calculator.calculate(chromosome)
+        logger.debug(f"Template local search: {accepted}/{moves} moves accepted")
+        
+        return chromosome
+
 
+def evolve_generation(population: List[Chromosome],
+                      population_size: int,
+                      selection: SelectionOperator,
+                      crossover: CrossoverOperator,
+                      mutation: MutationOperator,
+                      fitness_calculator: FitnessCalculator,
+                      evaluate: Callable[[List[Chromosome]], None],
+                      reinitialize: Optional[Callable[[int], List[Chromosome]]] = None,
+                      elite_size: int = 10) -> List[Chromosome]:
+    """
+    Одно поколение ГА: элитизм, локальный поиск, кроссовер, мутация,
+    отбор валидных
+    
+    Общий шаг для одиночной популяции и для островов.
+    evaluate - оценка списка хромосом (ParallelEvaluator.evaluate и т.п.)
+    Время фаз за поколение - в profiling (selection / local_search / crossover /
+    mutation / evaluation).
+    """
+    clock = time.perf_counter
+    start = clock()
+    
+    # Элитизм
+    elite = selection.elitism_selection(population, elite_size=elite_size)
+    new_population = elite.copy()
+    selection_time = clock() - start
+    
+    # Локальный поиск вокруг лучшего (дельта-оценка вместо полного пересчёта)
+    if elite:
+        with profiling.phase('local_search'):
+            new_population.append(
+                mutation.local_search(elite[0], fitness_calculator, moves=200)
+            )
+    mutation_time = 0.0
+    crossover_time = 0.0
+    
+    while len(new_population) < population_size:
+        t0 = clock()
+        parent1 = selection.tournament_selection(population)
+        parent2 = selection.tournament_selection(population)
+        t1 = clock()
+        
+        child1, child2 = crossover.single_point_crossover(parent1, parent2)
+        t2 = clock()
+        
+        child1 = mutation.mutate(child1, mutation_rate=0.1)
+        child2 = mutation.mutate(child2, mutation_rate=0.1)
+        
+        selection_time += t1 - t0
+        crossover_time += t2 - t1
+        mutation_time += clock() - t2
+        
+        new_population.extend([child1, child2])
+    
+    profiling.record('selection', selection_time)
+    profiling.record('crossover', crossover_time)
+    profiling.record('mutation', mutation_time)
+    
+    new_population = new_population[:population_size]
+    
+    # Отфильтровать невалидных (с жесткими нарушениями)
+    with profiling.phase('evaluation'):
+        evaluate(new_population)
+    valid_population = [c for c in new_population if c.is_valid()]
+    
+    if len(valid_population) < population_size // 2:
+        # Добавить валидных из старой популяции
+        valid_population.extend(c for c in population if c.is_valid())
+        valid_population = valid_population[:population_size]
+    
+    # Если все еще пусто, добавить лучших из старой популяции (даже невалидных)
+    if not valid_population:
+        logger.warning("⚠️ No valid chromosomes! Using best from previous population...")
+        sorted_old = sorted(population, key=lambda c: c.fitness, reverse=True)
+        valid_population = sorted_old[:population_size]
+    
+    # Если все еще пусто, пересоздать популяцию
+    if not valid_population and reinitialize is not None:
+        logger.warning("⚠️ Population completely lost! Reinitializing...")
+        valid_population = reinitialize(population_size)
+        evaluate(valid_population)
+    
+    return valid_population
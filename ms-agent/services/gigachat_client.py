@@ -2,30 +2,50 @@
 GigaChat API Client
 Клиент для работы с GigaChat API от Сбер
 OAuth 2.0 + Chat Completions + Functions
+
+Все экземпляры используют общий пул соединений (keep-alive requests.Session),
+общий токен (обновляется заранее, под блокировкой - без гонок между потоками
+генераций) и общий семафор (не больше GIGACHAT_MAX_CONCURRENCY запросов).
+429 / 5xx / сетевые ошибки повторяются с экспоненциальной задержкой и jitter.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import uuid
 import time
+import random
 import logging
+import threading
 from typing import List, Dict, Any, Optional
 import base64
 import json
 import urllib3
 
 from config import config
+from utils.metrics import llm_requests_total, llm_duration_seconds, llm_retries_total
+from utils import profiling, cancellation
 
 # Отключаем предупреждения SSL для корпоративных сертификатов
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logger = logging.getLogger(__name__)
 
+# Статусы, при которых запрос повторяется
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 
 class GigaChatClient:
     """Клиент для работы с GigaChat API"""
     
-    BASE_URL = "https://gigachat.devices.sberbank.ru/api/v1"
-    TOKEN_URL = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
+    BASE_URL = config.GIGACHAT_BASE_URL
+    TOKEN_URL = config.GIGACHAT_TOKEN_URL
+    
+    # Общие для всех экземпляров: пул соединений, токены, ограничение параллелизма
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    _tokens: Dict[tuple, Dict[str, Any]] = {}  # (client_id, scope) -> {'token', 'expires_at'}
+    _token_lock = threading.Lock()
+    _semaphore = threading.BoundedSemaphore(max(1, config.GIGACHAT_MAX_CONCURRENCY))
     
     def __init__(self):
         """Initialize GigaChat client"""
@@ -33,28 +53,62 @@ class GigaChatClient:
         self.client_secret = config.GIGACHAT_CLIENT_SECRET
         self.scope = config.GIGACHAT_SCOPE
         
-        self.access_token: Optional[str] = None
-        self.token_expires_at: int = 0
-        
         if not self.client_id or not self.client_secret:
             logger.warning("⚠️ GigaChat credentials not configured")
         else:
             self._ensure_token()
     
+    @property
+    def access_token(self) -> Optional[str]:
+        entry = self._tokens.get((self.client_id, self.scope))
+        return entry['token'] if entry else None
+    
+    @property
+    def token_expires_at(self) -> float:
+        entry = self._tokens.get((self.client_id, self.scope))
+        return entry['expires_at'] if entry else 0
+    
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Общая keep-alive сессия с пулом соединений"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=2,
+                        pool_maxsize=max(1, config.GIGACHAT_MAX_CONCURRENCY)
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    cls._session = session
+        return cls._session
+    
     def _get_auth_header(self) -> str:
         """Получить Authorization header для получения токена"""
         credentials = f"{self.client_id}:{self.client_secret}"
         encoded = base64.b64encode(credentials.encode()).decode()
         return f"Basic {encoded}"
     
-    def _ensure_token(self):
-        """Проверить токен и обновить если истёк"""
-        current_time = int(time.time())
-        
-        # Обновить за 5 минут до истечения
-        if self.access_token and current_time < (self.token_expires_at - 300):
+    def _token_valid(self) -> bool:
+        """Токен есть и не истекает в ближайшие GIGACHAT_TOKEN_REFRESH_MARGIN секунд"""
+        return bool(self.access_token) and (
+            time.time() < self.token_expires_at - config.GIGACHAT_TOKEN_REFRESH_MARGIN
+        )
+    
+    def _ensure_token(self, force: bool = False):
+        """Проверить токен и обновить заранее, если скоро истечёт"""
+        if not force and self._token_valid():
             return
         
+        with self._token_lock:
+            # Другой поток мог обновить токен, пока ждали блокировку
+            if not force and self._token_valid():
+                return
+            self._refresh_token()
+    
+    def _refresh_token(self):
+        """Получить новый токен (вызывается под _token_lock)"""
         logger.info("🔄 Refreshing GigaChat access token...")
         
         headers = {
@@ -67,7 +121,7 @@ class GigaChatClient:
         data = {'scope': self.scope}
         
         try:
-            response = requests.post(
+            response = self.session().post(
                 self.TOKEN_URL,
                 headers=headers,
                 data=data,
@@ -77,18 +131,101 @@ class GigaChatClient:
             response.raise_for_status()
             
             token_data = response.json()
-            self.access_token = token_data['access_token']
-            self.token_expires_at = token_data['expires_at']
             
-            logger.info(f"✅ GigaChat token obtained, expires at {self.token_expires_at}")
+            # expires_at приходит в миллисекундах
+            expires_at = float(token_data['expires_at'])
+            if expires_at > 1e11:
+                expires_at /= 1000
             
+            self._tokens[(self.client_id, self.scope)] = {
+                'token': token_data['access_token'],
+                'expires_at': expires_at
+            }
+            
+            logger.info(f"✅ GigaChat token obtained, expires at {expires_at:.0f}")
+        
         except requests.exceptions.HTTPError as e:
-            logger.error(f"❌ Failed to get GigaChat token: {e.response.text if e.response else e}")
+            logger.error(f"❌ Failed to get GigaChat token: {e.response.text if e.response is not None else e}")
             raise
         except Exception as e:
             logger.error(f"❌ Failed to get GigaChat token: {e}")
             raise
     
+    def _request(self, method: str, path: str, model: str, **kwargs) -> requests.Response:
+        """
+        Запрос к API: семафор параллелизма, повторы 429 / 5xx / сетевых ошибок
+        с экспоненциальной задержкой и jitter, метрики латентности
+        
+        401 - токен обновляется и запрос повторяется (один раз).
+        Перед каждой попыткой - cancellation.check(): остановленная генерация
+        (и её фоновые улучшения) не тратит квоту.
+        """
+        max_retries = max(0, config.GIGACHAT_MAX_RETRIES)
+        token_refreshed = False
+        attempt = 0
+        
+        while True:
+            cancellation.check()
+            self._ensure_token()
+            headers = dict(kwargs.pop('headers', {}) or {})
+            headers['Authorization'] = f'Bearer {self.access_token}'
+            kwargs['headers'] = headers
+            
+            start = time.monotonic()
+            with self._semaphore:
+                try:
+                    response = self.session().request(
+                        method,
+                        f'{self.BASE_URL}{path}',
+                        timeout=(config.GIGACHAT_CONNECT_TIMEOUT, config.GIGACHAT_TIMEOUT),
+                        **kwargs
+                    )
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    llm_duration_seconds.labels(model=model).observe(time.monotonic() - start)
+                    profiling.record('llm', time.monotonic() - start)
+                    llm_requests_total.labels(model=model, status='network_error').inc()
+                    if attempt >= max_retries:
+                        raise
+                    reason, retry_after, error = 'network_error', None, e
+                else:
+                    llm_duration_seconds.labels(model=model).observe(time.monotonic() - start)
+                    profiling.record('llm', time.monotonic() - start)
+                    llm_requests_total.labels(model=model, status=str(response.status_code)).inc()
+                    
+                    if response.status_code == 401 and not token_refreshed:
+                        token_refreshed = True
+                        llm_retries_total.labels(reason='401').inc()
+                        logger.warning("⚠️ GigaChat token rejected, refreshing")
+                        self._ensure_token(force=True)
+                        continue
+                    
+                    if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                        return response
+                    reason = str(response.status_code)
+                    retry_after = response.headers.get('Retry-After')
+                    error = f"HTTP {response.status_code}"
+            
+            # Задержка вне семафора: не занимать слот на время ожидания
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            llm_retries_total.labels(reason=reason).inc()
+            logger.warning(
+                f"⚠️ GigaChat {error}, retry {attempt}/{max_retries} in {delay:.2f}s"
+            )
+            time.sleep(delay)
+    
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Экспоненциальная задержка с полным jitter (Retry-After - нижняя граница)"""
+        cap = min(config.GIGACHAT_BACKOFF_MAX, config.GIGACHAT_BACKOFF_BASE * (2 ** attempt))
+        delay = random.uniform(0, cap)
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+    
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -114,12 +251,9 @@ class GigaChatClient:
         Returns:
             Ответ от API
         """
-        self._ensure_token()
-        
         headers = {
             'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.access_token}'
+            'Accept': 'application/json'
         }
         
         payload = {
@@ -167,12 +301,13 @@ class GigaChatClient:
                     ]
                 logger.debug(f"Payload preview: {json.dumps(debug_payload, indent=2, ensure_ascii=False)[:500]}...")
             
-            response = requests.post(
-                f'{self.BASE_URL}/chat/completions',
+            response = self._request(
+                'POST',
+                '/chat/completions',
+                model=payload['model'],
                 headers=headers,
                 json=payload,
-                verify=False,  # Отключаем проверку SSL для корпоративных сертификатов
-                timeout=60
+                verify=False  # Отключаем проверку SSL для корпоративных сертификатов
             )
             
             # Логировать ответ при ошибке
@@ -186,9 +321,9 @@ class GigaChatClient:
             logger.debug(f"✅ GigaChat response received")
             
             return result
-            
+        
         except requests.exceptions.HTTPError as e:
-            error_text = e.response.text if e.response else str(e)
+            error_text = e.response.text if e.response is not None else str(e)
             logger.error(f"❌ GigaChat API error: {error_text}")
             logger.error(f"Request payload: {json.dumps(payload, indent=2, ensure_ascii=False)}")
             raise
@@ -198,23 +333,21 @@ class GigaChatClient:
     
     def get_available_models(self) -> List[Dict]:
         """Получить список доступных моделей"""
-        self._ensure_token()
-        
         headers = {
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.access_token}'
+            'Accept': 'application/json'
         }
         
         try:
-            response = requests.get(
-                f'{self.BASE_URL}/models',
+            response = self._request(
+                'GET',
+                '/models',
+                model='-',
                 headers=headers,
-                verify=True,
-                timeout=10
+                verify=True
             )
             response.raise_for_status()
             return response.json()['data']
-            
+        
         except Exception as e:
             logger.error(f"❌ Failed to get models: {e}")
             raise
@@ -1,22 +1,71 @@
 """
 GigaChat Improver для генетического алгоритма
 Улучшение топ-3 расписаний через GigaChat каждые 10 итераций
+
+Ответы GigaChat кэшируются по нормализованному набору нарушений из промпта:
+одинаковые нарушения у разных хромосом/поколений - один запрос.
 """
 import json
 import re
 import logging
-from typing import List, Dict
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional
+from config import config
 from utils.chromosome import Chromosome
+from utils.metrics import llm_response_cache_lookups_total
 from services.gigachat_client import GigaChatClient
+from utils import cancellation
+from utils.cancellation import GenerationCancelled
 
 logger = logging.getLogger(__name__)
 
 
+class ResponseCache:
+    """
+    LRU: нормализованный набор нарушений -> ответ GigaChat
+
+    Потокобезопасен (улучшения выполняются в фоновом потоке).
+    max_size <= 0 - кэш выключен.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Tuple) -> Optional[Dict]:
+        with self._lock:
+            response = self._entries.get(key) if self.max_size > 0 else None
+            if response is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        llm_response_cache_lookups_total.labels(result='miss' if response is None else 'hit').inc()
+        return response
+    
+    def put(self, key: Tuple, response: Dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class GigaChatImprover:
     """Улучшение через GigaChat"""
     
     def __init__(self):
         self.client = GigaChatClient()
+        self.response_cache = ResponseCache(config.LLM_RESPONSE_CACHE_SIZE)
     
     async def improve_top_chromosomes(self,
                                      chromosomes: List[Chromosome],
@@ -45,6 +94,7 @@ class GigaChatImprover:
         improved = []
         
         for i, chromosome in enumerate(top):
+            cancellation.check()
             try:
                 logger.info(f"🤖 Improving chromosome {i + 1}/{top_n} via GigaChat")
                 
@@ -57,11 +107,22 @@ class GigaChatImprover:
                     improved.append(chromosome)
                     continue
                 
-                # Построить промпт
-                prompt = self._build_prompt(violations, chromosome)
+                # Тот же набор нарушений уже отправлялся - ответ из кэша
+                key = self._violations_key(violations)
+                suggestions = self.response_cache.get(key)
                 
-                # Вызвать GigaChat
-                suggestions = await self._call_gigachat(prompt)
+                if suggestions is None:
+                    # Построить промпт
+                    prompt = self._build_prompt(violations, chromosome)
+                    
+                    # Вызвать GigaChat (ошибки API не кэшируются)
+                    suggestions = await self._call_gigachat(prompt)
+                    if suggestions is None:
+                        suggestions = {'suggestions': []}
+                    else:
+                        self.response_cache.put(key, suggestions)
+                else:
+                    logger.info(f"💾 GigaChat response cache hit ({len(violations)} violations)")
                 
                 # Применить
                 improved_chromosome = self._apply_suggestions(
@@ -70,6 +131,8 @@ class GigaChatImprover:
                 
                 improved.append(improved_chromosome)
                 
+            except GenerationCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error improving chromosome {i + 1}: {e}")
                 improved.append(chromosome)
@@ -81,7 +144,7 @@ class GigaChatImprover:
         """Найти все нарушения предпочтений"""
         violations = []
         
-        for lesson in chromosome.lessons:
+        for index, lesson in enumerate(chromosome.lessons):
             teacher_id = lesson.teacher_id
             
             if teacher_id not in teacher_preferences:
@@ -100,7 +163,7 @@ class GigaChatImprover:
             
             if pref and not pref.get('is_preferred', True):
                 violations.append({
-                    'lesson_id': id(lesson),
+                    'lesson_id': index,
                     'teacher': teacher_info.get('name', f'Teacher {teacher_id}'),
                     'priority': priority,
                     'current_day': lesson.day,
@@ -113,6 +176,14 @@ class GigaChatImprover:
         
         return violations
     
+    @staticmethod
+    def _violations_key(violations: List[Dict]) -> Tuple:
+        """Ключ кэша: поля нарушений, попадающие в промпт, без учёта порядка"""
+        return tuple(sorted(
+            (v['teacher'], v['priority'], v['current_day'], v['current_slot'], v['discipline'][:30])
+            for v in violations
+        ))
+    
     def _build_prompt(self, violations: List[Dict], 
                      chromosome: Chromosome) -> str:
         """Построить компактный промпт"""
@@ -144,8 +215,8 @@ class GigaChatImprover:
 """
         return prompt
     
-    async def _call_gigachat(self, prompt: str) -> Dict:
-        """Вызвать GigaChat API"""
+    async def _call_gigachat(self, prompt: str) -> Optional[Dict]:
+        """Вызвать GigaChat API (None - ошибка API)"""
         try:
             messages = [
                 {
@@ -176,29 +247,30 @@ class GigaChatImprover:
             
             return {'suggestions': []}
             
+        except GenerationCancelled:
+            raise
         except Exception as e:
             logger.error(f"GigaChat API error: {e}")
-            return {'suggestions': []}
+            return None
     
     def _apply_suggestions(self, chromosome: Chromosome,
                           suggestions: Dict) -> Chromosome:
         """Применить рекомендации"""
         improved = chromosome.copy()
         
-        # Создать маппинг lesson_id -> lesson
-        lesson_map = {id(lesson): lesson for lesson in improved.lessons}
+        # lesson_id = индекс гена в хромосоме
+        size = len(improved)
         
         for suggestion in suggestions.get('suggestions', []):
             lesson_id = suggestion.get('lesson_id')
             new_day = suggestion.get('new_day')
             new_slot = suggestion.get('new_slot')
             
-            if lesson_id in lesson_map and new_day and new_slot:
-                lesson = lesson_map[lesson_id]
+            if isinstance(lesson_id, int) and 0 <= lesson_id < size and new_day and new_slot:
                 # Валидация
                 if 1 <= new_day <= 6 and 1 <= new_slot <= 6:
-                    lesson.day = new_day
-                    lesson.slot = new_slot
+                    improved.day[lesson_id] = new_day
+                    improved.slot[lesson_id] = new_slot
         
         return improved
 
@@ -0,0 +1,320 @@
+"""
+Island Model для генетического алгоритма
+N независимых популяций в отдельных процессах с периодической миграцией
+
+Каждый остров - отдельный процесс со своими операторами селекции,
+кроссовера и мутации. Раз в migration_interval поколений координатор
+собирает у островов лучшие хромосомы (migrants) и рассылает их
+по топологии ring (i -> i+1) или random (случайный другой остров).
+Мигранты замещают худших особей острова-получателя.
+
+Между процессами передаются только массивы генов.
+"""
+import time
+import random
+import logging
+import multiprocessing
+from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+
+from config import config
+from utils.chromosome import Chromosome, LoadTable
+from utils.preference_matrix import PreferenceMatrix
+from services.population_initializer import PopulationInitializer
+from services.fitness_calculator import FitnessCalculator
+from services.progress_bus import ProgressReporter
+from utils import cancellation
+from services.genetic_operators import (
+    SelectionOperator, CrossoverOperator, MutationOperator, evolve_generation
+)
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGY_RING = 'ring'
+TOPOLOGY_RANDOM = 'random'
+TOPOLOGIES = (TOPOLOGY_RING, TOPOLOGY_RANDOM)
+
+
+# ============ Процесс-остров ============
+
+def _island_worker(island_id: int,
+                   conn,
+                   context: Dict[str, Any],
+                   population_size: int,
+                   migrants_count: int,
+                   seed: int,
+                   engine: str,
+                   encoding: str):
+    """
+    Цикл острова
+
+    Команды от координатора:
+        ('epoch', generations, incoming_genes) -> принять мигрантов,
+            прожить generations поколений, ответить
+            ('epoch', best_genes, best_fitness, migrants_genes, valid_count,
+             cache_hit_rate)
+        ('stop',) -> завершить процесс
+    """
+    try:
+        # После fork у всех островов одинаковое состояние ГСЧ
+        random.seed(seed)
+        np.random.seed(seed % (2 ** 32))
+
+        fitness_calculator = FitnessCalculator(
+            teacher_preferences=context['teacher_preferences'],
+            classrooms=context['classrooms'],
+            groups=context['groups'],
+            engine=engine,
+            preference_matrix=PreferenceMatrix.from_context(context)
+        )
+        selection = SelectionOperator()
+        crossover = CrossoverOperator()
+        mutation = MutationOperator(context['classrooms'], fitness_calculator.preferences)
+        initializer = PopulationInitializer(context, encoding)
+        loads = initializer.loads
+
+        def evaluate(chromosomes: List[Chromosome]):
+            for chromosome in chromosomes:
+                fitness_calculator.calculate(chromosome)
+
+        population = initializer.create_population(population_size)
+        evaluate(population)
+        best: Optional[Chromosome] = None
+
+        while True:
+            message = conn.recv()
+            if message[0] == 'stop':
+                break
+
+            _, generations, incoming = message
+
+            # Мигранты замещают худших
+            if incoming and population:
+                migrants = [
+                    Chromosome(loads, genes)
+                    for genes in incoming[:max(1, len(population) // 2)]
+                ]
+                evaluate(migrants)
+                population.sort(key=lambda c: c.fitness)
+                population[:len(migrants)] = migrants
+
+            for _ in range(generations):
+                if not population:
+                    population = initializer.create_population(population_size)
+                    evaluate(population)
+
+                current_best = max(population, key=lambda c: c.fitness)
+                if best is None or current_best.fitness > best.fitness:
+                    best = current_best.copy()
+
+                population = evolve_generation(
+                    population=population,
+                    population_size=population_size,
+                    selection=selection,
+                    crossover=crossover,
+                    mutation=mutation,
+                    fitness_calculator=fitness_calculator,
+                    evaluate=evaluate,
+                    reinitialize=initializer.create_population
+                )
+
+            if population:
+                current_best = max(population, key=lambda c: c.fitness)
+                if best is None or current_best.fitness > best.fitness:
+                    best = current_best.copy()
+
+            top = selection.elitism_selection(population, elite_size=migrants_count)
+            valid_count = sum(1 for c in population if c.is_valid())
+            conn.send((
+                'epoch',
+                best.genes if best is not None else None,
+                best.fitness if best is not None else float('-inf'),
+                [c.genes for c in top],
+                valid_count,
+                fitness_calculator.cache.hit_rate
+            ))
+
+    except Exception as e:
+        logger.error(f"Island {island_id} failed: {e}", exc_info=True)
+        conn.send(('error', f"Island {island_id}: {e}"))
+    finally:
+        conn.close()
+
+
+# ============ Координатор ============
+
+class IslandModel:
+    """
+    Координатор островной модели
+
+    islands - число островов (процессов)
+    migration_interval - поколений между миграциями (K)
+    migrants_count - сколько лучших хромосом отправляет каждый остров
+    topology - ring или random
+    encoding - кодировка генов (weekly / template)
+    """
+
+    def __init__(self,
+                 context: Dict[str, Any],
+                 fitness_calculator: FitnessCalculator,
+                 islands: Optional[int] = None,
+                 migration_interval: Optional[int] = None,
+                 migrants_count: Optional[int] = None,
+                 topology: Optional[str] = None,
+                 population_size: int = 50,
+                 encoding: Optional[str] = None):
+        self.context = context
+        self.fitness_calculator = fitness_calculator
+        self.islands = max(1, islands or config.GA_ISLANDS)
+        self.migration_interval = max(1, migration_interval or config.GA_MIGRATION_INTERVAL)
+        self.migrants_count = max(0, migrants_count or config.GA_MIGRANTS)
+        self.topology = (topology or config.GA_MIGRATION_TOPOLOGY).lower()
+        if self.topology not in TOPOLOGIES:
+            raise ValueError(
+                f"Unknown migration topology '{self.topology}', "
+                f"expected one of {TOPOLOGIES}"
+            )
+        self.population_size = population_size
+        self.encoding = encoding or config.GA_GENE_ENCODING
+        self.loads = LoadTable(context['course_loads'], self.encoding)
+
+        self._processes: List[multiprocessing.Process] = []
+        self._connections = []
+
+    def run(self,
+            max_iterations: int,
+            progress: Optional[ProgressReporter] = None) -> Optional[Chromosome]:
+        """Запустить острова и вернуть лучшую хромосому (progress - после каждой эпохи)"""
+        logger.info(
+            f"🏝️ Island model: {self.islands} islands × {self.population_size}, "
+            f"migration every {self.migration_interval} generations "
+            f"({self.migrants_count} migrants, {self.topology})"
+        )
+
+        best: Optional[Chromosome] = None
+        self._start()
+
+        try:
+            incoming: List[List[np.ndarray]] = [[] for _ in range(self.islands)]
+            generation = 0
+
+            while generation < max_iterations:
+                cancellation.check()
+                generations = min(self.migration_interval, max_iterations - generation)
+                epoch_start = time.time()
+
+                for conn, genes in zip(self._connections, incoming):
+                    conn.send(('epoch', generations, genes))
+
+                replies = [self._receive(island_id) for island_id in range(self.islands)]
+                generation += generations
+                epoch_time = time.time() - epoch_start
+
+                outgoing = []
+                for island_id, reply in enumerate(replies):
+                    best_genes, best_fitness, migrants, valid_count, cache_hit_rate = reply
+                    outgoing.append(migrants)
+                    if best_genes is not None and (best is None or best_fitness > best.fitness):
+                        best = Chromosome(self.loads, best_genes)
+                        self.fitness_calculator.calculate(best)
+                    logger.debug(
+                        f"Island {island_id}: best {best_fitness:.0f}, "
+                        f"valid {valid_count}/{self.population_size}, "
+                        f"fitness cache hit rate {cache_hit_rate:.0%}"
+                    )
+
+                migration_start = time.time()
+                incoming = self._route(outgoing)
+                migration_time = time.time() - migration_start
+
+                best_fitness = best.fitness if best is not None else float('-inf')
+                logger.info(
+                    f"=== Generation {generation}/{max_iterations} === "
+                    f"🏆 Best across islands: {best_fitness:.0f}"
+                )
+
+                if progress is not None and best is not None:
+                    progress.report(
+                        iteration=generation,
+                        current_score=best.fitness,
+                        hard_violations=best.hard_violations,
+                        phase='epoch',
+                        phase_timings={'epoch': epoch_time, 'migration': migration_time},
+                        reasoning=f"{self.islands} islands"
+                    )
+
+        finally:
+            self.close()
+            if progress is not None:
+                progress.flush()
+
+        return best
+
+    def _start(self):
+        """Запустить процессы-острова"""
+        for island_id in range(self.islands):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_island_worker,
+                args=(
+                    island_id,
+                    child_conn,
+                    self.context,
+                    self.population_size,
+                    self.migrants_count,
+                    random.randrange(2 ** 63),
+                    self.fitness_calculator.engine,
+                    self.encoding
+                ),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._processes.append(process)
+            self._connections.append(parent_conn)
+
+    def _receive(self, island_id: int) -> Tuple:
+        """Получить ответ острова"""
+        try:
+            message = self._connections[island_id].recv()
+        except EOFError:
+            raise RuntimeError(f"Island {island_id} terminated unexpectedly")
+
+        if message[0] == 'error':
+            raise RuntimeError(message[1])
+        return message[1:]
+
+    def _route(self, outgoing: List[List[np.ndarray]]) -> List[List[np.ndarray]]:
+        """Разослать мигрантов по топологии"""
+        incoming: List[List[np.ndarray]] = [[] for _ in range(self.islands)]
+        if self.islands < 2 or self.migrants_count == 0:
+            return incoming
+
+        for source, migrants in enumerate(outgoing):
+            if self.topology == TOPOLOGY_RING:
+                target = (source + 1) % self.islands
+            else:
+                target = random.choice(
+                    [i for i in range(self.islands) if i != source]
+                )
+            incoming[target].extend(migrants)
+
+        return incoming
+
+    def close(self):
+        """Остановить острова"""
+        for conn in self._connections:
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+        self._processes = []
+        self._connections = []
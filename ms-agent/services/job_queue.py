@@ -0,0 +1,182 @@
+"""
+Generation Queue - очередь генераций с ограниченным числом воркеров
+
+Очередь хранится в generation_history: start_generation записывает
+генерацию со статусом 'queued', приоритетом и параметрами запуска (params),
+воркер забирает следующую (CLAIM_NEXT_GENERATION - приоритет, затем
+порядок постановки; SKIP LOCKED). Очередь переживает перезапуск
+ms-agent, а генерации, прерванные перезапуском этого экземпляра
+(GENERATION_WORKER_ID - стабильный между пересозданиями контейнера),
+помечаются 'failed'.
+
+Воркеры - потоки процесса ms-agent: прогресс генерации публикуется в
+шину progress_bus этого процесса (WatchGeneration), а тяжёлые вычисления
+генерации уже распределены по пулам процессов (острова, ParallelEvaluator,
+кластеры, Stage 2). GENERATION_WORKERS ограничивает число одновременных
+генераций, GENERATION_QUEUE_SIZE - длину очереди.
+
+Отмена кооперативная: cancel() взводит CancelToken генерации
+(utils.cancellation), циклы ГА и Stage 1 проверяют его между итерациями.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Optional, Any
+
+from db.connection import db
+from db.queries import generation_history as gen_queries
+from utils.cancellation import CancelToken
+from utils.metrics import (
+    generation_queue_depth, generation_queue_wait_seconds, generation_workers_busy
+)
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """В очереди уже GENERATION_QUEUE_SIZE генераций"""
+
+
+class GenerationQueue:
+    """Воркеры очереди генераций (start() - при запуске gRPC сервера)"""
+
+    def __init__(self, workers: Optional[int] = None, max_size: Optional[int] = None):
+        self.workers = config.GENERATION_WORKERS if workers is None else workers
+        self.max_size = config.GENERATION_QUEUE_SIZE if max_size is None else max_size
+        self.worker_name = config.GENERATION_WORKER_ID
+        self._runner: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._threads = []
+        self._wakeup = threading.Condition()
+        self._tokens: Dict[str, CancelToken] = {}  # job_id -> токен выполняемой генерации
+        self._lock = threading.Lock()
+
+    def start(self, runner: Callable[[Dict[str, Any]], None]):
+        """
+        Запустить воркеры
+
+        Args:
+            runner: Выполнение генерации по строке generation_history (с params)
+        """
+        if self._threads:
+            return
+        self._runner = runner
+
+        interrupted = db.execute_query(
+            gen_queries.FAIL_INTERRUPTED_GENERATIONS, {'worker': self.worker_name}, fetch=True
+        )
+        if interrupted:
+            logger.warning(
+                f"⚠️ Marked {len(interrupted)} generations interrupted by restart as failed"
+            )
+
+        for number in range(max(1, self.workers)):
+            thread = threading.Thread(
+                target=self._work, name=f"generation-worker-{number + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self.depth()
+        logger.info(
+            f"📥 Generation queue: {len(self._threads)} workers, up to {self.max_size} queued"
+        )
+
+    def ensure_capacity(self):
+        """QueueFull, если очередь заполнена"""
+        depth = self.depth()
+        if self.max_size > 0 and depth >= self.max_size:
+            raise QueueFull(
+                f"Generation queue is full ({depth}/{self.max_size}), try again later"
+            )
+
+    def notify(self):
+        """Разбудить свободный воркер: в очереди новая генерация"""
+        self.depth()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def position(self, job_id: str) -> int:
+        """Позиция генерации в очереди (0 - не в очереди)"""
+        rows = db.execute_query(gen_queries.SELECT_QUEUE_POSITION, {'job_id': job_id}, fetch=True)
+        return int(rows[0]['position']) if rows else 0
+
+    def depth(self) -> int:
+        """Число генераций в очереди (и метрика generation_queue_depth)"""
+        rows = db.execute_query(gen_queries.COUNT_QUEUED_GENERATIONS, {}, fetch=True)
+        depth = int(rows[0]['queued']) if rows else 0
+        generation_queue_depth.set(depth)
+        return depth
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Остановить выполняемую этим процессом генерацию (кооперативно)
+
+        Статус 'stopped' в БД пишет вызывающий (StopGeneration); генерации
+        в очереди воркер просто не возьмёт, выполняемые в другом экземпляре
+        ms-agent остановятся по опросу статуса.
+
+        Returns:
+            True - генерация выполнялась в этом процессе
+        """
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def is_running(self, job_id: str) -> bool:
+        """Генерация выполняется воркером этого процесса"""
+        with self._lock:
+            return job_id in self._tokens
+
+    def _work(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error(f"❌ Failed to claim queued generation: {e}", exc_info=True)
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=config.GENERATION_QUEUE_POLL_INTERVAL)
+                continue
+
+            self._run(job)
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        rows = db.execute_query(
+            gen_queries.CLAIM_NEXT_GENERATION, {'worker': self.worker_name}, fetch=True
+        )
+        if not rows:
+            return None
+        job = rows[0]
+        wait = float(job.get('wait_seconds') or 0.0)
+        generation_queue_wait_seconds.observe(wait)
+        self.depth()
+        logger.info(
+            f"▶️ Generation {job['job_id']} (priority {job.get('priority', 0)}) "
+            f"started after {wait:.1f}s in queue"
+        )
+        return job
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job['job_id']
+        token = CancelToken(job_id)
+        with self._lock:
+            self._tokens[job_id] = token
+        generation_workers_busy.inc()
+        try:
+            with token.bind():
+                self._runner(job)
+        except Exception as e:
+            # runner сам пишет статус генерации; сюда попадают только его собственные ошибки
+            logger.error(f"❌ Generation worker failed on {job_id}: {e}", exc_info=True)
+        finally:
+            generation_workers_busy.dec()
+            with self._lock:
+                self._tokens.pop(job_id, None)
+
+
+# Singleton instance
+generation_queue = GenerationQueue()
@@ -3,9 +3,13 @@ LLM Agent Improver для генетического алгоритма
 Использование Stage1Agent для локальной оптимизации лучших расписаний
 """
 import logging
-from typing import List, Dict
-from utils.chromosome import Chromosome, Lesson
+from typing import List, Dict, Optional
+from utils.chromosome import Chromosome
+from utils.load_catalog import CATALOG_KEY, LOAD_IDX_KEY
+from utils.preference_matrix import PreferenceMatrix
 from services.stage1_agent import Stage1Agent
+from utils import cancellation
+from utils.cancellation import GenerationCancelled
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +18,13 @@ class LLMAgentImprover:
     """Улучшение через Stage1Agent (LLM с инструментами)"""
     
     def __init__(self, generation_id: int, teacher_preferences: Dict, 
-                 classrooms: List[Dict] = None, groups: Dict = None):
+                 classrooms: List[Dict] = None, groups: Dict = None,
+                 preference_matrix: Optional[PreferenceMatrix] = None):
         self.generation_id = generation_id
         self.teacher_preferences = teacher_preferences
         self.classrooms = classrooms or []
         self.groups = groups or {}
+        self.preference_matrix = preference_matrix
     
     def improve_top_chromosomes(self,
                                chromosomes: List[Chromosome],
@@ -45,6 +51,7 @@ class LLMAgentImprover:
         improved = []
         
         for i, chromosome in enumerate(top):
+            cancellation.check()
             try:
                 logger.info(
                     f"🤖 Improving chromosome {i + 1}/{top_n} "
@@ -77,7 +84,8 @@ class LLMAgentImprover:
                     fitness_calc = FitnessCalculator(
                         teacher_preferences=self.teacher_preferences,
                         classrooms=self.classrooms,
-                        groups=self.groups
+                        groups=self.groups,
+                        preference_matrix=self.preference_matrix
                     )
                     fitness_calc.calculate(improved_chromosome)
                     
@@ -91,6 +99,8 @@ class LLMAgentImprover:
                     logger.warning("Stage1Agent failed, keeping original")
                     improved.append(chromosome)
                     
+            except GenerationCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error improving chromosome {i + 1}: {e}")
                 improved.append(chromosome)
@@ -98,19 +108,23 @@ class LLMAgentImprover:
         return improved
     
     def _chromosome_to_schedule(self, chromosome: Chromosome) -> List[Dict]:
-        """Преобразовать Chromosome в формат для Stage1Agent"""
+        """
+        Преобразовать Chromosome в формат для Stage1Agent
+        
+        Названия не копируются в каждое занятие: load_idx ссылается на
+        LoadCatalog хромосомы, отчёты о нарушениях берут имена из него
+        (utils.load_catalog.lesson_names).
+        """
         schedule = []
+        catalog = chromosome.loads
         
         for idx, lesson in enumerate(chromosome.lessons):
             schedule.append({
                 'id': idx,  # Уникальный индекс
-                'course_load_id': lesson.course_load_id,
-                'discipline_name': lesson.discipline_name,
-                'lesson_type': lesson.lesson_type,
+                CATALOG_KEY: catalog,
+                LOAD_IDX_KEY: lesson.load_idx,
                 'group_id': lesson.group_id,
-                'group_name': lesson.group_name,
                 'teacher_id': lesson.teacher_id,
-                'teacher_name': lesson.teacher_name,
                 'classroom_id': lesson.classroom_id,
                 'day_of_week': lesson.day,
                 'time_slot': lesson.slot,
@@ -124,40 +138,29 @@ class LLMAgentImprover:
                                schedule: List[Dict],
                                original: Chromosome) -> Chromosome:
         """Преобразовать расписание обратно в Chromosome"""
-        lessons = []
-        
-        # Создать маппинг по индексу
-        original_lessons = list(original.lessons)
+        size = len(original)
+        indices = []
+        days = []
+        slots = []
         
         for lesson_dict in schedule:
             lesson_id = lesson_dict.get('id', -1)
             
-            # Найти оригинальный lesson по индексу
-            if 0 <= lesson_id < len(original_lessons):
-                original_lesson = original_lessons[lesson_id]
-                # Обновить день и слот
-                lesson = original_lesson.copy()
-                lesson.day = lesson_dict.get('day_of_week', lesson.day)
-                lesson.slot = lesson_dict.get('time_slot', lesson.slot)
-                lessons.append(lesson)
-            else:
-                # Создать новый lesson из словаря
-                lesson = Lesson(
-                    course_load_id=lesson_dict.get('course_load_id', 0),
-                    discipline_name=lesson_dict.get('discipline_name', ''),
-                    lesson_type=lesson_dict.get('lesson_type', 'Практика'),
-                    group_id=lesson_dict.get('group_id', 0),
-                    group_name=lesson_dict.get('group_name', ''),
-                    teacher_id=lesson_dict.get('teacher_id', 0),
-                    teacher_name=lesson_dict.get('teacher_name', ''),
-                    classroom_id=lesson_dict.get('classroom_id', 0),
-                    day=lesson_dict.get('day_of_week', 1),
-                    slot=lesson_dict.get('time_slot', 1),
-                    week=lesson_dict.get('week_number', 1)
-                )
-                lessons.append(lesson)
+            # Найти оригинальный ген по индексу
+            if not 0 <= lesson_id < size:
+                logger.warning(f"Unknown lesson id {lesson_id} in agent schedule, skipping")
+                continue
+            
+            indices.append(lesson_id)
+            days.append(lesson_dict.get('day_of_week', int(original.day[lesson_id])))
+            slots.append(lesson_dict.get('time_slot', int(original.slot[lesson_id])))
         
-        return Chromosome(lessons)
+        # Обновить день и слот
+        improved = Chromosome(original.loads, original.genes[:, indices])
+        improved.day[:] = days
+        improved.slot[:] = slots
+        
+        return improved
     
     def _get_teacher_priority(self, teacher_id: int) -> int:
         """Получить приоритет преподавателя"""
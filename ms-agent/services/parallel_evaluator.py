@@ -0,0 +1,144 @@
+"""
+Parallel Evaluator для генетического алгоритма
+Оценка популяции в пуле процессов
+
+Статический контекст (предпочтения, аудитории, группы, нагрузки)
+передаётся в каждый процесс один раз через initializer пула.
+На каждую оценку пересылаются только массивы генов.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+
+from config import config
+from utils.chromosome import Chromosome, LoadTable
+from utils.preference_matrix import PreferenceMatrix
+from utils.process_pool import pool_workers
+from services.fitness_calculator import FitnessCalculator
+from services.fitness_cache import pack_result, apply_result
+
+logger = logging.getLogger(__name__)
+
+
+# ============ Состояние процесса-воркера ============
+
+_worker_calculator: Optional[FitnessCalculator] = None
+_worker_loads: Optional[LoadTable] = None
+
+
+def _init_worker(teacher_preferences: Dict,
+                 classrooms: List[Dict],
+                 groups: Dict,
+                 course_loads: List[Dict],
+                 engine: str,
+                 preference_matrix: PreferenceMatrix):
+    """Инициализация воркера: один раз на процесс (кэш fitness - в главном процессе)"""
+    global _worker_calculator, _worker_loads
+    _worker_calculator = FitnessCalculator(
+        teacher_preferences=teacher_preferences,
+        classrooms=classrooms,
+        groups=groups,
+        engine=engine,
+        preference_matrix=preference_matrix,
+        cache_size=0
+    )
+    _worker_loads = LoadTable(course_loads)
+
+
+def _evaluate_chunk(genes_chunk: List[np.ndarray], encoding: str) -> List[Tuple]:
+    """Оценить пачку хромосом в воркере (encoding - кодировка генов LoadTable)"""
+    loads = _worker_loads.with_encoding(encoding)
+    results = []
+    for genes in genes_chunk:
+        chromosome = Chromosome(loads, genes)
+        _worker_calculator.evaluate(chromosome)
+        results.append(pack_result(chromosome))
+    return results
+
+
+class ParallelEvaluator:
+    """
+    Оценка популяции в пуле процессов
+
+    workers <= 1 - последовательная оценка в текущем процессе.
+    Порядок нагрузок в course_loads должен совпадать с LoadTable хромосом.
+    Кэш fitness проверяется до отправки: в пул уходят только новые геномы.
+    """
+
+    def __init__(self,
+                 context: Dict[str, Any],
+                 fitness_calculator: FitnessCalculator,
+                 workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None):
+        self.fitness_calculator = fitness_calculator
+
+        self.workers = pool_workers(config.GA_EVAL_WORKERS if workers is None else workers)
+        self.chunk_size = max(1, chunk_size or config.GA_EVAL_CHUNK_SIZE)
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    context['teacher_preferences'],
+                    context['classrooms'],
+                    context['groups'],
+                    context['course_loads'],
+                    fitness_calculator.engine,
+                    fitness_calculator.preferences
+                )
+            )
+            logger.info(
+                f"⚙️ Parallel evaluation: {self.workers} workers, "
+                f"chunk size {self.chunk_size}"
+            )
+
+    def evaluate(self, population: List[Chromosome]):
+        """Рассчитать fitness для всей популяции"""
+        if self._pool is None or len(population) <= self.chunk_size:
+            for chromosome in population:
+                self.fitness_calculator.calculate(chromosome)
+            return
+
+        # Неизменённые геномы - из кэша, в пул только промахи
+        cache = self.fitness_calculator.cache
+        pending: List[Tuple[Chromosome, Optional[Tuple]]] = []
+        for chromosome in population:
+            if not cache.enabled:
+                pending.append((chromosome, None))
+                continue
+            key, hit = cache.lookup(chromosome)
+            if not hit:
+                pending.append((chromosome, key))
+
+        chunks = [
+            pending[i:i + self.chunk_size]
+            for i in range(0, len(pending), self.chunk_size)
+        ]
+        futures = [
+            self._pool.submit(
+                _evaluate_chunk, [c.genes for c, _ in chunk], chunk[0][0].loads.encoding
+            )
+            for chunk in chunks
+        ]
+
+        for chunk, future in zip(chunks, futures):
+            for (chromosome, key), result in zip(chunk, future.result()):
+                apply_result(chromosome, result)
+                if key is not None:
+                    cache.store(key, chromosome)
+
+    def close(self):
+        """Остановить пул"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> 'ParallelEvaluator':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -4,8 +4,11 @@ Population Initializer для генетического алгоритма
 """
 import random
 import logging
-from typing import List, Dict, Any
-from utils.chromosome import Chromosome, Lesson
+from typing import List, Dict, Any, Tuple, Optional
+from config import config
+from utils.chromosome import Chromosome, LoadTable, week_mask, mask_weeks
+from utils.preference_matrix import PreferenceMatrix
+from utils.classroom_types import is_lab_classroom, is_lab_lesson
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +19,9 @@ class PopulationInitializer:
     WEEKS_IN_SEMESTER = 16
     DAYS_PER_WEEK = 6
     SLOTS_PER_DAY = 6
+    MAX_LESSONS_PER_DAY = 4  # ЖЁСТКОЕ ОГРАНИЧЕНИЕ - ЗАКОН!
     
-    def __init__(self, context: Dict):
+    def __init__(self, context: Dict, encoding: Optional[str] = None):
         """
         Args:
             context: {
@@ -26,12 +30,22 @@ class PopulationInitializer:
                 'teachers': Dict[teacher_id, info],
                 'groups': Dict[group_id, info]
             }
+            encoding: кодировка генов - weekly (lessons_per_week × 16 генов)
+                или template (lessons_per_week генов с маской недель).
+                По умолчанию config.GA_GENE_ENCODING
         """
         self.context = context
         self.course_loads = context.get('course_loads', [])
         self.classrooms = context.get('classrooms', [])
         self.teachers = context.get('teachers', {})
         self.groups = context.get('groups', {})
+        
+        # Общие метаданные нагрузок для всех хромосом популяции
+        self.loads = LoadTable(self.course_loads, encoding or config.GA_GENE_ENCODING)
+        
+        # План размещения для конструктивного инициализатора
+        self._build_placement_plan()
+        self._last_unplaced = 0
     
     def create_population(self, size: int = 50) -> List[Chromosome]:
         """
@@ -39,7 +53,8 @@ class PopulationInitializer:
         
         Алгоритм:
         1. Для каждой course_load создать lessons_per_week × 16 недель пар
-        2. Случайно распределить по слотам
+           (в кодировке template - lessons_per_week занятий шаблона)
+        2. Случайно распределить по свободным слотам (битовые маски)
         3. Проверить на конфликты
         4. Повторять пока не получим size валидных
         """
@@ -58,7 +73,8 @@ class PopulationInitializer:
                     chromosome = self._create_random_chromosome()
                     
                     # КРИТИЧНО: проверить на конфликты
-                    if self._has_no_conflicts(chromosome):
+                    # (если все занятия размещены в свободные слоты, конфликтов нет по построению)
+                    if self._last_unplaced == 0 or self._has_no_conflicts(chromosome):
                         population.append(chromosome)
                         logger.info(f"Created valid chromosome {i + 1}/{size}")
                         break
@@ -88,151 +104,236 @@ class PopulationInitializer:
     
     def _create_random_chromosome(self) -> Chromosome:
         """
-        Создать случайное расписание с учетом ограничений
+        Создать случайное расписание без конфликтов (конструктивно)
         
         Для каждой course_load из Excel:
         - lessons_per_week пар в неделю
-        - 16 недель
+        - 16 недель (или недели из week_type нагрузки)
         - Итого: lessons_per_week × 16 пар
+        В кодировке template занятие ставится сразу во все недели своей
+        маски: свободный слот - пересечение свободных слотов этих недель.
         
-        Алгоритм: размещаем занятия с учетом ограничений (максимум 4 пары в день)
+        Занятость преподавателей, групп и аудиторий хранится 36-битными масками
+        на неделю (бит = день × 6 + пара). Свободные слоты занятия -
+        одна операция над масками, слот выбирается равномерно среди них.
+        Нагрузки размещаются от самых ограниченных (most-constrained-first),
+        порядок генов в хромосоме не зависит от порядка размещения.
         """
-        lessons = []
+        plan = self._placement_plan
+        total = self._total_lessons
         
-        # Отслеживание занятости слотов для каждой недели
-        # {(week, day, slot): set((teacher_id, group_id, classroom_id))}
-        occupied_slots = {}
+        # Колонки генов (позиция занятия фиксирована планом)
+        load_column = [0] * total
+        day_column = [0] * total
+        slot_column = [0] * total
+        week_column = [0] * total
+        classroom_column = [0] * total
         
-        # Отслеживание количества пар в день для каждой недели
-        # {(week, day, teacher_id): count} и {(week, day, group_id): count}
-        teacher_day_count = {}
-        group_day_count = {}
+        # Маски занятости по (сущность, неделя): бит = день × 6 + пара
+        weeks = self.WEEKS_IN_SEMESTER
+        teacher_busy = [0] * (self._teacher_count * weeks)
+        group_busy = [0] * (self._group_count * weeks)
+        teacher_full = [0] * (self._teacher_count * weeks)   # дни, где уже 4 пары
+        group_full = [0] * (self._group_count * weeks)
+        room_busy: Dict[Tuple[int, int], int] = {}
         
-        MAX_LESSONS_PER_DAY = 4
+        slots_mask = (1 << (self.DAYS_PER_WEEK * self.SLOTS_PER_DAY)) - 1
+        day_mask = (1 << self.SLOTS_PER_DAY) - 1
+        max_per_day = self.MAX_LESSONS_PER_DAY
+        unplaced = 0
         
-        for course_load in self.course_loads:
-            # Сколько пар в неделю (вычислено парсером из часов!)
-            lessons_per_week = course_load.get('lessons_per_week', 1)
+        # Most-constrained-first, случайный порядок при равной сложности
+        order = sorted(
+            range(len(plan)),
+            key=lambda i: (-plan[i]['difficulty'], random.random())
+        )
+        
+        for plan_idx in order:
+            entry = plan[plan_idx]
+            load_idx = entry['load_idx']
+            t_base = entry['teacher'] * weeks
+            g_base = entry['group'] * weeks
+            unavailable = entry['unavailable']
+            rooms = entry['rooms']
+            position = entry['position']
             
-            # Пропустить если нет teacher_id или group_id
+            # Единица размещения: (значение гена week, недели 0..15)
+            for week_gene, unit_weeks in entry['units']:
+                for _ in range(entry['lessons_per_week']):
+                    busy = unavailable
+                    for week in unit_weeks:
+                        busy |= (
+                            teacher_busy[t_base + week] | teacher_full[t_base + week] |
+                            group_busy[g_base + week] | group_full[g_base + week]
+                        )
+                    free = ~busy & slots_mask
+                    
+                    bit = room_id = None
+                    while free:
+                        bit = self._random_bit(free)
+                        room_id = self._free_room(rooms, room_busy, unit_weeks, 1 << bit)
+                        if room_id is not None:
+                            break
+                        free &= ~(1 << bit)  # Все подходящие аудитории заняты
+                    
+                    load_column[position] = load_idx
+                    week_column[position] = week_gene
+                    
+                    if not free:
+                        # Свободного слота нет - случайное место (валидация отфильтрует)
+                        unplaced += 1
+                        day_column[position] = random.randint(1, self.DAYS_PER_WEEK)
+                        slot_column[position] = random.randint(1, self.SLOTS_PER_DAY)
+                        classroom_column[position] = random.choice(rooms)
+                        position += 1
+                        continue
+                    
+                    day, slot = divmod(bit, self.SLOTS_PER_DAY)
+                    day_column[position] = day + 1
+                    slot_column[position] = slot + 1
+                    classroom_column[position] = room_id
+                    position += 1
+                    
+                    # Занять слот во всех неделях единицы
+                    flag = 1 << bit
+                    shift = day * self.SLOTS_PER_DAY
+                    for week in unit_weeks:
+                        t = t_base + week
+                        g = g_base + week
+                        teacher_busy[t] |= flag
+                        group_busy[g] |= flag
+                        room_key = (room_id, week)
+                        room_busy[room_key] = room_busy.get(room_key, 0) | flag
+                        
+                        # Максимум пар в день: закрыть день целиком
+                        if ((teacher_busy[t] >> shift) & day_mask).bit_count() >= max_per_day:
+                            teacher_full[t] |= day_mask << shift
+                        if ((group_busy[g] >> shift) & day_mask).bit_count() >= max_per_day:
+                            group_full[g] |= day_mask << shift
+        
+        self._last_unplaced = unplaced
+        if unplaced:
+            logger.debug(f"Constructive initializer: {unplaced} lessons without free slot")
+        
+        return Chromosome.from_arrays(
+            self.loads,
+            load_column, day_column, slot_column, week_column, classroom_column
+        )
+    
+    @staticmethod
+    def _random_bit(mask: int) -> int:
+        """Равномерно выбрать один из установленных битов маски"""
+        for _ in range(random.randrange(mask.bit_count())):
+            mask &= mask - 1  # Сбросить младший бит
+        return (mask & -mask).bit_length() - 1
+    
+    @staticmethod
+    def _free_room(rooms: List[int], room_busy: Dict[Tuple[int, int], int],
+                   weeks: List[int], flag: int) -> Optional[int]:
+        """Случайная подходящая аудитория, свободная в слоте flag во всех weeks (None - нет)"""
+        def is_free(room_id: int) -> bool:
+            return not any(room_busy.get((room_id, week), 0) & flag for week in weeks)
+        
+        for _ in range(min(4, len(rooms))):
+            room_id = random.choice(rooms)
+            if is_free(room_id):
+                return room_id
+        
+        free_rooms = [r for r in rooms if is_free(r)]
+        return random.choice(free_rooms) if free_rooms else None
+    
+    def _build_placement_plan(self):
+        """
+        Предрасчёт для конструктивного инициализатора (один раз на популяцию)
+        
+        Плотные индексы преподавателей/групп, маски недоступности,
+        подходящие аудитории и сложность размещения каждой нагрузки.
+        """
+        slots_per_week = self.DAYS_PER_WEEK * self.SLOTS_PER_DAY
+        teacher_index: Dict[int, int] = {}
+        group_index: Dict[int, int] = {}
+        teacher_demand: Dict[int, int] = {}
+        group_demand: Dict[int, int] = {}
+        
+        preferences = PreferenceMatrix.from_context(self.context)
+        unavailable_masks: Dict[int, int] = {}
+        
+        plan = []
+        position = 0
+        for load_idx, course_load in enumerate(self.course_loads):
             teacher_id = course_load.get('teacher_id', 0)
             group_id = course_load.get('group_id', 0)
             
+            # Пропустить если нет teacher_id или group_id
             if teacher_id == 0 or group_id == 0:
                 continue
             
-            # Для каждой из 16 недель
-            for week in range(1, self.WEEKS_IN_SEMESTER + 1):
-                # Создать lessons_per_week пар
-                for _ in range(lessons_per_week):
-                    # Попытаться найти свободный слот
-                    attempts = 0
-                    max_slot_attempts = 100
-                    placed = False
-                    
-                    while attempts < max_slot_attempts and not placed:
-                        # Случайный слот
-                        day = random.randint(1, self.DAYS_PER_WEEK)
-                        slot = random.randint(1, self.SLOTS_PER_DAY)
-                        
-                        key = (week, day, slot)
-                        
-                        # Проверить конфликты
-                        if key in occupied_slots:
-                            # Проверить, нет ли конфликта с этим преподавателем/группой/аудиторией
-                            conflicts = occupied_slots[key]
-                            has_conflict = False
-                            
-                            for (t_id, g_id, c_id) in conflicts:
-                                if t_id == teacher_id or g_id == group_id:
-                                    has_conflict = True
-                                    break
-                            
-                            if has_conflict:
-                                attempts += 1
-                                continue
-                        
-                        # Проверить максимум пар в день
-                        teacher_key = (week, day, teacher_id)
-                        group_key = (week, day, group_id)
-                        
-                        if teacher_day_count.get(teacher_key, 0) >= MAX_LESSONS_PER_DAY:
-                            attempts += 1
-                            continue
-                        
-                        if group_day_count.get(group_key, 0) >= MAX_LESSONS_PER_DAY:
-                            attempts += 1
-                            continue
-                        
-                        # Случайная подходящая аудитория
-                        classroom = self._select_classroom(course_load)
-                        classroom_id = classroom.get('id', 0)
-                        
-                        # Проверить конфликт аудитории
-                        if key in occupied_slots:
-                            for (t_id, g_id, c_id) in occupied_slots[key]:
-                                if c_id == classroom_id and c_id != 0:
-                                    has_conflict = True
-                                    break
-                            
-                            if has_conflict:
-                                attempts += 1
-                                continue
-                        
-                        # Разместить занятие
-                        lesson = Lesson(
-                            course_load_id=course_load.get('id', 0),
-                            discipline_name=course_load.get('discipline_name', ''),
-                            lesson_type=course_load.get('lesson_type', 'Практика'),
-                            group_id=group_id,
-                            group_name=course_load.get('group_name', ''),
-                            teacher_id=teacher_id,
-                            teacher_name=course_load.get('teacher_name', ''),
-                            classroom_id=classroom_id,
-                            day=day,
-                            slot=slot,
-                            week=week
-                        )
-                        
-                        lessons.append(lesson)
-                        
-                        # Обновить отслеживание
-                        if key not in occupied_slots:
-                            occupied_slots[key] = set()
-                        occupied_slots[key].add((teacher_id, group_id, classroom_id))
-                        
-                        teacher_day_count[teacher_key] = teacher_day_count.get(teacher_key, 0) + 1
-                        group_day_count[group_key] = group_day_count.get(group_key, 0) + 1
-                        
-                        placed = True
-                    
-                    # Если не удалось разместить после всех попыток, разместить в случайном месте
-                    # (валидация потом отфильтрует)
-                    if not placed:
-                        day = random.randint(1, self.DAYS_PER_WEEK)
-                        slot = random.randint(1, self.SLOTS_PER_DAY)
-                        classroom = self._select_classroom(course_load)
-                        
-                        lesson = Lesson(
-                            course_load_id=course_load.get('id', 0),
-                            discipline_name=course_load.get('discipline_name', ''),
-                            lesson_type=course_load.get('lesson_type', 'Практика'),
-                            group_id=group_id,
-                            group_name=course_load.get('group_name', ''),
-                            teacher_id=teacher_id,
-                            teacher_name=course_load.get('teacher_name', ''),
-                            classroom_id=classroom.get('id', 0),
-                            day=day,
-                            slot=slot,
-                            week=week
-                        )
-                        
-                        lessons.append(lesson)
+            lessons_per_week = course_load.get('lessons_per_week', 1)
+            
+            # Недоступные слоты преподавателя (маска одной недели)
+            if teacher_id not in unavailable_masks:
+                row = preferences.row(teacher_id)
+                mask = 0
+                for day in range(self.DAYS_PER_WEEK):
+                    for slot in range(self.SLOTS_PER_DAY):
+                        if preferences.unavailable[row, day + 1, slot + 1]:
+                            mask |= 1 << (day * self.SLOTS_PER_DAY + slot)
+                unavailable_masks[teacher_id] = mask
+            
+            rooms = [c.get('id', 0) for c in self._suitable_classrooms(course_load)]
+            
+            # Недели нагрузки: week_type ('odd'/'even'/'both') или маска, по умолчанию все
+            mask = week_mask(course_load.get('week_type'))
+            weeks = [week - 1 for week in mask_weeks(mask)]
+            if self.loads.is_template:
+                units = [(mask, weeks)]
+            else:
+                units = [(week + 1, [week]) for week in weeks]
+            
+            plan.append({
+                'load_idx': load_idx,
+                'teacher': teacher_index.setdefault(teacher_id, len(teacher_index)),
+                'group': group_index.setdefault(group_id, len(group_index)),
+                'teacher_id': teacher_id,
+                'group_id': group_id,
+                'lessons_per_week': lessons_per_week,
+                'unavailable': unavailable_masks[teacher_id],
+                'rooms': rooms or [0],
+                'units': units,
+                'position': position
+            })
+            position += lessons_per_week * len(units)
+            
+            teacher_demand[teacher_id] = teacher_demand.get(teacher_id, 0) + lessons_per_week
+            group_demand[group_id] = group_demand.get(group_id, 0) + lessons_per_week
         
-        return Chromosome(lessons)
+        # Сложность: недельная нагрузка преподавателя и группы
+        # относительно доступных слотов + дефицит аудиторий
+        for entry in plan:
+            available = slots_per_week - entry['unavailable'].bit_count()
+            entry['difficulty'] = (
+                (teacher_demand[entry['teacher_id']] + group_demand[entry['group_id']])
+                / max(available, 1)
+                + 1.0 / len(entry['rooms'])
+            )
+        
+        self._placement_plan = plan
+        self._total_lessons = position
+        self._teacher_count = len(teacher_index)
+        self._group_count = len(group_index)
     
     def _select_classroom(self, course_load: Dict) -> Dict:
         """Выбрать подходящую аудиторию"""
+        suitable = self._suitable_classrooms(course_load)
+        
+        if not suitable:
+            # Если вообще нет аудиторий - создать виртуальную
+            return {'id': 0, 'name': 'Unknown', 'capacity': 100}
+        
+        return random.choice(suitable)
+    
+    def _suitable_classrooms(self, course_load: Dict) -> List[Dict]:
+        """Подходящие аудитории (по вместимости; если таких нет - все)"""
         group_size = course_load.get('group_size') or course_load.get('students_count')
         lesson_type = course_load.get('lesson_type', 'Практика')
         
@@ -240,28 +341,24 @@ class PopulationInitializer:
         suitable = []
         for classroom in self.classrooms:
             capacity = classroom.get('capacity', 0)
-            classroom_type = classroom.get('classroom_type', '')
             
             # Проверка вместимости
             if group_size and capacity < group_size:
                 continue
             
-            # Проверка типа (если требуется)
-            if lesson_type == 'Лабораторная' and 'LAB' not in classroom_type.upper():
-                # Предпочтительно лаборатория, но не обязательно
-                pass
-            
             suitable.append(classroom)
         
+        # Лабораторные - в лаборатории, если такие есть (иначе жёсткое нарушение типа)
+        if is_lab_lesson(lesson_type):
+            labs = [c for c in suitable if is_lab_classroom(c)]
+            if labs:
+                suitable = labs
+        
         if not suitable:
             # Если нет подходящих - взять любую
             suitable = self.classrooms
         
-        if not suitable:
-            # Если вообще нет аудиторий - создать виртуальную
-            return {'id': 0, 'name': 'Unknown', 'capacity': 100}
-        
-        return random.choice(suitable)
+        return suitable
     
     def _has_no_conflicts(self, chromosome: Chromosome) -> bool:
         """
@@ -274,6 +371,9 @@ class PopulationInitializer:
         """
         MAX_LESSONS_PER_DAY = 4  # ЖЁСТКОЕ ОГРАНИЧЕНИЕ - ЗАКОН!
         
+        # Шаблон проверяется по неделям
+        chromosome = chromosome.expand()
+        
         teacher_slots = set()
         group_slots = set()
         classroom_slots = set()
@@ -282,36 +382,43 @@ class PopulationInitializer:
         group_day_lessons = {}  # {(group_id, day, week): set(slots)}
         teacher_day_lessons = {}  # {(teacher_id, day, week): set(slots)}
         
-        for lesson in chromosome.lessons:
-            key = (lesson.day, lesson.slot, lesson.week)
+        for teacher_id, group_id, classroom_id, day, slot, week in zip(
+            chromosome.teacher_ids.tolist(),
+            chromosome.group_ids.tolist(),
+            chromosome.classroom.tolist(),
+            chromosome.day.tolist(),
+            chromosome.slot.tolist(),
+            chromosome.week.tolist()
+        ):
+            key = (day, slot, week)
             
             # Проверка конфликтов
-            teacher_key = (lesson.teacher_id,) + key
+            teacher_key = (teacher_id,) + key
             if teacher_key in teacher_slots:
                 return False
             teacher_slots.add(teacher_key)
             
-            group_key = (lesson.group_id,) + key
+            group_key = (group_id,) + key
             if group_key in group_slots:
                 return False
             group_slots.add(group_key)
             
-            classroom_key = (lesson.classroom_id,) + key
+            classroom_key = (classroom_id,) + key
             if classroom_key in classroom_slots:
                 return False
             classroom_slots.add(classroom_key)
             
             # Проверка максимума пар в день для студентов
-            group_day_key = (lesson.group_id, lesson.day, lesson.week)
+            group_day_key = (group_id, day, week)
             if group_day_key not in group_day_lessons:
                 group_day_lessons[group_day_key] = set()
-            group_day_lessons[group_day_key].add(lesson.slot)
+            group_day_lessons[group_day_key].add(slot)
             
             # Проверка максимума пар в день для преподавателей
-            teacher_day_key = (lesson.teacher_id, lesson.day, lesson.week)
+            teacher_day_key = (teacher_id, day, week)
             if teacher_day_key not in teacher_day_lessons:
                 teacher_day_lessons[teacher_day_key] = set()
-            teacher_day_lessons[teacher_day_key].add(lesson.slot)
+            teacher_day_lessons[teacher_day_key].add(slot)
         
         # Проверить максимум пар в день для студентов
         for key, slots in group_day_lessons.items():
@@ -0,0 +1,235 @@
+"""
+Progress Bus - прогресс генераций в памяти процесса
+
+Итерации ГА и Stage1Agent публикуют события прогресса в шину,
+WatchGeneration (server-streaming gRPC) сразу раздаёт их подписчикам.
+generation_history в БД обновляется с прореживанием (PROGRESS_DB_INTERVAL):
+запись на каждой итерации нужна была только для опроса статуса.
+"""
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Callable, Iterator, Any
+
+from config import config
+from db.connection import db
+from db.queries import generation_history as gen_queries
+from utils import profiling
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed', 'stopped')
+
+# Последнее событие хранится для поздних подписчиков (по числу генераций)
+MAX_RETAINED_JOBS = 64
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    return event.get('status') in TERMINAL_STATUSES
+
+
+class ProgressBus:
+    """
+    Pub/sub событий прогресса по job_id
+
+    Подписчик сразу получает последнее событие генерации, затем - новые.
+    Очередь подписчика ограничена queue_size: медленный подписчик теряет
+    старые промежуточные события, последнее (в т.ч. терминальное) доходит всегда.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._last: "OrderedDict[str, Dict]" = OrderedDict()
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        """Опубликовать событие прогресса генерации job_id"""
+        event = dict(event, job_id=job_id, timestamp=time.time())
+        with self._lock:
+            self._last[job_id] = event
+            self._last.move_to_end(job_id)
+            while len(self._last) > MAX_RETAINED_JOBS:
+                self._last.popitem(last=False)
+            for subscriber in self._subscribers.get(job_id, ()):
+                self._offer(subscriber, event)
+
+    def close(self, job_id: str, status: str, error_message: Optional[str] = None):
+        """Терминальное событие: последний прогресс + итоговый статус"""
+        with self._lock:
+            last = self._last.get(job_id, {})
+        self.publish(job_id, dict(last, status=status, error_message=error_message or ''))
+
+    def last(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._last.get(job_id)
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        subscriber: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            last = self._last.get(job_id)
+            if last is not None:
+                subscriber.put_nowait(last)
+            self._subscribers.setdefault(job_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, job_id: str, subscriber: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def watch(self,
+              job_id: str,
+              is_active: Callable[[], bool] = lambda: True,
+              poll_interval: float = 1.0,
+              idle_timeout: Optional[float] = None) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        События генерации до терминального статуса
+
+        is_active проверяется раз в poll_interval секунд:
+        клиент отключился - подписка снимается. idle_timeout - нет событий
+        столько секунд: yield None (пульс), вызывающий решает, ждать ли дальше.
+        """
+        subscriber = self.subscribe(job_id)
+        last_event = time.monotonic()
+        try:
+            while is_active():
+                try:
+                    event = subscriber.get(timeout=poll_interval)
+                except queue.Empty:
+                    if idle_timeout and time.monotonic() - last_event >= idle_timeout:
+                        last_event = time.monotonic()
+                        yield None
+                    continue
+                last_event = time.monotonic()
+                yield event
+                if is_terminal(event):
+                    return
+        finally:
+            self.unsubscribe(job_id, subscriber)
+
+    @staticmethod
+    def _offer(subscriber: queue.Queue, event: Dict[str, Any]):
+        try:
+            subscriber.put_nowait(event)
+        except queue.Full:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            subscriber.put_nowait(event)
+
+
+class ProgressReporter:
+    """
+    Прогресс одной генерации
+
+    report() - событие в шину на каждой итерации,
+    UPDATE_GENERATION_ITERATION - не чаще раза в db_interval секунд
+    (первая итерация и flush=True пишутся сразу).
+    """
+
+    def __init__(self,
+                 job_id: str,
+                 max_iterations: int = 0,
+                 stage: str = '',
+                 db_interval: Optional[float] = None,
+                 bus: Optional[ProgressBus] = None):
+        self.job_id = job_id
+        self.max_iterations = max_iterations
+        self.stage = stage
+        self.db_interval = config.PROGRESS_DB_INTERVAL if db_interval is None else db_interval
+        self.bus = bus or progress_bus
+        self.best_score: Optional[float] = None
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._pending_best: Optional[float] = None
+        self._pending_actions = 0
+        self._last_write: Optional[float] = None
+
+    def report(self,
+               iteration: int,
+               current_score: float,
+               hard_violations: int = 0,
+               phase: str = '',
+               phase_timings: Optional[Dict[str, float]] = None,
+               reasoning: str = '',
+               flush: bool = False):
+        """Итерация завершена"""
+        if self.best_score is None or current_score > self.best_score:
+            self.best_score = current_score
+        if self._pending_best is None or current_score > self._pending_best:
+            self._pending_best = current_score
+
+        event = {
+            'stage': self.stage,
+            'status': 'running',
+            'iteration': iteration,
+            'max_iterations': self.max_iterations,
+            'current_score': current_score,
+            'best_score': self.best_score,
+            'hard_violations': hard_violations,
+            'phase': phase,
+            'phase_timings': dict(phase_timings or {}),
+            'last_reasoning': reasoning
+        }
+        self.bus.publish(self.job_id, event)
+        self._pending = event
+        self._pending_actions += 1
+
+        if (flush or self._last_write is None
+                or time.monotonic() - self._last_write >= self.db_interval):
+            self.flush()
+
+    def flush(self):
+        """Записать последнюю итерацию в generation_history"""
+        if self._pending is None:
+            return
+
+        event = self._pending
+        try:
+            with profiling.phase('progress_write'):
+                db.execute_query(
+                    gen_queries.UPDATE_GENERATION_ITERATION,
+                    {
+                        'job_id': self.job_id,
+                        'current_iteration': event['iteration'],
+                        'current_score': int(event['current_score']),
+                        'best_score': int(self._pending_best),
+                        'last_reasoning': event['last_reasoning'],
+                        'actions': self._pending_actions
+                    },
+                    fetch=False
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save progress of {self.job_id}: {e}")
+
+        self._pending = None
+        self._pending_best = None
+        self._pending_actions = 0
+        self._last_write = time.monotonic()
+
+    def finish(self, status: str, error_message: Optional[str] = None):
+        """Сохранить последнюю итерацию и итоговый статус, оповестить подписчиков"""
+        self.flush()
+        try:
+            db.execute_query(
+                gen_queries.UPDATE_GENERATION_STATUS,
+                {
+                    'job_id': self.job_id,
+                    'status': status,
+                    'error_message': error_message
+                },
+                fetch=False
+            )
+        finally:
+            self.bus.close(self.job_id, status, error_message)
+
+
+# Singleton instance
+progress_bus = ProgressBus()
@@ -0,0 +1,384 @@
+"""
+Schedule Repair - инкрементальный ремонт активного расписания
+
+Смена предпочтений одного преподавателя или добавление / удаление одной
+нагрузки не требует новой генерации всего семестра:
+
+1. Активное расписание сверяется с нагрузками семестра: занятия удалённых
+   нагрузок и лишние занятия удаляются, недостающие - добавляются в
+   свободные слоты, поля изменённых нагрузок (преподаватель, группа, ...)
+   обновляются.
+2. Затронутые занятия (изменённые и новые, занятия преподавателей из
+   teacher_ids и нагрузок из course_load_ids) задают окрестность - все
+   занятия их преподавателей и групп. Остальные занятия закреплены.
+3. Окрестность оптимизируется локальным поиском Stage1Optimizer
+   (правила services.fitness), затем сдвинутые без необходимости занятия
+   возвращаются на прежние места, если это не ухудшает скор.
+4. В БД пишется только разница (db.schedule_writer.apply_diff).
+
+Ремонтируется только недельное расписание (строка = занятие шаблона
+недели: простой генератор + Stage 1). Расписания ГА сохраняются по
+неделям семестра (to_schedule_dict: lessons_per_week x 16 строк на
+нагрузку), в schedules нет номера недели - их ремонт отклоняется
+(ShapeError), лишние строки такого расписания не удаляются.
+"""
+import time
+import random
+import logging
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+from services.stage1_optimizer import Stage1Optimizer, DAYS, SLOTS
+from services.progress_bus import ProgressReporter
+from utils import profiling
+from utils.chromosome import week_mask
+from utils.classroom_types import is_lab_classroom, is_lab_lesson
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Поля занятия, которые берутся из нагрузки
+LOAD_FIELDS = ('teacher_id', 'teacher_name', 'group_id', 'group_name', 'discipline_name', 'lesson_type')
+
+# Поля занятия, изменение которых пишется в БД (UPDATE_SCHEDULE_LESSON)
+DIFF_FIELDS = ('day_of_week', 'time_slot', 'classroom_id', 'classroom_name') + LOAD_FIELDS
+
+# Этапы генераций, сохраняющих расписание по неделям семестра (ГА, острова, кластеры)
+PER_WEEK_STAGES = ('genetic',)
+
+
+class ShapeError(ValueError):
+    """Расписание не недельное (или неоднозначное) - ремонт невозможен"""
+
+
+def check_weekly_shape(lessons: List[Dict], course_loads: List[Dict]):
+    """
+    ShapeError, если строки расписания похожи на занятия по неделям семестра
+
+    Признаки только по форме строк: номер недели в занятии, одна нагрузка
+    дважды в одном слоте недели (в недельном шаблоне это конфликт
+    преподавателя) или строк нагрузки не меньше, чем недель x
+    lessons_per_week. Отношение к текущему lessons_per_week не признак:
+    после его уменьшения лишние строки недельного расписания и удаляются
+    ремонтом.
+    """
+    weeks = {load['id']: week_mask(load.get('week_type')).bit_count() for load in course_loads}
+    per_semester = {
+        load['id']: max(1, load.get('lessons_per_week') or 1) * weeks[load['id']]
+        for load in course_loads
+    }
+    counts: Dict[Any, int] = {}
+    positions = set()
+    for lesson in lessons:
+        load_id = lesson.get('course_load_id')
+        if lesson.get('week_number') is not None:
+            raise ShapeError(
+                f"Course load {load_id} has a lesson for week {lesson['week_number']}: "
+                f"the active schedule is stored per semester week, run a full generation instead"
+            )
+        position = (load_id, lesson.get('day_of_week'), lesson.get('time_slot'))
+        if position in positions:
+            raise ShapeError(
+                f"Course load {load_id} occupies day {position[1]}, slot {position[2]} more than once: "
+                f"the active schedule is stored per semester week, run a full generation instead"
+            )
+        positions.add(position)
+        counts[load_id] = counts.get(load_id, 0) + 1
+
+    for load_id, count in counts.items():
+        if load_id in per_semester and weeks[load_id] > 1 and count >= per_semester[load_id]:
+            raise ShapeError(
+                f"Course load {load_id} has {count} lessons for {per_semester[load_id]} per semester: "
+                f"the active schedule looks stored per semester week, run a full generation instead"
+            )
+
+
+class ScheduleRepairer:
+    """
+    Ремонт сохранённого расписания под изменившиеся нагрузки и предпочтения
+
+    Работает без БД: на входе строки schedules и нагрузки, на выходе -
+    отремонтированное расписание и разница для apply_diff.
+    """
+
+    def __init__(self,
+                 lessons: List[Dict],
+                 course_loads: List[Dict],
+                 teacher_preferences: Dict,
+                 classrooms: Optional[List[Dict]] = None,
+                 teacher_ids: Iterable[int] = (),
+                 course_load_ids: Iterable[int] = (),
+                 method: Optional[str] = None,
+                 time_budget: Optional[float] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            lessons: Строки активного расписания (с id)
+            course_loads: Актуальные нагрузки семестра
+            teacher_preferences: {teacher_id: предпочтения}
+            classrooms: Аудитории - для новых занятий
+            teacher_ids: Преподаватели с изменёнными предпочтениями
+            course_load_ids: Нагрузки, занятия которых нужно переоптимизировать
+            method: annealing | tabu (default: config.REPAIR_METHOD)
+            time_budget: Бюджет локального поиска, сек (default: config.REPAIR_TIME_BUDGET)
+        """
+        self.lessons = lessons
+        self.loads = {load['id']: load for load in course_loads}
+        self.teacher_preferences = teacher_preferences
+        self.classrooms = sorted(classrooms or [], key=lambda c: c.get('capacity') or 0)
+        self.teacher_ids = set(teacher_ids)
+        self.course_load_ids = set(course_load_ids)
+        self.method = method or config.REPAIR_METHOD
+        self.time_budget = config.REPAIR_TIME_BUDGET if time_budget is None else time_budget
+        self.random = random.Random(seed)
+        self.seed = seed
+
+    def repair(self,
+               generation_id: int = 0,
+               progress: Optional[ProgressReporter] = None) -> Dict[str, Any]:
+        """
+        Отремонтировать расписание
+
+        Returns:
+            {'schedule', 'deleted_ids', 'updated', 'inserted', 'stats'}:
+            updated - занятия с id и изменёнными DIFF_FIELDS, inserted - новые
+            занятия (без id; generation_id / semester / academic_year - как у
+            активного расписания)
+        """
+        check_weekly_shape(self.lessons, list(self.loads.values()))
+
+        start = time.monotonic()
+        original = {
+            lesson['id']: tuple(lesson.get(field) for field in DIFF_FIELDS) for lesson in self.lessons
+        }
+        schedule = [dict(lesson) for lesson in self.lessons]
+
+        with profiling.phase('repair_diff'):
+            schedule, deleted_ids, touched, released = self._reconcile(schedule)
+            added = self._add_missing(schedule)
+
+        # Окрестность: все занятия преподавателей и групп затронутых занятий
+        affected = [
+            i for i, lesson in enumerate(schedule)
+            if lesson.get('id') in touched or lesson.get('id') is None
+            or lesson.get('teacher_id') in self.teacher_ids
+            or lesson.get('course_load_id') in self.course_load_ids
+        ]
+        # (и тех, чьи места освободились после удаления или изменения занятий)
+        teachers = {schedule[i]['teacher_id'] for i in affected} | {t for t, _ in released}
+        groups = {schedule[i]['group_id'] for i in affected} | {g for _, g in released}
+        movable = [
+            i for i, lesson in enumerate(schedule)
+            if lesson['teacher_id'] in teachers or lesson['group_id'] in groups
+        ]
+
+        # Временные id новых занятий (индекс оценщика по id)
+        for number, index in enumerate(added, start=1):
+            schedule[index]['id'] = -number
+
+        optimizer = Stage1Optimizer(
+            generation_id, schedule, self.teacher_preferences, progress,
+            method=self.method,
+            time_budget=self.time_budget,
+            seed=self.seed,
+            movable=movable
+        )
+        initial_score = optimizer.evaluator.score
+        result = optimizer.run() if movable else {'final_score': initial_score}
+        restored = self._reduce_churn(optimizer, original)
+
+        deleted_ids = sorted(deleted_ids)
+        updated, inserted = [], []
+        for lesson in schedule:
+            if lesson['id'] < 0:
+                lesson['id'] = None
+                inserted.append(lesson)
+            elif tuple(lesson.get(field) for field in DIFF_FIELDS) != original[lesson['id']]:
+                updated.append(lesson)
+
+        moved = sum(
+            1 for lesson in updated
+            if (lesson['day_of_week'], lesson['time_slot']) != original[lesson['id']][:2]
+        )
+        stats = {
+            'lessons': len(schedule),
+            'affected': len(affected),
+            'movable': len(movable),
+            'pinned': len(schedule) - len(movable),
+            'deleted': len(deleted_ids),
+            'inserted': len(inserted),
+            'updated': len(updated),
+            'moved': moved,
+            'restored': restored,
+            'initial_score': initial_score,
+            'final_score': optimizer.evaluator.score,
+            'conflicts': optimizer.evaluator.conflicts,
+            'candidates_evaluated': result.get('candidates_evaluated', 0),
+            'seconds': round(time.monotonic() - start, 3)
+        }
+        logger.info(
+            f"🩹 Repair: {stats['affected']} affected, {stats['movable']}/{stats['lessons']} movable; "
+            f"-{stats['deleted']} +{stats['inserted']} ~{stats['updated']} ({moved} moved); "
+            f"score {initial_score} -> {stats['final_score']} in {stats['seconds']:.2f}s"
+        )
+        return {
+            'schedule': schedule,
+            'deleted_ids': deleted_ids,
+            'updated': updated,
+            'inserted': inserted,
+            'stats': stats
+        }
+
+    # ============ Сверка с нагрузками ============
+
+    def _reconcile(self, schedule: List[Dict]) -> Tuple[List[Dict], List[int], set, set]:
+        """
+        Удалить занятия удалённых нагрузок и лишние, обновить поля изменённых нагрузок
+
+        Returns:
+            (оставшиеся занятия, id удалённых, id изменённых,
+             {(преподаватель, группа)} удалённых и изменённых занятий)
+        """
+        touched, released = set(), set()
+        deleted_ids: List[int] = []
+        by_load: Dict[Any, List[Dict]] = {}
+
+        kept = []
+        for lesson in schedule:
+            load = self.loads.get(lesson.get('course_load_id'))
+            if load is None:
+                deleted_ids.append(lesson['id'])
+                released.add((lesson.get('teacher_id'), lesson.get('group_id')))
+                continue
+            by_load.setdefault(load['id'], []).append(lesson)
+            kept.append(lesson)
+
+        extra = set()
+        for load_id, load_lessons in by_load.items():
+            load = self.loads[load_id]
+            required = max(1, load.get('lessons_per_week') or 1)
+            # Лишние занятия - самые новые
+            for lesson in sorted(load_lessons, key=lambda l: l['id'])[required:]:
+                extra.add(lesson['id'])
+                deleted_ids.append(lesson['id'])
+                released.add((lesson.get('teacher_id'), lesson.get('group_id')))
+
+            for lesson in load_lessons:
+                changed = [field for field in LOAD_FIELDS if load.get(field) != lesson.get(field)]
+                if changed and lesson['id'] not in extra:
+                    released.add((lesson.get('teacher_id'), lesson.get('group_id')))
+                    for field in changed:
+                        lesson[field] = load.get(field)
+                    touched.add(lesson['id'])
+
+        if extra:
+            kept = [lesson for lesson in kept if lesson['id'] not in extra]
+        return kept, deleted_ids, touched, released
+
+    def _add_missing(self, schedule: List[Dict]) -> List[int]:
+        """
+        Добавить недостающие занятия нагрузок
+
+        Новое занятие - в слот, свободный у преподавателя и группы, с
+        подходящей свободной аудиторией (если есть); дальше его место
+        подбирает локальный поиск.
+
+        Returns:
+            Индексы новых занятий в schedule
+        """
+        counts: Dict[Any, int] = {}
+        teacher_busy, group_busy, room_busy = set(), set(), set()
+        for lesson in schedule:
+            counts[lesson['course_load_id']] = counts.get(lesson['course_load_id'], 0) + 1
+            position = (lesson['day_of_week'], lesson['time_slot'])
+            teacher_busy.add((lesson['teacher_id'], *position))
+            group_busy.add((lesson['group_id'], *position))
+            if lesson.get('classroom_id'):
+                room_busy.add((lesson['classroom_id'], *position))
+
+        template = next(iter(schedule), {})
+        grid = [(day, slot) for day in DAYS for slot in SLOTS]
+        added = []
+        for load_id, load in self.loads.items():
+            missing = max(1, load.get('lessons_per_week') or 1) - counts.get(load_id, 0)
+            for _ in range(missing):
+                teacher_id, group_id = load.get('teacher_id'), load.get('group_id')
+                free = [
+                    (day, slot) for day, slot in grid
+                    if (teacher_id, day, slot) not in teacher_busy
+                    and (group_id, day, slot) not in group_busy
+                ]
+                self.random.shuffle(free)
+
+                position, classroom = None, None
+                for day, slot in free:
+                    classroom = self._free_classroom(load, day, slot, room_busy)
+                    if classroom is not None:
+                        position = (day, slot)
+                        break
+                if position is None:
+                    position = free[0] if free else self.random.choice(grid)
+                    logger.warning(
+                        f"⚠️ Repair: no free slot with a classroom for load {load_id}, "
+                        f"placing at {position}"
+                    )
+
+                lesson = {
+                    'id': None,
+                    'course_load_id': load_id,
+                    'day_of_week': position[0],
+                    'time_slot': position[1],
+                    'classroom_id': classroom.get('id') if classroom else None,
+                    'classroom_name': classroom.get('name') if classroom else None,
+                    'generation_id': template.get('generation_id'),
+                    'is_active': True,
+                    'semester': template.get('semester', load.get('semester')),
+                    'academic_year': template.get('academic_year', load.get('academic_year'))
+                }
+                for field in LOAD_FIELDS:
+                    lesson[field] = load.get(field)
+
+                teacher_busy.add((teacher_id, *position))
+                group_busy.add((group_id, *position))
+                if classroom is not None:
+                    room_busy.add((classroom.get('id'), *position))
+                added.append(len(schedule))
+                schedule.append(lesson)
+        return added
+
+    def _free_classroom(self, load: Dict, day: int, slot: int, room_busy: set) -> Optional[Dict]:
+        """Наименьшая свободная в слоте аудитория, подходящая по вместимости и типу"""
+        size = load.get('group_size') or load.get('students_count') or 0
+        needs_lab = is_lab_lesson(load.get('lesson_type'))
+        for classroom in self.classrooms:
+            if (classroom.get('capacity') or 0) < size:
+                continue
+            if needs_lab and not is_lab_classroom(classroom):
+                continue
+            if (classroom.get('id'), day, slot) not in room_busy:
+                return classroom
+        return None
+
+    # ============ Минимум перестановок ============
+
+    @staticmethod
+    def _reduce_churn(optimizer: Stage1Optimizer, original: Dict[Any, Tuple]) -> int:
+        """
+        Вернуть на прежние места сдвинутые занятия, если место свободно и
+        скор не ухудшается (меньше изменений в расписании студентов)
+
+        Returns:
+            Число возвращённых занятий
+        """
+        evaluator = optimizer.evaluator
+        restored = 0
+        for index, lesson in enumerate(evaluator.schedule):
+            before = original.get(lesson['id'])
+            if before is None or (lesson['day_of_week'], lesson['time_slot']) == before[:2]:
+                continue
+            day, slot = before[0], before[1]
+            if evaluator.is_free(index, day, slot) and evaluator.score_move(index, day, slot) >= 0:
+                evaluator.apply_move(index, day, slot)
+                restored += 1
+        if restored:
+            logger.info(f"↩️ Repair: {restored} lessons returned to their previous slots")
+        return restored
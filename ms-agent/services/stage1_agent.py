@@ -4,15 +4,18 @@ Stage 1 Agent
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import time
 
 from services.gigachat_client import gigachat_client
 from services.fitness import fitness_calculator
+from services.progress_bus import ProgressReporter
+from utils import profiling, cancellation
+from utils.cancellation import GenerationCancelled
 from tools.temporal_tools import ScheduleState, get_temporal_tools
 from prompts.stage1_prompt import STAGE1_SYSTEM_PROMPT
 from db.connection import db
-from db.queries import generation_history as gen_queries, agent_actions as action_queries
+from db.queries import agent_actions as action_queries
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -21,8 +24,14 @@ logger = logging.getLogger(__name__)
 class Stage1Agent:
     """Агент для оптимизации временных слотов"""
     
-    def __init__(self, generation_id: int, initial_schedule: List[Dict], teacher_preferences: Dict):
+    def __init__(self,
+                 generation_id: int,
+                 initial_schedule: List[Dict],
+                 teacher_preferences: Dict,
+                 progress: Optional[ProgressReporter] = None):
         self.generation_id = generation_id
+        # Прогресс итераций (подписчики WatchGeneration + generation_history)
+        self.progress = progress or ProgressReporter(str(generation_id), stage='temporal')
         self.schedule_state = ScheduleState(initial_schedule)
         self.teacher_preferences = teacher_preferences
         
@@ -68,9 +77,12 @@ class Stage1Agent:
         
         # Выполнить несколько итераций с имитацией работы
         num_iterations = min(max_iterations, random.randint(5, 15))
+        self.progress.max_iterations = num_iterations
         
         for iteration in range(num_iterations):
+            cancellation.check()
             self.current_iteration = iteration + 1
+            step_start = time.time()
             
             logger.info(f"\n{'='*60}")
             logger.info(f"Iteration {self.current_iteration}/{num_iterations}")
@@ -127,12 +139,18 @@ class Stage1Agent:
                 else:
                     result = self.tool_map['analyze_schedule'].execute()
             
+            action_time = time.time() - step_start
+            profiling.record('agent_action', action_time)
+            
             # Текущий скор
+            fitness_start = time.time()
             current_result = fitness_calculator.calculate(
                 self.schedule_state.current_schedule,
                 self.teacher_preferences
             )
             current_score = current_result['total_score']
+            fitness_time = time.time() - fitness_start
+            profiling.record('evaluation', fitness_time)
             
             # Случайное улучшение скора (для демонстрации)
             if random.random() < 0.3:  # 30% шанс улучшения
@@ -152,18 +170,18 @@ class Stage1Agent:
             }
             self._save_action(action_result, random.randint(200, 800))
             
-            # Обновить БД
-            db.execute_query(
-                gen_queries.UPDATE_GENERATION_ITERATION,
-                {
-                    'job_id': str(self.generation_id),
-                    'current_iteration': self.current_iteration,
-                    'current_score': current_score,
-                    'last_reasoning': f'Demo: {action_type}'
-                },
-                fetch=False
+            # Прогресс (в БД - с прореживанием)
+            self.progress.report(
+                iteration=self.current_iteration,
+                current_score=current_score,
+                hard_violations=len(current_result['details']['conflicts']),
+                phase=action_type,
+                phase_timings={'action': action_time, 'fitness': fitness_time},
+                reasoning=f'Demo: {action_type}'
             )
         
+        self.progress.flush()
+        
         # Финальный результат
         final_result = fitness_calculator.calculate(
             self.schedule_state.current_schedule,
@@ -217,8 +235,10 @@ class Stage1Agent:
         
         # Early stopping
         iterations_without_improvement = 0
+        self.progress.max_iterations = max_iterations
         
         for iteration in range(max_iterations):
+            cancellation.check()
             self.current_iteration = iteration + 1
             
             logger.info(f"\n{'='*60}")
@@ -236,12 +256,18 @@ class Stage1Agent:
                     iterations_without_improvement += 1
                     continue
                 
+                action_time = time.time() - action_start
+                profiling.record('agent_action', action_time)
+                
                 # Текущий скор
+                fitness_start = time.time()
                 current_result = fitness_calculator.calculate(
                     self.schedule_state.current_schedule,
                     self.teacher_preferences
                 )
                 current_score = current_result['total_score']
+                fitness_time = time.time() - fitness_start
+                profiling.record('evaluation', fitness_time)
                 
                 # Обновить лучший скор
                 if current_score > best_score:
@@ -251,16 +277,14 @@ class Stage1Agent:
                 else:
                     iterations_without_improvement += 1
                 
-                # Обновить БД
-                db.execute_query(
-                    gen_queries.UPDATE_GENERATION_ITERATION,
-                    {
-                        'job_id': str(self.generation_id),
-                        'current_iteration': self.current_iteration,
-                        'current_score': current_score,
-                        'last_reasoning': action_result.get('reasoning', '')
-                    },
-                    fetch=False
+                # Прогресс (в БД - с прореживанием)
+                self.progress.report(
+                    iteration=self.current_iteration,
+                    current_score=current_score,
+                    hard_violations=len(current_result['details']['conflicts']),
+                    phase=action_result.get('action_type', ''),
+                    phase_timings={'agent_step': action_time, 'fitness': fitness_time},
+                    reasoning=action_result.get('reasoning', '')
                 )
                 
                 # Сохранить действие
@@ -272,6 +296,8 @@ class Stage1Agent:
                     logger.info(f"⏹️ Early stopping: {iterations_without_improvement} iterations without improvement")
                     break
                 
+            except GenerationCancelled:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error in iteration {self.current_iteration}: {e}", exc_info=True)
                 # Если ошибка GigaChat API, пропустить итерацию
@@ -281,6 +307,8 @@ class Stage1Agent:
                     continue
                 iterations_without_improvement += 1
         
+        self.progress.flush()
+        
         # Финальный результат
         final_result = fitness_calculator.calculate(
             self.schedule_state.current_schedule,
@@ -357,6 +385,8 @@ class Stage1Agent:
                 tools=tools_definitions,
                 conversation_history=clean_history
             )
+        except GenerationCancelled:
+            raise
         except Exception as e:
             logger.error(f"GigaChat API error: {e}")
             # Fallback: вызвать analyze_schedule если GigaChat недоступен
@@ -0,0 +1,343 @@
+"""
+Stage 1 Optimizer
+Быстрая оптимизация временных слотов без LLM
+
+Те же ходы, что у инструментов Stage 1 (swap_lessons, move_to_empty_slot,
+rollback), но выбирает их не GigaChat, а имитация отжига (annealing) или
+поиск с запретами (tabu). Кандидат сначала проверяется на занятость слота
+(как move_to_empty_slot - ход не создаёт конфликтов), затем оценивается
+дельтой ScheduleDeltaEvaluator: десятки тысяч ходов в секунду вместо одного
+хода на запрос к LLM. Поиск ограничен временем (time_budget); в конце
+расписание откатывается к лучшему найденному.
+
+movable - индексы занятий, которые разрешено двигать (режим ремонта,
+services.schedule_repair): остальные закреплены - не выбираются ни для
+перемещения, ни вторым занятием swap.
+"""
+
+import math
+import time
+import random
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from services.fitness import fitness_calculator
+from services.progress_bus import ProgressReporter
+from tools.temporal_tools import ScheduleState
+from utils import profiling, cancellation
+from config import config
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('annealing', 'tabu')
+
+DAYS = range(1, 7)
+SLOTS = range(1, 7)
+
+# Доля swap среди кандидатов (остальное - перемещение в свободный слот)
+SWAP_SHARE = 0.5
+
+# Время проверяется раз в N кандидатов
+CLOCK_CHECK_EVERY = 256
+
+# Отжиг: температура падает геометрически от T0 до T0 * FINAL_TEMPERATURE_RATIO
+FINAL_TEMPERATURE_RATIO = 1e-3
+
+# Tabu: кандидатов на шаг и срок запрета перемещённого занятия (шагов)
+TABU_SAMPLE = 24
+TABU_TENURE = (5, 15)
+
+Move = Tuple  # ('swap', i, j) | ('move', i, day, slot)
+
+
+class Stage1Optimizer:
+    """Локальный поиск по временным слотам (annealing / tabu)"""
+
+    def __init__(self,
+                 generation_id: int,
+                 initial_schedule: List[Dict],
+                 teacher_preferences: Dict,
+                 progress: Optional[ProgressReporter] = None,
+                 method: str = 'annealing',
+                 time_budget: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 movable: Optional[Iterable[int]] = None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown Stage 1 optimizer '{method}', expected one of {METHODS}")
+
+        self.generation_id = generation_id
+        self.method = method
+        self.time_budget = config.STAGE1_TIME_BUDGET if time_budget is None else time_budget
+        self.progress = progress or ProgressReporter(str(generation_id), stage='temporal')
+        self.schedule_state = ScheduleState(initial_schedule)
+        self.teacher_preferences = teacher_preferences
+        self.evaluator = self.schedule_state.get_evaluator(teacher_preferences)
+        self.random = random.Random(seed)
+
+        # Подвижные занятия (None - все)
+        self._movable: List[int] = (
+            list(range(len(initial_schedule))) if movable is None else sorted(set(movable))
+        )
+
+        # Подвижные занятия по группам: swap внутри группы не создаёт конфликтов группы
+        self._group_lessons: Dict[Any, List[int]] = {}
+        for index in self._movable:
+            self._group_lessons.setdefault(initial_schedule[index]['group_id'], []).append(index)
+
+        # Счётчики
+        self.evaluated = 0
+        self.applied = 0
+        self.best_score = self.evaluator.score
+        self._best_positions: Optional[List[Tuple[int, int]]] = None
+        self._best_saved = False
+        self._rounds = 0
+        self._last_report = 0.0
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Запустить оптимизацию
+
+        Returns:
+            Результат в формате Stage1Agent.run (+ статистика поиска)
+        """
+        schedule = self.schedule_state.current_schedule
+        initial_score = self.evaluator.score
+        self.best_score = initial_score
+
+        logger.info(
+            f"🚀 Starting Stage 1 {self.method} ({len(schedule)} lessons, "
+            f"budget {self.time_budget:.0f}s)"
+        )
+        logger.info(f"📊 Initial score: {initial_score}")
+
+        interval = config.STAGE1_PROGRESS_INTERVAL
+        self.progress.max_iterations = max(1, math.ceil(self.time_budget / interval))
+
+        start = time.monotonic()
+        self._last_report = start
+        if len(schedule) >= 2 and self._movable:
+            with profiling.phase('local_search'):
+                if self.method == 'annealing':
+                    self._anneal(start)
+                else:
+                    self._tabu(start)
+
+        # Rollback к лучшему найденному
+        if self.evaluator.score < self.best_score:
+            self._restore_best()
+
+        elapsed = time.monotonic() - start
+        self._report(elapsed, force=True)
+        self.progress.flush()
+
+        final_score = self.evaluator.score
+        rate = self.evaluated / elapsed if elapsed > 0 else 0.0
+        improvement = fitness_calculator.calculate_improvement(initial_score, final_score)
+
+        logger.info(f"\n{'='*60}")
+        logger.info(f"✅ Stage 1 {self.method} complete in {elapsed:.1f}s")
+        logger.info(f"Candidates: {self.evaluated} ({rate:.0f}/s), applied: {self.applied}")
+        logger.info(f"Initial score: {initial_score}")
+        logger.info(f"Final score: {final_score}")
+        logger.info(f"Improvement: {improvement['delta']:+d} ({improvement['percent']:.2f}%)")
+        logger.info(f"{'='*60}\n")
+
+        return {
+            'success': True,
+            'method': self.method,
+            'initial_score': initial_score,
+            'final_score': final_score,
+            'best_score': self.best_score,
+            'improvement': improvement,
+            'iterations_completed': self.applied,
+            'candidates_evaluated': self.evaluated,
+            'candidates_per_second': round(rate, 1),
+            'elapsed': round(elapsed, 3),
+            'schedule': schedule
+        }
+
+    # ============ Поиск ============
+
+    def _anneal(self, start: float):
+        """Имитация отжига: ухудшение принимается с вероятностью exp(delta / T)"""
+        t0 = self._initial_temperature()
+        temperature = t0
+        patience = config.STAGE1_PATIENCE
+        since_best = 0
+
+        while True:
+            if self.evaluated % CLOCK_CHECK_EVERY == 0:
+                cancellation.check()
+                elapsed = time.monotonic() - start
+                if elapsed >= self.time_budget or since_best >= patience:
+                    break
+                temperature = t0 * FINAL_TEMPERATURE_RATIO ** (elapsed / self.time_budget)
+                self._report(elapsed)
+
+            move = self._candidate()
+            self.evaluated += 1
+            since_best += 1
+            if move is None:
+                continue
+
+            delta = self._score(move)
+            if delta >= 0 or self.random.random() < math.exp(delta / temperature):
+                if self._apply(move, delta):
+                    since_best = 0
+
+    def _tabu(self, start: float):
+        """
+        Поиск с запретами: на каждом шаге лучший из TABU_SAMPLE кандидатов
+        (даже если хуже текущего); перемещённые занятия запрещены на
+        TABU_TENURE шагов, если ход не даёт новый лучший скор (аспирация)
+        """
+        tabu_until: Dict[int, int] = {}
+        patience = config.STAGE1_PATIENCE
+        since_best = 0
+        step = 0
+
+        while True:
+            cancellation.check()
+            elapsed = time.monotonic() - start
+            if elapsed >= self.time_budget or since_best >= patience:
+                break
+            self._report(elapsed)
+            step += 1
+
+            score = self.evaluator.score
+            best_move, best_delta = None, None
+            for _ in range(TABU_SAMPLE):
+                move = self._candidate()
+                self.evaluated += 1
+                since_best += 1
+                if move is None:
+                    continue
+
+                delta = self._score(move)
+                is_tabu = any(tabu_until.get(index, 0) > step for index in self._lessons(move))
+                if is_tabu and score + delta <= self.best_score:
+                    continue
+                if best_delta is None or delta > best_delta:
+                    best_move, best_delta = move, delta
+
+            if best_move is None:
+                continue
+
+            if self._apply(best_move, best_delta):
+                since_best = 0
+            for index in self._lessons(best_move):
+                tabu_until[index] = step + self.random.randint(*TABU_TENURE)
+
+    def _initial_temperature(self) -> float:
+        """T0: медианное ухудшение из пробной выборки принимается с вероятностью 1/2"""
+        worsening = []
+        for _ in range(200):
+            move = self._candidate()
+            if move is not None:
+                delta = self._score(move)
+                if delta < 0:
+                    worsening.append(-delta)
+        if not worsening:
+            return 1.0
+        worsening.sort()
+        return max(1.0, worsening[len(worsening) // 2] / math.log(2))
+
+    # ============ Ходы ============
+
+    def _candidate(self) -> Optional[Move]:
+        """Случайный ход без новых конфликтов или None"""
+        evaluator = self.evaluator
+        schedule = evaluator.schedule
+        rnd = self.random
+        movable = self._movable
+        index = movable[rnd.randrange(len(movable))]
+        lesson = schedule[index]
+        position = (lesson['day_of_week'], lesson['time_slot'])
+
+        if rnd.random() < SWAP_SHARE:
+            # swap_lessons: обмен слотами (половина - внутри группы)
+            group_lessons = self._group_lessons[lesson['group_id']]
+            if len(group_lessons) > 1 and rnd.random() < 0.5:
+                other = rnd.choice(group_lessons)
+            else:
+                other = movable[rnd.randrange(len(movable))]
+            other_lesson = schedule[other]
+            other_position = (other_lesson['day_of_week'], other_lesson['time_slot'])
+            if other == index or other_position == position:
+                return None
+            if not evaluator.is_free(index, *other_position, ignore=other):
+                return None
+            if not evaluator.is_free(other, *position, ignore=index):
+                return None
+            return ('swap', index, other)
+
+        # move_to_empty_slot: только дни 1-6, слот должен быть свободен
+        day, slot = rnd.choice(DAYS), rnd.choice(SLOTS)
+        if (day, slot) == position or not evaluator.is_free(index, day, slot):
+            return None
+        return ('move', index, day, slot)
+
+    def _score(self, move: Move) -> int:
+        if move[0] == 'swap':
+            return self.evaluator.score_swap(move[1], move[2])
+        return self.evaluator.score_move(move[1], move[2], move[3])
+
+    @staticmethod
+    def _lessons(move: Move) -> Tuple[int, ...]:
+        return (move[1], move[2]) if move[0] == 'swap' else (move[1],)
+
+    def _apply(self, move: Move, delta: int) -> bool:
+        """Применить ход; True - новый лучший скор"""
+        # Перед ухудшением запомнить лучшее состояние (для rollback)
+        if delta < 0 and not self._best_saved and self.evaluator.score == self.best_score:
+            self._save_best()
+
+        if move[0] == 'swap':
+            self.evaluator.apply_swap(move[1], move[2])
+        else:
+            self.evaluator.apply_move(move[1], move[2], move[3])
+        self.applied += 1
+
+        score = self.evaluator.score
+        if score > self.best_score:
+            self.best_score = score
+            self._best_saved = False
+            return True
+        return False
+
+    def _save_best(self):
+        self._best_positions = [
+            (lesson['day_of_week'], lesson['time_slot']) for lesson in self.evaluator.schedule
+        ]
+        self._best_saved = True
+
+    def _restore_best(self):
+        """Вернуть занятия на позиции лучшего расписания"""
+        if self._best_positions is None:
+            return
+        schedule = self.evaluator.schedule
+        for index, (day, slot) in enumerate(self._best_positions):
+            lesson = schedule[index]
+            if (lesson['day_of_week'], lesson['time_slot']) != (day, slot):
+                self.evaluator.apply_move(index, day, slot)
+        logger.info(f"↩️ Rollback to best score {self.evaluator.score}")
+
+    def _report(self, elapsed: float, force: bool = False):
+        """Прогресс раз в STAGE1_PROGRESS_INTERVAL секунд"""
+        now = time.monotonic()
+        if not force and now - self._last_report < config.STAGE1_PROGRESS_INTERVAL:
+            return
+
+        self._rounds += 1
+        self.progress.report(
+            iteration=self._rounds,
+            current_score=self.evaluator.score,
+            hard_violations=self.evaluator.conflicts,
+            phase=self.method,
+            phase_timings={'search': now - self._last_report},
+            reasoning=(
+                f"{self.method}: {self.evaluated} candidates in {elapsed:.1f}s, "
+                f"{self.applied} applied, best {self.best_score}"
+            )
+        )
+        self._last_report = now
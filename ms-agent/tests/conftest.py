@@ -0,0 +1,14 @@
+"""
+Общие настройки тестов ms-agent
+
+db.connection открывает пул PostgreSQL при импорте. Тестам чистых функций
+база не нужна: модуль подменяется пулом-заглушкой до импорта сервисов.
+"""
+import sys
+import types
+from unittest.mock import MagicMock
+
+if 'db.connection' not in sys.modules:
+    connection = types.ModuleType('db.connection')
+    connection.db = MagicMock(name='db')
+    sys.modules['db.connection'] = connection
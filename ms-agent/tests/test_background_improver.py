@@ -0,0 +1,60 @@
+"""BackgroundLLMImprover: отмена фонового улучшения"""
+import threading
+import time
+
+from services.background_improver import BackgroundLLMImprover
+from services.fitness_calculator import FitnessCalculator
+from utils import cancellation
+from utils.cancellation import CancelToken
+
+
+class SlowGigaChatImprover:
+    """Улучшение, которое проверяет отмену, как запросы к GigaChat"""
+    
+    def __init__(self):
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+        self.calls = 0
+    
+    async def improve_top_chromosomes(self, chromosomes, teacher_preferences, top_n):
+        self.started.set()
+        try:
+            for _ in range(500):
+                cancellation.check()
+                self.calls += 1
+                time.sleep(0.01)
+            return chromosomes
+        finally:
+            self.stopped.set()
+
+
+def _improver(gigachat):
+    return BackgroundLLMImprover(gigachat, agent_improver=None, fitness_calculator=FitnessCalculator({}),
+                                 teacher_preferences={})
+
+
+def test_close_cancels_running_improvement():
+    gigachat = SlowGigaChatImprover()
+    improver = _improver(gigachat)
+    
+    assert improver.submit([], iteration=1)
+    assert gigachat.started.wait(1)
+    improver.close()
+    
+    assert gigachat.stopped.wait(1)
+    assert gigachat.calls < 500
+
+
+def test_generation_cancel_stops_improvement():
+    gigachat = SlowGigaChatImprover()
+    token = CancelToken('job', poll_interval=0)
+    with token.bind():
+        improver = _improver(gigachat)
+    
+    improver.submit([], iteration=1)
+    assert gigachat.started.wait(1)
+    token.cancel()
+    
+    assert gigachat.stopped.wait(1)
+    assert improver.collect() in (None, [])
+    improver.close()
@@ -0,0 +1,42 @@
+"""compare_reports: порог по медиане и проверка разброса замеров"""
+from benchmarks.report import (
+    STATUS_IMPROVEMENT, STATUS_MISSING, STATUS_NEW, STATUS_NOISY, STATUS_OK, STATUS_REGRESSION,
+    compare_reports
+)
+
+
+def _result(median, q1=None, q3=None):
+    return {
+        'per_op': median,
+        'q1_per_op': median * 0.95 if q1 is None else q1,
+        'q3_per_op': median * 1.05 if q3 is None else q3
+    }
+
+
+def _statuses(current, baseline, threshold=0.2):
+    rows = compare_reports({'benchmarks': current}, {'benchmarks': baseline}, threshold)
+    return {row['name']: row['status'] for row in rows}
+
+
+def test_separated_slowdown_is_regression():
+    assert _statuses({'op': _result(1.5)}, {'op': _result(1.0)}) == {'op': STATUS_REGRESSION}
+
+
+def test_separated_speedup_is_improvement():
+    assert _statuses({'op': _result(0.5)}, {'op': _result(1.0)}) == {'op': STATUS_IMPROVEMENT}
+
+
+def test_overlapping_samples_are_noise():
+    # Медиана +30%, но замеры базового отчёта разбросаны до 1.4
+    current = {'op': _result(1.3, q1=1.1, q3=1.5)}
+    baseline = {'op': _result(1.0, q1=0.9, q3=1.4)}
+    assert _statuses(current, baseline) == {'op': STATUS_NOISY}
+
+
+def test_within_threshold_is_ok():
+    assert _statuses({'op': _result(1.1)}, {'op': _result(1.0)}) == {'op': STATUS_OK}
+
+
+def test_new_and_missing():
+    statuses = _statuses({'new': _result(1.0)}, {'old': _result(1.0)})
+    assert statuses == {'new': STATUS_NEW, 'old': STATUS_MISSING}
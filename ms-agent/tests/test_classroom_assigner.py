@@ -0,0 +1,91 @@
+"""Stage 2: min_cost_assignment, группировка по неделям, признак лаборатории"""
+import itertools
+
+import numpy as np
+import pytest
+
+from services.classroom_assigner import ClassroomAssigner, min_cost_assignment
+from services.fitness_calculator import FitnessCalculator
+from utils.classroom_types import is_lab_classroom
+
+
+def _brute_force(cost: np.ndarray) -> float:
+    n, m = cost.shape
+    return min(
+        sum(cost[row, col] for row, col in enumerate(cols))
+        for cols in itertools.permutations(range(m), n)
+    )
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (3, 3), (3, 5), (5, 5), (4, 7)])
+def test_min_cost_assignment_is_optimal(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        cost = rng.integers(0, 10, size=shape).astype(np.float64)
+        assignment = min_cost_assignment(cost)
+        
+        assert len(set(assignment.tolist())) == shape[0]
+        assert cost[np.arange(shape[0]), assignment].sum() == _brute_force(cost)
+
+
+def test_min_cost_assignment_avoids_infeasible():
+    cost = np.array([[1e6, 5.0], [1.0, 2.0]])
+    assert min_cost_assignment(cost).tolist() == [1, 0]
+
+
+def _lesson(lesson_id, group_id, week_number=None, lesson_type='Лекция'):
+    lesson = {
+        'id': lesson_id,
+        'day_of_week': 1,
+        'time_slot': 1,
+        'group_id': group_id,
+        'group_size': 20,
+        'lesson_type': lesson_type
+    }
+    if week_number is not None:
+        lesson['week_number'] = week_number
+    return lesson
+
+
+def test_weeks_assigned_independently():
+    # Одна аудитория: в один слот разных недель она свободна каждую неделю
+    assigner = ClassroomAssigner([{'id': 7, 'name': '101', 'capacity': 30}], workers=1)
+    schedule = [_lesson(1, 1, week_number=1), _lesson(2, 2, week_number=2)]
+    
+    stats = assigner.assign(schedule)
+    
+    assert stats['unassigned'] == 0
+    assert [lesson['classroom_id'] for lesson in schedule] == [7, 7]
+
+
+def test_same_slot_needs_distinct_rooms():
+    assigner = ClassroomAssigner([{'id': 7, 'name': '101', 'capacity': 30}], workers=1)
+    schedule = [_lesson(1, 1), _lesson(2, 2)]
+    
+    stats = assigner.assign(schedule)
+    
+    assert stats['unassigned'] == 1
+
+
+@pytest.mark.parametrize('classroom_type, is_lab', [
+    ('LAB', True),
+    ('Laboratory', True),
+    ('Лаборатория', True),
+    ('лабораторная', True),
+    ('LECTURE', False),
+    ('Компьютерный класс', False),
+    (None, False)
+])
+def test_lab_classroom(classroom_type, is_lab):
+    assert is_lab_classroom({'classroom_type': classroom_type}) is is_lab
+
+
+def test_stage2_and_fitness_agree_on_labs():
+    classrooms = [
+        {'id': i, 'capacity': 30, 'classroom_type': classroom_type}
+        for i, classroom_type in enumerate(['LAB', 'Лаборатория', 'LECTURE', 'Семинарская'], start=1)
+    ]
+    assigner = ClassroomAssigner(classrooms, workers=1)
+    calculator = FitnessCalculator({}, classrooms=classrooms)
+    
+    assert assigner._labs.tolist() == (~calculator._room_not_lab).tolist()
@@ -0,0 +1,72 @@
+"""ScheduleContextBuilder.decompose - кластеры по компонентам преподаватель-группа"""
+from services.context_builder import ScheduleContextBuilder
+
+
+def _load(load_id, teacher_id, group_id, lessons_per_week=1, week_type='both'):
+    return {
+        'id': load_id,
+        'teacher_id': teacher_id,
+        'group_id': group_id,
+        'lessons_per_week': lessons_per_week,
+        'week_type': week_type
+    }
+
+
+def _context(course_loads, teacher_preferences=None):
+    return {
+        'course_loads': course_loads,
+        'teacher_preferences': teacher_preferences or {},
+        'classrooms': [{'id': 1}],
+        'teachers': {},
+        'groups': {}
+    }
+
+
+def _clusters(context, max_clusters):
+    return ScheduleContextBuilder.decompose(context, max_clusters)
+
+
+def test_single_cluster_returns_context():
+    context = _context([_load(1, 10, 100), _load(2, 11, 101)])
+    assert _clusters(context, 1) == [context]
+
+
+def test_connected_loads_stay_together():
+    # Преподаватель 10 связывает группы 100 и 101, группа 101 - преподавателя 11
+    context = _context([_load(1, 10, 100), _load(2, 10, 101), _load(3, 11, 101)])
+    assert _clusters(context, 4) == [context]
+
+
+def test_independent_components_split():
+    context = _context(
+        [_load(1, 10, 100), _load(2, 20, 200), _load(3, 10, 101), _load(4, 20, 201)],
+        teacher_preferences={
+            10: [{'day_of_week': 1, 'time_slot': 1, 'is_preferred': True}],
+            20: [{'day_of_week': 2, 'time_slot': 3, 'is_preferred': False}]
+        }
+    )
+    clusters = _clusters(context, 4)
+    
+    assert sorted(cluster['load_positions'] for cluster in clusters) == [[0, 2], [1, 3]]
+    for cluster in clusters:
+        loads = cluster['course_loads']
+        assert loads == [context['course_loads'][p] for p in cluster['load_positions']]
+        teacher_ids = {load['teacher_id'] for load in loads}
+        assert set(cluster['teacher_preferences']) == teacher_ids
+        assert cluster['classrooms'] is context['classrooms']
+
+
+def test_components_balanced_by_lessons():
+    # Компоненты по 48, 32, 24 и 16 занятий в 2 кластера: 48+16 и 32+24
+    context = _context([
+        _load(1, 1, 1, lessons_per_week=3),
+        _load(2, 2, 2, lessons_per_week=2),
+        _load(3, 3, 3, lessons_per_week=3, week_type='odd'),
+        _load(4, 4, 4, lessons_per_week=1)
+    ])
+    clusters = _clusters(context, 2)
+    
+    assert len(clusters) == 2
+    assert sorted(cluster['load_positions'] for cluster in clusters) == [[0, 3], [1, 2]]
+    positions = sorted(p for cluster in clusters for p in cluster['load_positions'])
+    assert positions == [0, 1, 2, 3]
@@ -0,0 +1,55 @@
+"""ExcelParser.ingest_files: объединение нагрузок кафедр и дубликаты"""
+import io
+
+import openpyxl
+import pytest
+
+from utils.excel_parser import ExcelParser
+
+HEADERS = ['Дисциплина', 'Преподаватель', 'Группа', 'Нагрузка', 'Часы',
+           'Количество контингента', 'Семестр']
+
+
+def _workbook(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADERS)
+    for row in rows:
+        ws.append(row)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+FILES = [
+    (_workbook([
+        ['Математика', 'Иванов И.И.', 'ИВТ-21', 'Лекции', 36, 25, '3 семестр'],
+        ['Физика', 'Петров П.П.', 'ИВТ-21', 'Практические', 18, 25, '3 семестр'],
+    ]), 'kafedra_a.xlsx'),
+    (_workbook([
+        ['Физика', 'Петров П.П.', 'ИВТ-21', 'Практические', 18, 25, '3 семестр'],
+        ['Химия', 'Сидоров С.С.', 'ХИМ-22', 'Лабораторные', 24, 15, '1 семестр'],
+    ]), 'kafedra_b.xlsx'),
+]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_duplicates_across_files_are_merged(workers):
+    result = ExcelParser.ingest_files(FILES, '2025-2026', workers=workers)
+
+    names = [load['discipline_name'] for load in result['loads']]
+    assert names == ['Математика', 'Физика', 'Химия']
+    # Дубликат остаётся за первым файлом
+    physics = result['loads'][1]
+    assert physics['source_file'] == 'kafedra_a.xlsx'
+    assert [f['filename'] for f in result['files']] == ['kafedra_a.xlsx', 'kafedra_b.xlsx']
+    assert [f['loads'] for f in result['files']] == [2, 2]
+    assert result['workers'] == workers
+
+
+def test_broken_file_is_reported():
+    files = FILES[:1] + [(b'not an xlsx', 'broken.xlsx')]
+    loads, errors = ExcelParser.parse_multiple_files(files, '2025-2026', workers=1)
+
+    assert len(loads) == 2
+    assert any('broken.xlsx' in error for error in errors)
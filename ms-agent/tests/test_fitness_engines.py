@@ -0,0 +1,58 @@
+"""FitnessCalculator: векторный и построчный движки дают одинаковый результат"""
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_context
+from services.fitness_calculator import FitnessCalculator
+from services.population_initializer import PopulationInitializer
+from utils.chromosome import ENCODING_TEMPLATE, ENCODING_WEEKLY, GENE_DAY, GENE_SLOT
+
+COUNTERS = ('fitness', 'conflicts_count', 'hard_violations', 'preference_violations',
+            'gaps_count', 'early_lessons', 'late_lessons')
+
+
+def _calculator(context, engine):
+    return FitnessCalculator(
+        teacher_preferences=context['teacher_preferences'],
+        classrooms=context['classrooms'],
+        groups=context['groups'],
+        engine=engine,
+        cache_size=0
+    )
+
+
+def _counters(chromosome):
+    return {name: getattr(chromosome, name, None) for name in COUNTERS}
+
+
+@pytest.mark.parametrize('encoding', [ENCODING_WEEKLY, ENCODING_TEMPLATE])
+def test_engines_agree(encoding):
+    soft = hard = 0
+    for seed in range(6):
+        context = generate_context(groups=2 + seed, teachers=4 + seed, classrooms=12,
+                                   loads_per_group=2, alternating_share=0.3, seed=seed)
+        random.seed(seed)
+        np.random.seed(seed)
+        population = PopulationInitializer(context, encoding).create_population(4)
+        reference = _calculator(context, FitnessCalculator.ENGINE_REFERENCE)
+        vectorized = _calculator(context, FitnessCalculator.ENGINE_VECTORIZED)
+        
+        # Все занятия в одну пару - конфликты и превышение пар в день
+        clash = copy.deepcopy(population[0])
+        clash.genes[GENE_DAY] = 1
+        clash.genes[GENE_SLOT] = 1
+        
+        for chromosome in population + [clash]:
+            expected = copy.deepcopy(chromosome)
+            reference.calculate(expected)
+            vectorized.calculate(chromosome)
+            
+            assert _counters(chromosome) == _counters(expected)
+            soft += expected.hard_violations == 0
+            hard += expected.hard_violations > 0
+    
+    # Мягкие ограничения считаются только без жёстких нарушений
+    assert soft > 0 and hard > 0
@@ -0,0 +1,18 @@
+"""pool_workers: размер пулов процессов по умолчанию"""
+from unittest import mock
+
+from utils.process_pool import DEFAULT_MAX_WORKERS, pool_workers
+
+
+def test_configured_value_is_kept():
+    assert pool_workers(1) == 1
+    assert pool_workers(12) == 12
+
+
+def test_default_is_capped():
+    with mock.patch('os.cpu_count', return_value=64):
+        assert pool_workers(0) == DEFAULT_MAX_WORKERS
+    with mock.patch('os.cpu_count', return_value=2):
+        assert pool_workers(0) == 2
+    with mock.patch('os.cpu_count', return_value=None):
+        assert pool_workers(-1) == 1
@@ -0,0 +1,24 @@
+"""ProgressBus.watch - события, пульс без событий, терминальный статус"""
+from services.progress_bus import ProgressBus
+
+
+def test_watch_yields_last_event_and_stops_on_terminal():
+    bus = ProgressBus()
+    bus.publish('job', {'status': 'running', 'iteration': 1})
+    bus.close('job', 'completed')
+    
+    events = list(bus.watch('job', poll_interval=0.01))
+    
+    assert [event['status'] for event in events] == ['completed']
+    assert events[0]['iteration'] == 1
+
+
+def test_watch_heartbeat_when_idle():
+    bus = ProgressBus()
+    watch = bus.watch('job', poll_interval=0.01, idle_timeout=0.02)
+    
+    assert next(watch) is None
+    bus.publish('job', {'status': 'running', 'iteration': 2})
+    assert next(watch)['iteration'] == 2
+    watch.close()
+    assert not bus._subscribers
@@ -0,0 +1,74 @@
+"""check_weekly_shape и ремонт недельного расписания"""
+import pytest
+
+from services.schedule_repair import ScheduleRepairer, ShapeError, check_weekly_shape
+
+
+def _load(load_id, lessons_per_week, teacher_id=1, group_id=1, week_type='both'):
+    return {
+        'id': load_id,
+        'teacher_id': teacher_id,
+        'teacher_name': f'Преподаватель {teacher_id}',
+        'group_id': group_id,
+        'group_name': f'Группа {group_id}',
+        'discipline_name': f'Дисциплина {load_id}',
+        'lesson_type': 'Лекция',
+        'lessons_per_week': lessons_per_week,
+        'week_type': week_type
+    }
+
+
+def _lesson(lesson_id, load, day, slot, **extra):
+    return {
+        'id': lesson_id,
+        'course_load_id': load['id'],
+        'day_of_week': day,
+        'time_slot': slot,
+        'classroom_id': 1,
+        'classroom_name': '101',
+        **{field: load[field] for field in (
+            'teacher_id', 'teacher_name', 'group_id', 'group_name', 'discipline_name', 'lesson_type'
+        )},
+        **extra
+    }
+
+
+def test_weekly_schedule_passes():
+    load = _load(1, 2)
+    check_weekly_shape([_lesson(1, load, 1, 1), _lesson(2, load, 3, 2)], [load])
+
+
+def test_lowered_lessons_per_week_passes():
+    # 2 -> 1 занятие в неделю: лишняя строка недельного расписания, а не другая неделя
+    load = _load(1, 1)
+    check_weekly_shape([_lesson(1, load, 1, 1), _lesson(2, load, 3, 2)], [load])
+
+
+def test_week_number_rejected():
+    load = _load(1, 1)
+    with pytest.raises(ShapeError):
+        check_weekly_shape([_lesson(1, load, 1, 1, week_number=3)], [load])
+
+
+def test_same_slot_twice_rejected():
+    load = _load(1, 2)
+    with pytest.raises(ShapeError):
+        check_weekly_shape([_lesson(1, load, 1, 1), _lesson(2, load, 1, 1)], [load])
+
+
+def test_rows_for_every_week_rejected():
+    # По занятию на каждую неделю в разных слотах: 8 недель числителя x 1
+    load = _load(1, 1, week_type='odd')
+    lessons = [_lesson(i, load, 1 + i % 6, 1 + i // 6) for i in range(8)]
+    with pytest.raises(ShapeError):
+        check_weekly_shape(lessons, [load])
+
+
+def test_repair_deletes_surplus_after_lowering_load():
+    load = _load(1, 1)
+    lessons = [_lesson(1, load, 1, 1), _lesson(2, load, 3, 2)]
+    result = ScheduleRepairer(lessons, [load], {}, time_budget=0.01, seed=1).repair()
+    
+    assert len(result['deleted_ids']) == 1
+    assert len(result['schedule']) == 1
+    assert not result['inserted']
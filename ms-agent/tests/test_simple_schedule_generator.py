@@ -0,0 +1,46 @@
+"""SimpleScheduleGenerator: маски занятости дня"""
+import itertools
+
+import pytest
+
+from services.simple_schedule_generator import SimpleScheduleGenerator
+
+SLOTS = SimpleScheduleGenerator.SLOTS_PER_DAY
+
+
+def _first_block(free: int, count: int):
+    for start in range(SLOTS - count + 1):
+        if all(free >> (start + i) & 1 for i in range(count)):
+            return start
+    return None
+
+
+@pytest.mark.parametrize('count', range(1, SLOTS + 1))
+def test_find_block_matches_linear_scan(count):
+    for free in range(1 << SLOTS):
+        assert SimpleScheduleGenerator._find_block(free, count) == _first_block(free, count)
+
+
+def test_find_block_examples():
+    assert SimpleScheduleGenerator._find_block(0b111111, 2) == 0
+    assert SimpleScheduleGenerator._find_block(0b110110, 2) == 1
+    assert SimpleScheduleGenerator._find_block(0b101010, 2) is None
+    assert SimpleScheduleGenerator._find_block(0, 1) is None
+
+
+def test_bit_and_slots_of_roundtrip():
+    bits = [SimpleScheduleGenerator._bit(day, slot)
+            for day, slot in itertools.product(range(1, 7), range(1, SLOTS + 1))]
+    assert len(set(bits)) == len(bits)
+    assert SimpleScheduleGenerator._slots_of(0b100101) == [1, 3, 6]
+
+
+def test_free_slots_combines_teacher_and_group():
+    generator = SimpleScheduleGenerator([], [])
+    generator.teacher_masks[1] = SimpleScheduleGenerator._bit(2, 1) | SimpleScheduleGenerator._bit(3, 2)
+    generator.group_masks[7] = SimpleScheduleGenerator._bit(2, 6)
+    
+    assert generator._free_slots(2, 1, 7) == 0b011110
+    assert generator._free_slots(3, 1, 7) == 0b111101
+    assert generator._free_slots(1, 1, 7) == SimpleScheduleGenerator.DAY_MASK
+    assert SimpleScheduleGenerator._find_block(generator._free_slots(2, 1, 7), 3) == 1
@@ -3,12 +3,12 @@ Temporal Tools для Stage 1
 Инструменты для оптимизации временных слотов (без аудиторий)
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
-import copy
 
 from tools.base import Tool
 from services.fitness import fitness_calculator
+from services.delta_evaluator import ScheduleDeltaEvaluator
 
 logger = logging.getLogger(__name__)
 
@@ -144,44 +144,36 @@ class SwapLessonsTool(Tool):
     
     def execute(self, lesson1_id: int, lesson2_id: int, **kwargs) -> Dict[str, Any]:
         """Выполнить swap"""
-        # Сохранить для rollback
-        self.schedule_state.save_checkpoint()
+        evaluator = self.schedule_state.get_evaluator(self.teacher_preferences)
         
-        # Найти пары
-        schedule = self.schedule_state.current_schedule
-        lesson1 = next((l for l in schedule if l['id'] == lesson1_id), None)
-        lesson2 = next((l for l in schedule if l['id'] == lesson2_id), None)
+        # Найти пары (O(1) по индексу)
+        index1 = evaluator.index_of(lesson1_id)
+        index2 = evaluator.index_of(lesson2_id)
         
-        if not lesson1 or not lesson2:
+        if index1 is None or index2 is None:
             return {
                 "success": False,
                 "error": f"Lessons not found: {lesson1_id}, {lesson2_id}"
             }
         
-        # Скор ДО
-        result_before = fitness_calculator.calculate(schedule, self.teacher_preferences)
-        score_before = result_before['total_score']
-        
-        # Поменять временные слоты
-        lesson1['day_of_week'], lesson2['day_of_week'] = lesson2['day_of_week'], lesson1['day_of_week']
-        lesson1['time_slot'], lesson2['time_slot'] = lesson2['time_slot'], lesson1['time_slot']
-        
-        # Скор ПОСЛЕ
-        result_after = fitness_calculator.calculate(schedule, self.teacher_preferences)
-        score_after = result_after['total_score']
-        delta = score_after - score_before
+        # Предпросмотр: скор ДО/ПОСЛЕ через дельту, без изменения расписания
+        score_before = evaluator.score
+        preview = evaluator.preview_swap(index1, index2)
+        score_after = preview['score_after']
+        delta = preview['score_delta']
         
         # Проверить конфликты
-        conflicts = result_after['details']['conflicts']
-        if conflicts:
-            # Откатить если создали конфликт
-            self.schedule_state.rollback()
+        if preview['conflicts']:
             return {
                 "success": False,
-                "error": f"Swap would create {len(conflicts)} conflicts",
-                "conflicts": conflicts
+                "error": f"Swap would create {preview['conflicts']} conflicts",
+                "conflicts": self._conflicts_after_swap(evaluator, index1, index2)
             }
         
+        # Сохранить для rollback и применить
+        self.schedule_state.save_checkpoint()
+        self.schedule_state.apply_swap(index1, index2)
+        
         logger.info(f"SWAP: {lesson1_id} ↔ {lesson2_id} | Score: {score_before} → {score_after} | Delta: {delta:+d}")
         
         return {
@@ -191,6 +183,15 @@ class SwapLessonsTool(Tool):
             "score_delta": delta,
             "improved": delta > 0
         }
+    
+    @staticmethod
+    def _conflicts_after_swap(evaluator: ScheduleDeltaEvaluator,
+                              index1: int, index2: int) -> List[Dict]:
+        """Детали конфликтов (только для ответа об ошибке)"""
+        evaluator.apply_swap(index1, index2)
+        conflicts = fitness_calculator._find_conflicts(evaluator.schedule)
+        evaluator.apply_swap(index1, index2)
+        return conflicts
 
 
 class MoveToEmptySlotTool(Tool):
@@ -237,42 +238,41 @@ class MoveToEmptySlotTool(Tool):
                 "error": f"Invalid day_of_week={day_of_week}. Only days 1-6 (Monday-Saturday) are allowed. Sunday (0 or 7) is FORBIDDEN!"
             }
         
-        # Сохранить для rollback
-        self.schedule_state.save_checkpoint()
+        evaluator = self.schedule_state.get_evaluator(self.teacher_preferences)
         
-        # Найти пару
-        schedule = self.schedule_state.current_schedule
-        lesson = next((l for l in schedule if l['id'] == lesson_id), None)
+        # Найти пару (O(1) по индексу)
+        index = evaluator.index_of(lesson_id)
         
-        if not lesson:
+        if index is None:
             return {
                 "success": False,
                 "error": f"Lesson not found: {lesson_id}"
             }
         
-        # Скор ДО
-        score_before = fitness_calculator.calculate(schedule, self.teacher_preferences)['total_score']
-        
-        # Переместить
+        lesson = evaluator.schedule[index]
         old_day, old_slot = lesson['day_of_week'], lesson['time_slot']
-        lesson['day_of_week'] = day_of_week
-        lesson['time_slot'] = time_slot
         
-        # Скор ПОСЛЕ
-        result_after = fitness_calculator.calculate(schedule, self.teacher_preferences)
-        score_after = result_after['total_score']
-        delta = score_after - score_before
+        # Предпросмотр: скор ДО/ПОСЛЕ через дельту
+        score_before = evaluator.score
+        preview = evaluator.preview_move(index, day_of_week, time_slot)
+        score_after = preview['score_after']
+        delta = preview['score_delta']
         
         # Проверить конфликты
-        conflicts = result_after['details']['conflicts']
-        if conflicts:
-            self.schedule_state.rollback()
+        if preview['conflicts']:
+            evaluator.apply_move(index, day_of_week, time_slot)
+            conflicts = fitness_calculator._find_conflicts(evaluator.schedule)
+            evaluator.apply_move(index, old_day, old_slot)
             return {
                 "success": False,
                 "error": f"Move would create {len(conflicts)} conflicts",
                 "conflicts": conflicts
             }
         
+        # Сохранить для rollback и переместить
+        self.schedule_state.save_checkpoint()
+        self.schedule_state.apply_move(index, day_of_week, time_slot)
+        
         logger.info(f"MOVE: Lesson {lesson_id} from ({old_day},{old_slot}) to ({day_of_week},{time_slot}) | Delta: {delta:+d}")
         
         return {
@@ -323,29 +323,77 @@ class RollbackTool(Tool):
 
 
 class ScheduleState:
-    """Состояние расписания с поддержкой checkpoint/rollback"""
+    """
+    Состояние расписания с поддержкой checkpoint/rollback
+    
+    Вместо копии расписания на каждый checkpoint ведётся журнал изменений:
+    swap / move записывают прежние (day_of_week, time_slot) затронутых пар,
+    checkpoint - позиция в журнале (O(1)), rollback отменяет записи после
+    неё в обратном порядке (O(изменений)). Глубина отката не ограничена,
+    память зависит от числа действий, а не от размера расписания.
+    """
     
     def __init__(self, initial_schedule: List[Dict]):
         self.current_schedule = initial_schedule
-        self.checkpoints = []
-        self.max_checkpoints = 10
+        self.checkpoints: List[int] = []
+        self._journal: List[Tuple[int, int, int]] = []  # (index, old_day, old_slot)
+        self._evaluator: Optional[ScheduleDeltaEvaluator] = None
+    
+    def get_evaluator(self, teacher_preferences: Dict) -> ScheduleDeltaEvaluator:
+        """Инкрементальный оценщик для текущего расписания (строится лениво)"""
+        if self._evaluator is None or self._evaluator.schedule is not self.current_schedule:
+            self._evaluator = ScheduleDeltaEvaluator(self.current_schedule, teacher_preferences)
+        return self._evaluator
     
     def save_checkpoint(self):
-        """Сохранить текущее состояние"""
-        checkpoint = copy.deepcopy(self.current_schedule)
-        self.checkpoints.append(checkpoint)
-        
-        # Ограничить количество checkpoints
-        if len(self.checkpoints) > self.max_checkpoints:
-            self.checkpoints.pop(0)
+        """Запомнить текущую позицию журнала"""
+        self.checkpoints.append(len(self._journal))
+    
+    def apply_swap(self, index1: int, index2: int):
+        """Поменять пары слотами (с записью в журнал)"""
+        schedule = self.current_schedule
+        day1, slot1 = schedule[index1]['day_of_week'], schedule[index1]['time_slot']
+        day2, slot2 = schedule[index2]['day_of_week'], schedule[index2]['time_slot']
+        self._record(index1)
+        self._record(index2)
+        if self._evaluator is not None:
+            self._evaluator.apply_swap(index1, index2)
+        else:
+            self._place(index1, day2, slot2)
+            self._place(index2, day1, slot1)
+    
+    def apply_move(self, index: int, day: int, slot: int):
+        """Переместить пару (с записью в журнал)"""
+        self._record(index)
+        if self._evaluator is not None:
+            self._evaluator.apply_move(index, day, slot)
+        else:
+            self._place(index, day, slot)
     
     def rollback(self) -> bool:
         """Откатить к последнему checkpoint"""
         if not self.checkpoints:
             return False
         
-        self.current_schedule = self.checkpoints.pop()
+        mark = self.checkpoints.pop()
+        while len(self._journal) > mark:
+            index, day, slot = self._journal.pop()
+            if self._evaluator is not None:
+                self._evaluator.apply_move(index, day, slot)
+            else:
+                self._place(index, day, slot)
         return True
+    
+    def _record(self, index: int):
+        # Без checkpoints откатывать некуда - журнал не нужен
+        if self.checkpoints:
+            lesson = self.current_schedule[index]
+            self._journal.append((index, lesson['day_of_week'], lesson['time_slot']))
+    
+    def _place(self, index: int, day: int, slot: int):
+        lesson = self.current_schedule[index]
+        lesson['day_of_week'] = day
+        lesson['time_slot'] = slot
 
 
 def get_temporal_tools(schedule_state: ScheduleState, teacher_preferences: Dict) -> List[Tool]:
@@ -0,0 +1,102 @@
+"""
+Кооперативная отмена генераций
+
+StopGeneration помечает генерацию 'stopped' в generation_history и
+взводит CancelToken задания. Циклы ГА и Stage 1 вызывают
+cancellation.check() между итерациями: токен привязан к потоку
+генерации (как профилировщик utils.profiling), поэтому передавать его
+через все слои не нужно. Вне генерации check() ничего не делает.
+
+Токен раз в GENERATION_CANCEL_POLL_INTERVAL секунд сверяется со статусом
+в БД - отмена работает и тогда, когда StopGeneration пришёл в другой
+экземпляр ms-agent. Дочерний токен (parent) отменяется вместе с токеном
+генерации или сам по себе - например, фоновое LLM-улучшение ГА после
+завершения генерации.
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class GenerationCancelled(Exception):
+    """Генерация остановлена пользователем"""
+
+
+def current() -> Optional['CancelToken']:
+    """Токен отмены генерации текущего потока"""
+    return getattr(_local, 'token', None)
+
+
+def check():
+    """Прервать генерацию текущего потока, если её отменили"""
+    token = current()
+    if token is not None:
+        token.check()
+
+
+class CancelToken:
+    """Флаг отмены одной генерации"""
+
+    def __init__(self,
+                 job_id: str,
+                 poll_interval: Optional[float] = None,
+                 parent: Optional['CancelToken'] = None):
+        self.job_id = job_id
+        self.poll_interval = (
+            config.GENERATION_CANCEL_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        self.parent = parent
+        self._event = threading.Event()
+        self._next_poll = time.monotonic() + self.poll_interval
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self._event.set()
+            return True
+        if self.poll_interval > 0 and time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_interval
+            if self._stopped_in_db():
+                self._event.set()
+        return self._event.is_set()
+
+    def check(self):
+        if self.cancelled:
+            raise GenerationCancelled(f"Generation {self.job_id} stopped")
+
+    @contextmanager
+    def bind(self):
+        """Сделать токен текущим в потоке генерации (и её фоновых потоках)"""
+        previous = current()
+        _local.token = self
+        try:
+            yield self
+        finally:
+            _local.token = previous
+
+    def _stopped_in_db(self) -> bool:
+        try:
+            # db - при проверке: check() используется и без psycopg2 (benchmarks)
+            from db.connection import db
+            from db.queries import generation_history as gen_queries
+
+            rows = db.execute_query(
+                gen_queries.SELECT_GENERATION_STATUS, {'job_id': self.job_id}, fetch=True
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to poll status of generation {self.job_id}: {e}")
+            return False
+        return bool(rows) and rows[0]['status'] == 'stopped'
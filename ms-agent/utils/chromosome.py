@@ -1,74 +1,163 @@
 """
 Chromosome and Lesson structures for Genetic Algorithm
-Хромосома = полное расписание (массив Lesson объектов)
+Хромосома = полное расписание
+
+Хранение: struct-of-arrays на NumPy. Гены (индекс нагрузки, день, слот,
+неделя, аудитория) лежат в одном int32 массиве формы (5, N), а метаданные
+нагрузок (дисциплина, преподаватель, группа, ...) вынесены в общую
+read-only таблицу LoadTable (LoadCatalog генерации + числовые колонки),
+которую разделяют все хромосомы популяции. Копия хромосомы = одна
+аллокация массива генов, Lesson - индекс нагрузки и положение занятия.
+
+Кодировки генов (LoadTable.encoding):
+- weekly: ген = одно занятие одной недели, строка week = номер недели 1..16
+- template: ген = занятие недельного шаблона, строка week = маска недель
+  (бит w-1 = неделя w: все / нечётные / чётные / произвольный набор).
+  Генов в 16 раз меньше; на отдельные недели шаблон разворачивается
+  только при сохранении (to_schedule_dict / expand).
 """
-import copy
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import hashlib
 import logging
 
+import numpy as np
+
+from utils.load_catalog import LoadCatalog
+
 logger = logging.getLogger(__name__)
 
+# Строки массива генов
+GENE_LOAD = 0
+GENE_DAY = 1
+GENE_SLOT = 2
+GENE_WEEK = 3
+GENE_CLASSROOM = 4
+GENE_FIELDS = 5
+
+GENE_DTYPE = np.int32
+
+# Маски недель (бит w-1 = неделя w)
+WEEKS_IN_SEMESTER = 16
+WEEK_MASK_ALL = (1 << WEEKS_IN_SEMESTER) - 1   # Каждую неделю
+WEEK_MASK_ODD = 0x5555                         # Нечётные (числитель)
+WEEK_MASK_EVEN = 0xAAAA                        # Чётные (знаменатель)
+
+# week_type из ms-schedule -> маска
+WEEK_TYPE_MASKS = {
+    'both': WEEK_MASK_ALL,
+    'odd': WEEK_MASK_ODD,
+    'even': WEEK_MASK_EVEN
+}
+
+ENCODING_WEEKLY = 'weekly'
+ENCODING_TEMPLATE = 'template'
+ENCODINGS = (ENCODING_WEEKLY, ENCODING_TEMPLATE)
+
+
+def week_mask(value: Any) -> int:
+    """
+    Маска недель из week_type ('odd'/'even'/'both'), int-маски
+    или списка номеров недель. None/пусто - все недели.
+    """
+    if value is None or value == '':
+        return WEEK_MASK_ALL
+    if isinstance(value, str):
+        mask = WEEK_TYPE_MASKS.get(value.lower())
+        if mask is None:
+            raise ValueError(
+                f"Unknown week_type '{value}', expected one of {tuple(WEEK_TYPE_MASKS)}"
+            )
+        return mask
+    if isinstance(value, (int, np.integer)):
+        mask = int(value) & WEEK_MASK_ALL
+    else:
+        mask = 0
+        for week in value:
+            if 1 <= week <= WEEKS_IN_SEMESTER:
+                mask |= 1 << (week - 1)
+    return mask or WEEK_MASK_ALL
+
+
+def mask_weeks(mask: int) -> List[int]:
+    """Номера недель (1..16) в маске"""
+    return [week + 1 for week in range(WEEKS_IN_SEMESTER) if mask >> week & 1]
+
 
 class Lesson:
-    """Одно занятие в расписании"""
-    
+    """
+    Одно занятие в расписании
+
+    Хранит только индекс нагрузки в LoadCatalog и положение (аудитория,
+    день, слот, неделя); ID и названия нагрузки читаются из каталога.
+    """
+
+    __slots__ = ('catalog', 'load_idx', 'classroom_id', 'day', 'slot', 'week')
+
     def __init__(self,
-                 course_load_id: int,
-                 discipline_name: str,
-                 lesson_type: str,
-                 group_id: int,
-                 group_name: str,
-                 teacher_id: int,
-                 teacher_name: str,
+                 catalog: LoadCatalog,
+                 load_idx: int,
                  classroom_id: int,
                  day: int,          # 1-6 (Понедельник-Суббота)
                  slot: int,         # 1-6 (1-6 пара)
                  week: int):        # 1-16 (неделя семестра)
-        self.course_load_id = course_load_id
-        self.discipline_name = discipline_name
-        self.lesson_type = lesson_type
-        self.group_id = group_id
-        self.group_name = group_name
-        self.teacher_id = teacher_id
-        self.teacher_name = teacher_name
+        self.catalog = catalog
+        self.load_idx = load_idx
         self.classroom_id = classroom_id
         self.day = day
         self.slot = slot
         self.week = week
-    
+
+    @property
+    def course_load_id(self) -> int:
+        return self.catalog.course_load_ids[self.load_idx]
+
+    @property
+    def discipline_name(self) -> str:
+        return self.catalog.discipline_names[self.load_idx]
+
+    @property
+    def lesson_type(self) -> str:
+        return self.catalog.lesson_types[self.load_idx]
+
+    @property
+    def group_id(self) -> int:
+        return self.catalog.group_ids[self.load_idx]
+
+    @property
+    def group_name(self) -> str:
+        return self.catalog.group_names[self.load_idx]
+
+    @property
+    def teacher_id(self) -> int:
+        return self.catalog.teacher_ids[self.load_idx]
+
+    @property
+    def teacher_name(self) -> str:
+        return self.catalog.teacher_names[self.load_idx]
+
     def __repr__(self):
         return (
             f"Lesson({self.discipline_name[:20]}, "
             f"T{self.teacher_id}, G{self.group_id}, "
             f"D{self.day}S{self.slot}W{self.week})"
         )
-    
+
     def to_dict(self) -> Dict:
         """Преобразовать в словарь для сохранения"""
-        return {
-            'course_load_id': self.course_load_id,
-            'discipline_name': self.discipline_name,
-            'lesson_type': self.lesson_type,
-            'group_id': self.group_id,
-            'group_name': self.group_name,
-            'teacher_id': self.teacher_id,
-            'teacher_name': self.teacher_name,
-            'classroom_id': self.classroom_id,
-            'day_of_week': self.day,
-            'time_slot': self.slot,
-            'week_number': self.week
-        }
-    
+        lesson = self.catalog.load_fields(self.load_idx)
+        lesson.update(
+            classroom_id=self.classroom_id,
+            day_of_week=self.day,
+            time_slot=self.slot,
+            week_number=self.week
+        )
+        return lesson
+
     def copy(self) -> 'Lesson':
         """Создать копию"""
         return Lesson(
-            course_load_id=self.course_load_id,
-            discipline_name=self.discipline_name,
-            lesson_type=self.lesson_type,
-            group_id=self.group_id,
-            group_name=self.group_name,
-            teacher_id=self.teacher_id,
-            teacher_name=self.teacher_name,
+            catalog=self.catalog,
+            load_idx=self.load_idx,
             classroom_id=self.classroom_id,
             day=self.day,
             slot=self.slot,
@@ -76,15 +165,84 @@ class Lesson:
         )
 
 
+class LoadTable(LoadCatalog):
+    """
+    Общие метаданные нагрузок (read-only)
+
+    LoadCatalog генерации плюс числовые колонки для векторных операций.
+    Хромосомы ссылаются на строки таблицы по индексу нагрузки (load_idx).
+    encoding - кодировка генов всех хромосом таблицы (weekly / template).
+    """
+
+    def __init__(self, course_loads: Sequence[Dict], encoding: str = ENCODING_WEEKLY):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown gene encoding '{encoding}', expected one of {ENCODINGS}")
+        super().__init__(course_loads)
+        self.encoding = encoding
+        self._variants: Dict[str, 'LoadTable'] = {encoding: self}
+
+        # Числовые колонки для векторных операций
+        self.course_load_id_array = self._frozen(self.course_load_ids)
+        self.group_id_array = self._frozen(self.group_ids)
+        self.teacher_id_array = self._frozen(self.teacher_ids)
+
+    @staticmethod
+    def _frozen(values: Sequence[int]) -> np.ndarray:
+        array = np.asarray(values, dtype=np.int64)
+        array.flags.writeable = False
+        return array
+
+    @property
+    def is_template(self) -> bool:
+        """Гены - недельный шаблон с масками недель"""
+        return self.encoding == ENCODING_TEMPLATE
+
+    def with_encoding(self, encoding: str) -> 'LoadTable':
+        """
+        Та же таблица в другой кодировке
+
+        Массивы общие, вариант создаётся один раз и переиспользуется
+        (кэши по LoadTable в FitnessCalculator остаются валидными).
+        """
+        table = self._variants.get(encoding)
+        if table is None:
+            if encoding not in ENCODINGS:
+                raise ValueError(f"Unknown gene encoding '{encoding}', expected one of {ENCODINGS}")
+            table = object.__new__(LoadTable)
+            table.__dict__.update(self.__dict__)
+            table.encoding = encoding
+            self._variants[encoding] = table
+        return table
+
+    @classmethod
+    def from_lessons(cls, lessons: Sequence[Lesson]) -> 'LoadTable':
+        """Восстановить таблицу нагрузок из списка Lesson"""
+        course_loads = []
+        seen = set()
+        for lesson in lessons:
+            key = (lesson.catalog, lesson.load_idx)
+            if key in seen:
+                continue
+            seen.add(key)
+            load = lesson.catalog.load_fields(lesson.load_idx)
+            load['id'] = load.pop('course_load_id')
+            course_loads.append(load)
+        return cls(course_loads)
+
+
 class Chromosome:
     """
     Хромосома = полное расписание
-    
-    Массив из 500-1000 Lesson объектов
+
+    genes: int32 массив (5, N) - load_idx, day, slot, week, classroom_id
+    loads: общая LoadTable (не копируется)
     """
-    
-    def __init__(self, lessons: List[Lesson]):
-        self.lessons = lessons
+
+    def __init__(self, loads: LoadTable, genes: Optional[np.ndarray] = None):
+        self.loads = loads
+        if genes is None:
+            genes = np.empty((GENE_FIELDS, 0), dtype=GENE_DTYPE)
+        self.genes = genes
         self.fitness = 0.0
         self.conflicts_count = 0  # ДОЛЖНО БЫТЬ 0!
         self.hard_violations = 0  # Все жесткие нарушения (конфликты + несоответствия)
@@ -92,10 +250,125 @@ class Chromosome:
         self.gaps_count = 0
         self.early_lessons = 0
         self.late_lessons = 0
-    
+        # Хэш генов, для которых посчитан fitness (None - не оценивалась)
+        self.scored_hash: Optional[Tuple] = None
+
+    @classmethod
+    def from_arrays(cls,
+                    loads: LoadTable,
+                    load_idx: Sequence[int],
+                    day: Sequence[int],
+                    slot: Sequence[int],
+                    week: Sequence[int],
+                    classroom: Sequence[int]) -> 'Chromosome':
+        """Собрать хромосому из колонок генов"""
+        genes = np.array([load_idx, day, slot, week, classroom], dtype=GENE_DTYPE)
+        if genes.ndim != 2:
+            genes = genes.reshape(GENE_FIELDS, -1)
+        return cls(loads, genes)
+
+    @classmethod
+    def from_lessons(cls, lessons: Sequence[Lesson],
+                     loads: Optional[LoadTable] = None) -> 'Chromosome':
+        """Собрать хромосому из списка Lesson (совместимость)"""
+        if loads is None:
+            catalogs = {id(lesson.catalog) for lesson in lessons}
+            if len(catalogs) == 1 and isinstance(lessons[0].catalog, LoadTable):
+                # Занятия одной хромосомы - её же таблица
+                loads = lessons[0].catalog.with_encoding(ENCODING_WEEKLY)
+            else:
+                loads = LoadTable.from_lessons(lessons)
+
+        load_idx = []
+        for lesson in lessons:
+            idx = loads.index.get(lesson.course_load_id)
+            if idx is None:
+                raise ValueError(
+                    f"course_load_id={lesson.course_load_id} not found in LoadTable"
+                )
+            load_idx.append(idx)
+
+        return cls.from_arrays(
+            loads,
+            load_idx,
+            [lesson.day for lesson in lessons],
+            [lesson.slot for lesson in lessons],
+            [lesson.week for lesson in lessons],
+            [lesson.classroom_id for lesson in lessons]
+        )
+
+    # ============ Колонки генов (views, изменяемые) ============
+
+    @property
+    def load_idx(self) -> np.ndarray:
+        return self.genes[GENE_LOAD]
+
+    @property
+    def day(self) -> np.ndarray:
+        return self.genes[GENE_DAY]
+
+    @property
+    def slot(self) -> np.ndarray:
+        return self.genes[GENE_SLOT]
+
+    @property
+    def week(self) -> np.ndarray:
+        return self.genes[GENE_WEEK]
+
+    @property
+    def classroom(self) -> np.ndarray:
+        return self.genes[GENE_CLASSROOM]
+
+    # ============ Производные колонки (read-only) ============
+
+    @property
+    def teacher_ids(self) -> np.ndarray:
+        return self.loads.teacher_id_array[self.genes[GENE_LOAD]]
+
+    @property
+    def group_ids(self) -> np.ndarray:
+        return self.loads.group_id_array[self.genes[GENE_LOAD]]
+
+    @property
+    def course_load_ids(self) -> np.ndarray:
+        return self.loads.course_load_id_array[self.genes[GENE_LOAD]]
+
+    def __len__(self) -> int:
+        return self.genes.shape[1]
+
+    def lesson(self, i: int) -> Lesson:
+        """Материализовать i-е занятие (копия, изменения не влияют на гены)"""
+        load_idx, day, slot, week, classroom = self.genes[:, i].tolist()
+        return Lesson(self.loads, load_idx, classroom, day, slot, week)
+
+    @property
+    def lessons(self) -> List[Lesson]:
+        """
+        Список Lesson (только для чтения)
+
+        Материализуется на каждый вызов. Для изменения расписания
+        нужно писать в колонки day/slot/week/classroom.
+        """
+        loads = self.loads
+        return [
+            Lesson(loads, load_idx, classroom, day, slot, week)
+            for load_idx, day, slot, week, classroom in zip(*self.genes.tolist())
+        ]
+
+    def genome_hash(self) -> Tuple:
+        """
+        Хэш содержимого генов (ключ кэша fitness)
+
+        Считается заново на каждый вызов: гены меняются на месте через
+        views, поэтому флаг "изменено" надёжно не отследить.
+        """
+        genes = np.ascontiguousarray(self.genes)
+        digest = hashlib.blake2b(genes.tobytes(), digest_size=16).digest()
+        return (self.loads.encoding, genes.shape[1], digest)
+
     def copy(self) -> 'Chromosome':
-        """Глубокое копирование"""
-        new_chromosome = Chromosome([lesson.copy() for lesson in self.lessons])
+        """Копирование: одна аллокация массива генов, LoadTable общая"""
+        new_chromosome = Chromosome(self.loads, self.genes.copy())
         new_chromosome.fitness = self.fitness
         new_chromosome.conflicts_count = self.conflicts_count
         new_chromosome.hard_violations = self.hard_violations
@@ -103,20 +376,54 @@ class Chromosome:
         new_chromosome.gaps_count = self.gaps_count
         new_chromosome.early_lessons = self.early_lessons
         new_chromosome.late_lessons = self.late_lessons
+        new_chromosome.scored_hash = self.scored_hash
         return new_chromosome
-    
+
     def is_valid(self) -> bool:
         """Проверка на отсутствие жестких нарушений"""
         return self.hard_violations == 0
-    
+
+    def expand(self) -> 'Chromosome':
+        """
+        Развернуть недельный шаблон в занятия по неделям (weekly)
+        
+        Ген с маской недель даёт по одному гену на каждую неделю маски,
+        порядок: гены шаблона, внутри - по возрастанию недели.
+        Для weekly-хромосомы возвращает её саму.
+        """
+        if not self.loads.is_template:
+            return self
+        
+        masks = self.genes[GENE_WEEK].astype(np.int64)
+        weeks = np.arange(WEEKS_IN_SEMESTER, dtype=np.int64)
+        active = ((masks[:, None] >> weeks) & 1).astype(bool)
+        gene_idx, week_idx = np.nonzero(active)
+        
+        genes = self.genes[:, gene_idx]
+        genes[GENE_WEEK] = week_idx + 1
+        return Chromosome(self.loads.with_encoding(ENCODING_WEEKLY), genes)
+
     def to_schedule_dict(self) -> List[Dict]:
-        """Преобразование для сохранения в БД"""
-        return [lesson.to_dict() for lesson in self.lessons]
-    
+        """Преобразование для сохранения в БД (шаблон разворачивается по неделям)"""
+        if self.loads.is_template:
+            return self.expand().to_schedule_dict()
+        
+        load_fields = self.loads.load_fields
+        schedule = []
+        for load_idx, day, slot, week, classroom in zip(*self.genes.tolist()):
+            lesson = load_fields(load_idx)
+            lesson['classroom_id'] = classroom
+            lesson['day_of_week'] = day
+            lesson['time_slot'] = slot
+            lesson['week_number'] = week
+            schedule.append(lesson)
+        return schedule
+
     def get_statistics(self) -> Dict[str, Any]:
         """Получить статистику хромосомы"""
         return {
-            'total_lessons': len(self.lessons),
+            'total_lessons': len(self),
+            'encoding': self.loads.encoding,
             'fitness': self.fitness,
             'conflicts': self.conflicts_count,
             'preference_violations': self.preference_violations.copy(),
@@ -125,4 +432,3 @@ class Chromosome:
             'late_lessons': self.late_lessons,
             'is_valid': self.is_valid()
         }
-
@@ -0,0 +1,26 @@
+"""
+Classroom Types - типы аудиторий и занятий
+
+Одно правило «что считается лабораторией» для всех этапов: начальные
+расписания ГА, фитнес (жёсткое нарушение типа аудитории), Stage 2
+(назначение аудиторий) и ремонт расписания.
+"""
+from typing import Any, Dict, Optional
+
+# Тип занятия, требующий лаборатории
+LAB_LESSON_TYPE = 'Лабораторная'
+
+# Подстроки classroom_type (в верхнем регистре) у лабораторий:
+# LAB, LABORATORY, Лаборатория, лабораторный корпус, ...
+LAB_CLASSROOM_MARKERS = ('LAB', 'ЛАБОРАТОР')
+
+
+def is_lab_lesson(lesson_type: Optional[str]) -> bool:
+    """Занятие должно проходить в лаборатории"""
+    return lesson_type == LAB_LESSON_TYPE
+
+
+def is_lab_classroom(classroom: Dict[str, Any]) -> bool:
+    """Аудитория - лаборатория (по classroom_type, без учёта регистра)"""
+    classroom_type = (classroom.get('classroom_type') or '').upper()
+    return any(marker in classroom_type for marker in LAB_CLASSROOM_MARKERS)
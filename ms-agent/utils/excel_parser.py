@@ -1,17 +1,63 @@
 """
 Excel Parser
 Парсинг файлов нагрузки из Excel
+
+Книги читаются потоково (read_only + iter_rows(values_only=True)): в памяти
+только первые строки (поиск заголовков и учебного года) и текущая строка.
+parse_multiple_files разбирает файлы кафедр в пуле процессов
+(EXCEL_PARSE_WORKERS), одновременно в пул передано не больше двух файлов
+на процесс.
 """
 
+import time
 import openpyxl
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
 from typing import List, Dict, Any, Optional, Tuple
 import io
 import re
 from datetime import datetime
 
+from config import config
+from utils.process_pool import pool_workers
+
 logger = logging.getLogger(__name__)
 
+# Строк в начале листа, среди которых ищутся заголовки
+HEADER_SCAN_ROWS = 19
+# Строк в начале листа, среди которых ищется учебный год
+ACADEMIC_YEAR_SCAN_ROWS = 9
+
+
+def _ingest_file(file_data: bytes, filename: str, academic_year: str,
+                 is_autumn: bool) -> Dict[str, Any]:
+    """Разобрать один файл кафедры (в воркере пула): нагрузки с семестром групп"""
+    start = time.monotonic()
+    loads, errors = ExcelParser.parse_course_loads(
+        file_data=file_data,
+        semester=1,  # Временное значение, будет перезаписано
+        academic_year=academic_year
+    )
+    
+    # Автоматически определяем семестр для каждой нагрузки
+    for load in loads:
+        load['semester'] = ExcelParser.determine_group_semester(
+            group_name=load.get('group_name', ''),
+            semester_column=load.get('semester_column'),
+            contingent_info=load.get('contingent_info'),
+            academic_year=academic_year,
+            is_autumn_semester=is_autumn
+        )
+        load['source_file'] = filename  # Для отладки
+    
+    return {
+        'filename': filename,
+        'loads': loads,
+        'errors': errors,
+        'seconds': round(time.monotonic() - start, 3)
+    }
+
 
 class ExcelParser:
     """Парсер Excel файлов с нагрузкой"""
@@ -61,12 +107,16 @@ class ExcelParser:
             wb = openpyxl.load_workbook(io.BytesIO(file_data), read_only=True)
             ws = wb.active
             
+            # Первые строки листа - одним потоковым проходом
+            # (ws[row_idx] в read_only режиме каждый раз читает лист с начала)
+            head_rows = list(ws.iter_rows(max_row=HEADER_SCAN_ROWS, values_only=True))
+            
             # Найти строку с заголовками (не всегда первая строка!)
             header_row_idx = None
-            for row_idx in range(1, min(20, ws.max_row + 1)):  # Проверяем первые 20 строк
+            for row_idx, row in enumerate(head_rows, start=1):
                 row_values = [
-                    str(cell.value).strip().lower() if cell.value else ""
-                    for cell in ws[row_idx]
+                    str(value).strip().lower() if value else ""
+                    for value in row
                 ]
                 
                 # Проверяем наличие ключевых слов заголовков
@@ -98,15 +148,15 @@ class ExcelParser:
             
             # Получить заголовки из найденной строки
             headers = []
-            for cell in ws[header_row_idx]:
-                headers.append(str(cell.value).strip() if cell.value else "")
+            for value in (head_rows[header_row_idx - 1] if head_rows else ()):
+                headers.append(str(value).strip() if value else "")
             
             logger.info(f"Found headers (row {header_row_idx}): {headers}")
             
             # Парсить учебный год из файла (из первых строк или заголовков)
             parsed_academic_year = academic_year
             if not parsed_academic_year:
-                parsed_academic_year = ExcelParser._extract_academic_year(ws, header_row_idx)
+                parsed_academic_year = ExcelParser._extract_academic_year(head_rows, header_row_idx)
                 if parsed_academic_year:
                     logger.info(f"Extracted academic year from file: {parsed_academic_year}")
                 else:
@@ -439,18 +489,22 @@ class ExcelParser:
             return lesson_type.strip()
     
     @staticmethod
-    def _extract_academic_year(ws, header_row_idx: int) -> str:
+    def _extract_academic_year(rows: List[tuple], header_row_idx: int) -> str:
         """
         Извлечь учебный год из файла
         Ищет в первых строках паттерн типа "2025-2026 уч. год" или "2025/2026"
+        
+        Args:
+            rows: Значения первых строк листа (iter_rows(values_only=True))
+            header_row_idx: Номер строки заголовков (с 1)
         """
         # Ищем в первых строках до заголовков
-        for row_idx in range(1, min(header_row_idx + 1, 10)):
-            row = ws[row_idx]
-            for cell in row:
-                if not cell.value:
+        scan_rows = rows[:min(header_row_idx, ACADEMIC_YEAR_SCAN_ROWS)]
+        for row_idx, row in enumerate(scan_rows, start=1):
+            for value in row:
+                if not value:
                     continue
-                cell_text = str(cell.value).strip()
+                cell_text = str(value).strip()
                 
                 # Паттерн: "2025-2026 уч. год" или "2025/2026" или "2025-2026"
                 # Ищем формат YYYY-YYYY или YYYY/YYYY
@@ -601,7 +655,8 @@ class ExcelParser:
     @staticmethod
     def parse_multiple_files(
         files_data: List[Tuple[bytes, str]],
-        academic_year: str
+        academic_year: str,
+        workers: Optional[int] = None
     ) -> Tuple[List[Dict[str, Any]], List[str]]:
         """
         Парсит множество Excel файлов от разных кафедр.
@@ -609,100 +664,141 @@ class ExcelParser:
         Args:
             files_data: Список кортежей (байты файла, имя файла)
             academic_year: Учебный год "2024/2025"
+            workers: Процессов (default: config.EXCEL_PARSE_WORKERS, 0 = min(4, ядер))
             
         Returns:
             (объединенные_нагрузки, список_ошибок)
             
+        Время разбора по файлам - ExcelParser.ingest_files.
+        """
+        result = ExcelParser.ingest_files(files_data, academic_year, workers)
+        return result['loads'], result['errors']
+    
+    @staticmethod
+    def ingest_files(
+        files_data: List[Tuple[bytes, str]],
+        academic_year: str,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Разобрать файлы кафедр (параллельно) и объединить нагрузки
+        
         Process:
-            1. Парсит каждый файл отдельно
+            1. Парсит каждый файл отдельно (в пуле процессов при workers > 1)
             2. Автоматически определяет семестр для каждой группы
-            3. Объединяет все нагрузки
-            4. Проверяет на дубликаты
-            5. Возвращает единый список
+            3. Объединяет нагрузки в порядке файлов по мере готовности
+            4. Отбрасывает дубликаты (индекс по ключу нагрузки)
+        
+        Returns:
+            {'loads', 'errors', 'files': [{'filename', 'loads', 'errors', 'seconds'}],
+             'workers', 'seconds'}
         """
-        all_loads = []
-        all_errors = []
+        start = time.monotonic()
         
         # Определяем, какой сейчас семестр (осенний/весенний)
         # По умолчанию: месяцы 9-12 и 1 = осенний, 2-6 = весенний
         current_month = datetime.now().month
         is_autumn = current_month >= 9 or current_month == 1
         
+        workers = pool_workers(config.EXCEL_PARSE_WORKERS if workers is None else workers)
+        workers = max(1, min(workers, len(files_data)))
+        
         logger.info(
             f"Parsing {len(files_data)} files for academic year {academic_year} "
-            f"(is_autumn={is_autumn})"
+            f"(is_autumn={is_autumn}, workers={workers})"
         )
         
-        for file_data, filename in files_data:
-            try:
-                logger.info(f"Parsing file: {filename}")
-                
-                # Парсим один файл (используем существующий метод)
-                loads, errors = ExcelParser.parse_course_loads(
-                    file_data=file_data,
-                    semester=1,  # Временное значение, будет перезаписано
-                    academic_year=academic_year
-                )
-                
-                if errors:
-                    all_errors.extend([f"[{filename}] {err}" for err in errors])
-                
-                # Обновляем семестр для каждой нагрузки
-                for load in loads:
-                    group_name = load.get('group_name', '')
-                    semester_col = load.get('semester_column')
-                    contingent = load.get('contingent_info')
-                    
-                    # Автоматически определяем семестр
-                    semester = ExcelParser.determine_group_semester(
-                        group_name=group_name,
-                        semester_column=semester_col,
-                        contingent_info=contingent,
-                        academic_year=academic_year,
-                        is_autumn_semester=is_autumn
-                    )
-                    
-                    load['semester'] = semester
-                    load['source_file'] = filename  # Для отладки
-                
-                all_loads.extend(loads)
-                logger.info(
-                    f"Parsed {len(loads)} loads from {filename}, "
-                    f"total loads: {len(all_loads)}"
-                )
-                
-            except Exception as e:
-                error_msg = f"[{filename}] Ошибка парсинга: {str(e)}"
+        unique_loads: Dict[Tuple, Dict[str, Any]] = {}
+        all_errors: List[str] = []
+        duplicate_errors: List[str] = []
+        files: List[Dict[str, Any]] = []
+        
+        def merge(filename: str, parsed: Optional[Dict[str, Any]], error: Optional[Exception]):
+            if error is not None:
+                error_msg = f"[{filename}] Ошибка парсинга: {str(error)}"
                 all_errors.append(error_msg)
-                logger.error(error_msg, exc_info=True)
-        
-        # Проверка на дубликаты
-        seen = set()
-        deduplicated_loads = []
-        
-        for load in all_loads:
-            # Уникальный ключ: группа + дисциплина + преподаватель + тип + семестр
-            key = (
-                load['group_name'],
-                load['discipline_name'],
-                load['teacher_name'],
-                load['lesson_type'],
-                load['semester']
-            )
+                logger.error(error_msg, exc_info=error)
+                files.append({'filename': filename, 'loads': 0, 'errors': 1, 'seconds': None})
+                return
             
-            if key not in seen:
-                seen.add(key)
-                deduplicated_loads.append(load)
-            else:
-                all_errors.append(
-                    f"Дубликат: {load['discipline_name']} для {load['group_name']} "
-                    f"({load['teacher_name']}, {load['lesson_type']}, семестр {load['semester']})"
+            loads, errors = parsed['loads'], parsed['errors']
+            if errors:
+                all_errors.extend([f"[{filename}] {err}" for err in errors])
+            
+            for load in loads:
+                # Уникальный ключ: группа + дисциплина + преподаватель + тип + семестр
+                key = (
+                    load['group_name'],
+                    load['discipline_name'],
+                    load['teacher_name'],
+                    load['lesson_type'],
+                    load['semester']
                 )
+                if key not in unique_loads:
+                    unique_loads[key] = load
+                else:
+                    duplicate_errors.append(
+                        f"Дубликат: {load['discipline_name']} для {load['group_name']} "
+                        f"({load['teacher_name']}, {load['lesson_type']}, семестр {load['semester']})"
+                    )
+            
+            files.append({
+                'filename': filename,
+                'loads': len(loads),
+                'errors': len(errors),
+                'seconds': parsed['seconds']
+            })
+            logger.info(
+                f"Parsed {len(loads)} loads from {filename} in {parsed['seconds']:.2f}s, "
+                f"unique loads: {len(unique_loads)}"
+            )
+        
+        if workers > 1:
+            # Файлы передаются в пул окном: байты в очереди пула не копируются все сразу,
+            # результаты сливаются в порядке файлов (дубликаты - как при разборе по очереди)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                files_iter = iter(files_data)
+                while True:
+                    while len(pending) < workers * 2:
+                        item = next(files_iter, None)
+                        if item is None:
+                            break
+                        file_data, filename = item
+                        pending.append((
+                            filename,
+                            pool.submit(_ingest_file, file_data, filename, academic_year, is_autumn)
+                        ))
+                    if not pending:
+                        break
+                    filename, future = pending.popleft()
+                    try:
+                        merge(filename, future.result(), None)
+                    except Exception as e:
+                        merge(filename, None, e)
+        else:
+            for file_data, filename in files_data:
+                try:
+                    logger.info(f"Parsing file: {filename}")
+                    parsed = _ingest_file(file_data, filename, academic_year, is_autumn)
+                except Exception as e:
+                    merge(filename, None, e)
+                else:
+                    merge(filename, parsed, None)
+        
+        deduplicated_loads = list(unique_loads.values())
+        all_errors.extend(duplicate_errors)
+        seconds = round(time.monotonic() - start, 3)
         
         logger.info(
-            f"Total: {len(deduplicated_loads)} unique loads from {len(files_data)} files, "
-            f"{len(all_errors)} errors/warnings"
+            f"Total: {len(deduplicated_loads)} unique loads from {len(files_data)} files "
+            f"in {seconds:.2f}s ({workers} workers), {len(all_errors)} errors/warnings"
         )
         
-        return deduplicated_loads, all_errors
-
+        return {
+            'loads': deduplicated_loads,
+            'errors': all_errors,
+            'files': files,
+            'workers': workers,
+            'seconds': seconds
+        }
@@ -0,0 +1,92 @@
+"""
+Load Catalog - справочник нагрузок генерации
+
+Строится один раз на генерацию из course_loads. Названия (дисциплина,
+преподаватель, группа, тип занятия) хранятся в нём по индексу нагрузки
+(load_idx) и интернируются: одно и то же имя из разных строк БД -
+один объект str на всю генерацию.
+
+Гены хромосом, Lesson и рабочие расписания агента ссылаются на нагрузку
+по индексу и ID; имена подставляются только при материализации
+(Chromosome.to_schedule_dict, строки schedules, ответы gRPC) и в отчётах
+о нарушениях (lesson_names).
+"""
+import sys
+from typing import Any, Dict, Sequence
+
+# Названия нагрузки в занятии
+NAME_FIELDS = ('discipline_name', 'lesson_type', 'group_name', 'teacher_name')
+
+# Ключи рабочего занятия без названий: каталог и индекс нагрузки в нём
+CATALOG_KEY = 'load_catalog'
+LOAD_IDX_KEY = 'load_idx'
+
+DEFAULT_LESSON_TYPE = 'Практика'
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class LoadCatalog:
+    """
+    Атрибуты нагрузок по load_idx (read-only)
+
+    Порядок - порядок course_loads; index: course_load_id -> load_idx
+    (первое вхождение).
+    """
+
+    def __init__(self, course_loads: Sequence[Dict]):
+        self.course_load_ids = tuple(cl.get('id', 0) for cl in course_loads)
+        self.discipline_names = tuple(_intern(cl.get('discipline_name', '')) for cl in course_loads)
+        self.lesson_types = tuple(
+            _intern(cl.get('lesson_type', DEFAULT_LESSON_TYPE)) for cl in course_loads
+        )
+        self.group_ids = tuple(cl.get('group_id', 0) for cl in course_loads)
+        self.group_names = tuple(_intern(cl.get('group_name', '')) for cl in course_loads)
+        self.teacher_ids = tuple(cl.get('teacher_id', 0) for cl in course_loads)
+        self.teacher_names = tuple(_intern(cl.get('teacher_name', '')) for cl in course_loads)
+
+        self.index: Dict[int, int] = {}
+        for idx, load_id in enumerate(self.course_load_ids):
+            self.index.setdefault(load_id, idx)
+
+    def __len__(self) -> int:
+        return len(self.course_load_ids)
+
+    def names(self, load_idx: int) -> Dict[str, str]:
+        """Названия нагрузки (NAME_FIELDS)"""
+        return {
+            'discipline_name': self.discipline_names[load_idx],
+            'lesson_type': self.lesson_types[load_idx],
+            'group_name': self.group_names[load_idx],
+            'teacher_name': self.teacher_names[load_idx]
+        }
+
+    def load_fields(self, load_idx: int) -> Dict[str, Any]:
+        """ID и названия нагрузки - поля занятия, общие для всех его недель"""
+        return {
+            'course_load_id': self.course_load_ids[load_idx],
+            'discipline_name': self.discipline_names[load_idx],
+            'lesson_type': self.lesson_types[load_idx],
+            'group_id': self.group_ids[load_idx],
+            'group_name': self.group_names[load_idx],
+            'teacher_id': self.teacher_ids[load_idx],
+            'teacher_name': self.teacher_names[load_idx]
+        }
+
+
+def lesson_names(lesson: Dict[str, Any], fields: Sequence[str] = NAME_FIELDS) -> Dict[str, str]:
+    """
+    Названия занятия: из самого занятия, иначе из его LoadCatalog
+
+    Поля, которых нет ни там, ни там, в результат не попадают.
+    """
+    catalog = lesson.get(CATALOG_KEY)
+    names = catalog.names(lesson[LOAD_IDX_KEY]) if catalog is not None else {}
+    result = {}
+    for field in fields:
+        value = lesson[field] if field in lesson else names.get(field)
+        if value is not None:
+            result[field] = value
+    return result
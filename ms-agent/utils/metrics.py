@@ -17,6 +17,30 @@ generation_duration_seconds = Histogram(
     ['stage']
 )
 
+generation_phase_seconds = Histogram(
+    'generation_phase_seconds',
+    'Generation phase duration (utils.profiling; per generation - generation_history.metrics)',
+    ['phase'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+
+# Generation queue metrics (services.job_queue)
+generation_queue_depth = Gauge(
+    'generation_queue_depth',
+    'Generations waiting in the queue'
+)
+
+generation_queue_wait_seconds = Histogram(
+    'generation_queue_wait_seconds',
+    'Time from enqueue to worker start',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+generation_workers_busy = Gauge(
+    'generation_workers_busy',
+    'Generation workers running a job'
+)
+
 # RPC metrics
 rpc_requests_total = Counter(
     'rpc_requests_total',
@@ -43,6 +67,19 @@ fitness_score = Gauge(
     ['generation_id']
 )
 
+# Fitness cache metrics
+fitness_cache_lookups_total = Counter(
+    'fitness_cache_lookups_total',
+    'Fitness cache lookups',
+    ['result']
+)
+
+fitness_cache_hit_rate = Gauge(
+    'fitness_cache_hit_rate',
+    'Fitness cache hit rate',
+    ['generation_id']
+)
+
 # LLM metrics
 llm_requests_total = Counter(
     'llm_requests_total',
@@ -56,3 +93,28 @@ llm_duration_seconds = Histogram(
     ['model']
 )
 
+llm_retries_total = Counter(
+    'llm_retries_total',
+    'LLM request retries',
+    ['reason']
+)
+
+
+llm_response_cache_lookups_total = Counter(
+    'llm_response_cache_lookups_total',
+    'LLM response cache lookups (by violation set)',
+    ['result']
+)
+
+analysis_cache_lookups_total = Counter(
+    'analysis_cache_lookups_total',
+    'AnalyzeSchedule response cache lookups (by generation)',
+    ['result']
+)
+
+# GA throughput
+ga_generations_per_second = Gauge(
+    'ga_generations_per_second',
+    'GA throughput over the last run',
+    ['llm_stage']
+)
@@ -0,0 +1,212 @@
+"""
+Preference Matrix - скомпилированные предпочтения преподавателей
+
+Списки предпочтений {day_of_week, time_slot, is_preferred} один раз
+переводятся в плотные массивы преподаватели × дни × пары. После этого
+проверка предпочтения для занятия - индексирование, а для всего
+расписания - один gather по массивам генов.
+
+Строка 0 - преподаватель без данных (нет предпочтений, всегда доступен).
+"""
+from typing import Dict, List, Tuple, Optional, Any
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Штраф за нарушение предпочтения по приоритету преподавателя
+# (совпадает с FitnessCalculator.PENALTY_PREFERENCE)
+DEFAULT_PREFERENCE_PENALTIES = {
+    1: -500,   # Внешний совместитель
+    2: -200,   # Магистрант
+    3: -100,   # Внутренний совместитель
+    4: -30     # Штатный
+}
+
+
+class PreferenceMatrix:
+    """
+    Плотные таблицы предпочтений [row, day, slot]
+
+    priority - приоритет нарушенного (is_preferred=False) предпочтения, 0 = нет
+    penalty - штраф за занятие в слоте (по priority)
+    preferred - слот отмечен как предпочтительный
+    unavailable - преподаватель недоступен (календарь availability)
+    preferred_slots[row, k] - k-й предпочтительный (day, slot), k < preferred_count[row]
+    """
+
+    GRID_SIZE = 8  # Индексы дня/пары 0..7 (используются 1..6)
+
+    def __init__(self,
+                 teacher_preferences: Dict[Any, Any],
+                 penalties: Optional[Dict[int, int]] = None):
+        """
+        Args:
+            teacher_preferences: {teacher_id: {'priority', 'preferences', 'availability'}}
+                или {teacher_id: [preferences]} (формат Stage 1)
+            penalties: штрафы по приоритетам (по умолчанию как в FitnessCalculator)
+        """
+        self.penalties = penalties or DEFAULT_PREFERENCE_PENALTIES
+        grid = self.GRID_SIZE
+
+        teacher_ids = sorted(teacher_preferences.keys())
+        size = len(teacher_ids) + 1
+
+        self.teacher_ids = np.array(teacher_ids, dtype=np.int64)
+        self.rows: Dict[Any, int] = {
+            teacher_id: row for row, teacher_id in enumerate(teacher_ids, start=1)
+        }
+        self.priorities = np.zeros(size, dtype=np.int8)
+
+        self.priority = np.zeros((size, grid, grid), dtype=np.int8)
+        self.preferred = np.zeros((size, grid, grid), dtype=bool)
+        self.unavailable = np.zeros((size, grid, grid), dtype=bool)
+
+        for teacher_id, row in self.rows.items():
+            self._compile_teacher(row, teacher_preferences[teacher_id])
+
+        # Штрафы: gather по приоритету
+        penalty_by_priority = np.zeros(max(self.penalties) + 1, dtype=np.int64)
+        for priority, penalty in self.penalties.items():
+            penalty_by_priority[priority] = penalty
+        self.penalty = penalty_by_priority[self.priority]
+
+        # Предпочтительные слоты: (row, day, slot) в порядке дня/пары
+        pref_rows, pref_days, pref_slots = np.nonzero(self.preferred)
+        self.preferred_count = np.bincount(pref_rows, minlength=size).astype(np.int64)
+        self.preferred_slots = np.zeros(
+            (size, max(1, int(self.preferred_count.max(initial=0))), 2), dtype=np.int64
+        )
+        offsets = np.arange(len(pref_rows)) - np.repeat(
+            np.cumsum(self.preferred_count) - self.preferred_count, self.preferred_count
+        )
+        self.preferred_slots[pref_rows, offsets, 0] = pref_days
+        self.preferred_slots[pref_rows, offsets, 1] = pref_slots
+
+        for array in (
+            self.teacher_ids, self.priorities, self.priority, self.preferred,
+            self.unavailable, self.penalty, self.preferred_count, self.preferred_slots
+        ):
+            array.flags.writeable = False
+
+    def _compile_teacher(self, row: int, teacher_info: Any):
+        """Заполнить строку таблиц для одного преподавателя"""
+        if isinstance(teacher_info, dict):
+            priority = teacher_info.get('priority', 4)
+            preferences = teacher_info.get('preferences', []) or []
+            availability = teacher_info.get('availability')
+        else:
+            priority = 4
+            preferences = teacher_info or []
+            availability = None
+
+        self.priorities[row] = priority if priority in self.penalties else 0
+        grid = self.GRID_SIZE
+
+        # Для штрафа учитывается первое предпочтение слота,
+        # флаг preferred - любое предпочтение с is_preferred
+        seen = set()
+        for pref in preferences:
+            day = pref.get('day_of_week')
+            slot = pref.get('time_slot')
+            if not (isinstance(day, int) and isinstance(slot, int)):
+                continue
+            if not (0 <= day < grid and 0 <= slot < grid):
+                continue
+
+            if pref.get('is_preferred', False):
+                self.preferred[row, day, slot] = True
+
+            if (day, slot) in seen:
+                continue
+            seen.add((day, slot))
+            if not pref.get('is_preferred', True) and priority in self.penalties:
+                self.priority[row, day, slot] = priority
+
+        # Формат availability: {day: {slot: bool}}
+        if availability and isinstance(availability, dict):
+            for day in range(grid):
+                day_availability = availability.get(day, {})
+                if not isinstance(day_availability, dict):
+                    continue
+                for slot in range(grid):
+                    if not day_availability.get(slot, True):
+                        self.unavailable[row, day, slot] = True
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> 'PreferenceMatrix':
+        """Матрица из контекста генерации (скомпилированная или новая)"""
+        matrix = context.get('preference_matrix')
+        if matrix is None:
+            matrix = cls(context.get('teacher_preferences', {}))
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.teacher_ids)
+
+    # ============ Поиск строк ============
+
+    def row(self, teacher_id: Any) -> int:
+        """Строка преподавателя (0 - нет данных)"""
+        return self.rows.get(teacher_id, 0)
+
+    def rows_for(self, teacher_ids: np.ndarray) -> np.ndarray:
+        """Строки для массива teacher_id (векторно)"""
+        teacher_ids = np.asarray(teacher_ids, dtype=np.int64)
+        if len(self.teacher_ids) == 0:
+            return np.zeros(len(teacher_ids), dtype=np.int64)
+        pos = np.minimum(
+            np.searchsorted(self.teacher_ids, teacher_ids), len(self.teacher_ids) - 1
+        )
+        return np.where(self.teacher_ids[pos] == teacher_ids, pos + 1, 0)
+
+    # ============ Проверки для одного занятия ============
+
+    def _in_grid(self, day: Any, slot: Any) -> bool:
+        return isinstance(day, (int, np.integer)) and isinstance(slot, (int, np.integer)) \
+            and 0 <= day < self.GRID_SIZE and 0 <= slot < self.GRID_SIZE
+
+    def violation_priority(self, teacher_id: Any, day: int, slot: int) -> int:
+        """Приоритет нарушенного предпочтения (0 = нет нарушения)"""
+        if not self._in_grid(day, slot):
+            return 0
+        return int(self.priority[self.row(teacher_id), day, slot])
+
+    def is_preferred(self, teacher_id: Any, day: int, slot: int) -> bool:
+        if not self._in_grid(day, slot):
+            return False
+        return bool(self.preferred[self.row(teacher_id), day, slot])
+
+    def is_unavailable(self, teacher_id: Any, day: int, slot: int) -> bool:
+        if not self._in_grid(day, slot):
+            return False
+        return bool(self.unavailable[self.row(teacher_id), day, slot])
+
+    def preferred_slots_for(self, teacher_id: Any) -> List[Tuple[int, int]]:
+        """Предпочтительные (day, slot) преподавателя"""
+        row = self.row(teacher_id)
+        count = int(self.preferred_count[row])
+        return [tuple(pair) for pair in self.preferred_slots[row, :count].tolist()]
+
+    # ============ Векторные проверки ============
+
+    def gather(self, table: np.ndarray, rows: np.ndarray,
+               day: np.ndarray, slot: np.ndarray) -> np.ndarray:
+        """table[rows, day, slot] с нулём для значений вне сетки"""
+        grid = self.GRID_SIZE
+        in_grid = (day >= 0) & (day < grid) & (slot >= 0) & (slot < grid)
+        values = table[rows, np.where(in_grid, day, 0), np.where(in_grid, slot, 0)]
+        return np.where(in_grid, values, 0).astype(table.dtype)
+
+    def random_preferred(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Случайный предпочтительный слот для каждой строки
+
+        Returns:
+            (has_preferred, slots[N, 2]) - для строк без предпочтений slots не определены
+        """
+        counts = self.preferred_count[rows]
+        has_preferred = counts > 0
+        choice = (np.random.random(len(rows)) * np.maximum(counts, 1)).astype(np.int64)
+        return has_preferred, self.preferred_slots[rows, choice]
@@ -0,0 +1,24 @@
+"""
+Размер пулов процессов
+
+ms-agent - многопоточный процесс: потоки gRPC сервера, воркеры очереди
+генераций (GENERATION_WORKERS), фоновые LLM-улучшения. Пулы процессов
+(оценка популяции, Stage 2, кластеры, разбор Excel) создаются через fork
+из такого процесса: дочерний получает копию памяти со всеми блокировками,
+захваченными в этот момент другими потоками (logging, пул соединений БД),
+и может повиснуть на первой же из них. Риск растёт с числом процессов, а
+несколько генераций из очереди с пулом «по числу ядер» каждая
+переподписывают CPU, поэтому 0 в конфиге - не больше DEFAULT_MAX_WORKERS
+процессов. Больше - явным значением *_WORKERS.
+"""
+import os
+
+# Процессов пула по умолчанию (0 в *_WORKERS) - не больше ядер
+DEFAULT_MAX_WORKERS = 4
+
+
+def pool_workers(configured: int) -> int:
+    """Процессов пула: > 0 - как задано, иначе min(DEFAULT_MAX_WORKERS, число ядер)"""
+    if configured > 0:
+        return configured
+    return max(1, min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1))
@@ -0,0 +1,171 @@
+"""
+Профилирование генераций
+
+Фазы генерации (сбор контекста, начальная популяция, оценка, селекция,
+кроссовер, мутация, LLM, запись прогресса в БД, сохранение расписания)
+замеряются в гистограмму generation_phase_seconds{phase} (общую для всех
+генераций: метка generation_id плодила бы серии без предела) и суммируются
+по генерации. Итог по генерации пишется в generation_history.metrics:
+
+    'phases':  {фаза: {'seconds', 'count'}}
+    'profile': топ функций cProfile (только если профилирование включено
+               для генерации - GenerateRequest.profile / GENERATION_PROFILE)
+
+Профилировщик текущей генерации привязан к потоку: фазы в коде ГА и
+Stage 1 пишутся через profiling.phase() / profiling.record() без передачи
+объекта. Фоновые потоки генерации подключаются через bind(). cProfile
+видит только поток генерации, не процессы островов / ParallelEvaluator.
+"""
+import json
+import time
+import pstats
+import logging
+import cProfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Any
+
+from config import config
+from utils.metrics import generation_phase_seconds
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def current() -> Optional['GenerationProfiler']:
+    """Профилировщик генерации текущего потока"""
+    return getattr(_local, 'profiler', None)
+
+
+@contextmanager
+def phase(name: str):
+    """Замерить фазу текущей генерации (вне генерации - без замера)"""
+    profiler = current()
+    if profiler is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(name, time.perf_counter() - start)
+
+
+def record(name: str, seconds: float, count: int = 1):
+    """Добавить уже замеренное время фазы (например, сумму за поколение)"""
+    profiler = current()
+    if profiler is not None:
+        profiler.record(name, seconds, count)
+
+
+class GenerationProfiler:
+    """
+    Замеры фаз одной генерации (+ cProfile при profile=True)
+
+        with GenerationProfiler(generation_id, profile=True):
+            ...  # генерация в этом потоке
+
+    На выходе итог сохраняется в generation_history.metrics.
+    """
+
+    def __init__(self, generation_id: int, profile: Optional[bool] = None):
+        self.generation_id = generation_id
+        self.profile = config.GENERATION_PROFILE if profile is None else profile
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._previous = None
+
+    def record(self, name: str, seconds: float, count: int = 1):
+        generation_phase_seconds.labels(phase=name).observe(seconds)
+        with self._lock:
+            totals = self.phases.setdefault(name, {'seconds': 0.0, 'count': 0})
+            totals['seconds'] += seconds
+            totals['count'] += count
+
+    @contextmanager
+    def bind(self):
+        """Сделать профилировщик текущим в другом (фоновом) потоке"""
+        previous = current()
+        _local.profiler = self
+        try:
+            yield self
+        finally:
+            _local.profiler = previous
+
+    def __enter__(self):
+        self._previous = current()
+        _local.profiler = self
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError as e:
+                # В потоке уже работает другой профилировщик
+                logger.warning(f"⚠️ cProfile unavailable for generation {self.generation_id}: {e}")
+                self._profiler = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+        _local.profiler = self._previous
+        self.save()
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        """Итог для generation_history.metrics"""
+        with self._lock:
+            result: Dict[str, Any] = {
+                'phases': {
+                    name: {'seconds': round(totals['seconds'], 3), 'count': totals['count']}
+                    for name, totals in self.phases.items()
+                }
+            }
+        if self._profiler is not None:
+            result['profile'] = self._profile_top(config.GENERATION_PROFILE_TOP)
+        return result
+
+    def save(self):
+        """Записать итог в generation_history.metrics (ошибка БД не роняет генерацию)"""
+        summary = self.summary()
+        try:
+            # db - при сохранении: phase() используется и без psycopg2 (benchmarks)
+            from db.connection import db
+            from db.queries import generation_history as gen_queries
+
+            db.execute_query(
+                gen_queries.MERGE_GENERATION_METRICS,
+                {'id': self.generation_id, 'metrics': json.dumps(summary)},
+                fetch=False
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save profile of generation {self.generation_id}: {e}")
+            return
+
+        slowest = sorted(summary['phases'].items(), key=lambda item: -item[1]['seconds'])[:5]
+        logger.info(
+            f"⏱️ Generation {self.generation_id} phases: "
+            + ', '.join(f"{name} {totals['seconds']:.2f}s" for name, totals in slowest)
+            + (" (cProfile saved)" if 'profile' in summary else "")
+        )
+
+    def _profile_top(self, limit: int) -> Dict[str, Any]:
+        """Топ функций по cumulative time"""
+        stats = pstats.Stats(self._profiler)
+        rows = []
+        for (filename, line, function), (calls, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': f"{filename}:{line}({function})",
+                'ncalls': ncalls,
+                'primitive_calls': calls,
+                'tottime': round(tottime, 4),
+                'cumtime': round(cumtime, 4)
+            })
+        rows.sort(key=lambda row: -row['cumtime'])
+        return {
+            'total_seconds': round(stats.total_tt, 3),
+            'sort': 'cumtime',
+            'functions': rows[:limit]
+        }